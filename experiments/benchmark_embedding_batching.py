@@ -0,0 +1,46 @@
+import json
+import os
+import time
+
+from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+
+from src.config import DEVICE, EMBEDDING_MODEL_NAME, EMBEDDING_TOKEN_BUDGETS
+from src.core.models.bucketed_embeddings import LengthBucketedEmbeddings
+
+CHUNKS_DIRECTORY = "data/processed/chunks"
+MAX_CHUNKS = 2000
+
+
+def load_chunks():
+    chunks = []
+    for filename in sorted(os.listdir(CHUNKS_DIRECTORY)):
+        if filename.endswith(".jsonl"):
+            with open(os.path.join(CHUNKS_DIRECTORY, filename), "r") as f:
+                chunks.extend(json.loads(line)["text"] for line in f)
+    return chunks[:MAX_CHUNKS]
+
+
+if __name__ == "__main__":
+    chunks = load_chunks()
+    print(f"Chunks: {len(chunks)}")
+
+    embeddings = HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL_NAME, model_kwargs={"device": DEVICE, "trust_remote_code": True}
+    )
+    embeddings.embed_documents(chunks[:8])
+
+    start_time = time.perf_counter()
+    embeddings.embed_documents(chunks)
+    baseline_seconds = time.perf_counter() - start_time
+    print(f"{'default batching':<24} {baseline_seconds:>8.2f}s")
+
+    default_budget = EMBEDDING_TOKEN_BUDGETS[DEVICE]
+    for token_budget in (default_budget // 4, default_budget // 2, default_budget, default_budget * 2):
+        bucketed_embeddings = LengthBucketedEmbeddings(embeddings, token_budget)
+        bucketed_embeddings.embed_documents(chunks)
+        stats = bucketed_embeddings.stats()
+        print(
+            f"{f'budget {token_budget}':<24} {stats['seconds']:>8.2f}s | "
+            f"{stats['tokens_per_second']:>8.0f} tokens/s | padding {stats['padding_ratio']:.2f}x | "
+            f"speedup {baseline_seconds / stats['seconds']:.2f}x"
+        )
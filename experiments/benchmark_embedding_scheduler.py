@@ -0,0 +1,62 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+
+from src.config import DEVICE, EMBEDDING_BATCH_WINDOW_MS, EMBEDDING_MAX_BATCH_SIZE, EMBEDDING_MODEL_NAME
+from src.core.models.embedding_scheduler import EmbeddingScheduler
+
+CONCURRENT_SESSIONS = 16
+REQUESTS_PER_SESSION = 20
+QUESTION = "What datasets were used to evaluate the proposed method and how does it compare to the baselines?"
+
+
+def run_load(embeddings):
+    def session(session_id):
+        latencies = []
+        for request_id in range(REQUESTS_PER_SESSION):
+            start_time = time.perf_counter()
+            embeddings.embed_query(f"{QUESTION} ({session_id}-{request_id})")
+            latencies.append(time.perf_counter() - start_time)
+        return latencies
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENT_SESSIONS) as executor:
+        latencies = [latency for result in executor.map(session, range(CONCURRENT_SESSIONS)) for latency in result]
+    return time.perf_counter() - start_time, np.array(latencies)
+
+
+if __name__ == "__main__":
+    embeddings = HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL_NAME, model_kwargs={"device": DEVICE, "trust_remote_code": True}
+    )
+    embeddings.embed_query(QUESTION)
+    request_count = CONCURRENT_SESSIONS * REQUESTS_PER_SESSION
+    print(f"{CONCURRENT_SESSIONS} sessions x {REQUESTS_PER_SESSION} queries on {DEVICE}")
+
+    for name, window_ms in [
+        ("direct", None),
+        ("scheduler", EMBEDDING_BATCH_WINDOW_MS / 2),
+        ("scheduler", EMBEDDING_BATCH_WINDOW_MS),
+        ("scheduler", EMBEDDING_BATCH_WINDOW_MS * 2),
+    ]:
+        model = embeddings
+        if window_ms is not None:
+            model = EmbeddingScheduler(
+                embeddings,
+                batch_window_seconds=window_ms / 1000,
+                max_batch_size=EMBEDDING_MAX_BATCH_SIZE,
+                queries_as_documents=not embeddings.query_encode_kwargs,
+            )
+        seconds, latencies = run_load(model)
+        label = name if window_ms is None else f"{name} {window_ms:g}ms"
+        print(
+            f"{label:<18} {request_count / seconds:>8.1f} req/s | "
+            f"p50 {np.percentile(latencies, 50) * 1000:>7.1f}ms | "
+            f"p95 {np.percentile(latencies, 95) * 1000:>7.1f}ms | "
+            f"p99 {np.percentile(latencies, 99) * 1000:>7.1f}ms"
+        )
+        if isinstance(model, EmbeddingScheduler):
+            print(f"{'':<18} mean batch size {model.stats()['mean_batch_size']:.1f}")
+            model.close()
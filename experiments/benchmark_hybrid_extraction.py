@@ -0,0 +1,49 @@
+import os
+import time
+
+from src.core.data_processing.hybrid_extractor import HybridTextExtractor, summarize_page_sources
+from src.core.data_processing.text_extractor import MarkerTextExtractor
+
+RAW_DOCS_DIRECTORY = "data/raw/documents"
+
+
+if __name__ == "__main__":
+    marker_extractor = MarkerTextExtractor()
+    hybrid_extractor = HybridTextExtractor()
+
+    all_pages = []
+    total_marker_seconds = 0.0
+    total_hybrid_seconds = 0.0
+
+    for filename in sorted(os.listdir(RAW_DOCS_DIRECTORY)):
+        if not filename.endswith(".pdf"):
+            continue
+        file_path = os.path.join(RAW_DOCS_DIRECTORY, filename)
+
+        start_time = time.perf_counter()
+        marker_extractor.extract_text_from_pdf_file(file_path)
+        marker_seconds = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        pages = hybrid_extractor.extract_pages(file_path)
+        hybrid_seconds = time.perf_counter() - start_time
+
+        summary = summarize_page_sources(pages)
+        print(
+            f"{filename}: {len(pages)} pages | marker {marker_seconds:.2f}s | hybrid {hybrid_seconds:.2f}s "
+            f"({summary['text_layer']['pages']} text layer, {summary['marker']['pages']} marker)"
+        )
+
+        all_pages.extend(pages)
+        total_marker_seconds += marker_seconds
+        total_hybrid_seconds += hybrid_seconds
+
+    summary = summarize_page_sources(all_pages)
+    print(f"\n{'=' * 70}")
+    print(f"Pages: {len(all_pages)}")
+    for source, stats in summary.items():
+        print(f"  {source:<12} {stats['pages']:>6} pages  {stats['pages_per_second']:>10.2f} pages/s")
+    print(f"Marker only: {total_marker_seconds:.2f}s")
+    print(f"Hybrid:      {total_hybrid_seconds:.2f}s")
+    if total_hybrid_seconds > 0:
+        print(f"Speedup:     {total_marker_seconds / total_hybrid_seconds:.2f}x")
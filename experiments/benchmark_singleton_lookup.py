@@ -0,0 +1,78 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock, Thread
+
+from src.core.utils.model_registry import ModelRegistryMeta
+from src.core.utils.singleton_meta import SingletonMeta
+
+THREADS = 16
+LOOKUPS_PER_THREAD = 100_000
+SLOW_INIT_SECONDS = 2.0
+
+
+class GlobalLockSingletonMeta(type):
+    """Previous SingletonMeta: one class-level lock taken on every call."""
+
+    _instances = {}
+    _lock: Lock = Lock()
+
+    def __call__(cls, *args, **kwargs):
+        with cls._lock:
+            if cls not in cls._instances:
+                cls._instances[cls] = super().__call__(*args, **kwargs)
+        return cls._instances[cls]
+
+
+def make_classes(metaclass):
+    release = Event()
+
+    class FastModel(metaclass=metaclass):
+        pass
+
+    class SlowModel(metaclass=metaclass):
+        def __init__(self):
+            release.wait(SLOW_INIT_SECONDS)
+
+    return FastModel, SlowModel, release
+
+
+def measure_lookups(model_class):
+    model_class()
+
+    def lookups(_):
+        for _ in range(LOOKUPS_PER_THREAD):
+            model_class()
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        list(executor.map(lookups, range(THREADS)))
+    return THREADS * LOOKUPS_PER_THREAD / (time.perf_counter() - start_time)
+
+
+def measure_blocked_lookup(fast_class, slow_class, release):
+    slow_thread = Thread(target=slow_class)
+    slow_thread.start()
+    time.sleep(0.1)
+    start_time = time.perf_counter()
+    fast_class()
+    seconds = time.perf_counter() - start_time
+    release.set()
+    slow_thread.join()
+    return seconds
+
+
+if __name__ == "__main__":
+    print(f"{THREADS} threads x {LOOKUPS_PER_THREAD} lookups, slow init {SLOW_INIT_SECONDS}s")
+    for name, metaclass in [
+        ("global lock", GlobalLockSingletonMeta),
+        ("SingletonMeta", SingletonMeta),
+        ("ModelRegistryMeta", ModelRegistryMeta),
+    ]:
+        fast_class, slow_class, release = make_classes(metaclass)
+        lookups_per_second = measure_lookups(fast_class)
+        fast_class, slow_class, release = make_classes(metaclass)
+        blocked_seconds = measure_blocked_lookup(fast_class, slow_class, release)
+        print(
+            f"{name:<18} {lookups_per_second / 1e6:>6.2f}M lookups/s | "
+            f"first lookup during another class's init: {blocked_seconds * 1000:>8.1f}ms"
+        )
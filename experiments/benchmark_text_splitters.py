@@ -0,0 +1,50 @@
+import os
+import time
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from transformers import AutoTokenizer
+
+from src.config import CHUNK_OVERLAP, CHUNK_SIZE, EMBEDDING_MODEL_NAME, SEPARATORS
+from src.core.data_processing.token_offset_splitter import TokenOffsetTextSplitter
+
+PROCESSED_DOCS_DIRECTORY = "data/processed/documents"
+
+
+def measure(text_splitter, texts):
+    start_time = time.process_time()
+    chunks = [chunk for text in texts for chunk in text_splitter.split_text(text)]
+    return chunks, time.process_time() - start_time
+
+
+if __name__ == "__main__":
+    tokenizer = AutoTokenizer.from_pretrained(EMBEDDING_MODEL_NAME)
+    text_splitters = {
+        "recursive": RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+            tokenizer=tokenizer, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, separators=SEPARATORS
+        ),
+        "token_offset": TokenOffsetTextSplitter(
+            tokenizer=tokenizer, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, separators=SEPARATORS
+        ),
+    }
+
+    texts = []
+    for filename in sorted(os.listdir(PROCESSED_DOCS_DIRECTORY)):
+        if filename.endswith(".md"):
+            with open(os.path.join(PROCESSED_DOCS_DIRECTORY, filename), "r") as f:
+                texts.append(f.read())
+    total_chars = sum(len(text) for text in texts)
+    print(f"Documents: {len(texts)} ({total_chars} characters)")
+
+    cpu_seconds = {}
+    for name, text_splitter in text_splitters.items():
+        chunks, cpu_seconds[name] = measure(text_splitter, texts)
+        token_counts = [len(tokenizer.tokenize(chunk)) for chunk in chunks]
+        oversized = sum(1 for count in token_counts if count > CHUNK_SIZE)
+        print(
+            f"{name:<14} {cpu_seconds[name]:>8.2f}s CPU | {len(chunks):>6} chunks | "
+            f"mean {sum(token_counts) / max(len(token_counts), 1):>6.1f} tokens | "
+            f"max {max(token_counts, default=0):>4} tokens | {oversized} over {CHUNK_SIZE}"
+        )
+
+    if cpu_seconds["token_offset"] > 0:
+        print(f"Speedup: {cpu_seconds['recursive'] / cpu_seconds['token_offset']:.2f}x")
@@ -1,7 +1,7 @@
 import os
 
-from src.core.data_processing.text_extractor import MarkerTextExtractor
-
+from src.core.data_processing.extraction_cache import build_text_extractor
+from src.core.data_processing.markdown_chunker import join_pages
 
 RAW_DOCS_DIRECTORY = "data/raw/documents"
 PROCESSED_DOCS_DIRECTORY = "data/processed/documents"
@@ -9,7 +9,7 @@ PROCESSED_DOCS_DIRECTORY = "data/processed/documents"
 if __name__ == "__main__":
     os.makedirs(PROCESSED_DOCS_DIRECTORY, exist_ok=True)
 
-    text_extractor = MarkerTextExtractor()
+    text_extractor = build_text_extractor()
 
     for filename in os.listdir(RAW_DOCS_DIRECTORY):
         if filename.endswith(".pdf"):
@@ -20,7 +20,7 @@ if __name__ == "__main__":
 
             if not os.path.exists(processed_file_path):
                 print(f"Processing {filename}...")
-                article_text = text_extractor.extract_text_from_pdf_file(raw_file_path)
+                article_text = join_pages([text_extractor.extract_text_from_pdf_file(raw_file_path)])
                 with open(processed_file_path, "w") as f:
                     f.write(article_text)
                 print(f"Processed {filename}")
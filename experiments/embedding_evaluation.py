@@ -4,13 +4,28 @@ from typing import Dict, List, Any
 
 import numpy as np
 from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_huggingface.embeddings import HuggingFaceEmbeddings
 
+from experiments.retrieval_metrics import RetrievalMetrics
+from src.core.data_processing.vector_index import (
+    INDEX_OPTIONS,
+    batch_similarity_search,
+    build_vector_store,
+    get_index_embeddings,
+    get_index_memory_bytes,
+)
+from src.core.exceptions import VectorStoreError
+from src.core.models.embedding_cache import CachedEmbeddings, EmbeddingCache
+from src.core.models.process_pool_embeddings import ProcessPoolEmbeddings
+
 
 # --- Configuration ---
 CHUNKED_DOCS_DIRECTORY = "data/processed/chunks"
 EMBEDDING_DATASET_DIRECTORY = "data/embedding_dataset"
 EVAL_RESULTS_DIRECTORY = "results"
+EMBEDDING_CACHE_DIRECTORY = "data/cache/embeddings"
 
 
 MODEL_NAMES_TO_EVALUATE = [
@@ -24,6 +39,14 @@ MODEL_KWARGS = {
     "trust_remote_code": True,
 }
 
+# On CPU-only hosts, set to the number of worker processes chunk embedding is sharded across
+EMBEDDING_WORKERS = 0
+EMBEDDING_THREADS_PER_WORKER = 4
+
+# Vector index options (see src/core/data_processing/vector_index.py) compared for each model.
+# Chunk embeddings are cached, so every option after the first reuses them.
+INDEX_OPTIONS_TO_EVALUATE = list(INDEX_OPTIONS)
+
 RECALL_KS_TO_EVALUATE = [
     1,
     3,
@@ -35,37 +58,9 @@ K_RETRIEVAL_SEARCH_LIMIT = (
     max(RECALL_KS_TO_EVALUATE) + 5 if RECALL_KS_TO_EVALUATE else 1
 )
 
-
-# --- Helper Functions (Metrics) ---
-
-
-def calculate_mrr(
-    ground_truth_chunk_ids: List[str], ranked_chunk_ids: List[str]
-) -> float:
-    """
-    Calculates Mean Reciprocal Rank (MRR) for a single query.
-    Returns 1.0/(rank of first relevant) or 0.0 if no relevant found in rank.
-    Rank is 1-based for MRR calculation.
-    Assumes ground_truth_chunk_ids is not empty for questions where a relevant chunk exists.
-    """
-    for rank, chunk_id in enumerate(ranked_chunk_ids):
-        if chunk_id in ground_truth_chunk_ids:
-            return 1.0 / (rank + 1)
-    return 0.0
-
-
-def calculate_recall(
-    ground_truth_chunk_ids: List[str], ranked_chunk_ids: List[str]
-) -> float:
-    """
-    Calculates Recall for a single query based on a list of ranked chunk IDs (top K).
-    K is implicitly the length of ranked_chunk_ids.
-    Assumes ground_truth_chunk_ids is not empty for questions where a relevant chunk exists.
-    """
-    relevant_count = sum(
-        1 for chunk_id in ranked_chunk_ids if chunk_id in ground_truth_chunk_ids
-    )
-    return relevant_count / len(ground_truth_chunk_ids)
+# Resamples of the questions used for the bootstrap confidence intervals of every metric
+BOOTSTRAP_SAMPLES = 1000
+CONFIDENCE_LEVEL = 0.95
 
 
 # --- Data Loading Functions ---
@@ -103,20 +98,41 @@ def load_questions(directory: str) -> Dict[str, List[Dict[str, Any]]]:
 
 
 def create_vector_stores(
-    chunks_data: Dict[str, List[Dict[str, Any]]], embedding_model: HuggingFaceEmbeddings
+    chunks_data: Dict[str, List[Dict[str, Any]]], embedding_model: Embeddings, index_option: str = "float32"
 ) -> Dict[str, FAISS]:
-    """Creates and returns a dictionary of FAISS vector stores (one per source chunk file)."""
-    print(f"\nCreating FAISS vector stores for model: {embedding_model.model_name}")
+    """
+    Creates and returns a dictionary of FAISS vector stores (one per source chunk file).
+    Trainable indexes (e.g. PCA) are fitted on the pooled chunks of all files,
+    since a single paper usually has fewer chunks than output dimensions.
+    Raises VectorStoreError if an index cannot be built, e.g. with too few vectors.
+    """
+    print(f"\nCreating FAISS vector stores for model: {embedding_model.model_name} [{index_option}]")
     vector_stores = {}
+    index_embeddings = get_index_embeddings(embedding_model, index_option)
+
+    documents_by_file = {
+        filename: [Document(page_content=chunk["text"], metadata={"id": chunk["id"]}) for chunk in chunks_list]
+        for filename, chunks_list in chunks_data.items()
+    }
+    vectors_by_file = {
+        filename: index_embeddings.embed_documents([document.page_content for document in documents])
+        for filename, documents in documents_by_file.items()
+    }
+    training_vectors = np.concatenate(
+        [np.asarray(vectors, dtype=np.float32) for vectors in vectors_by_file.values() if vectors]
+    )
 
-    for filename, chunks_list in chunks_data.items():
+    for filename, documents in documents_by_file.items():
         print(
-            f"  Creating FAISS store for {filename} with {len(chunks_list)} chunks..."
+            f"  Creating FAISS store for {filename} with {len(documents)} chunks..."
         )
-        vector_store = FAISS.from_texts(
-            texts=[chunk["text"] for chunk in chunks_list],
-            embedding=embedding_model,
-            metadatas=[{"id": chunk["id"]} for chunk in chunks_list],
+        vector_store = build_vector_store(
+            index_embeddings,
+            documents,
+            vectors_by_file[filename],
+            index_option,
+            training_vectors=training_vectors,
+            fallback_option=None,
         )
         vector_stores[filename] = vector_store
         print(f"  FAISS store for {filename} created.")
@@ -137,56 +153,42 @@ def evaluate_model_on_dataset(
     Evaluates the embedding model (reprezented by the vector_stores)
     based on questions and ground truth.
     Performs search up to k_retrieval_search_limit.
-    Calculates MRR (on full search results) and Recall@K for specified Ks.
-    Returns a dictionary with average metrics (MRR and Recall@K for specified Ks).
+    Calculates MRR (on full search results), Recall@K, nDCG@K and hit rate@K for specified Ks,
+    with bootstrap confidence intervals (see experiments/retrieval_metrics.py).
+    Returns a dictionary with average metrics and their confidence intervals.
     Assumes data is well-formed and searches succeed.
     """
     print(
         f"\nStarting evaluation (Retrieval Search Limit K={k_retrieval_search_limit})..."
     )
 
-    all_mrr_scores: List[float] = []
-    all_recall_scores_at_k: Dict[int, List[float]] = {k: [] for k in recall_ks}
-    evaluated_questions_count = 0
+    all_ranked_chunk_ids: List[List[str]] = []
+    all_ground_truth_chunk_ids: List[List[str]] = []
 
     for filename, faiss_index in vector_stores.items():
         qa_list = questions_answers_data[filename]
 
-        for q_entry in qa_list:
-            question_text = q_entry["question"]
-            ground_truth_chunk_ids = q_entry["chunk_ids"]
-
-            search_results = faiss_index.similarity_search(
-                query=question_text, k=k_retrieval_search_limit
-            )
-
-            ranked_chunk_ids = [result.metadata["id"] for result in search_results]
-
-            mrr = calculate_mrr(ground_truth_chunk_ids, ranked_chunk_ids)
-            all_mrr_scores.append(mrr)
-
-            for k in recall_ks:
-                current_k = min(k, len(ranked_chunk_ids))
-
-                top_k_ranked_ids = ranked_chunk_ids[:current_k]
-                recall_at_k = calculate_recall(ground_truth_chunk_ids, top_k_ranked_ids)
-
-                all_recall_scores_at_k[k].append(recall_at_k)
-
-            evaluated_questions_count += 1
+        # All questions of a paper are embedded and searched in one batch.
+        batch_results = batch_similarity_search(
+            faiss_index,
+            [q_entry["question"] for q_entry in qa_list],
+            k_retrieval_search_limit,
+        )
 
-    mean_mrr = np.mean(all_mrr_scores)
+        for q_entry, search_results in zip(qa_list, batch_results):
+            all_ranked_chunk_ids.append([result.metadata["id"] for result, _ in search_results])
+            all_ground_truth_chunk_ids.append(q_entry["chunk_ids"])
 
-    mean_recalls_at_k = {
-        k: np.mean(scores) for k, scores in all_recall_scores_at_k.items()
-    }
+    metrics = RetrievalMetrics(all_ranked_chunk_ids, all_ground_truth_chunk_ids).compute(
+        recall_ks, bootstrap_samples=BOOTSTRAP_SAMPLES, confidence_level=CONFIDENCE_LEVEL
+    )
+    evaluated_questions_count = len(all_ranked_chunk_ids)
 
     print("\nEvaluation finished.")
     print(f"Number of questions evaluated: {evaluated_questions_count}")
 
     return {
-        "mean_mrr": mean_mrr,
-        "mean_recalls_at_k": mean_recalls_at_k,
+        **metrics,
         "k_retrieval_search_limit": k_retrieval_search_limit,
         "evaluated_questions_count": evaluated_questions_count,
     }
@@ -199,27 +201,51 @@ if __name__ == "__main__":
     all_questions_answers_data = load_questions(EMBEDDING_DATASET_DIRECTORY)
 
     all_models_evaluation_results: Dict[str, Dict[str, Any]] = {}
+    skipped_evaluations: Dict[str, str] = {}
 
     for model_name in MODEL_NAMES_TO_EVALUATE:
         print(f"\n{'-' * 70}")
         print(f"STARTING EVALUATION FOR MODEL: {model_name}")
         print(f"{'-' * 70}")
 
-        embedding_model = HuggingFaceEmbeddings(
-            model_name=model_name, model_kwargs=MODEL_KWARGS
-        )
+        if EMBEDDING_WORKERS:
+            base_model = ProcessPoolEmbeddings(
+                model_name,
+                {**MODEL_KWARGS, "device": "cpu"},
+                num_workers=EMBEDDING_WORKERS,
+                threads_per_worker=EMBEDDING_THREADS_PER_WORKER,
+                min_shard_size=16,
+            )
+        else:
+            base_model = HuggingFaceEmbeddings(model_name=model_name, model_kwargs=MODEL_KWARGS)
+        embedding_model = CachedEmbeddings(base_model, EmbeddingCache(EMBEDDING_CACHE_DIRECTORY, model_name))
         print(f"Model '{model_name}' loaded successfully.")
 
-        vector_stores_for_model = create_vector_stores(all_chunks_data, embedding_model)
+        for index_option in INDEX_OPTIONS_TO_EVALUATE:
+            try:
+                vector_stores_for_model = create_vector_stores(all_chunks_data, embedding_model, index_option)
+            except VectorStoreError as e:
+                # e.g. PCA needs at least as many pooled chunks as output dimensions.
+                print(f"Skipping index option {index_option}: {e}")
+                skipped_evaluations[f"{model_name} [{index_option}]"] = str(e)
+                continue
+            print(
+                f"Chunk embeddings: {embedding_model.hits} served from cache, {embedding_model.misses} computed."
+            )
 
-        model_evaluation_metrics = evaluate_model_on_dataset(
-            vector_stores_for_model,
-            all_questions_answers_data,
-            k_retrieval_search_limit=K_RETRIEVAL_SEARCH_LIMIT,
-            recall_ks=RECALL_KS_TO_EVALUATE,
-        )
+            model_evaluation_metrics = evaluate_model_on_dataset(
+                vector_stores_for_model,
+                all_questions_answers_data,
+                k_retrieval_search_limit=K_RETRIEVAL_SEARCH_LIMIT,
+                recall_ks=RECALL_KS_TO_EVALUATE,
+            )
+            model_evaluation_metrics["index_bytes"] = sum(
+                get_index_memory_bytes(vector_store) for vector_store in vector_stores_for_model.values()
+            )
 
-        all_models_evaluation_results[model_name] = model_evaluation_metrics
+            all_models_evaluation_results[f"{model_name} [{index_option}]"] = model_evaluation_metrics
+        if isinstance(base_model, ProcessPoolEmbeddings):
+            base_model.close()
 
     eval_results_file = os.path.join(
         EVAL_RESULTS_DIRECTORY, "embedding_model_evaluation_results.json"
@@ -227,7 +253,7 @@ if __name__ == "__main__":
     os.makedirs(EVAL_RESULTS_DIRECTORY, exist_ok=True)
 
     with open(eval_results_file, "w") as f:
-        json.dump(all_models_evaluation_results, f, indent=4)
+        json.dump({**all_models_evaluation_results, "skipped": skipped_evaluations}, f, indent=4)
     print(f"\nEvaluation results saved to: {eval_results_file}")
 
     
@@ -246,14 +272,15 @@ if __name__ == "__main__":
     col_width_mrr = 15
     col_width_recall_col = 15
 
-    recall_header_cols = [f"Recall@{k}" for k in RECALL_KS_TO_EVALUATE]
-    header_row_list = ["Model", "Qs Eval", "Mean MRR"] + recall_header_cols
+    max_k = max(RECALL_KS_TO_EVALUATE)
+    recall_header_cols = [f"Recall@{k}" for k in RECALL_KS_TO_EVALUATE] + [f"nDCG@{max_k}", f"Hit@{max_k}", "MRR CI"]
+    header_row_list = ["Model", "Qs Eval", "Mean MRR"] + recall_header_cols + ["Index MB"]
 
     header_line = f"{header_row_list[0]:<{col_width_model}} | {header_row_list[1]:<{col_width_questions}} | {header_row_list[2]:<{col_width_mrr}} | {' | '.join([f'{h:<{col_width_recall_col}}' for h in header_row_list[3:]])}"
     print(header_line)
 
     fixed_line_part = f"{'-' * col_width_model}-|-{'-' * col_width_questions}-|-{'-' * col_width_mrr}-|-"
-    recall_line_parts = [f"{'-' * col_width_recall_col}" for _ in RECALL_KS_TO_EVALUATE]
+    recall_line_parts = [f"{'-' * col_width_recall_col}" for _ in header_row_list[3:]]
     dynamic_line_part = " | ".join(recall_line_parts)
     full_separator_line = fixed_line_part + dynamic_line_part
     print(full_separator_line)
@@ -262,6 +289,11 @@ if __name__ == "__main__":
         recall_values_formatted_list = [
             f"{metrics['mean_recalls_at_k'][k]:<{col_width_recall_col}.4f}"
             for k in RECALL_KS_TO_EVALUATE
+        ] + [
+            f"{metrics['mean_ndcg_at_k'][max_k]:<{col_width_recall_col}.4f}",
+            f"{metrics['hit_rate_at_k'][max_k]:<{col_width_recall_col}.4f}",
+            f"{'{:.3f}-{:.3f}'.format(*metrics['confidence_intervals']['mrr']):<{col_width_recall_col}}",
+            f"{metrics['index_bytes'] / 2**20:<{col_width_recall_col}.2f}",
         ]
         recall_values_formatted_str = " | ".join(recall_values_formatted_list)
 
@@ -272,6 +304,9 @@ if __name__ == "__main__":
             f"{recall_values_formatted_str}"
         )
 
+    for model_name, reason in skipped_evaluations.items():
+        print(f"{model_name:<{col_width_model}} | skipped: {reason}")
+
     print(f"\n{'=' * 70}")
     print("END OF EVALUATION")
     print(f"{'=' * 70}")
@@ -0,0 +1,92 @@
+import time
+
+import numpy as np
+from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+
+from experiments.embedding_evaluation import (
+    CHUNKED_DOCS_DIRECTORY,
+    EMBEDDING_DATASET_DIRECTORY,
+    K_RETRIEVAL_SEARCH_LIMIT,
+    RECALL_KS_TO_EVALUATE,
+    create_vector_stores,
+    evaluate_model_on_dataset,
+    load_chunks,
+    load_questions,
+)
+from src.config import EMBEDDING_MODEL_NAME, EMBEDDING_ONNX_DIR
+from src.core.models.onnx_export import EMBEDDING_BACKENDS, export_onnx_model, get_onnx_file_name
+
+PARITY_SAMPLE_SIZE = 256
+MIN_COSINE_SIMILARITY = 0.99
+MAX_RECALL_DROP = 0.01
+
+
+def load_backend(backend):
+    model_kwargs = {"device": "cpu", "trust_remote_code": True}
+    model_path = EMBEDDING_MODEL_NAME
+    if backend != "torch":
+        quantized = backend == "onnx-int8"
+        model_path = export_onnx_model(EMBEDDING_MODEL_NAME, EMBEDDING_ONNX_DIR, quantize=quantized)
+        model_kwargs["backend"] = "onnx"
+        model_kwargs["model_kwargs"] = {"file_name": get_onnx_file_name(quantized)}
+    return HuggingFaceEmbeddings(model_name=model_path, model_kwargs=model_kwargs)
+
+
+def cosine_similarities(vectors_a, vectors_b):
+    vectors_a = np.asarray(vectors_a, dtype=np.float32)
+    vectors_b = np.asarray(vectors_b, dtype=np.float32)
+    norms = np.linalg.norm(vectors_a, axis=1) * np.linalg.norm(vectors_b, axis=1)
+    return np.sum(vectors_a * vectors_b, axis=1) / np.maximum(norms, 1e-12)
+
+
+if __name__ == "__main__":
+    all_chunks_data = load_chunks(CHUNKED_DOCS_DIRECTORY)
+    all_questions_answers_data = load_questions(EMBEDDING_DATASET_DIRECTORY)
+    sample = [chunk["text"] for chunks in all_chunks_data.values() for chunk in chunks][:PARITY_SAMPLE_SIZE]
+
+    results = {}
+    reference_vectors = None
+    for backend in EMBEDDING_BACKENDS:
+        print(f"\n{'-' * 70}\nBACKEND: {backend}\n{'-' * 70}")
+        embeddings = load_backend(backend)
+        embeddings.model_name = f"{EMBEDDING_MODEL_NAME}@{backend}"
+        embeddings.embed_documents(sample[:8])
+
+        start_time = time.perf_counter()
+        vectors = embeddings.embed_documents(sample)
+        seconds = time.perf_counter() - start_time
+
+        if reference_vectors is None:
+            reference_vectors = vectors
+        similarities = cosine_similarities(reference_vectors, vectors)
+
+        vector_stores = create_vector_stores(all_chunks_data, embeddings)
+        metrics = evaluate_model_on_dataset(
+            vector_stores,
+            all_questions_answers_data,
+            k_retrieval_search_limit=K_RETRIEVAL_SEARCH_LIMIT,
+            recall_ks=RECALL_KS_TO_EVALUATE,
+        )
+        results[backend] = {
+            "seconds": seconds,
+            "min_cosine": float(similarities.min()),
+            "mean_cosine": float(similarities.mean()),
+            "metrics": metrics,
+        }
+
+    reference = results["torch"]
+    print(f"\n{'=' * 70}\nBACKEND COMPARISON ({len(sample)} chunks, CPU)\n{'=' * 70}")
+    for backend, result in results.items():
+        recall_drops = {
+            k: reference["metrics"]["mean_recalls_at_k"][k] - result["metrics"]["mean_recalls_at_k"][k]
+            for k in RECALL_KS_TO_EVALUATE
+        }
+        passed = result["min_cosine"] >= MIN_COSINE_SIMILARITY and max(recall_drops.values()) <= MAX_RECALL_DROP
+        recalls = " | ".join(
+            f"R@{k} {result['metrics']['mean_recalls_at_k'][k]:.4f}" for k in RECALL_KS_TO_EVALUATE
+        )
+        print(
+            f"{backend:<10} {result['seconds']:>7.2f}s ({reference['seconds'] / result['seconds']:.2f}x) | "
+            f"cosine min {result['min_cosine']:.4f} mean {result['mean_cosine']:.4f} | "
+            f"MRR {result['metrics']['mean_mrr']:.4f} | {recalls} | {'OK' if passed else 'DEGRADED'}"
+        )
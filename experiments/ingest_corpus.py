@@ -0,0 +1,299 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+from queue import Queue
+from typing import Callable, NamedTuple, Optional
+
+from langchain_core.documents import Document as Chunk
+
+from src.config import (
+    CHUNK_OVERLAP,
+    CHUNK_SIZE,
+    DEFAULT_EXTRACTION_PROFILE,
+    DEVICE,
+    EMBEDDING_BACKEND,
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_MIN_SHARD_SIZE,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_ONNX_DIR,
+    EMBEDDING_THREADS_PER_WORKER,
+    EMBEDDING_TOKEN_BUDGETS,
+    EMBEDDING_WORKERS,
+    EXTRACTION_WORKERS,
+    PARALLEL_EXTRACTION,
+    SEPARATORS,
+    TOKEN_OFFSET_SPLITTER,
+    VECTOR_INDEX_OPTION,
+)
+from src.core.data_processing.corpus_index import CORPUS_INDEX_TYPES, CorpusIndex
+from src.core.data_processing.document_processor import DocumentProcessor
+from src.core.data_processing.extraction_cache import build_text_extractor
+from src.core.data_processing.ingestion_manifest import (
+    CHUNKED_STAGE,
+    EMBEDDED_STAGE,
+    EXTRACTED_STAGE,
+    IngestionManifest,
+    compute_content_hash,
+)
+from src.core.data_processing.markdown_chunker import MarkdownSectionChunker
+from src.core.data_processing.text_extractor import EXTRACTION_PROFILES
+from src.core.data_processing.text_splitter_registry import TextSplitterRegistry
+from src.core.data_processing.vector_index import INDEX_OPTIONS, get_index_embeddings
+from src.core.models.embedding import EmbeddingModel
+
+RAW_DOCS_DIRECTORY = "data/raw/documents"
+CORPUS_DIRECTORY = "data/processed/corpus"
+MANIFEST_PATH = "data/processed/corpus/manifest.sqlite"
+
+_STOP = object()
+
+
+class Document(NamedTuple):
+    content_hash: str
+    source_path: str
+
+
+class Stage:
+    """
+    Pool of worker threads consuming documents from a bounded queue.
+    Documents a worker finishes are passed on to the downstream stage, so a
+    slow stage blocks the stages before it instead of buffering without limit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Document], None],
+        workers: int,
+        queue_size: int,
+        manifest: IngestionManifest,
+        downstream: Optional["Stage"] = None,
+    ):
+        self.name = name
+        self.handler = handler
+        self.manifest = manifest
+        self.downstream = downstream
+        self.queue: Queue = Queue(maxsize=queue_size)
+        self.threads = [
+            threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def put(self, document: Document) -> None:
+        self.queue.put(document)
+
+    def close(self) -> None:
+        """Waits until all queued documents are processed, then closes the downstream stage."""
+        for _ in self.threads:
+            self.queue.put(_STOP)
+        for thread in self.threads:
+            thread.join()
+        if self.downstream is not None:
+            self.downstream.close()
+
+    def _work(self) -> None:
+        while (document := self.queue.get()) is not _STOP:
+            try:
+                self.handler(document)
+            except Exception as e:
+                self.manifest.mark_failed(document.content_hash, document.source_path, f"{self.name}: {e}")
+                print(f"[{self.name}] Failed {document.source_path}: {e}")
+                continue
+            if self.downstream is not None:
+                self.downstream.put(document)
+
+
+def write_atomically(file_path: str, text: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def find_pdf_files(directory: str) -> list[str]:
+    pdf_files = []
+    for dir_path, _, filenames in os.walk(directory):
+        pdf_files.extend(os.path.join(dir_path, filename) for filename in filenames if filename.endswith(".pdf"))
+    return sorted(pdf_files)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Extract, chunk and embed a directory of PDFs, resuming interrupted runs."
+    )
+    parser.add_argument("--input-dir", default=RAW_DOCS_DIRECTORY, help="Directory searched for PDF files.")
+    parser.add_argument("--output-dir", default=CORPUS_DIRECTORY, help="Directory for markdown, chunks and indexes.")
+    parser.add_argument("--manifest", default=MANIFEST_PATH, help="Path of the SQLite ingestion manifest.")
+    parser.add_argument("--profile", default=DEFAULT_EXTRACTION_PROFILE, choices=list(EXTRACTION_PROFILES))
+    parser.add_argument(
+        "--extract-workers",
+        type=int,
+        default=2,
+        help="Number of extraction threads. With more than one, Marker runs in its pool of "
+        f"{EXTRACTION_WORKERS} worker processes instead of sharing one converter between threads.",
+    )
+    parser.add_argument("--chunk-workers", type=int, default=4, help="Number of chunking threads.")
+    parser.add_argument("--embed-workers", type=int, default=1, help="Number of embedding threads.")
+    parser.add_argument(
+        "--embedding-processes",
+        type=int,
+        default=EMBEDDING_WORKERS,
+        help="Number of CPU worker processes that chunks are sharded across. Embeds in this process if 0 or not set.",
+    )
+    parser.add_argument(
+        "--threads-per-process",
+        type=int,
+        default=EMBEDDING_THREADS_PER_WORKER,
+        help="Number of torch threads of each embedding worker process.",
+    )
+    parser.add_argument(
+        "--index-option",
+        default=VECTOR_INDEX_OPTION,
+        choices=list(INDEX_OPTIONS),
+        help="Vector index option of the per-document indexes, and dimension truncation of the corpus index.",
+    )
+    parser.add_argument("--queue-size", type=int, default=16, help="Maximum number of documents waiting per stage.")
+    parser.add_argument("--retry-failed", action="store_true", help="Retry documents whose last attempt failed.")
+    parser.add_argument(
+        "--corpus-index",
+        action="store_true",
+        help="Build a corpus index over all ingested documents, searchable across and within papers.",
+    )
+    parser.add_argument(
+        "--corpus-index-type",
+        choices=list(CORPUS_INDEX_TYPES),
+        help="Index type of the corpus index, rebuilt from scratch. Chosen from the corpus size and updated "
+        "incrementally if not set.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    documents_dir = os.path.join(args.output_dir, "documents")
+    chunks_dir = os.path.join(args.output_dir, "chunks")
+    indexes_dir = os.path.join(args.output_dir, "indexes")
+    for directory in (documents_dir, chunks_dir, indexes_dir):
+        os.makedirs(directory, exist_ok=True)
+
+    manifest = IngestionManifest(args.manifest)
+    text_extractor = build_text_extractor(parallel=PARALLEL_EXTRACTION or args.extract_workers > 1)
+    chunker = MarkdownSectionChunker(
+        TextSplitterRegistry().get_text_splitter(
+            EMBEDDING_MODEL_NAME, CHUNK_SIZE, CHUNK_OVERLAP, SEPARATORS, TOKEN_OFFSET_SPLITTER
+        )
+    )
+
+    def extract(document: Document) -> None:
+        text = text_extractor.extract_text_from_pdf_file(document.source_path, args.profile)
+        write_atomically(os.path.join(documents_dir, f"{document.content_hash}.md"), text)
+        manifest.mark_stage(document.content_hash, document.source_path, EXTRACTED_STAGE)
+
+    def chunk(document: Document) -> None:
+        with open(os.path.join(documents_dir, f"{document.content_hash}.md"), "r", encoding="utf-8") as f:
+            chunks = chunker.split_documents(f.read())
+        lines = [
+            json.dumps({"id": i, "text": chunk.page_content, "metadata": chunk.metadata})
+            for i, chunk in enumerate(chunks)
+        ]
+        write_atomically(os.path.join(chunks_dir, f"{document.content_hash}.jsonl"), "\n".join(lines) + "\n")
+        manifest.mark_stage(document.content_hash, document.source_path, CHUNKED_STAGE)
+
+    def load_chunks(content_hash: str) -> list[dict]:
+        with open(os.path.join(chunks_dir, f"{content_hash}.jsonl"), "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def get_embedding_model() -> EmbeddingModel:
+        return EmbeddingModel(
+            device=DEVICE,
+            model_name=EMBEDDING_MODEL_NAME,
+            cache_dir=EMBEDDING_CACHE_DIR,
+            token_budget=EMBEDDING_TOKEN_BUDGETS[DEVICE],
+            backend=EMBEDDING_BACKEND,
+            onnx_dir=EMBEDDING_ONNX_DIR,
+            num_workers=args.embedding_processes,
+            threads_per_worker=args.threads_per_process,
+            min_shard_size=EMBEDDING_MIN_SHARD_SIZE,
+        )
+
+    def get_document_processor() -> DocumentProcessor:
+        return DocumentProcessor(get_embedding_model(), chunker.text_splitter, index_option=args.index_option)
+
+    def embed(document: Document) -> None:
+        chunks = load_chunks(document.content_hash)
+        vector_store = get_document_processor().create_vector_store_from_document_stream(
+            Chunk(page_content=chunk["text"], metadata=chunk["metadata"]) for chunk in chunks
+        )
+        vector_store.save_local(os.path.join(indexes_dir, document.content_hash))
+        manifest.mark_stage(document.content_hash, document.source_path, EMBEDDED_STAGE)
+        print(f"Ingested {document.source_path} ({len(chunks)} chunks)")
+
+    embed_stage = Stage("embed", embed, args.embed_workers, args.queue_size, manifest)
+    chunk_stage = Stage("chunk", chunk, args.chunk_workers, args.queue_size, manifest, embed_stage)
+    extract_stage = Stage("extract", extract, args.extract_workers, args.queue_size, manifest, chunk_stage)
+    stages = {
+        EXTRACTED_STAGE: extract_stage,
+        CHUNKED_STAGE: chunk_stage,
+        EMBEDDED_STAGE: embed_stage,
+    }
+
+    seen_hashes = set()
+    skipped = 0
+    for source_path in find_pdf_files(args.input_dir):
+        content_hash = compute_content_hash(source_path)
+        if content_hash in seen_hashes:
+            continue
+        seen_hashes.add(content_hash)
+
+        next_stage = manifest.next_stage(content_hash)
+        if next_stage is None or (manifest.get_error(content_hash) and not args.retry_failed):
+            skipped += 1
+            continue
+        stages[next_stage].put(Document(content_hash, source_path))
+
+    extract_stage.close()
+
+    if args.corpus_index:
+        # Chunk embeddings come from the embedding cache filled during ingestion.
+        corpus_index_dir = os.path.join(args.output_dir, "corpus_index")
+        ingested_hashes = sorted(content_hash for content_hash in seen_hashes if manifest.is_complete(content_hash))
+        doc_processor = get_document_processor()
+
+        def load_papers(content_hashes: list[str]):
+            for content_hash in content_hashes:
+                chunks = load_chunks(content_hash)
+                yield content_hash, [Chunk(page_content=chunk["text"], metadata=chunk["metadata"]) for chunk in chunks]
+
+        if os.path.isdir(corpus_index_dir) and args.corpus_index_type is None:
+            # Only papers added to or removed from the input directory since the last run are indexed.
+            corpus_index = CorpusIndex.load(
+                corpus_index_dir,
+                get_index_embeddings(doc_processor.embedding_model.model, doc_processor.index_option),
+                mmap=False,
+            )
+            indexed_hashes = set(corpus_index.paper_ids)
+            doc_processor.delete_corpus_papers(
+                corpus_index, sorted(indexed_hashes - set(ingested_hashes)), corpus_index_dir
+            )
+            new_hashes = [content_hash for content_hash in ingested_hashes if content_hash not in indexed_hashes]
+            doc_processor.upsert_corpus_papers(corpus_index, load_papers(new_hashes), corpus_index_dir)
+            doc_processor.wait_for_compaction()
+            print(f"Corpus index updated with {len(new_hashes)} new papers.")
+        else:
+            corpus_index = doc_processor.create_corpus_index(load_papers(ingested_hashes), args.corpus_index_type)
+            corpus_index.save(corpus_index_dir)
+        print(f"Corpus index ({corpus_index.index_type}) holds {len(corpus_index)} chunks.")
+
+    print(f"\n{'=' * 70}")
+    print(f"Documents found: {len(seen_hashes)} ({skipped} skipped)")
+    for stage, count in manifest.count_by_stage().items():
+        print(f"  {stage or 'not started':<12} {count:>8}")
+    manifest.close()
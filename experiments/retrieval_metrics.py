@@ -0,0 +1,152 @@
+from typing import Any, Hashable, Optional, Sequence
+
+import numpy as np
+
+BOOTSTRAP_BATCH_SIZE = 64
+
+
+class RetrievalMetrics:
+    """
+    Computes retrieval metrics for a set of questions with NumPy.
+    Rankings and ground truth are turned into a boolean relevance matrix
+    (one row per question, one column per rank) once. MRR, Recall@K, nDCG@K
+    and hit rate for every K are then read off its cumulative sums, and
+    bootstrap confidence intervals reweight the per-question scores instead
+    of recomputing the metrics for every resample.
+    """
+
+    def __init__(self, ranked_ids: Sequence[Sequence[Hashable]], ground_truth_ids: Sequence[Sequence[Hashable]]):
+        """
+        Builds the relevance matrix of the questions.
+        Args:
+            ranked_ids (Sequence[Sequence[Hashable]]): Retrieved chunk ids of each question, best first.
+            ground_truth_ids (Sequence[Sequence[Hashable]]): Relevant chunk ids of each question.
+        """
+        if len(ranked_ids) != len(ground_truth_ids):
+            raise ValueError(f"Got rankings for {len(ranked_ids)} questions but ground truth for {len(ground_truth_ids)}.")
+
+        codes: dict[Hashable, int] = {}
+        lengths = np.fromiter((len(ranking) for ranking in ranked_ids), dtype=np.int64, count=len(ranked_ids))
+        depth = int(lengths.max(initial=0))
+        ranked = np.full((len(ranked_ids), depth), -1, dtype=np.int64)
+        ranked[np.arange(depth) < lengths[:, None]] = np.fromiter(
+            (codes.setdefault(chunk_id, len(codes)) for ranking in ranked_ids for chunk_id in ranking),
+            dtype=np.int64,
+            count=int(lengths.sum()),
+        )
+
+        relevant_questions = np.repeat(
+            np.arange(len(ground_truth_ids), dtype=np.int64), [len(ids) for ids in ground_truth_ids]
+        )
+        relevant = np.fromiter(
+            (codes.get(chunk_id, -1) for ids in ground_truth_ids for chunk_id in ids),
+            dtype=np.int64,
+            count=len(relevant_questions),
+        )
+
+        # Pairs of (question, chunk) as single integers, so relevance is one set membership test.
+        width = len(codes) + 1
+        relevant_keys = relevant_questions * width + relevant + 1
+        ranked_keys = np.arange(len(ranked_ids), dtype=np.int64)[:, None] * width + ranked + 1
+        self.relevance = np.isin(ranked_keys, relevant_keys) & (ranked >= 0)
+        self.relevant_counts = np.array([len(set(ids)) for ids in ground_truth_ids], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.relevance)
+
+    def per_question_scores(self, ks: Sequence[int]) -> dict[str, np.ndarray]:
+        """
+        Computes the metrics of every question.
+        Args:
+            ks (Sequence[int]): Cutoffs of Recall@K, nDCG@K and hit rate@K.
+        Returns:
+            dict[str, np.ndarray]: "mrr" of shape (questions,), and "recall", "ndcg" and "hit_rate"
+                of shape (questions, len(ks)). Questions without relevant chunks score 0.
+        """
+        depth = self.relevance.shape[1]
+        cutoffs = np.minimum(np.asarray(ks, dtype=np.int64), depth)
+        hits = self.relevance.cumsum(axis=1)
+        hits_at_k = hits[:, cutoffs - 1] if depth else np.zeros((len(self), len(cutoffs)), dtype=np.int64)
+
+        mrr = np.zeros(len(self))
+        if depth:
+            found = self.relevance.any(axis=1)
+            mrr[found] = 1.0 / (self.relevance[found].argmax(axis=1) + 1)
+
+        counts = self.relevant_counts[:, None]
+        recall = np.divide(hits_at_k, counts, out=np.zeros(hits_at_k.shape), where=counts > 0)
+
+        discounts = 1.0 / np.log2(np.arange(2, max(depth, max(ks, default=0)) + 2))
+        ideal_dcg = np.concatenate(([0.0], discounts.cumsum()))
+        dcg = (self.relevance * discounts[:depth]).cumsum(axis=1)
+        dcg_at_k = dcg[:, cutoffs - 1] if depth else np.zeros(hits_at_k.shape)
+        ideal_at_k = ideal_dcg[np.minimum(counts, np.asarray(ks, dtype=np.int64))]
+        ndcg = np.divide(dcg_at_k, ideal_at_k, out=np.zeros(dcg_at_k.shape), where=ideal_at_k > 0)
+
+        return {"mrr": mrr, "recall": recall, "ndcg": ndcg, "hit_rate": (hits_at_k > 0).astype(np.float64)}
+
+    def compute(
+        self,
+        ks: Sequence[int],
+        bootstrap_samples: int = 1000,
+        confidence_level: float = 0.95,
+        seed: Optional[int] = 0,
+    ) -> dict[str, Any]:
+        """
+        Computes the mean metrics over all questions with bootstrap confidence intervals.
+        Args:
+            ks (Sequence[int]): Cutoffs of Recall@K, nDCG@K and hit rate@K.
+            bootstrap_samples (int): Number of resamples of the questions. Intervals are skipped if 0.
+            confidence_level (float): Coverage of the confidence intervals.
+            seed (Optional[int]): Seed of the resampling.
+        Returns:
+            dict[str, Any]: "mean_mrr", and "mean_recalls_at_k", "mean_ndcg_at_k" and "hit_rate_at_k"
+                mapping each K to its mean, plus "confidence_intervals" mapping "mrr" and e.g. "recall@5"
+                to their (lower, upper) bounds.
+        """
+        scores = self.per_question_scores(ks)
+        names = ["mrr"] + [f"{metric}@{k}" for metric in ("recall", "ndcg", "hit_rate") for k in ks]
+        matrix = np.column_stack([scores["mrr"], scores["recall"], scores["ndcg"], scores["hit_rate"]])
+        means = matrix.mean(axis=0) if len(self) else np.zeros(len(names))
+
+        results: dict[str, Any] = {"mean_mrr": float(means[0])}
+        for position, key in enumerate(("mean_recalls_at_k", "mean_ndcg_at_k", "hit_rate_at_k")):
+            start = 1 + position * len(ks)
+            results[key] = {k: float(value) for k, value in zip(ks, means[start : start + len(ks)])}
+
+        if bootstrap_samples and len(self):
+            lower, upper = bootstrap_confidence_intervals(matrix, bootstrap_samples, confidence_level, seed)
+            results["confidence_intervals"] = {
+                name: (float(low), float(high)) for name, low, high in zip(names, lower, upper)
+            }
+        return results
+
+
+def bootstrap_confidence_intervals(
+    scores: np.ndarray, samples: int, confidence_level: float = 0.95, seed: Optional[int] = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Computes percentile bootstrap confidence intervals of the column means of per-question scores.
+    Each resample is a vector of how often every question was drawn, so its means are
+    one matrix product with the scores. Resamples are drawn in batches to bound memory.
+    Args:
+        scores (np.ndarray): Scores of shape (questions, metrics).
+        samples (int): Number of resamples.
+        confidence_level (float): Coverage of the intervals.
+        seed (Optional[int]): Seed of the resampling.
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Lower and upper bound of each metric.
+    """
+    generator = np.random.default_rng(seed)
+    question_count = len(scores)
+    means = np.empty((samples, scores.shape[1]))
+    for start in range(0, samples, BOOTSTRAP_BATCH_SIZE):
+        batch_size = min(BOOTSTRAP_BATCH_SIZE, samples - start)
+        draws = generator.integers(0, question_count, size=(batch_size, question_count))
+        draws += np.arange(batch_size)[:, None] * question_count
+        counts = np.bincount(draws.ravel(), minlength=batch_size * question_count).reshape(batch_size, question_count)
+        means[start : start + batch_size] = counts @ scores / question_count
+
+    tail = (1 - confidence_level) / 2 * 100
+    lower, upper = np.percentile(means, [tail, 100 - tail], axis=0)
+    return lower, upper
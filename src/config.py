@@ -12,9 +12,66 @@ else:
 SEPARATORS = ["\n\n", "\n", " ", ""]
 CHUNK_SIZE = 512
 CHUNK_OVERLAP = 64
+TOKEN_OFFSET_SPLITTER = True
 
 K_RETRIEVED_DOCS = 5
+SECTION_FILTER_FETCH_K = 100
+HYBRID_RETRIEVAL = True
+HYBRID_FETCH_K = 20
+RRF_K = 60
+BM25_K1 = 1.2
+BM25_B = 0.75
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+VECTOR_INDEX_OPTION = "float32"
+
+CORPUS_FLAT_MAX_VECTORS = 100_000
+CORPUS_HNSW_MAX_VECTORS = 1_000_000
+CORPUS_HNSW_M = 32
+CORPUS_HNSW_EF_CONSTRUCTION = 80
+CORPUS_HNSW_EF_SEARCH = 64
+CORPUS_IVF_NPROBE = 16
+CORPUS_IVF_FILTER_NPROBE = 64
+CORPUS_IVF_TRAIN_SIZE = 200_000
+CORPUS_EXACT_FILTER_MAX_VECTORS = 20_000
+CORPUS_COMPACTION_DELETED_RATIO = 0.2
+CORPUS_COMPACTION_ADDED_RATIO = 0.5
+CORPUS_CHANGE_LOG_MAX_RATIO = 0.5
 
 EMBEDDING_MODEL_NAME = "Lajavaness/bilingual-embedding-large"
+EMBEDDING_CACHE_DIR = "data/cache/embeddings"
+EMBEDDING_TOKEN_BUDGETS = {"cuda": 65536, "mps": 16384, "cpu": 4096}
+EMBEDDING_BACKEND = "torch"
+EMBEDDING_BATCH_WINDOW_MS = 10
+EMBEDDING_MAX_BATCH_SIZE = 256
+EMBEDDING_MAX_DOCUMENT_BATCH_SIZE = 64
+EMBEDDING_WORKERS = None
+EMBEDDING_THREADS_PER_WORKER = 4
+EMBEDDING_MIN_SHARD_SIZE = 16
+EMBEDDING_ONNX_DIR = "data/cache/onnx"
 
 HISTORY_MAX_LENGTH = 10
+
+MODEL_REGISTRY_MEMORY_BUDGET_BYTES = 8 * 1024 * 1024 * 1024
+MODEL_REGISTRY_IDLE_TIMEOUT_SECONDS = 30 * 60
+
+EXTRACTION_CACHE_DIR = "data/cache/extraction"
+EXTRACTION_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+VECTOR_STORE_CACHE_DIR = "data/cache/vector_stores"
+VECTOR_STORE_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+PARALLEL_EXTRACTION = False
+EXTRACTION_WORKERS = 4
+EXTRACTION_PAGES_PER_SHARD = 8
+EXTRACTION_CONVERTER_CACHE_SIZE = 8
+
+STREAMING_PAGES_PER_STEP = 4
+STREAMING_PREFETCH_STEPS = 2
+STREAMING_EMBEDDING_BATCH_SIZE = 32
+STREAMING_MAX_SECTION_BUFFER_SIZE = 32768
+
+HYBRID_EXTRACTION = False
+TEXT_LAYER_MIN_CHARS = 200
+TEXT_LAYER_MIN_QUALITY = 0.9
+
+DEFAULT_EXTRACTION_PROFILE = "balanced"
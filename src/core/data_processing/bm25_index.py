@@ -0,0 +1,126 @@
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Callable, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.config import BM25_B, BM25_K1
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Splits text into case-folded word tokens. Acronyms, numbers and the parts
+    of hyphenated names (e.g. "ImageNet-1k") become separate tokens.
+    Args:
+        text (str): Text to tokenize.
+    Returns:
+        list[str]: Tokens in text order.
+    """
+    return TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).casefold())
+
+
+class BM25Index:
+    """
+    In-memory inverted index scoring chunks with Okapi BM25.
+    Each term maps to the ids of the chunks containing it and their BM25
+    weight for the term, computed once when the index is built. A query
+    only reads the postings of its own terms, so its cost grows with how
+    many chunks contain them rather than with the number of chunks.
+    """
+
+    def __init__(self, documents: list[Document], k1: float = BM25_K1, b: float = BM25_B):
+        """
+        Builds the inverted index over chunks.
+        Args:
+            documents (list[Document]): Chunks to index.
+            k1 (float): Term frequency saturation.
+            b (float): Strength of chunk length normalization.
+        """
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+
+        entries: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        lengths = np.zeros(len(documents), dtype=np.float32)
+        for doc_id, document in enumerate(documents):
+            tokens = tokenize(document.page_content)
+            lengths[doc_id] = len(tokens)
+            for term, count in Counter(tokens).items():
+                entries[term].append((doc_id, count))
+
+        average_length = float(lengths.mean()) if len(documents) and lengths.any() else 1.0
+        norms = k1 * (1 - b + b * lengths / average_length)
+        self._postings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for term, term_entries in entries.items():
+            doc_ids = np.fromiter((doc_id for doc_id, _ in term_entries), dtype=np.int32, count=len(term_entries))
+            counts = np.fromiter((count for _, count in term_entries), dtype=np.float32, count=len(term_entries))
+            idf = math.log(1 + (len(documents) - len(term_entries) + 0.5) / (len(term_entries) + 0.5))
+            weights = idf * counts * (k1 + 1) / (counts + norms[doc_ids])
+            self._postings[term] = (doc_ids, weights.astype(np.float32))
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._postings)
+
+    def search(self, query: str, k: int, filter: Optional[Callable[[dict], bool]] = None) -> list[Document]:
+        """
+        Returns the chunks with the highest BM25 score for a query.
+        Args:
+            query (str): Query text.
+            k (int): Maximum number of chunks to return.
+            filter (Optional[Callable[[dict], bool]]): Predicate on chunk metadata the returned chunks must match.
+        Returns:
+            list[Document]: Chunks sharing at least one term with the query, best first.
+        """
+        return [document for document, _ in self.search_with_scores(query, k, filter)]
+
+    def search_with_scores(
+        self, query: str, k: int, filter: Optional[Callable[[dict], bool]] = None
+    ) -> list[tuple[Document, float]]:
+        """
+        Returns the chunks with the highest BM25 score for a query, with their scores.
+        Args:
+            query (str): Query text.
+            k (int): Maximum number of chunks to return.
+            filter (Optional[Callable[[dict], bool]]): Predicate on chunk metadata the returned chunks must match.
+        Returns:
+            list[tuple[Document, float]]: Chunks sharing at least one term with the query and their scores, best first.
+        """
+        postings = [self._postings[term] for term in dict.fromkeys(tokenize(query)) if term in self._postings]
+        if not postings or k <= 0:
+            return []
+
+        if len(postings) == 1:
+            doc_ids, scores = postings[0]
+        else:
+            doc_ids = np.concatenate([doc_ids for doc_ids, _ in postings])
+            weights = np.concatenate([weights for _, weights in postings])
+            order = np.argsort(doc_ids, kind="stable")
+            doc_ids = doc_ids[order]
+            starts = np.flatnonzero(np.concatenate(([True], doc_ids[1:] != doc_ids[:-1])))
+            scores = np.add.reduceat(weights[order], starts)
+            doc_ids = doc_ids[starts]
+
+        if filter is None and len(scores) > k:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+            ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        else:
+            ranked = np.argsort(-scores, kind="stable")
+
+        results = []
+        for position in ranked:
+            document = self.documents[doc_ids[position]]
+            if filter is not None and not filter(document.metadata):
+                continue
+            results.append((document, float(scores[position])))
+            if len(results) == k:
+                break
+        return results
@@ -0,0 +1,827 @@
+import base64
+import json
+import math
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from threading import Lock, RLock
+from typing import Callable, Iterable, Iterator, Optional
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.config import (
+    CORPUS_CHANGE_LOG_MAX_RATIO,
+    CORPUS_COMPACTION_ADDED_RATIO,
+    CORPUS_COMPACTION_DELETED_RATIO,
+    CORPUS_EXACT_FILTER_MAX_VECTORS,
+    CORPUS_FLAT_MAX_VECTORS,
+    CORPUS_HNSW_EF_CONSTRUCTION,
+    CORPUS_HNSW_EF_SEARCH,
+    CORPUS_HNSW_M,
+    CORPUS_HNSW_MAX_VECTORS,
+    CORPUS_IVF_FILTER_NPROBE,
+    CORPUS_IVF_NPROBE,
+    CORPUS_IVF_TRAIN_SIZE,
+)
+from src.core.exceptions import VectorStoreError
+from src.core.models.query_embedding_cache import QueryEmbeddingCache
+from src.core.models.query_embeddings import embed_queries
+from src.core.utils.file_lock import lock_file
+from src.core.utils.read_write_lock import ReadWriteLock
+
+FLAT_INDEX = "flat"
+HNSW_INDEX = "hnsw"
+IVF_PQ_INDEX = "ivfpq"
+
+CORPUS_INDEX_TYPES = (FLAT_INDEX, HNSW_INDEX, IVF_PQ_INDEX)
+"""Index types of the corpus index, from exact to the most compact."""
+
+INDEX_FILE_NAME = "index.faiss"
+DOCSTORE_FILE_NAME = "docstore.json"
+CHANGE_LOG_FILE_NAME = "changes.jsonl"
+CURRENT_FILE_NAME = "CURRENT"
+SNAPSHOT_PREFIX = "snapshot-"
+LOCK_FILE_SUFFIX = ".lock"
+LOAD_ATTEMPTS = 3
+
+
+def choose_index_type(vector_count: int) -> str:
+    """
+    Chooses the index type for a corpus of the given size.
+    Exact search is fast enough for small corpora, HNSW keeps queries in the
+    millisecond range for medium ones, and IVF-PQ compresses the vectors of
+    large corpora so that they fit in memory.
+    Args:
+        vector_count (int): Number of chunks in the corpus.
+    Returns:
+        str: One of `CORPUS_INDEX_TYPES`.
+    """
+    if vector_count <= CORPUS_FLAT_MAX_VECTORS:
+        return FLAT_INDEX
+    if vector_count <= CORPUS_HNSW_MAX_VECTORS:
+        return HNSW_INDEX
+    return IVF_PQ_INDEX
+
+
+def get_index_factory(index_type: str, dimension: int, vector_count: int) -> str:
+    """
+    Returns the `faiss.index_factory` description of an index type.
+    IVF-PQ uses about 4 * sqrt(n) inverted lists, rounded to a power of two,
+    and one 8-bit sub-quantizer per 16 dimensions.
+    Args:
+        index_type (str): One of `CORPUS_INDEX_TYPES`.
+        dimension (int): Dimension of the embeddings.
+        vector_count (int): Number of chunks in the corpus.
+    Returns:
+        str: Index factory description.
+    Raises:
+        VectorStoreError: If the index type does not exist.
+    """
+    if index_type == FLAT_INDEX:
+        return "Flat"
+    if index_type == HNSW_INDEX:
+        return f"HNSW{CORPUS_HNSW_M}"
+    if index_type == IVF_PQ_INDEX:
+        nlist = 2 ** max(round(math.log2(4 * math.sqrt(max(vector_count, 1)))), 0)
+        subquantizers = next(m for m in range(max(dimension // 16, 1), 0, -1) if dimension % m == 0)
+        return f"IVF{nlist},PQ{subquantizers}"
+    raise VectorStoreError(
+        f"Unsupported corpus index type: {index_type}. Supported types are: {', '.join(CORPUS_INDEX_TYPES)}."
+    )
+
+
+class CorpusIndex:
+    """
+    Vector index over the chunks of many papers.
+    The chunks of each paper get consecutive ids, so a search restricted to
+    some papers passes an id selector to FAISS instead of filtering results
+    afterwards. Small selections of an exact or HNSW index are searched
+    exactly over their reconstructed vectors, since graph search loses
+    recall when most of the graph is filtered out, and selections of an
+    IVF-PQ index probe more inverted lists only for queries that found too
+    few of their chunks. Searches run concurrently; only in-place additions
+    to the FAISS index wait for them. Chunk metadata gets a "paper_id".
+    Papers can be upserted and deleted in place: new chunks are appended to
+    the index, and the ids of removed chunks are left as tombstones that
+    searches skip until the index is rebuilt by a compaction. On disk, an
+    index is a snapshot plus a log of the changes made since, so saving an
+    update only appends the new chunks and deletions (see `save_changes`).
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        index: faiss.Index,
+        documents: list[Optional[Document]],
+        paper_ranges: dict[str, tuple[int, int]],
+        index_type: str,
+        trained_count: Optional[int] = None,
+        read_only: bool = False,
+    ):
+        """
+        Initializes the corpus index. Use `build` or `load` to create one.
+        Args:
+            embeddings (Embeddings): Embeddings used to embed queries.
+            index (faiss.Index): FAISS index holding the chunk vectors in id order.
+            documents (list[Optional[Document]]): Chunk of each id, or None if the chunk was deleted.
+            paper_ranges (dict[str, tuple[int, int]]): Start (inclusive) and end (exclusive) id of each paper.
+            index_type (str): One of `CORPUS_INDEX_TYPES`.
+            trained_count (Optional[int]): Number of chunks the index was built with. Defaults to all chunks.
+            read_only (bool): Whether the FAISS index is memory-mapped read-only and cannot be modified.
+        """
+        self.embeddings = embeddings
+        self.index = index
+        self.documents = documents
+        self.paper_ranges = paper_ranges
+        self.index_type = index_type
+        self.trained_count = len(documents) if trained_count is None else trained_count
+        self.read_only = read_only
+        self._lock = RLock()
+        self._index_lock = ReadWriteLock()
+        self._changes: Optional[list[tuple[str, tuple]]] = None
+        self._unsaved_changes: list[tuple[str, tuple]] = []
+        self._snapshot: Optional[tuple[str, int]] = None
+        self._live_selector: Optional[faiss.IDSelector] = None
+        self._deleted_selector: Optional[faiss.IDSelector] = None
+
+    def __len__(self) -> int:
+        return sum(end - start for start, end in self.paper_ranges.values())
+
+    @property
+    def paper_ids(self) -> list[str]:
+        return list(self.paper_ranges)
+
+    @property
+    def deleted_count(self) -> int:
+        return len(self.documents) - len(self)
+
+    @classmethod
+    def build(
+        cls,
+        embeddings: Embeddings,
+        papers: Iterable[tuple[str, list[Document], list[list[float]]]],
+        index_type: Optional[str] = None,
+    ) -> "CorpusIndex":
+        """
+        Builds a corpus index over precomputed chunk embeddings.
+        Args:
+            embeddings (Embeddings): Embeddings used to embed queries.
+            papers (Iterable[tuple[str, list[Document], list[list[float]]]]): Paper ID, chunks and
+                chunk embeddings of each paper.
+            index_type (Optional[str]): One of `CORPUS_INDEX_TYPES`. Chosen from the corpus size if None.
+        Returns:
+            CorpusIndex: Corpus index.
+        Raises:
+            VectorStoreError: If the corpus is empty, a paper appears twice or the index cannot be built.
+        """
+        documents: list[Document] = []
+        blocks: list[np.ndarray] = []
+        paper_ranges: dict[str, tuple[int, int]] = {}
+        for paper_id, paper_documents, vectors in papers:
+            if paper_id in paper_ranges:
+                raise VectorStoreError(f"Paper {paper_id} appears more than once in the corpus.")
+            if len(paper_documents) != len(vectors):
+                raise VectorStoreError(
+                    f"Paper {paper_id} has {len(paper_documents)} chunks but {len(vectors)} vectors."
+                )
+            if not paper_documents:
+                continue
+            paper_ranges[paper_id] = (len(documents), len(documents) + len(paper_documents))
+            documents.extend(
+                Document(page_content=document.page_content, metadata={**document.metadata, "paper_id": paper_id})
+                for document in paper_documents
+            )
+            blocks.append(np.asarray(vectors, dtype=np.float32))
+        if not documents:
+            raise VectorStoreError("Cannot create corpus index from empty chunks.")
+
+        matrix = np.vstack(blocks)
+        index_type = index_type or choose_index_type(len(matrix))
+        try:
+            index = faiss.index_factory(
+                matrix.shape[1], get_index_factory(index_type, matrix.shape[1], len(matrix)), faiss.METRIC_L2
+            )
+            if index_type == HNSW_INDEX:
+                index.hnsw.efConstruction = CORPUS_HNSW_EF_CONSTRUCTION
+            if not index.is_trained:
+                sample_size = min(len(matrix), CORPUS_IVF_TRAIN_SIZE)
+                sample = np.random.default_rng(0).choice(len(matrix), sample_size, replace=False)
+                index.train(matrix[np.sort(sample)])
+            index.add(matrix)
+        except VectorStoreError:
+            raise
+        except Exception as e:
+            raise VectorStoreError(f"Error during corpus index creation: {e}") from e
+        return cls(embeddings, index, documents, paper_ranges, index_type)
+
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        paper_ids: Optional[Iterable[str]] = None,
+        filter: Optional[Callable[[dict], bool]] = None,
+        fetch_k: int = 20,
+    ) -> list[Document]:
+        """
+        Returns the chunks most similar to a query.
+        Args:
+            query (str): Query text.
+            k (int): Number of chunks to return.
+            paper_ids (Optional[Iterable[str]]): Papers to search in. All papers are searched if None.
+            filter (Optional[Callable[[dict], bool]]): Predicate on chunk metadata applied to the
+                `fetch_k` nearest chunks.
+            fetch_k (int): Number of chunks fetched before applying `filter`.
+        Returns:
+            list[Document]: Most similar chunks, nearest first.
+        """
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k, paper_ids, filter, fetch_k)
+
+    def similarity_search_by_vector(
+        self,
+        embedding: list[float],
+        k: int = 4,
+        paper_ids: Optional[Iterable[str]] = None,
+        filter: Optional[Callable[[dict], bool]] = None,
+        fetch_k: int = 20,
+    ) -> list[Document]:
+        """
+        Returns the chunks most similar to a query embedding.
+        Args:
+            embedding (list[float]): Query embedding.
+            k (int): Number of chunks to return.
+            paper_ids (Optional[Iterable[str]]): Papers to search in. All papers are searched if None.
+            filter (Optional[Callable[[dict], bool]]): Predicate on chunk metadata applied to the
+                `fetch_k` nearest chunks.
+            fetch_k (int): Number of chunks fetched before applying `filter`.
+        Returns:
+            list[Document]: Most similar chunks, nearest first.
+        """
+        results = self.similarity_search_with_score_by_vector(embedding, k, paper_ids, filter, fetch_k)
+        return [document for document, _ in results]
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: list[float],
+        k: int = 4,
+        paper_ids: Optional[Iterable[str]] = None,
+        filter: Optional[Callable[[dict], bool]] = None,
+        fetch_k: int = 20,
+    ) -> list[tuple[Document, float]]:
+        """
+        Returns the chunks most similar to a query embedding with their L2 distances.
+        Args:
+            embedding (list[float]): Query embedding.
+            k (int): Number of chunks to return.
+            paper_ids (Optional[Iterable[str]]): Papers to search in. All papers are searched if None.
+            filter (Optional[Callable[[dict], bool]]): Predicate on chunk metadata applied to the
+                `fetch_k` nearest chunks.
+            fetch_k (int): Number of chunks fetched before applying `filter`.
+        Returns:
+            list[tuple[Document, float]]: Most similar chunks and their distances, nearest first.
+        Raises:
+            VectorStoreError: If a paper is not in the index.
+        """
+        return self.similarity_search_with_score_by_vectors([embedding], k, paper_ids, filter, fetch_k)[0]
+
+    def batch_similarity_search(
+        self,
+        queries: list[str],
+        k: int = 4,
+        paper_ids: Optional[Iterable[str]] = None,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+    ) -> list[list[tuple[Document, float]]]:
+        """
+        Searches the index for many queries at once, embedding them in one batch and
+        looking them up with a single matrix search.
+        Args:
+            queries (list[str]): Query texts.
+            k (int): Number of chunks returned per query.
+            paper_ids (Optional[Iterable[str]]): Papers to search in. All papers are searched if None.
+            query_cache (Optional[QueryEmbeddingCache]): Cache of query embeddings. All queries are embedded if None.
+        Returns:
+            list[list[tuple[Document, float]]]: Most similar chunks and their distances for each query, nearest first.
+        Raises:
+            VectorStoreError: If a paper is not in the index.
+        """
+        if not queries:
+            return []
+        if query_cache is not None:
+            embeddings = query_cache.get_query_embeddings(self.embeddings, queries)
+        else:
+            embeddings = embed_queries(self.embeddings, queries)
+        return self.similarity_search_with_score_by_vectors(embeddings, k, paper_ids)
+
+    def similarity_search_with_score_by_vectors(
+        self,
+        embeddings: list[list[float]],
+        k: int = 4,
+        paper_ids: Optional[Iterable[str]] = None,
+        filter: Optional[Callable[[dict], bool]] = None,
+        fetch_k: int = 20,
+    ) -> list[list[tuple[Document, float]]]:
+        """
+        Returns the chunks most similar to each of many query embeddings, searched with a single matrix search.
+        Args:
+            embeddings (list[list[float]]): Query embeddings.
+            k (int): Number of chunks returned per query.
+            paper_ids (Optional[Iterable[str]]): Papers to search in. All papers are searched if None.
+            filter (Optional[Callable[[dict], bool]]): Predicate on chunk metadata applied to the
+                `fetch_k` nearest chunks.
+            fetch_k (int): Number of chunks fetched before applying `filter`.
+        Returns:
+            list[list[tuple[Document, float]]]: Most similar chunks and their distances for each query, nearest first.
+        Raises:
+            VectorStoreError: If a paper is not in the index.
+        """
+        queries = np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), self.index.d)
+        search_k = max(k, fetch_k) if filter is not None else k
+        distances, ids, index_documents = self._search(queries, search_k, paper_ids)
+        documents = [[index_documents[i] if i >= 0 else None for i in query_ids] for query_ids in ids]
+
+        results = []
+        for query_distances, query_documents in zip(distances, documents):
+            query_results = []
+            for distance, document in zip(query_distances, query_documents):
+                if document is None:
+                    continue
+                if filter is not None and not filter(document.metadata):
+                    continue
+                query_results.append((document, float(distance)))
+                if len(query_results) == k:
+                    break
+            results.append(query_results)
+        return results
+
+    def _search(
+        self, queries: np.ndarray, k: int, paper_ids: Optional[Iterable[str]]
+    ) -> tuple[np.ndarray, np.ndarray, list[Optional[Document]]]:
+        # Only the references to the current index and chunks are taken under the lock; the
+        # search itself runs outside it, so concurrent queries run in parallel. A compaction
+        # swaps in a new index instead of changing the one being searched, and in-place
+        # additions wait for running searches through the index lock.
+        with self._lock:
+            index, index_type, documents = self.index, self.index_type, self.documents
+            if paper_ids is None:
+                # The live selector only points to the deleted one, so both are kept referenced.
+                selectors = (self._get_live_selector(), self._deleted_selector)
+            else:
+                ranges = []
+                for paper_id in dict.fromkeys(paper_ids):
+                    if paper_id not in self.paper_ranges:
+                        raise VectorStoreError(f"Paper {paper_id} is not in the corpus index.")
+                    ranges.append(self.paper_ranges[paper_id])
+
+        with self._index_lock.read():
+            if paper_ids is None:
+                params = self._get_search_parameters(index_type, selectors[0])
+                return *index.search(queries, k, params=params), documents
+            return *self._search_selection(index, index_type, queries, k, ranges), documents
+
+    @staticmethod
+    def _search_selection(
+        index: faiss.Index, index_type: str, queries: np.ndarray, k: int, ranges: list[tuple[int, int]]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if not ranges:
+            return np.empty((len(queries), 0), dtype=np.float32), np.empty((len(queries), 0), dtype=np.int64)
+
+        selected_count = sum(end - start for start, end in ranges)
+        if index_type != IVF_PQ_INDEX and selected_count <= CORPUS_EXACT_FILTER_MAX_VECTORS:
+            ids = np.concatenate([np.arange(start, end, dtype=np.int64) for start, end in ranges])
+            vectors = index.reconstruct_batch(ids)
+            distances = (queries**2).sum(axis=1, keepdims=True) - 2 * queries @ vectors.T + (vectors**2).sum(axis=1)
+            nearest = np.argsort(distances, axis=1, kind="stable")[:, :k]
+            return np.take_along_axis(distances, nearest, axis=1), ids[nearest]
+
+        if len(ranges) == 1:
+            selector = faiss.IDSelectorRange(*ranges[0])
+        else:
+            selector = faiss.IDSelectorBatch(
+                np.concatenate([np.arange(start, end, dtype=np.int64) for start, end in ranges])
+            )
+        if index_type != IVF_PQ_INDEX:
+            return index.search(queries, k, params=CorpusIndex._get_search_parameters(index_type, selector))
+
+        # A selection of papers may live in lists far from the query. Rather than probing
+        # every list, queries that found too few selected chunks are searched again with
+        # more probes, so a full scan only happens for those that need it.
+        nlist = faiss.extract_index_ivf(index).nlist
+        nprobe = min(CORPUS_IVF_FILTER_NPROBE, nlist)
+        params = CorpusIndex._get_search_parameters(index_type, selector, nprobe)
+        distances, ids = index.search(queries, k, params=params)
+        wanted = min(k, selected_count)
+        while nprobe < nlist:
+            missing = np.flatnonzero((ids >= 0).sum(axis=1) < wanted)
+            if not len(missing):
+                break
+            nprobe = min(nprobe * 4, nlist)
+            params = CorpusIndex._get_search_parameters(index_type, selector, nprobe)
+            distances[missing], ids[missing] = index.search(queries[missing], k, params=params)
+        return distances, ids
+
+    def _get_live_selector(self) -> Optional[faiss.IDSelector]:
+        # Must be called with the lock held.
+        if not self.deleted_count:
+            return None
+        if self._live_selector is None:
+            deleted_ids = np.flatnonzero(
+                np.fromiter((d is None for d in self.documents), dtype=bool, count=len(self.documents))
+            )
+            # The selectors only hold pointers to each other, so both are kept alive here.
+            self._deleted_selector = faiss.IDSelectorBatch(deleted_ids.astype(np.int64))
+            self._live_selector = faiss.IDSelectorNot(self._deleted_selector)
+        return self._live_selector
+
+    @staticmethod
+    def _get_search_parameters(
+        index_type: str, selector: Optional[faiss.IDSelector] = None, nprobe: int = CORPUS_IVF_NPROBE
+    ) -> faiss.SearchParameters:
+        if index_type == HNSW_INDEX:
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=CORPUS_HNSW_EF_SEARCH)
+        if index_type == IVF_PQ_INDEX:
+            return faiss.SearchParametersIVF(sel=selector, nprobe=nprobe)
+        return faiss.SearchParameters(sel=selector)
+
+    def upsert_paper(self, paper_id: str, documents: list[Document], vectors: list[list[float]]) -> None:
+        """
+        Adds the chunks of a paper to the index, replacing its previous chunks.
+        The index is not retrained, so the cost is proportional to the number of new chunks.
+        Args:
+            paper_id (str): ID of the paper.
+            documents (list[Document]): Chunks of the paper.
+            vectors (list[list[float]]): Embedding of each chunk.
+        Raises:
+            VectorStoreError: If the index is read-only, the vectors do not match the chunks,
+                or the chunks cannot be added.
+        """
+        if len(documents) != len(vectors):
+            raise VectorStoreError(f"Paper {paper_id} has {len(documents)} chunks but {len(vectors)} vectors.")
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), self.index.d)
+        with self._lock:
+            self._check_writable()
+            self._upsert(paper_id, documents, matrix)
+            self._record(("upsert", (paper_id, documents, matrix)))
+
+    def _upsert(self, paper_id: str, documents: list[Document], matrix: np.ndarray) -> None:
+        self._delete(paper_id)
+        if not documents:
+            return
+        try:
+            with self._index_lock.write():
+                self.index.add(matrix)
+        except Exception as e:
+            raise VectorStoreError(f"Error adding paper {paper_id} to corpus index: {e}") from e
+        self.paper_ranges[paper_id] = (len(self.documents), len(self.documents) + len(documents))
+        self.documents.extend(
+            Document(page_content=document.page_content, metadata={**document.metadata, "paper_id": paper_id})
+            for document in documents
+        )
+
+    def delete_paper(self, paper_id: str) -> bool:
+        """
+        Removes the chunks of a paper from search results. Their vectors stay in the index until compaction.
+        Args:
+            paper_id (str): ID of the paper.
+        Returns:
+            bool: Whether the paper was in the index.
+        Raises:
+            VectorStoreError: If the index is read-only.
+        """
+        with self._lock:
+            self._check_writable()
+            deleted = self._delete(paper_id)
+            if deleted:
+                self._record(("delete", (paper_id,)))
+            return deleted
+
+    def _record(self, change: tuple[str, tuple]) -> None:
+        # Must be called with the lock held.
+        self._unsaved_changes.append(change)
+        if self._changes is not None:
+            self._changes.append(change)
+
+    def _delete(self, paper_id: str) -> bool:
+        if paper_id not in self.paper_ranges:
+            return False
+        start, end = self.paper_ranges.pop(paper_id)
+        self.documents[start:end] = [None] * (end - start)
+        self._live_selector = self._deleted_selector = None
+        return True
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise VectorStoreError("Corpus index is memory-mapped read-only. Load it with mmap=False to modify it.")
+
+    def needs_compaction(self) -> bool:
+        """
+        Tells whether the index should be rebuilt: too many of its chunks are
+        deleted, an IVF-PQ index got too many chunks its lists were not trained
+        on, or the corpus outgrew its index type.
+        Returns:
+            bool: Whether the index should be compacted.
+        """
+        with self._lock:
+            if not len(self):
+                return False
+            if self.deleted_count > CORPUS_COMPACTION_DELETED_RATIO * len(self.documents):
+                return True
+            added_count = len(self.documents) - self.trained_count
+            if self.index_type == IVF_PQ_INDEX and added_count > CORPUS_COMPACTION_ADDED_RATIO * self.trained_count:
+                return True
+            return self.get_compacted_index_type() != self.index_type
+
+    def get_compacted_index_type(self) -> str:
+        """
+        Returns the index type a compaction rebuilds the index with. Indexes are
+        moved to a more scalable type once the corpus outgrows theirs, but never
+        back to a less scalable one.
+        Returns:
+            str: One of `CORPUS_INDEX_TYPES`.
+        """
+        with self._lock:
+            return max(self.index_type, choose_index_type(len(self)), key=CORPUS_INDEX_TYPES.index)
+
+    def begin_compaction(self) -> list[tuple[str, list[Document], Optional[np.ndarray]]]:
+        """
+        Takes a snapshot of the live papers to rebuild the index from, and starts
+        recording the changes made until `finish_compaction`.
+        Returns:
+            list[tuple[str, list[Document], Optional[np.ndarray]]]: Paper ID, chunks and chunk vectors of
+                each paper. Vectors are None for IVF-PQ indexes, which only keep compressed codes.
+        Raises:
+            VectorStoreError: If the index is read-only or a compaction is already running.
+        """
+        with self._lock:
+            self._check_writable()
+            if self._changes is not None:
+                raise VectorStoreError("Corpus index compaction is already running.")
+            self._changes = []
+            papers = []
+            for paper_id, (start, end) in self.paper_ranges.items():
+                vectors = self.index.reconstruct_n(start, end - start) if self.index_type != IVF_PQ_INDEX else None
+                papers.append((paper_id, self._strip_paper_ids(self.documents[start:end]), vectors))
+            return papers
+
+    def finish_compaction(self, compacted: Optional["CorpusIndex"]) -> None:
+        """
+        Replaces the index with its compacted version, replaying the changes made since `begin_compaction`.
+        Args:
+            compacted (Optional[CorpusIndex]): Index rebuilt from the snapshot, or None to abort the compaction.
+        """
+        with self._lock:
+            changes, self._changes = self._changes or [], None
+            if compacted is None:
+                return
+            for operation, arguments in changes:
+                if operation == "upsert":
+                    compacted.upsert_paper(*arguments)
+                else:
+                    compacted.delete_paper(*arguments)
+            self.index = compacted.index
+            self.documents = compacted.documents
+            self.paper_ranges = compacted.paper_ranges
+            self.index_type = compacted.index_type
+            self.trained_count = compacted.trained_count
+            self._live_selector = self._deleted_selector = None
+            # The change log of the saved snapshot no longer applies to the rebuilt index.
+            self._snapshot = None
+
+    @staticmethod
+    def _strip_paper_ids(documents: list[Document]) -> list[Document]:
+        return [
+            Document(
+                page_content=document.page_content,
+                metadata={key: value for key, value in document.metadata.items() if key != "paper_id"},
+            )
+            for document in documents
+        ]
+
+    def save(self, directory: str) -> None:
+        """
+        Saves a full snapshot of the corpus index to a directory, replacing the previous snapshot.
+        The snapshot is written next to the previous one and switched to atomically, so a crash
+        leaves either of them intact, and indexes still mapped from the previous one keep working.
+        Args:
+            directory (str): Directory of the corpus index.
+        Raises:
+            VectorStoreError: If the index cannot be written.
+        """
+        try:
+            with _lock_directory(directory):
+                self._save_snapshot(directory)
+        except Exception as e:
+            raise VectorStoreError(f"Error saving corpus index to {directory}: {e}") from e
+
+    def save_changes(self, directory: str) -> None:
+        """
+        Persists the changes made since the index was last saved or loaded by appending
+        them to the change log of its snapshot, so the cost is proportional to the new
+        chunks. A full snapshot is saved instead if the directory holds a different snapshot
+        (e.g. after a compaction) or the change log grew too large relative to the snapshot.
+        Args:
+            directory (str): Directory of the corpus index.
+        Raises:
+            VectorStoreError: If the changes cannot be written.
+        """
+        try:
+            with _lock_directory(directory):
+                version = _read_current_version(directory)
+                with self._lock:
+                    snapshot_path = _snapshot_path(directory, version) if version is not None else None
+                    if self._snapshot != (os.path.abspath(directory), version) or _change_log_too_large(snapshot_path):
+                        self._save_snapshot(directory)
+                        return
+                    if not self._unsaved_changes:
+                        return
+                    with open(os.path.join(snapshot_path, CHANGE_LOG_FILE_NAME), "a", encoding="utf-8") as f:
+                        f.writelines(json.dumps(_encode_change(change)) + "\n" for change in self._unsaved_changes)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    self._unsaved_changes = []
+        except Exception as e:
+            raise VectorStoreError(f"Error saving corpus index changes to {directory}: {e}") from e
+
+    def _save_snapshot(self, directory: str) -> None:
+        # Must be called with the directory lock held.
+        directory = os.path.abspath(directory)
+        os.makedirs(directory, exist_ok=True)
+        version = (_read_current_version(directory) or 0) + 1
+        tmp_path = tempfile.mkdtemp(dir=directory, suffix=".tmp")
+        try:
+            with self._lock:
+                self._write(tmp_path)
+                open(os.path.join(tmp_path, CHANGE_LOG_FILE_NAME), "w").close()
+                os.rename(tmp_path, _snapshot_path(directory, version))
+                _write_current_version(directory, version)
+                self._snapshot = (directory, version)
+                self._unsaved_changes = []
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.startswith(SNAPSHOT_PREFIX) and path != _snapshot_path(directory, version):
+                # Indexes memory-mapped from an old snapshot stay valid after its files are removed.
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _write(self, tmp_path: str) -> None:
+        faiss.write_index(self.index, os.path.join(tmp_path, INDEX_FILE_NAME))
+        docstore = {
+            "index_type": self.index_type,
+            "trained_count": self.trained_count,
+            "paper_ranges": self.paper_ranges,
+            "documents": [
+                {"page_content": document.page_content, "metadata": document.metadata} if document else None
+                for document in self.documents
+            ],
+        }
+        with open(os.path.join(tmp_path, DOCSTORE_FILE_NAME), "w", encoding="utf-8") as f:
+            json.dump(docstore, f)
+            f.flush()
+            os.fsync(f.fileno())
+
+    @classmethod
+    def load(cls, directory: str, embeddings: Embeddings, mmap: bool = True) -> "CorpusIndex":
+        """
+        Loads a corpus index saved with `save` and replays its change log.
+        Args:
+            directory (str): Directory of the corpus index.
+            embeddings (Embeddings): Embeddings used to embed queries.
+            mmap (bool): Whether to memory-map the FAISS index read-only, sharing it with other processes
+                through the page cache. Otherwise it is read into memory and can be modified. A mapped
+                index cannot grow, so it is read into memory (and still read-only) if the change log
+                adds chunks, until the next snapshot.
+        Returns:
+            CorpusIndex: Corpus index.
+        Raises:
+            VectorStoreError: If the index cannot be read.
+        """
+        for attempt in range(LOAD_ATTEMPTS):
+            try:
+                version, docstore, changes, index = cls._read_snapshot(directory, mmap)
+                break
+            except Exception as e:
+                # A writer may have replaced the snapshot while it was being read.
+                if attempt + 1 == LOAD_ATTEMPTS or _read_current_version(directory) is None:
+                    raise VectorStoreError(f"Error loading corpus index from {directory}: {e}") from e
+
+        documents = [Document(**document) if document else None for document in docstore["documents"]]
+        paper_ranges = {paper_id: tuple(bounds) for paper_id, bounds in docstore["paper_ranges"].items()}
+        corpus_index = cls(
+            embeddings,
+            index,
+            documents,
+            paper_ranges,
+            docstore["index_type"],
+            trained_count=docstore.get("trained_count"),
+            read_only=mmap,
+        )
+        for operation, arguments in changes:
+            if operation == "upsert":
+                corpus_index._upsert(*arguments)
+            else:
+                corpus_index._delete(*arguments)
+        corpus_index._snapshot = (os.path.abspath(directory), version)
+        return corpus_index
+
+    @staticmethod
+    def _read_snapshot(directory: str, mmap: bool) -> tuple[int, dict, list[tuple[str, tuple]], faiss.Index]:
+        version = _read_current_version(directory)
+        if version is None:
+            raise FileNotFoundError(f"No corpus index snapshot in {directory}")
+        snapshot_path = _snapshot_path(directory, version)
+        with open(os.path.join(snapshot_path, DOCSTORE_FILE_NAME), "r", encoding="utf-8") as f:
+            docstore = json.load(f)
+        changes = _read_change_log(os.path.join(snapshot_path, CHANGE_LOG_FILE_NAME))
+        map_index = mmap and all(operation == "delete" for operation, _ in changes)
+        # IO_FLAG_MMAP_IFC maps the codes of flat and HNSW indexes as well as IVF inverted lists.
+        index = faiss.read_index(
+            os.path.join(snapshot_path, INDEX_FILE_NAME),
+            faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY if map_index else 0,
+        )
+        return version, docstore, changes, index
+
+
+_directory_locks: dict[str, Lock] = {}
+_directory_locks_guard = Lock()
+
+
+@contextmanager
+def _lock_directory(directory: str) -> Iterator[None]:
+    """Serializes writers of a corpus index directory across threads and processes."""
+    directory = os.path.abspath(directory)
+    with _directory_locks_guard:
+        thread_lock = _directory_locks.setdefault(directory, Lock())
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    with thread_lock, lock_file(f"{directory}{LOCK_FILE_SUFFIX}"):
+        yield
+
+
+def _snapshot_path(directory: str, version: int) -> str:
+    return os.path.join(os.path.abspath(directory), f"{SNAPSHOT_PREFIX}{version:08d}")
+
+
+def _read_current_version(directory: str) -> Optional[int]:
+    try:
+        with open(os.path.join(directory, CURRENT_FILE_NAME), "r", encoding="utf-8") as f:
+            return int(f.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def _write_current_version(directory: str, version: int) -> None:
+    # os.replace swaps the pointer atomically, so readers see either the old or the new snapshot.
+    tmp_path = os.path.join(directory, f"{CURRENT_FILE_NAME}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(str(version))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(directory, CURRENT_FILE_NAME))
+
+
+def _change_log_too_large(snapshot_path: Optional[str]) -> bool:
+    if snapshot_path is None:
+        return True
+    try:
+        log_bytes = os.path.getsize(os.path.join(snapshot_path, CHANGE_LOG_FILE_NAME))
+        snapshot_bytes = sum(
+            os.path.getsize(os.path.join(snapshot_path, name)) for name in (INDEX_FILE_NAME, DOCSTORE_FILE_NAME)
+        )
+    except OSError:
+        return True
+    return log_bytes > CORPUS_CHANGE_LOG_MAX_RATIO * snapshot_bytes
+
+
+def _encode_change(change: tuple[str, tuple]) -> dict:
+    operation, arguments = change
+    if operation == "delete":
+        return {"operation": operation, "paper_id": arguments[0]}
+    paper_id, documents, matrix = arguments
+    return {
+        "operation": operation,
+        "paper_id": paper_id,
+        "documents": [{"page_content": document.page_content, "metadata": document.metadata} for document in documents],
+        "dimension": matrix.shape[1],
+        "vectors": base64.b64encode(np.ascontiguousarray(matrix, dtype=np.float32).tobytes()).decode("ascii"),
+    }
+
+
+def _read_change_log(path: str) -> list[tuple[str, tuple]]:
+    changes = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A record cut short by a crash while it was appended.
+                break
+            if record["operation"] == "delete":
+                changes.append(("delete", (record["paper_id"],)))
+                continue
+            matrix = np.frombuffer(base64.b64decode(record["vectors"]), dtype=np.float32)
+            documents = [Document(**document) for document in record["documents"]]
+            changes.append(("upsert", (record["paper_id"], documents, matrix.reshape(-1, record["dimension"]))))
+    return changes
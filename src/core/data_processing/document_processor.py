@@ -1,14 +1,53 @@
+from threading import Lock, Thread
+from typing import Iterable, Iterator, Optional, Union
+
 from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_text_splitters import TextSplitter
 
+from src.config import STREAMING_EMBEDDING_BATCH_SIZE, VECTOR_INDEX_OPTION
+from src.core.data_processing.bm25_index import BM25Index
+from src.core.data_processing.corpus_index import CorpusIndex
+from src.core.data_processing.markdown_chunker import MarkdownSectionChunker
+from src.core.data_processing.vector_index import (
+    FULL_PRECISION_OPTION,
+    build_vector_store,
+    get_index_embeddings,
+    get_index_option,
+)
+from src.core.data_processing.vector_store_cache import CachedVectorStore, VectorStoreCache
 from src.core.exceptions import VectorStoreError
 from src.core.models.embedding import EmbeddingModel
 
 
 class DocumentProcessor:
-    def __init__(self, embedding_model: EmbeddingModel, text_splitter: TextSplitter):
+    def __init__(
+        self,
+        embedding_model: EmbeddingModel,
+        text_splitter: TextSplitter,
+        index_option: str = VECTOR_INDEX_OPTION,
+        vector_store_cache: Optional[VectorStoreCache] = None,
+    ):
+        """
+        Initializes the document processor.
+        Args:
+            embedding_model (EmbeddingModel): Model embedding the chunks.
+            text_splitter (TextSplitter): Splitter producing the chunks.
+            index_option (str): Name of the vector index option (see `INDEX_OPTIONS`) of the created stores.
+            vector_store_cache (Optional[VectorStoreCache]): Cache the vector stores of processed papers are
+                saved to and loaded from. Vector stores are not persisted if None.
+        Raises:
+            VectorStoreError: If the index option does not exist.
+        """
+        get_index_option(index_option)
         self.embedding_model = embedding_model
         self.text_splitter = text_splitter
+        self.index_option = index_option
+        self.vector_store_cache = vector_store_cache
+        self.compaction_thread: Optional[Thread] = None
+        self.compaction_error: Optional[Exception] = None
+        self._compaction_lock = Lock()
 
     def split_text(self, text: str) -> list[str]:
         """
@@ -20,6 +59,26 @@ class DocumentProcessor:
         """
         return self.text_splitter.split_text(text)
 
+    def split_documents(self, text: str) -> list[Document]:
+        """
+        Splits markdown into chunks that follow its sections.
+        Args:
+            text (str): The markdown to be split.
+        Returns:
+            list[Document]: Chunks with "section", "page", "start_index" and "end_index" metadata.
+        """
+        return MarkdownSectionChunker(self.text_splitter).split_documents(text)
+
+    def split_document_stream(self, texts: Iterable[str]) -> Iterator[Document]:
+        """
+        Splits markdown that arrives in consecutive pieces (e.g. pages) into chunks that follow its sections.
+        Args:
+            texts (Iterable[str]): Consecutive pieces of the markdown.
+        Yields:
+            Document: Chunks with "section", "page", "start_index" and "end_index" metadata, in document order.
+        """
+        return MarkdownSectionChunker(self.text_splitter).split_document_stream(texts)
+
     def create_vector_store(self, chunks: list[str]) -> FAISS:
         """
         Creates a FAISS vector store from the text chunks.
@@ -32,6 +91,8 @@ class DocumentProcessor:
         """
         if not chunks:
             raise VectorStoreError("Cannot create vector store from empty chunks.")
+        if self.index_option != FULL_PRECISION_OPTION:
+            return self._create_indexed_vector_store(chunks, len(chunks))
         try:
             vector_store = FAISS.from_texts(
                 texts=chunks, embedding=self.embedding_model.model
@@ -41,3 +102,271 @@ class DocumentProcessor:
             raise VectorStoreError(
                 f"Error during FAISS vector store creation: {e}"
             ) from e
+
+    def create_vector_store_from_document_stream(
+        self, documents: Iterable[Document], batch_size: int = STREAMING_EMBEDDING_BATCH_SIZE
+    ) -> FAISS:
+        """
+        Creates a FAISS vector store from a stream of chunks with metadata.
+        The metadata of each chunk is kept in the docstore, so it is returned with search results
+        and can be used to filter them.
+        Args:
+            documents (Iterable[Document]): Stream of chunks with metadata.
+            batch_size (int): Number of chunks embedded at once.
+        Returns:
+            FAISS: FAISS vector store.
+        Raises:
+            VectorStoreError: If there is an error during vector store creation.
+        """
+        if self.index_option != FULL_PRECISION_OPTION:
+            return self._create_indexed_vector_store(documents, batch_size)
+
+        vector_store: Optional[FAISS] = None
+        batch: list[Document] = []
+        for document in documents:
+            batch.append(document)
+            if len(batch) >= batch_size:
+                vector_store = self._add_document_batch(vector_store, batch)
+                batch = []
+        if batch:
+            vector_store = self._add_document_batch(vector_store, batch)
+
+        if vector_store is None:
+            raise VectorStoreError("Cannot create vector store from empty chunks.")
+        return vector_store
+
+    def _add_document_batch(self, vector_store: Optional[FAISS], batch: list[Document]) -> FAISS:
+        try:
+            if vector_store is None:
+                return FAISS.from_documents(documents=batch, embedding=self.embedding_model.model)
+            vector_store.add_documents(batch)
+            return vector_store
+        except Exception as e:
+            raise VectorStoreError(
+                f"Error during FAISS vector store creation: {e}"
+            ) from e
+
+    @staticmethod
+    def create_keyword_index(chunks: list[Document]) -> BM25Index:
+        """
+        Builds the BM25 inverted index used next to the vector store for hybrid retrieval.
+        Args:
+            chunks (list[Document]): Chunks of the vector store.
+        Returns:
+            BM25Index: Inverted index over the chunks.
+        """
+        return BM25Index(chunks)
+
+    def create_corpus_index(
+        self,
+        papers: Iterable[tuple[str, Iterable[Document]]],
+        index_type: Optional[str] = None,
+        batch_size: int = STREAMING_EMBEDDING_BATCH_SIZE,
+    ) -> CorpusIndex:
+        """
+        Embeds the chunks of many papers and builds a corpus index searchable across and within papers.
+        Only the dimension truncation of the index option applies, the corpus index compresses vectors itself.
+        Args:
+            papers (Iterable[tuple[str, Iterable[Document]]]): Paper ID and chunks of each paper.
+            index_type (Optional[str]): One of `CORPUS_INDEX_TYPES`. Chosen from the corpus size if None.
+            batch_size (int): Number of chunks embedded at a time.
+        Returns:
+            CorpusIndex: Corpus index over all chunks.
+        Raises:
+            VectorStoreError: If there are no chunks, or embedding or indexing fails.
+        """
+        embeddings = get_index_embeddings(self.embedding_model.model, self.index_option)
+        return CorpusIndex.build(embeddings, self._embed_papers(embeddings, papers, batch_size), index_type)
+
+    def upsert_corpus_papers(
+        self,
+        corpus_index: CorpusIndex,
+        papers: Iterable[tuple[str, Iterable[Document]]],
+        directory: Optional[str] = None,
+        batch_size: int = STREAMING_EMBEDDING_BATCH_SIZE,
+    ) -> None:
+        """
+        Adds papers to a corpus index, replacing the chunks of papers it already holds.
+        Only the new chunks are embedded, added and appended to the saved index. Once
+        enough changes pile up, the index is compacted in a background thread (see
+        `wait_for_compaction`).
+        Args:
+            corpus_index (CorpusIndex): Corpus index loaded with mmap=False.
+            papers (Iterable[tuple[str, Iterable[Document]]]): Paper ID and chunks of each paper.
+            directory (Optional[str]): Directory the changes and the compacted index are saved to.
+                The index is not saved if None.
+            batch_size (int): Number of chunks embedded at a time.
+        Raises:
+            VectorStoreError: If the index is read-only, embedding, indexing or saving fails,
+                or the previous background compaction failed.
+        """
+        for paper_id, documents, vectors in self._embed_papers(corpus_index.embeddings, papers, batch_size):
+            corpus_index.upsert_paper(paper_id, documents, vectors)
+        self._finish_corpus_update(corpus_index, directory)
+
+    def delete_corpus_papers(
+        self, corpus_index: CorpusIndex, paper_ids: Iterable[str], directory: Optional[str] = None
+    ) -> None:
+        """
+        Removes papers from a corpus index, compacting it in a background thread once enough changes pile up.
+        Args:
+            corpus_index (CorpusIndex): Corpus index loaded with mmap=False.
+            paper_ids (Iterable[str]): IDs of the removed papers. Papers not in the index are ignored.
+            directory (Optional[str]): Directory the changes and the compacted index are saved to.
+                The index is not saved if None.
+        Raises:
+            VectorStoreError: If the index is read-only, saving fails, or the previous background
+                compaction failed.
+        """
+        for paper_id in paper_ids:
+            corpus_index.delete_paper(paper_id)
+        self._finish_corpus_update(corpus_index, directory)
+
+    def compact_corpus_index(
+        self,
+        corpus_index: CorpusIndex,
+        directory: Optional[str] = None,
+        batch_size: int = STREAMING_EMBEDDING_BATCH_SIZE,
+    ) -> None:
+        """
+        Rebuilds a corpus index from its live chunks, dropping deleted ones and retraining IVF-PQ lists.
+        Exact and HNSW indexes are rebuilt from their stored vectors, while the chunks of IVF-PQ indexes,
+        which only keep compressed codes, are embedded again (mostly from the embedding cache).
+        Searches and changes can continue while the new index is built.
+        Args:
+            corpus_index (CorpusIndex): Corpus index loaded with mmap=False.
+            directory (Optional[str]): Directory the compacted index is saved to. The index is not saved if None.
+            batch_size (int): Number of chunks embedded at a time.
+        Raises:
+            VectorStoreError: If a compaction of the index is already running, or embedding, indexing
+                or saving fails.
+        """
+        index_type = corpus_index.get_compacted_index_type()
+        papers = corpus_index.begin_compaction()
+        compacted = None
+        try:
+            if papers:
+                embedded_papers = (
+                    (paper_id, documents, vectors)
+                    if vectors is not None
+                    else next(self._embed_papers(corpus_index.embeddings, [(paper_id, documents)], batch_size))
+                    for paper_id, documents, vectors in papers
+                )
+                compacted = CorpusIndex.build(corpus_index.embeddings, embedded_papers, index_type)
+        finally:
+            corpus_index.finish_compaction(compacted)
+        if directory is not None:
+            corpus_index.save(directory)
+
+    def wait_for_compaction(self) -> None:
+        """
+        Waits for the background compaction started by a corpus update, if any, to finish.
+        Raises:
+            VectorStoreError: If the compaction failed.
+        """
+        with self._compaction_lock:
+            compaction_thread = self.compaction_thread
+        if compaction_thread is not None:
+            compaction_thread.join()
+        self._raise_compaction_error()
+
+    def _raise_compaction_error(self) -> None:
+        with self._compaction_lock:
+            error, self.compaction_error = self.compaction_error, None
+        if error is not None:
+            raise VectorStoreError(f"Background compaction of the corpus index failed: {error}") from error
+
+    def _finish_corpus_update(self, corpus_index: CorpusIndex, directory: Optional[str]) -> None:
+        if directory is not None:
+            corpus_index.save_changes(directory)
+        self._raise_compaction_error()
+        if not corpus_index.needs_compaction():
+            return
+        with self._compaction_lock:
+            if self.compaction_thread is not None and self.compaction_thread.is_alive():
+                return
+            self.compaction_thread = Thread(
+                target=self._compact_in_background,
+                args=(corpus_index, directory),
+                name="corpus-index-compaction",
+                daemon=True,
+            )
+            self.compaction_thread.start()
+
+    def _compact_in_background(self, corpus_index: CorpusIndex, directory: Optional[str]) -> None:
+        try:
+            self.compact_corpus_index(corpus_index, directory)
+        except Exception as e:
+            # Raised by `wait_for_compaction` or the next corpus update.
+            with self._compaction_lock:
+                self.compaction_error = e
+
+    def _embed_papers(
+        self, embeddings: Embeddings, papers: Iterable[tuple[str, Iterable[Document]]], batch_size: int
+    ) -> Iterator[tuple[str, list[Document], list[list[float]]]]:
+        for paper_id, chunks in papers:
+            documents = list(chunks)
+            vectors = []
+            for start in range(0, len(documents), batch_size):
+                vectors.extend(self._embed_batch(embeddings, documents[start : start + batch_size]))
+            yield paper_id, documents, vectors
+
+    def load_vector_store(self, key: str) -> Optional[CachedVectorStore]:
+        """
+        Loads the persisted vector store of a paper.
+        Args:
+            key (str): Cache key of the paper, as returned by `VectorStoreCache.make_key`.
+        Returns:
+            Optional[CachedVectorStore]: Memory-mapped vector store with its chunks and markdown,
+                or None if it was not persisted or there is no vector store cache.
+        """
+        if self.vector_store_cache is None:
+            return None
+        embeddings = get_index_embeddings(self.embedding_model.model, self.index_option)
+        return self.vector_store_cache.get(key, embeddings)
+
+    def save_vector_store(self, key: str, vector_store: FAISS, text: str) -> None:
+        """
+        Persists the vector store of a paper so that later sessions can load it instead of processing the paper.
+        Failures to write the cache are ignored.
+        Args:
+            key (str): Cache key of the paper, as returned by `VectorStoreCache.make_key`.
+            vector_store (FAISS): Vector store of the paper.
+            text (str): Markdown the chunks of the vector store were split from.
+        """
+        if self.vector_store_cache is None:
+            return
+        try:
+            self.vector_store_cache.put(key, vector_store, text)
+        except (OSError, RuntimeError):
+            pass
+
+    def _create_indexed_vector_store(self, items: Iterable[Union[str, Document]], batch_size: int) -> FAISS:
+        """
+        Embeds chunks in batches as they arrive and builds the index of the index option once all are embedded,
+        since compressed indexes are trained on the whole set of vectors.
+        """
+        embeddings = get_index_embeddings(self.embedding_model.model, self.index_option)
+        documents: list[Document] = []
+        vectors: list[list[float]] = []
+        batch: list[Document] = []
+        for item in items:
+            batch.append(Document(page_content=item) if isinstance(item, str) else item)
+            if len(batch) >= batch_size:
+                vectors.extend(self._embed_batch(embeddings, batch))
+                documents.extend(batch)
+                batch = []
+        if batch:
+            vectors.extend(self._embed_batch(embeddings, batch))
+            documents.extend(batch)
+
+        return build_vector_store(embeddings, documents, vectors, self.index_option)
+
+    @staticmethod
+    def _embed_batch(embeddings: Embeddings, batch: list[Document]) -> list[list[float]]:
+        try:
+            return embeddings.embed_documents([document.page_content for document in batch])
+        except Exception as e:
+            raise VectorStoreError(
+                f"Error during FAISS vector store creation: {e}"
+            ) from e
@@ -0,0 +1,276 @@
+import hashlib
+import json
+import os
+import tempfile
+from functools import partial
+from threading import Lock
+from typing import Callable, Iterator, Optional, Union
+
+from src.config import (
+    DEFAULT_EXTRACTION_PROFILE,
+    EXTRACTION_CACHE_DIR,
+    EXTRACTION_CACHE_MAX_BYTES,
+    HYBRID_EXTRACTION,
+    PARALLEL_EXTRACTION,
+    TEXT_LAYER_MIN_CHARS,
+    TEXT_LAYER_MIN_QUALITY,
+)
+from src.core.data_processing.hybrid_extractor import HybridTextExtractor
+from src.core.data_processing.parallel_extractor import ParallelMarkerTextExtractor
+from src.core.data_processing.text_extractor import (
+    MARKER_CONFIG,
+    MarkerTextExtractor,
+    PdfData,
+    as_pdf_buffer,
+    get_extraction_profile,
+    in_memory_pdf_path,
+)
+from src.core.exceptions import TextExtractionError
+
+
+class ExtractionCache:
+    """
+    Content-addressed on-disk cache for markdown extracted from PDF files.
+    Entries are keyed by the SHA-256 of the PDF bytes and the Marker config.
+    Once the total size of the stored entries exceeds the limit, the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir: str, max_size_bytes: int):
+        """
+        Initializes the extraction cache.
+        Args:
+            cache_dir (str): Directory where the cached markdown files are stored.
+            max_size_bytes (int): Maximum total size of the cached entries in bytes.
+        """
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self._lock = Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(pdf_bytes: Union[bytes, bytearray, memoryview], config: dict) -> str:
+        """
+        Builds the cache key for the given PDF contents and extraction config.
+        Args:
+            pdf_bytes (Union[bytes, bytearray, memoryview]): Raw contents of the PDF file.
+            config (dict): Marker config used for the extraction.
+        Returns:
+            str: Hex digest identifying the cache entry.
+        """
+        digest = hashlib.sha256(pdf_bytes)
+        digest.update(json.dumps(config, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.md")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns the cached markdown for the key and marks the entry as recently used.
+        Args:
+            key (str): Cache key returned by `make_key`.
+        Returns:
+            Optional[str]: Cached markdown, or None if the entry does not exist.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                text = f.read()
+            os.utime(entry_path)
+        except OSError:
+            return None
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """
+        Stores the markdown under the key and evicts old entries if needed.
+        Args:
+            key (str): Cache key returned by `make_key`.
+            text (str): Extracted markdown to store.
+        """
+        entry_path = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, entry_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            for dir_path, _, filenames in os.walk(self.cache_dir):
+                for filename in filenames:
+                    if not filename.endswith(".md"):
+                        continue
+                    path = os.path.join(dir_path, filename)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_size <= self.max_size_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total_size -= size
+
+
+class CachedTextExtractor:
+    """
+    Text extractor that serves previously seen PDFs from an ExtractionCache.
+    The Marker models are only loaded when a PDF is not found in the cache.
+    """
+
+    def __init__(
+        self,
+        cache: ExtractionCache,
+        extractor_factory: Callable[[], MarkerTextExtractor] = MarkerTextExtractor,
+        config: Optional[dict] = None,
+    ):
+        """
+        Initializes the cached text extractor.
+        Args:
+            cache (ExtractionCache): Cache used to store the extracted markdown.
+            extractor_factory (Callable[[], MarkerTextExtractor]): Returns the extractor used on cache misses.
+            config (Optional[dict]): Extraction config that is part of the cache key. Defaults to MARKER_CONFIG.
+        """
+        self.cache = cache
+        self.extractor_factory = extractor_factory
+        self.config = MARKER_CONFIG if config is None else config
+
+    def extract_text_from_pdf_file(self, file_path: str, profile: str = DEFAULT_EXTRACTION_PROFILE) -> str:
+        """
+        Extracts text from a PDF file, using the cache when possible.
+        Args:
+            file_path (str): Path to the PDF file.
+            profile (str): Name of the extraction profile.
+        Returns:
+            str: Extracted text from the PDF file.
+        Raises:
+            TextExtractionError: If there is an error during text extraction.
+        """
+        if not os.path.exists(file_path):
+            raise TextExtractionError(f"PDF file not found at: {file_path}")
+
+        with open(file_path, "rb") as f:
+            key = self._make_key(f.read(), profile)
+        text = self.cache.get(key)
+        if text is not None:
+            return text
+
+        text = self.extractor_factory().extract_text_from_pdf_file(file_path, profile)
+        self._store(key, text)
+        return text
+
+    def iter_text_from_pdf_file(self, file_path: str, profile: str = DEFAULT_EXTRACTION_PROFILE) -> Iterator[str]:
+        """
+        Extracts text from a PDF file page range by page range, using the cache when possible.
+        On a cache hit the whole cached markdown is yielded at once.
+        Args:
+            file_path (str): Path to the PDF file.
+            profile (str): Name of the extraction profile.
+        Yields:
+            str: Extracted text of consecutive page ranges, in page order.
+        Raises:
+            TextExtractionError: If there is an error during text extraction.
+        """
+        if not os.path.exists(file_path):
+            raise TextExtractionError(f"PDF file not found at: {file_path}")
+
+        with open(file_path, "rb") as f:
+            key = self._make_key(f.read(), profile)
+        yield from self._iter_cached(key, file_path, profile)
+
+    def extract_text_from_bytes(self, data: PdfData, profile: str = DEFAULT_EXTRACTION_PROFILE) -> str:
+        """
+        Extracts text from an in-memory PDF, using the cache when possible.
+        On a cache miss the PDF is exposed to the extractor through a RAM-backed
+        file instead of a temporary file on disk.
+        Args:
+            data (PdfData): PDF contents as bytes or a binary buffer (e.g. BytesIO).
+            profile (str): Name of the extraction profile.
+        Returns:
+            str: Extracted text from the PDF.
+        Raises:
+            TextExtractionError: If there is an error during text extraction.
+        """
+        return "\n\n".join(self.iter_text_from_bytes(data, profile))
+
+    def iter_text_from_bytes(self, data: PdfData, profile: str = DEFAULT_EXTRACTION_PROFILE) -> Iterator[str]:
+        """
+        Extracts text from an in-memory PDF page range by page range, using the cache when possible.
+        Args:
+            data (PdfData): PDF contents as bytes or a binary buffer (e.g. BytesIO).
+            profile (str): Name of the extraction profile.
+        Yields:
+            str: Extracted text of consecutive page ranges, in page order.
+        Raises:
+            TextExtractionError: If there is an error during text extraction.
+        """
+        buffer = as_pdf_buffer(data)
+        key = self._make_key(buffer, profile)
+        if (text := self.cache.get(key)) is not None:
+            yield text
+            return
+
+        with in_memory_pdf_path(buffer) as file_path:
+            yield from self._iter_cached(key, file_path, profile)
+
+    def _iter_cached(self, key: str, file_path: str, profile: str) -> Iterator[str]:
+        text = self.cache.get(key)
+        if text is not None:
+            yield text
+            return
+
+        texts = []
+        for text in self.extractor_factory().iter_text_from_pdf_file(file_path, profile):
+            texts.append(text)
+            yield text
+        self._store(key, "\n\n".join(texts))
+
+    def _make_key(self, pdf_bytes: Union[bytes, bytearray, memoryview], profile: str) -> str:
+        profile_config = {**self.config, "profile": profile, **get_extraction_profile(profile)}
+        return self.cache.make_key(pdf_bytes, profile_config)
+
+    def _store(self, key: str, text: str) -> None:
+        try:
+            self.cache.put(key, text)
+        except OSError:
+            pass
+
+
+def build_text_extractor(parallel: bool = PARALLEL_EXTRACTION) -> CachedTextExtractor:
+    """
+    Builds the cached text extractor selected in src/config.py.
+    The hybrid text-layer extractor takes precedence over the parallel one,
+    and the extraction mode is part of the cache key.
+    Args:
+        parallel (bool): Whether Marker runs in the pool of worker processes instead of this process,
+            also for the fallback pages of the hybrid extractor. Needed when several threads extract
+            at once, since they would otherwise share one Marker converter.
+    Returns:
+        CachedTextExtractor: Cached text extractor.
+    """
+    cache = ExtractionCache(EXTRACTION_CACHE_DIR, EXTRACTION_CACHE_MAX_BYTES)
+    marker_factory = ParallelMarkerTextExtractor if parallel else MarkerTextExtractor
+    if HYBRID_EXTRACTION:
+        config = {
+            **MARKER_CONFIG,
+            "text_layer_min_chars": TEXT_LAYER_MIN_CHARS,
+            "text_layer_min_quality": TEXT_LAYER_MIN_QUALITY,
+        }
+        return CachedTextExtractor(cache, partial(HybridTextExtractor, marker_factory), config)
+    return CachedTextExtractor(cache, marker_factory)
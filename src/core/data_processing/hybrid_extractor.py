@@ -0,0 +1,275 @@
+import os
+import time
+import unicodedata
+from contextlib import closing
+from typing import Callable, Iterator, NamedTuple
+
+import pypdfium2 as pdfium
+
+from src.config import (
+    DEFAULT_EXTRACTION_PROFILE,
+    STREAMING_PAGES_PER_STEP,
+    TEXT_LAYER_MIN_CHARS,
+    TEXT_LAYER_MIN_QUALITY,
+)
+from src.core.data_processing.markdown_chunker import PAGE_SEPARATOR_PATTERN
+from src.core.data_processing.text_extractor import MarkerTextExtractor, format_page_separator
+from src.core.exceptions import TextExtractionError
+
+TEXT_LAYER_SOURCE = "text_layer"
+MARKER_SOURCE = "marker"
+
+_BAD_CHAR_CATEGORIES = {"Cc", "Cf", "Co", "Cs", "Cn"}
+
+
+class PageExtraction(NamedTuple):
+    """Text extracted from a single PDF page and the path that produced it."""
+
+    page: int
+    text: str
+    source: str
+    seconds: float
+
+
+def text_layer_quality(text: str) -> float:
+    """
+    Scores how clean an embedded text layer looks.
+    Unmapped glyphs ("(cid:N)"), replacement and control characters, and
+    letter-spaced text ("T h i s") all lower the score.
+    Args:
+        text (str): Text read from the PDF text layer.
+    Returns:
+        float: Score between 0.0 (garbled) and 1.0 (clean).
+    """
+    words = text.split()
+    if not words:
+        return 0.0
+
+    chars = "".join(words)
+    bad_chars = 5 * text.count("(cid:") + sum(
+        1 for char in chars if char == "\ufffd" or unicodedata.category(char) in _BAD_CHAR_CATEGORIES
+    )
+    char_quality = max(0.0, 1.0 - bad_chars / len(chars))
+
+    average_word_length = len(chars) / len(words)
+    spacing_quality = min(1.0, average_word_length / 3)
+
+    return char_quality * spacing_quality
+
+
+def is_text_layer_usable(
+    text: str,
+    min_chars: int = TEXT_LAYER_MIN_CHARS,
+    min_quality: float = TEXT_LAYER_MIN_QUALITY,
+) -> bool:
+    """
+    Checks whether the embedded text layer of a page can be used instead of Marker.
+    Args:
+        text (str): Text read from the PDF text layer.
+        min_chars (int): Minimum number of non-whitespace characters on the page.
+        min_quality (float): Minimum score returned by `text_layer_quality`.
+    Returns:
+        bool: True if the text layer is dense and clean enough.
+    """
+    non_whitespace_chars = sum(1 for char in text if not char.isspace())
+    return non_whitespace_chars >= min_chars and text_layer_quality(text) >= min_quality
+
+
+def iter_text_layer(file_path: str) -> Iterator[str]:
+    """
+    Reads the embedded text layer of a PDF file page by page.
+    Args:
+        file_path (str): Path to the PDF file.
+    Yields:
+        str: Text of each page, in page order.
+    """
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        for page in pdf:
+            text_page = page.get_textpage()
+            text = text_page.get_text_range()
+            text_page.close()
+            page.close()
+            yield text
+    finally:
+        pdf.close()
+
+
+def split_marker_pages(text: str, first_page: int, last_page: int) -> list[str]:
+    """
+    Splits the paginated Marker output of a page range into the text of each page.
+    Each page keeps the separator that precedes it, as if it had been converted on its own.
+    Args:
+        text (str): Marker output of the page range.
+        first_page (int): Index of the first page of the range (0-based, inclusive).
+        last_page (int): Index of the last page of the range (0-based, inclusive).
+    Returns:
+        list[str]: Text of each page of the range, in page order. Pages Marker produced
+            no output for are empty, and all text goes to the first page if there are no separators.
+    """
+    page_texts = [""] * (last_page - first_page + 1)
+    matches = list(PAGE_SEPARATOR_PATTERN.finditer(text))
+    if not matches:
+        page_texts[0] = text
+        return page_texts
+
+    page_texts[0] = text[: matches[0].start()]
+    for match, next_match in zip(matches, matches[1:] + [None]):
+        page = int(match.group(1))
+        if first_page <= page <= last_page:
+            end = next_match.start() if next_match is not None else len(text)
+            page_texts[page - first_page] += text[match.start() : end]
+    return page_texts
+
+
+class HybridTextExtractor:
+    """
+    Text extractor that reads the embedded text layer of a PDF and only sends
+    pages whose text layer is missing or garbled to Marker.
+    The Marker models are loaded lazily, the first time a page needs them, and
+    consecutive fallback pages are converted together in a single Marker pass.
+    """
+
+    def __init__(
+        self,
+        marker_factory: Callable[[], MarkerTextExtractor] = MarkerTextExtractor,
+        min_chars: int = TEXT_LAYER_MIN_CHARS,
+        min_quality: float = TEXT_LAYER_MIN_QUALITY,
+        max_marker_pages: int = STREAMING_PAGES_PER_STEP,
+    ):
+        """
+        Initializes the hybrid text extractor.
+        Args:
+            marker_factory (Callable[[], MarkerTextExtractor]): Returns the extractor used for fallback pages.
+            min_chars (int): Minimum number of non-whitespace characters for a usable text layer.
+            min_quality (float): Minimum text layer quality score for a usable text layer.
+            max_marker_pages (int): Maximum number of consecutive fallback pages converted in one Marker pass.
+        """
+        self.marker_factory = marker_factory
+        self.min_chars = min_chars
+        self.min_quality = min_quality
+        self.max_marker_pages = max_marker_pages
+
+    def iter_pages(self, file_path: str, profile: str = DEFAULT_EXTRACTION_PROFILE) -> Iterator[PageExtraction]:
+        """
+        Extracts the pages of a PDF file one by one, reporting the path each page took.
+        The text layer of a page is read when the page is reached, so its timing
+        covers the read as well as its share of the Marker fallback, if any.
+        Runs of consecutive fallback pages (up to `max_marker_pages`) are held back
+        and converted in one Marker pass once the run ends.
+        Args:
+            file_path (str): Path to the PDF file.
+            profile (str): Name of the extraction profile used for Marker fallback pages.
+        Yields:
+            PageExtraction: Extracted text, source and timing of each page, in page order.
+        Raises:
+            TextExtractionError: If there is an error during text extraction.
+        """
+        if not os.path.exists(file_path):
+            raise TextExtractionError(f"PDF file not found at: {file_path}")
+
+        with closing(iter_text_layer(file_path)) as text_layer:
+            fallback_pages: list[tuple[int, float]] = []
+            page = 0
+            while True:
+                start_time = time.perf_counter()
+                try:
+                    text = next(text_layer, None)
+                except Exception as e:
+                    raise TextExtractionError(f"Failed to read text layer of {file_path}: {e}") from e
+                if text is None:
+                    yield from self._extract_marker_pages(file_path, fallback_pages, profile)
+                    return
+
+                seconds = time.perf_counter() - start_time
+                if is_text_layer_usable(text, self.min_chars, self.min_quality):
+                    yield from self._extract_marker_pages(file_path, fallback_pages, profile)
+                    fallback_pages = []
+                    yield PageExtraction(page, text.strip(), TEXT_LAYER_SOURCE, seconds)
+                else:
+                    fallback_pages.append((page, seconds))
+                    if len(fallback_pages) >= self.max_marker_pages:
+                        yield from self._extract_marker_pages(file_path, fallback_pages, profile)
+                        fallback_pages = []
+                page += 1
+
+    def _extract_marker_pages(
+        self, file_path: str, fallback_pages: list[tuple[int, float]], profile: str
+    ) -> Iterator[PageExtraction]:
+        """
+        Converts a run of consecutive fallback pages in one Marker pass, splitting its time evenly between them.
+        """
+        if not fallback_pages:
+            return
+
+        first_page, last_page = fallback_pages[0][0], fallback_pages[-1][0]
+        start_time = time.perf_counter()
+        text = self.marker_factory().extract_text_from_pdf_pages(file_path, first_page, last_page, profile)
+        marker_seconds = (time.perf_counter() - start_time) / len(fallback_pages)
+        for (page, read_seconds), page_text in zip(fallback_pages, split_marker_pages(text, first_page, last_page)):
+            yield PageExtraction(page, page_text, MARKER_SOURCE, read_seconds + marker_seconds)
+
+    def extract_pages(self, file_path: str, profile: str = DEFAULT_EXTRACTION_PROFILE) -> list[PageExtraction]:
+        """
+        Extracts all pages of a PDF file, reporting the path each page took.
+        Args:
+            file_path (str): Path to the PDF file.
+            profile (str): Name of the extraction profile used for Marker fallback pages.
+        Returns:
+            list[PageExtraction]: Extracted text, source and timing of each page.
+        Raises:
+            TextExtractionError: If there is an error during text extraction.
+        """
+        return list(self.iter_pages(file_path, profile))
+
+    def extract_text_from_pdf_file(self, file_path: str, profile: str = DEFAULT_EXTRACTION_PROFILE) -> str:
+        """
+        Extracts text from a PDF file.
+        Args:
+            file_path (str): Path to the PDF file.
+            profile (str): Name of the extraction profile used for Marker fallback pages.
+        Returns:
+            str: Extracted text from the PDF file.
+        Raises:
+            TextExtractionError: If there is an error during text extraction.
+        """
+        return "\n\n".join(self.iter_text_from_pdf_file(file_path, profile))
+
+    def iter_text_from_pdf_file(self, file_path: str, profile: str = DEFAULT_EXTRACTION_PROFILE) -> Iterator[str]:
+        """
+        Extracts text from a PDF file page by page.
+        Text layer pages are preceded by the same page separator that Marker
+        puts before the pages it converts.
+        Args:
+            file_path (str): Path to the PDF file.
+            profile (str): Name of the extraction profile used for Marker fallback pages.
+        Yields:
+            str: Extracted text of each page, in page order.
+        Raises:
+            TextExtractionError: If there is an error during text extraction.
+        """
+        for page_extraction in self.iter_pages(file_path, profile):
+            if page_extraction.source == TEXT_LAYER_SOURCE:
+                yield format_page_separator(page_extraction.page) + page_extraction.text
+            else:
+                yield page_extraction.text
+
+
+def summarize_page_sources(pages: list[PageExtraction]) -> dict[str, dict[str, float]]:
+    """
+    Aggregates the number of pages and time spent on each extraction path.
+    Args:
+        pages (list[PageExtraction]): Pages returned by `HybridTextExtractor.extract_pages`.
+    Returns:
+        dict[str, dict[str, float]]: Page count, total seconds and pages per second for each source.
+    """
+    summary = {}
+    for source in (TEXT_LAYER_SOURCE, MARKER_SOURCE):
+        source_pages = [page for page in pages if page.source == source]
+        seconds = sum(page.seconds for page in source_pages)
+        summary[source] = {
+            "pages": len(source_pages),
+            "seconds": seconds,
+            "pages_per_second": len(source_pages) / seconds if seconds > 0 else 0.0,
+        }
+    return summary
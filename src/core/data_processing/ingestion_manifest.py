@@ -0,0 +1,170 @@
+import hashlib
+import os
+import sqlite3
+import time
+from threading import Lock
+from typing import Optional
+
+EXTRACTED_STAGE = "extracted"
+CHUNKED_STAGE = "chunked"
+EMBEDDED_STAGE = "embedded"
+
+INGESTION_STAGES = (EXTRACTED_STAGE, CHUNKED_STAGE, EMBEDDED_STAGE)
+"""Stages every document goes through during ingestion, in order."""
+
+
+def compute_content_hash(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """
+    Computes the SHA-256 of a file without loading it into memory at once.
+    Args:
+        file_path (str): Path to the file.
+        block_size (int): Number of bytes read at a time.
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while block := f.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestionManifest:
+    """
+    SQLite-backed record of how far each document got through ingestion.
+    Documents are identified by the hash of their contents, so renamed or
+    duplicated files are only ingested once. The manifest can be shared by
+    the worker threads of all ingestion stages.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Opens the manifest, creating the database if it does not exist.
+        Args:
+            db_path (str): Path to the SQLite database file.
+        """
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    content_hash TEXT PRIMARY KEY,
+                    source_path TEXT NOT NULL,
+                    stage TEXT,
+                    error TEXT,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def get_stage(self, content_hash: str) -> Optional[str]:
+        """
+        Returns the last stage the document completed.
+        Args:
+            content_hash (str): Hash of the document contents.
+        Returns:
+            Optional[str]: Last completed stage, or None if no stage was completed yet.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT stage FROM documents WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_error(self, content_hash: str) -> Optional[str]:
+        """
+        Returns the error recorded for the document, if its last attempt failed.
+        Args:
+            content_hash (str): Hash of the document contents.
+        Returns:
+            Optional[str]: Error message, or None if the document did not fail.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT error FROM documents WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_complete(self, content_hash: str) -> bool:
+        """
+        Checks whether the document went through all ingestion stages.
+        Args:
+            content_hash (str): Hash of the document contents.
+        Returns:
+            bool: True if the document was fully ingested.
+        """
+        return self.get_stage(content_hash) == INGESTION_STAGES[-1]
+
+    def next_stage(self, content_hash: str) -> Optional[str]:
+        """
+        Returns the stage the document should resume from.
+        Args:
+            content_hash (str): Hash of the document contents.
+        Returns:
+            Optional[str]: Next stage to run, or None if the document was fully ingested.
+        """
+        stage = self.get_stage(content_hash)
+        if stage is None:
+            return INGESTION_STAGES[0]
+        index = INGESTION_STAGES.index(stage) + 1
+        return INGESTION_STAGES[index] if index < len(INGESTION_STAGES) else None
+
+    def mark_stage(self, content_hash: str, source_path: str, stage: str) -> None:
+        """
+        Records that the document completed a stage and clears any previous error.
+        Args:
+            content_hash (str): Hash of the document contents.
+            source_path (str): Path of the source file.
+            stage (str): Completed stage, one of INGESTION_STAGES.
+        Raises:
+            ValueError: If the stage is unknown.
+        """
+        if stage not in INGESTION_STAGES:
+            raise ValueError(f"Unknown ingestion stage: {stage}")
+        self._upsert(content_hash, source_path, stage, None)
+
+    def mark_failed(self, content_hash: str, source_path: str, error: str) -> None:
+        """
+        Records that a stage of the document failed, keeping its last completed stage.
+        Args:
+            content_hash (str): Hash of the document contents.
+            source_path (str): Path of the source file.
+            error (str): Description of the failure.
+        """
+        self._upsert(content_hash, source_path, self.get_stage(content_hash), error)
+
+    def count_by_stage(self) -> dict[Optional[str], int]:
+        """
+        Counts the documents by their last completed stage.
+        Returns:
+            dict[Optional[str], int]: Number of documents for each stage (None for not started).
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT stage, COUNT(*) FROM documents GROUP BY stage"
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def _upsert(self, content_hash: str, source_path: str, stage: Optional[str], error: Optional[str]) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                INSERT INTO documents (content_hash, source_path, stage, error, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(content_hash) DO UPDATE SET
+                    source_path = excluded.source_path,
+                    stage = excluded.stage,
+                    error = excluded.error,
+                    updated_at = excluded.updated_at
+                """,
+                (content_hash, source_path, stage, error, time.time()),
+            )
@@ -0,0 +1,235 @@
+import re
+from bisect import bisect_right
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+
+from langchain_core.documents import Document
+from langchain_text_splitters import TextSplitter
+
+from src.config import STREAMING_MAX_SECTION_BUFFER_SIZE
+
+PAGE_SEPARATOR_PATTERN = re.compile(r"\s*\{(\d+)\}-{48}\s*")
+"""Page separator inserted by Marker's `paginate_output` before each page."""
+
+HEADING_PATTERN = re.compile(r"(#{1,6})[ \t]+(.+?)[ \t#]*$")
+
+FENCE_PATTERN = re.compile(r"(```|~~~)")
+
+SECTION_PATH_SEPARATOR = " > "
+
+
+class Heading(NamedTuple):
+    """Markdown heading found in a text."""
+
+    start: int
+    level: int
+    title: str
+
+
+def strip_page_separators(text: str) -> tuple[str, list[tuple[int, int]]]:
+    """
+    Removes Marker page separators from a text and records where each page starts.
+    Args:
+        text (str): Markdown with optional page separators.
+    Returns:
+        tuple[str, list[tuple[int, int]]]: Text without separators (and without surrounding whitespace),
+            and (offset, page) pairs marking where each page starts in it.
+    """
+    parts = []
+    page_starts = []
+    length = 0
+    position = 0
+    for match in PAGE_SEPARATOR_PATTERN.finditer(text):
+        part = text[position : match.start()].strip()
+        if part:
+            if parts:
+                length += 2
+            parts.append(part)
+            length += len(part)
+        page_starts.append((length + 2 if parts else 0, int(match.group(1))))
+        position = match.end()
+
+    part = text[position:].strip()
+    if part:
+        if parts:
+            length += 2
+        parts.append(part)
+    return "\n\n".join(parts), page_starts
+
+
+def join_pages(texts: Iterable[str]) -> str:
+    """
+    Joins consecutive pieces of extracted markdown the same way `MarkdownSectionChunker` does,
+    so that the chunk offsets point into the returned text.
+    Args:
+        texts (Iterable[str]): Consecutive pieces (e.g. pages) of the markdown.
+    Returns:
+        str: Markdown without page separators.
+    """
+    return "\n\n".join(clean_text for clean_text, _ in map(strip_page_separators, texts) if clean_text)
+
+
+def make_section_filter(section: str) -> Callable[[dict], bool]:
+    """
+    Builds a metadata filter matching the chunks of a section and of its subsections.
+    Args:
+        section (str): Section path, as stored in the "section" metadata of the chunks.
+    Returns:
+        Callable[[dict], bool]: Filter accepted by `FAISS.similarity_search`.
+    """
+    subsection_prefix = f"{section}{SECTION_PATH_SEPARATOR}"
+
+    def section_filter(metadata: dict) -> bool:
+        chunk_section = metadata.get("section", "")
+        return chunk_section == section or chunk_section.startswith(subsection_prefix)
+
+    return section_filter
+
+
+def find_headings(text: str) -> list[Heading]:
+    """
+    Finds the markdown headings of a text, skipping fenced code blocks.
+    Args:
+        text (str): Markdown text.
+    Returns:
+        list[Heading]: Headings in the order they appear.
+    """
+    return _scan_headings(text, in_fence=False)[0]
+
+
+def _scan_headings(text: str, in_fence: bool) -> tuple[list[Heading], bool]:
+    # Also takes and returns whether the text is inside a fenced code block, so a text
+    # can be scanned piece by piece as long as every piece ends at a line break.
+    headings = []
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        stripped = line.strip()
+        if FENCE_PATTERN.match(stripped):
+            in_fence = not in_fence
+        elif not in_fence and (match := HEADING_PATTERN.match(stripped)):
+            headings.append(Heading(offset, len(match.group(1)), match.group(2)))
+        offset += len(line)
+    return headings, in_fence
+
+
+class MarkdownSectionChunker:
+    """
+    Chunker that splits markdown along its heading hierarchy.
+    Each section is split on its own, so chunks never cross section
+    boundaries. Every chunk carries the path of headings it belongs to, the
+    page it starts on and its character offsets in the joined text.
+    """
+
+    def __init__(self, text_splitter: TextSplitter, max_buffer_size: int = STREAMING_MAX_SECTION_BUFFER_SIZE):
+        """
+        Initializes the markdown section chunker.
+        Args:
+            text_splitter (TextSplitter): Splitter used for the text of each section.
+            max_buffer_size (int): Number of characters of an open section held back when splitting
+                a stream, beyond which its complete chunks are emitted.
+        """
+        self.text_splitter = text_splitter
+        self.max_buffer_size = max_buffer_size
+
+    def split_documents(self, text: str) -> list[Document]:
+        """
+        Splits markdown into chunks with section metadata.
+        Args:
+            text (str): Markdown text, optionally with Marker page separators.
+        Returns:
+            list[Document]: Chunks with "section", "page", "start_index" and "end_index" metadata.
+        """
+        return list(self.split_document_stream([text]))
+
+    def split_document_stream(self, texts: Iterable[str]) -> Iterator[Document]:
+        """
+        Splits markdown that arrives in consecutive pieces (e.g. pages) into chunks with section metadata.
+        Only the section that is still open at the end of the received text is
+        held back, and only newly received text is scanned for headings. Once the
+        open section exceeds `max_buffer_size` characters, all its chunks but the
+        last are emitted and the rest of the section is split on its own later.
+        Offsets refer to the text returned by `join_pages`.
+        Args:
+            texts (Iterable[str]): Consecutive pieces of the markdown.
+        Yields:
+            Document: Chunks with "section", "page", "start_index" and "end_index" metadata, in document order.
+        """
+        buffer = ""
+        buffer_start = 0
+        page_starts: list[tuple[int, int]] = []
+        heading_stack: list[tuple[int, str]] = []
+        in_fence = False
+
+        for text in texts:
+            clean_text, text_page_starts = strip_page_separators(text)
+            prefix = "\n\n" if buffer or buffer_start else ""
+            offset = buffer_start + len(buffer) + len(prefix)
+            page_starts.extend((offset + page_offset, page) for page_offset, page in text_page_starts)
+            if not clean_text:
+                continue
+            appended_at = len(buffer)
+            buffer = f"{buffer}{prefix}{clean_text}"
+            # Pieces are joined with blank lines, so the new text starts on a line of its own.
+            headings, in_fence = _scan_headings(buffer[appended_at:], in_fence)
+
+            consumed = 0
+            for heading in headings:
+                heading_start = appended_at + heading.start
+                if heading_start > consumed:
+                    yield from self._split_section(
+                        buffer[consumed:heading_start], buffer_start + consumed, heading_stack, page_starts
+                    )
+                    consumed = heading_start
+                heading_stack = [(level, title) for level, title in heading_stack if level < heading.level]
+                heading_stack.append((heading.level, heading.title))
+
+            if len(buffer) - consumed > self.max_buffer_size:
+                # The last chunk may still grow with the next piece, so it stays in the buffer.
+                chunks = list(
+                    self._split_section(buffer[consumed:], buffer_start + consumed, heading_stack, page_starts)
+                )
+                if len(chunks) > 1:
+                    yield from chunks[:-1]
+                    consumed = chunks[-1].metadata["start_index"] - buffer_start
+            buffer_start += consumed
+            buffer = buffer[consumed:]
+
+        if buffer:
+            yield from self._split_section(buffer, buffer_start, heading_stack, page_starts)
+
+    def _split_section(
+        self,
+        section_text: str,
+        section_start: int,
+        heading_stack: list[tuple[int, str]],
+        page_starts: list[tuple[int, int]],
+    ) -> Iterator[Document]:
+        stripped_section_text = section_text.strip()
+        if "\n" not in stripped_section_text and HEADING_PATTERN.match(stripped_section_text):
+            return
+
+        section = SECTION_PATH_SEPARATOR.join(title for _, title in heading_stack)
+        page_offsets = [offset for offset, _ in page_starts]
+        search_start = 0
+        for chunk in self.text_splitter.split_text(section_text):
+            chunk_start = section_text.find(chunk, search_start)
+            if chunk_start < 0:
+                chunk_start = search_start
+            search_start = chunk_start + 1
+
+            start_index = section_start + chunk_start
+            yield Document(
+                page_content=chunk,
+                metadata={
+                    "section": section,
+                    "page": self._find_page(start_index, page_offsets, page_starts),
+                    "start_index": start_index,
+                    "end_index": start_index + len(chunk),
+                },
+            )
+
+    @staticmethod
+    def _find_page(
+        offset: int, page_offsets: list[int], page_starts: list[tuple[int, int]]
+    ) -> Optional[int]:
+        index = bisect_right(page_offsets, offset) - 1
+        return page_starts[index][1] if index >= 0 else None
@@ -0,0 +1,158 @@
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, Optional
+
+from marker.converters.pdf import PdfConverter
+from marker.models import create_model_dict
+from marker.output import text_from_rendered
+
+from src.config import DEFAULT_EXTRACTION_PROFILE, EXTRACTION_PAGES_PER_SHARD, EXTRACTION_WORKERS
+from src.core.data_processing.text_extractor import (
+    build_converter,
+    cache_converter,
+    count_pdf_pages,
+    get_extraction_profile,
+    split_page_ranges,
+)
+from src.core.exceptions import TextExtractionError
+from src.core.utils.singleton_meta import SingletonMeta
+
+_worker_artifact_dict: Optional[dict] = None
+_worker_converters: OrderedDict[tuple[str, str], PdfConverter] = OrderedDict()
+
+
+def _initialize_worker() -> None:
+    """Loads the Marker models once per worker process."""
+    global _worker_artifact_dict
+    _worker_artifact_dict = create_model_dict()
+
+
+def _extract_page_range(file_path: str, first_page: int, last_page: int, profile: str) -> str:
+    """
+    Converts a range of pages of a PDF file in a worker process.
+    The converters of recently converted ranges are kept by each worker and reused.
+    Args:
+        file_path (str): Path to the PDF file.
+        first_page (int): Index of the first page to convert (0-based, inclusive).
+        last_page (int): Index of the last page to convert (0-based, inclusive).
+        profile (str): Name of the extraction profile.
+    Returns:
+        str: Markdown extracted from the page range.
+    """
+    page_range = f"{first_page}-{last_page}"
+    converter = _worker_converters.get((profile, page_range))
+    if converter is None:
+        converter = build_converter(_worker_artifact_dict, profile, page_range=page_range)
+    cache_converter(_worker_converters, (profile, page_range), converter)
+    text, _, _ = text_from_rendered(converter(file_path))
+    return text
+
+
+class ParallelMarkerTextExtractor(metaclass=SingletonMeta):
+    """
+    Singleton class to manage a pool of Marker worker processes.
+    Each worker loads its own copy of the Marker models, PDF files are split
+    into page ranges that are converted concurrently, and the resulting
+    markdown is stitched back together in page order.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = EXTRACTION_WORKERS,
+        pages_per_shard: int = EXTRACTION_PAGES_PER_SHARD,
+    ):
+        """
+        Initializes the worker pool.
+        Args:
+            max_workers (int): Number of worker processes.
+            pages_per_shard (int): Number of pages converted by a worker in one task.
+        """
+        self.max_workers = max_workers
+        self.pages_per_shard = pages_per_shard
+        self.executor = self._initialize_executor()
+
+    def _initialize_executor(self) -> ProcessPoolExecutor:
+        """
+        Initializes the process pool. Workers are started with the "spawn"
+        method so that they do not inherit the parent's torch state.
+        Returns:
+            ProcessPoolExecutor: Pool of Marker worker processes.
+        """
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_worker,
+        )
+
+    def extract_text_from_pdf_file(self, file_path: str, profile: str = DEFAULT_EXTRACTION_PROFILE) -> str:
+        """
+        Extracts text from a PDF file by converting its page ranges in parallel.
+        Args:
+            file_path (str): Path to the PDF file.
+            profile (str): Name of the extraction profile.
+        Returns:
+            str: Extracted text from the PDF file.
+        Raises:
+            TextExtractionError: If there is an error during text extraction.
+        """
+        return "\n\n".join(self.iter_text_from_pdf_file(file_path, profile))
+
+    def iter_text_from_pdf_file(self, file_path: str, profile: str = DEFAULT_EXTRACTION_PROFILE) -> Iterator[str]:
+        """
+        Submits all page ranges of a PDF file to the pool and yields their
+        markdown in page order as soon as each range is converted.
+        Args:
+            file_path (str): Path to the PDF file.
+            profile (str): Name of the extraction profile.
+        Yields:
+            str: Extracted text of consecutive page ranges, in page order.
+        Raises:
+            TextExtractionError: If there is an error during text extraction.
+        """
+        if not os.path.exists(file_path):
+            raise TextExtractionError(f"PDF file not found at: {file_path}")
+        get_extraction_profile(profile)
+
+        try:
+            futures = [
+                self.executor.submit(_extract_page_range, file_path, first_page, last_page, profile)
+                for first_page, last_page in split_page_ranges(count_pdf_pages(file_path), self.pages_per_shard)
+            ]
+            for future in futures:
+                yield future.result()
+        except Exception as e:
+            raise self._wrap_error(file_path, e) from e
+
+    def extract_text_from_pdf_pages(
+        self, file_path: str, first_page: int, last_page: int, profile: str = DEFAULT_EXTRACTION_PROFILE
+    ) -> str:
+        """
+        Extracts text from a range of pages of a PDF file in one of the workers.
+        Args:
+            file_path (str): Path to the PDF file.
+            first_page (int): Index of the first page to convert (0-based, inclusive).
+            last_page (int): Index of the last page to convert (0-based, inclusive).
+            profile (str): Name of the extraction profile.
+        Returns:
+            str: Extracted text from the page range.
+        Raises:
+            TextExtractionError: If there is an error during text extraction.
+        """
+        if not os.path.exists(file_path):
+            raise TextExtractionError(f"PDF file not found at: {file_path}")
+        get_extraction_profile(profile)
+
+        try:
+            return self.executor.submit(_extract_page_range, file_path, first_page, last_page, profile).result()
+        except Exception as e:
+            raise self._wrap_error(file_path, e) from e
+
+    def _wrap_error(self, file_path: str, error: Exception) -> TextExtractionError:
+        if isinstance(error, BrokenProcessPool):
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self._initialize_executor()
+            return TextExtractionError(f"Marker worker pool crashed during PDF extraction for {file_path}: {error}")
+        return TextExtractionError(f"Error during Marker PDF extraction for {file_path}: {error}")
@@ -1,43 +1,260 @@
 import os
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import Lock
+from typing import BinaryIO, Iterator, Optional, Union
 
+import pypdfium2 as pdfium
 from marker.config.parser import ConfigParser
 from marker.converters.pdf import PdfConverter
 from marker.models import create_model_dict
 from marker.output import text_from_rendered
 
+from src.config import DEFAULT_EXTRACTION_PROFILE, EXTRACTION_CONVERTER_CACHE_SIZE, STREAMING_PAGES_PER_STEP
 from src.core.exceptions import TextExtractionError
-from src.core.utils.singleton_meta import SingletonMeta
+from src.core.utils.model_registry import ModelRegistryMeta, estimate_module_bytes
 
+MARKER_CONFIG = {
+    "disable_image_extraction": True,
+    "disable_links": True,
+    "paginate_output": True,
+}
 
-class MarkerTextExtractor(metaclass=SingletonMeta):
+PAGE_SEPARATOR = "-" * 48
+"""Separator Marker puts after the page number when `paginate_output` is enabled."""
+
+EXTRACTION_PROFILES = {
+    "fast": {
+        "config": {"disable_ocr": True},
+        "disabled_processors": [
+            "CodeProcessor",
+            "DebugProcessor",
+            "DocumentTOCProcessor",
+            "EquationProcessor",
+            "TableProcessor",
+        ],
+    },
+    "balanced": {
+        "config": {},
+        "disabled_processors": ["DebugProcessor", "TableProcessor"],
+    },
+    "full": {
+        "config": {},
+        "disabled_processors": None,
+    },
+}
+"""
+Marker settings of each extraction profile. Profiles override MARKER_CONFIG
+with their "config" and drop their "disabled_processors" (as well as the LLM
+processors, which need `use_llm`) from Marker's default processor list.
+A profile without disabled processors runs Marker's full default pipeline.
+"""
+
+PdfData = Union[bytes, bytearray, memoryview, BinaryIO]
+
+
+def as_pdf_buffer(data: PdfData) -> Union[bytes, bytearray, memoryview]:
+    """
+    Returns the contents of an in-memory PDF without copying them when possible.
+    Args:
+        data (PdfData): PDF contents as bytes or a binary buffer (e.g. BytesIO).
+    Returns:
+        Union[bytes, bytearray, memoryview]: Object exposing the PDF bytes through the buffer protocol.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return data
+    if hasattr(data, "getbuffer"):
+        return data.getbuffer()
+    data.seek(0)
+    return data.read()
+
+
+@contextmanager
+def in_memory_pdf_path(data: PdfData) -> Iterator[str]:
+    """
+    Exposes an in-memory PDF under a file path, as required by Marker.
+    On Linux the bytes are written to an anonymous RAM-backed file (memfd),
+    so they never touch the disk. The path is also readable from child
+    processes. Elsewhere a temporary file is used.
+    Args:
+        data (PdfData): PDF contents as bytes or a binary buffer (e.g. BytesIO).
+    Yields:
+        str: Path under which the PDF can be opened while the context is active.
+    """
+    buffer = as_pdf_buffer(data)
+    if hasattr(os, "memfd_create"):
+        fd = os.memfd_create("pdf")
+        try:
+            with open(fd, "wb", closefd=False) as f:
+                f.write(buffer)
+            yield f"/proc/{os.getpid()}/fd/{fd}"
+        finally:
+            os.close(fd)
+    else:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+            tmp_file.write(buffer)
+        try:
+            yield tmp_file.name
+        finally:
+            os.remove(tmp_file.name)
+
+
+def format_page_separator(page: int) -> str:
+    """
+    Formats the separator that precedes a page in paginated Marker output.
+    Args:
+        page (int): Index of the page (0-based).
+    Returns:
+        str: Page separator.
+    """
+    return f"\n\n{{{page}}}{PAGE_SEPARATOR}\n\n"
+
+
+def get_extraction_profile(profile: str) -> dict:
+    """
+    Returns the settings of an extraction profile.
+    Args:
+        profile (str): Name of the extraction profile.
+    Returns:
+        dict: Settings of the extraction profile.
+    Raises:
+        TextExtractionError: If the profile does not exist.
+    """
+    if profile not in EXTRACTION_PROFILES:
+        raise TextExtractionError(
+            f"Unsupported extraction profile: {profile}. Supported profiles are: {', '.join(EXTRACTION_PROFILES)}."
+        )
+    return EXTRACTION_PROFILES[profile]
+
+
+def build_converter(artifact_dict: dict, profile: str, page_range: Optional[str] = None) -> PdfConverter:
+    """
+    Builds a Marker PDF converter for an extraction profile on top of already loaded models.
+    Args:
+        artifact_dict (dict): Loaded Marker models, as returned by `create_model_dict`.
+        profile (str): Name of the extraction profile.
+        page_range (Optional[str]): Pages to convert (e.g. "0-3"). Converts all pages if None.
+    Returns:
+        PdfConverter: Marker PDF converter for the profile.
+    Raises:
+        TextExtractionError: If the profile does not exist.
+    """
+    settings = get_extraction_profile(profile)
+    config = {**MARKER_CONFIG, **settings["config"]}
+    if page_range is not None:
+        config["page_range"] = page_range
+
+    converter_kwargs = {
+        "artifact_dict": artifact_dict,
+        "config": ConfigParser(config).generate_config_dict(),
+    }
+    if settings["disabled_processors"] is not None:
+        converter_kwargs["processor_list"] = [
+            f"{processor.__module__}.{processor.__name__}"
+            for processor in PdfConverter.default_processors
+            if processor.__name__ not in settings["disabled_processors"] and not processor.__name__.startswith("LLM")
+        ]
+    return PdfConverter(**converter_kwargs)
+
+
+def count_pdf_pages(file_path: str) -> int:
+    """
+    Counts the pages of a PDF file without loading any models.
+    Args:
+        file_path (str): Path to the PDF file.
+    Returns:
+        int: Number of pages in the PDF file.
+    """
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def cache_converter(
+    converters: OrderedDict[tuple[str, Optional[str]], PdfConverter],
+    key: tuple[str, Optional[str]],
+    converter: PdfConverter,
+) -> None:
+    """
+    Stores a converter as the most recently used one, dropping the least recently used
+    converters beyond `EXTRACTION_CONVERTER_CACHE_SIZE`. Converters are keyed by page range,
+    so without a bound every distinct range of every document would keep one alive.
+    Args:
+        converters (OrderedDict[tuple[str, Optional[str]], PdfConverter]): Cached converters by profile
+            and page range, least recently used first.
+        key (tuple[str, Optional[str]]): Profile and page range of the converter.
+        converter (PdfConverter): Converter to store.
+    """
+    converters[key] = converter
+    converters.move_to_end(key)
+    while len(converters) > EXTRACTION_CONVERTER_CACHE_SIZE:
+        converters.popitem(last=False)
+
+
+def split_page_ranges(page_count: int, pages_per_shard: int) -> list[tuple[int, int]]:
+    """
+    Splits the pages of a document into consecutive shards.
+    Args:
+        page_count (int): Number of pages in the document.
+        pages_per_shard (int): Maximum number of pages in a single shard.
+    Returns:
+        list[tuple[int, int]]: Inclusive (first_page, last_page) pairs in page order.
     """
-    Singleton class to manage the Marker PDF converter.
-    This class ensures that the converter is only initialized once,
-    even if called from multiple threads.
+    return [
+        (first_page, min(first_page + pages_per_shard, page_count) - 1)
+        for first_page in range(0, page_count, pages_per_shard)
+    ]
+
+
+class MarkerTextExtractor(metaclass=ModelRegistryMeta):
+    """
+    Registry-managed class to manage the Marker PDF converters.
+    This class ensures that the models are only loaded once per device,
+    even if called from multiple threads, and that unused models can be
+    evicted by the registry. A converter is built for each extraction profile
+    and page range on first use, and the least recently used converters are
+    dropped once `EXTRACTION_CONVERTER_CACHE_SIZE` are cached.
     """
 
-    def __init__(self):
+    def __init__(self, device: Optional[str] = None):
+        """
+        Loads the Marker models.
+        Args:
+            device (Optional[str]): Device to run the models on. Marker picks the device if None.
+        Raises:
+            TextExtractionError: If there is an error during converter initialization.
+        """
+        self.device = device
+        self._converters: OrderedDict[tuple[str, Optional[str]], PdfConverter] = OrderedDict()
+        self._converters_lock = Lock()
         self.converter = self._initialize_converter()
 
+    def memory_footprint(self) -> int:
+        """
+        Estimates the memory held by the Marker models.
+        Returns:
+            int: Estimated size in bytes.
+        """
+        return estimate_module_bytes(*self.artifact_dict.values())
+
+    def _create_model_dict(self) -> dict:
+        return create_model_dict(device=self.device) if self.device else create_model_dict()
+
     def _initialize_converter(self) -> PdfConverter:
         """
-        Initializes the Marker PDF converter.
+        Loads the Marker models and initializes the converter of the default profile.
         Returns:
             PdfConverter: Initialized Marker PDF converter.
         Raises:
             TextExtractionError: If there is an error during converter initialization.
         """
         try:
-            config = {
-                "disable_image_extraction": True,
-                "disable_links": True,
-            }
-            config_parser = ConfigParser(config)
-
-            converter = converter = PdfConverter(
-                artifact_dict=create_model_dict(),
-                config=config_parser.generate_config_dict(),
-            )
+            self.artifact_dict = self._create_model_dict()
+            converter = build_converter(self.artifact_dict, DEFAULT_EXTRACTION_PROFILE)
+            self._converters[(DEFAULT_EXTRACTION_PROFILE, None)] = converter
 
             return converter
         except Exception as e:
@@ -45,11 +262,39 @@ class MarkerTextExtractor(metaclass=SingletonMeta):
                 f"Failed to initialize Marker PDF converter: {e}"
             ) from e
 
-    def extract_text_from_pdf_file(self, file_path: str) -> str:
+    def get_converter(
+        self, profile: str = DEFAULT_EXTRACTION_PROFILE, page_range: Optional[str] = None
+    ) -> PdfConverter:
+        """
+        Returns the cached converter of an extraction profile and page range, building it on first use.
+        Args:
+            profile (str): Name of the extraction profile.
+            page_range (Optional[str]): Pages to convert (e.g. "0-3"). Converts all pages if None.
+        Returns:
+            PdfConverter: Marker PDF converter for the profile and page range.
+        Raises:
+            TextExtractionError: If the profile does not exist or its converter cannot be built.
+        """
+        key = (profile, page_range)
+        with self._converters_lock:
+            converter = self._converters.get(key)
+            if converter is None:
+                get_extraction_profile(profile)
+                try:
+                    converter = build_converter(self.artifact_dict, profile, page_range)
+                except Exception as e:
+                    raise TextExtractionError(
+                        f"Failed to initialize Marker PDF converter for profile {profile}: {e}"
+                    ) from e
+            cache_converter(self._converters, key, converter)
+            return converter
+
+    def extract_text_from_pdf_file(self, file_path: str, profile: str = DEFAULT_EXTRACTION_PROFILE) -> str:
         """
         Extracts text from a PDF file using the Marker PDF converter.
         Args:
             file_path (str): Path to the PDF file.
+            profile (str): Name of the extraction profile.
         Returns:
             str: Extracted text from the PDF file.
         Raises:
@@ -58,11 +303,89 @@ class MarkerTextExtractor(metaclass=SingletonMeta):
         if not os.path.exists(file_path):
             raise TextExtractionError(f"PDF file not found at: {file_path}")
 
+        converter = self.get_converter(profile)
         try:
-            rendered = self.converter(file_path)
+            rendered = converter(file_path)
             text, _, _ = text_from_rendered(rendered)
             return text
         except Exception as e:
             raise TextExtractionError(
                 f"Error during Marker PDF extraction for {file_path}: {e}"
             ) from e
+
+    def extract_text_from_bytes(self, data: PdfData, profile: str = DEFAULT_EXTRACTION_PROFILE) -> str:
+        """
+        Extracts text from an in-memory PDF using the Marker PDF converter.
+        Args:
+            data (PdfData): PDF contents as bytes or a binary buffer (e.g. BytesIO).
+            profile (str): Name of the extraction profile.
+        Returns:
+            str: Extracted text from the PDF.
+        Raises:
+            TextExtractionError: If there is an error during text extraction.
+        """
+        converter = self.get_converter(profile)
+        try:
+            with in_memory_pdf_path(data) as file_path:
+                rendered = converter(file_path)
+            text, _, _ = text_from_rendered(rendered)
+            return text
+        except Exception as e:
+            raise TextExtractionError(
+                f"Error during Marker PDF extraction from bytes: {e}"
+            ) from e
+
+    def extract_text_from_pdf_pages(
+        self, file_path: str, first_page: int, last_page: int, profile: str = DEFAULT_EXTRACTION_PROFILE
+    ) -> str:
+        """
+        Extracts text from a range of pages of a PDF file.
+        The converter of each range is built once on top of the already loaded
+        Marker models and reused, since streaming visits the same ranges for every file.
+        Args:
+            file_path (str): Path to the PDF file.
+            first_page (int): Index of the first page to convert (0-based, inclusive).
+            last_page (int): Index of the last page to convert (0-based, inclusive).
+            profile (str): Name of the extraction profile.
+        Returns:
+            str: Extracted text from the page range.
+        Raises:
+            TextExtractionError: If there is an error during text extraction.
+        """
+        converter = self.get_converter(profile, f"{first_page}-{last_page}")
+        try:
+            text, _, _ = text_from_rendered(converter(file_path))
+            return text
+        except Exception as e:
+            raise TextExtractionError(
+                f"Error during Marker PDF extraction for {file_path} (pages {first_page}-{last_page}): {e}"
+            ) from e
+
+    def iter_text_from_pdf_file(
+        self,
+        file_path: str,
+        profile: str = DEFAULT_EXTRACTION_PROFILE,
+        pages_per_step: int = STREAMING_PAGES_PER_STEP,
+    ) -> Iterator[str]:
+        """
+        Extracts text from a PDF file, yielding the markdown of each page range
+        as soon as it is converted.
+        Args:
+            file_path (str): Path to the PDF file.
+            profile (str): Name of the extraction profile.
+            pages_per_step (int): Number of pages converted before yielding.
+        Yields:
+            str: Extracted text of consecutive page ranges, in page order.
+        Raises:
+            TextExtractionError: If there is an error during text extraction.
+        """
+        if not os.path.exists(file_path):
+            raise TextExtractionError(f"PDF file not found at: {file_path}")
+
+        try:
+            page_count = count_pdf_pages(file_path)
+        except Exception as e:
+            raise TextExtractionError(f"Failed to read PDF file {file_path}: {e}") from e
+
+        for first_page, last_page in split_page_ranges(page_count, pages_per_step):
+            yield self.extract_text_from_pdf_pages(file_path, first_page, last_page, profile)
@@ -0,0 +1,138 @@
+import time
+from threading import Lock
+from typing import Sequence
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter, TextSplitter
+from transformers import AutoTokenizer, PreTrainedTokenizerBase
+
+from src.core.data_processing.token_offset_splitter import TokenOffsetTextSplitter
+from src.core.utils.singleton_meta import SingletonMeta
+
+
+class TextSplitterRegistry(metaclass=SingletonMeta):
+    """
+    Process-wide registry of Hugging Face tokenizers and the text splitters built on them.
+    Tokenizers are keyed by model name and splitters by model name, chunk size,
+    chunk overlap, separators and splitter type. Each is loaded once and then shared by all
+    sessions. The splitters only call `tokenizer.tokenize`, which does not
+    change the tokenizer state, so they can be used from several threads.
+    """
+
+    def __init__(self):
+        self._tokenizers: dict[str, PreTrainedTokenizerBase] = {}
+        self._text_splitters: dict[tuple, TextSplitter] = {}
+        self._build_seconds: dict[tuple, float] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def get_tokenizer(self, model_name: str) -> PreTrainedTokenizerBase:
+        """
+        Returns the tokenizer of a model, loading it on first use.
+        Args:
+            model_name (str): Name of the Hugging Face model.
+        Returns:
+            PreTrainedTokenizerBase: Shared tokenizer of the model.
+        """
+        tokenizer = self._tokenizers.get(model_name)
+        if tokenizer is not None:
+            return tokenizer
+
+        with self._lock:
+            if model_name not in self._tokenizers:
+                self._tokenizers[model_name] = AutoTokenizer.from_pretrained(model_name)
+            return self._tokenizers[model_name]
+
+    def get_text_splitter(
+        self,
+        model_name: str,
+        chunk_size: int,
+        chunk_overlap: int,
+        separators: Sequence[str],
+        offset_based: bool = False,
+    ) -> TextSplitter:
+        """
+        Returns a token-based text splitter, building it (and its tokenizer) on first use.
+        Args:
+            model_name (str): Name of the Hugging Face model whose tokenizer measures chunk length.
+            chunk_size (int): Maximum number of tokens in a chunk.
+            chunk_overlap (int): Number of tokens shared by consecutive chunks.
+            separators (Sequence[str]): Separators tried in order when splitting.
+            offset_based (bool): Whether to build a TokenOffsetTextSplitter instead of
+                a RecursiveCharacterTextSplitter.
+        Returns:
+            TextSplitter: Shared text splitter.
+        """
+        key = (model_name, chunk_size, chunk_overlap, tuple(separators), offset_based)
+        text_splitter = self._text_splitters.get(key)
+        if text_splitter is not None:
+            with self._lock:
+                self._record_hit(key)
+            return text_splitter
+
+        with self._lock:
+            if key in self._text_splitters:
+                self._record_hit(key)
+                return self._text_splitters[key]
+
+            start_time = time.perf_counter()
+            if model_name not in self._tokenizers:
+                self._tokenizers[model_name] = AutoTokenizer.from_pretrained(model_name)
+            splitter_factory = (
+                TokenOffsetTextSplitter
+                if offset_based
+                else RecursiveCharacterTextSplitter.from_huggingface_tokenizer
+            )
+            text_splitter = splitter_factory(
+                tokenizer=self._tokenizers[model_name],
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                separators=list(separators),
+            )
+            self._build_seconds[key] = time.perf_counter() - start_time
+            self._text_splitters[key] = text_splitter
+            self.misses += 1
+            return text_splitter
+
+    def get_build_seconds(
+        self,
+        model_name: str,
+        chunk_size: int,
+        chunk_overlap: int,
+        separators: Sequence[str],
+        offset_based: bool = False,
+    ) -> float:
+        """
+        Returns how long building a registered text splitter took, i.e. the setup
+        time saved each time it is reused.
+        Args:
+            model_name (str): Name of the Hugging Face model whose tokenizer measures chunk length.
+            chunk_size (int): Maximum number of tokens in a chunk.
+            chunk_overlap (int): Number of tokens shared by consecutive chunks.
+            separators (Sequence[str]): Separators tried in order when splitting.
+            offset_based (bool): Whether the splitter is a TokenOffsetTextSplitter.
+        Returns:
+            float: Build time in seconds, or 0.0 if the splitter was not built yet.
+        """
+        key = (model_name, chunk_size, chunk_overlap, tuple(separators), offset_based)
+        return self._build_seconds.get(key, 0.0)
+
+    def stats(self) -> dict[str, float]:
+        """
+        Summarizes how often the registered text splitters were reused.
+        Returns:
+            dict[str, float]: Hits, misses, total build time and total setup time saved in seconds.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "build_seconds": sum(self._build_seconds.values()),
+                "saved_seconds": self.saved_seconds,
+            }
+
+    def _record_hit(self, key: tuple) -> None:
+        # Must be called with the lock held.
+        self.hits += 1
+        self.saved_seconds += self._build_seconds[key]
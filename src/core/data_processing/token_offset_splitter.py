@@ -0,0 +1,125 @@
+import re
+from bisect import bisect_left, bisect_right
+from typing import Any, Sequence
+
+from langchain_text_splitters import TextSplitter
+from transformers import PreTrainedTokenizerBase
+
+_BOUNDARY_TOKENS = 4
+"""
+Tokens at chunk boundaries may merge differently when a chunk is tokenized
+on its own, so chunks within this many tokens of the limit are re-counted.
+"""
+
+
+class TokenOffsetTextSplitter(TextSplitter):
+    """
+    Token-aware text splitter that tokenizes the whole text only once.
+    Chunk boundaries are chosen from the character offsets of the tokens,
+    preferring the separators in the given order, so every chunk holds at
+    most `chunk_size` tokens and consecutive chunks share about
+    `chunk_overlap` tokens.
+    """
+
+    def __init__(
+        self,
+        tokenizer: PreTrainedTokenizerBase,
+        separators: Sequence[str] = ("\n\n", "\n", " ", ""),
+        **kwargs: Any,
+    ):
+        """
+        Initializes the token offset text splitter.
+        Args:
+            tokenizer (PreTrainedTokenizerBase): Fast Hugging Face tokenizer measuring chunk length.
+            separators (Sequence[str]): Preferred chunk boundaries, from the most to the least preferred.
+            **kwargs: Arguments of `TextSplitter`, e.g. `chunk_size` and `chunk_overlap`.
+        Raises:
+            ValueError: If the tokenizer cannot return offset mappings.
+        """
+        if not tokenizer.is_fast:
+            raise ValueError("TokenOffsetTextSplitter requires a fast tokenizer with offset mapping support.")
+        super().__init__(length_function=self._count_tokens, **kwargs)
+        self._tokenizer = tokenizer
+        self._separators = [separator for separator in separators if separator]
+
+    def _count_tokens(self, text: str) -> int:
+        return len(self._tokenizer.tokenize(text))
+
+    def split_text(self, text: str) -> list[str]:
+        """
+        Splits the text into chunks of at most `chunk_size` tokens.
+        Args:
+            text (str): The text to be split.
+        Returns:
+            list[str]: List of text chunks.
+        """
+        offsets = self._tokenizer(
+            text,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            return_attention_mask=False,
+            verbose=False,
+        )["offset_mapping"]
+        if not offsets:
+            return []
+
+        token_starts = [start for start, _ in offsets]
+        separator_ends = [
+            [match.end() for match in re.finditer(re.escape(separator), text)] for separator in self._separators
+        ]
+
+        chunks = []
+        first_token = 0
+        token_count = len(offsets)
+        while first_token < token_count:
+            end_token = self._find_end_token(first_token, token_starts, separator_ends)
+            chunk = self._make_chunk(text, offsets, first_token, end_token)
+            while end_token - first_token > 1 and end_token - first_token > self._chunk_size - _BOUNDARY_TOKENS:
+                if self._length_function(chunk) <= self._chunk_size:
+                    break
+                end_token -= 1
+                chunk = self._make_chunk(text, offsets, first_token, end_token)
+            if chunk:
+                chunks.append(chunk)
+            if end_token == token_count:
+                break
+            first_token = self._find_overlap_start(first_token, end_token, text, offsets)
+        return chunks
+
+    def _make_chunk(self, text: str, offsets: list[tuple[int, int]], first_token: int, end_token: int) -> str:
+        chunk = text[offsets[first_token][0] : offsets[end_token - 1][1]]
+        return chunk.strip() if self._strip_whitespace else chunk
+
+    def _find_end_token(self, first_token: int, token_starts: list[int], separator_ends: list[list[int]]) -> int:
+        """
+        Returns the index after the last token of the chunk starting at `first_token`.
+        The chunk ends right after the last occurrence of the most preferred
+        separator that fits, or at the token limit if no separator fits.
+        """
+        max_end_token = min(first_token + self._chunk_size, len(token_starts))
+        if max_end_token == len(token_starts):
+            return max_end_token
+
+        min_end_token = first_token + self._chunk_overlap + 1
+        lowest_position = token_starts[min(min_end_token, max_end_token)]
+        highest_position = token_starts[max_end_token]
+        for ends in separator_ends:
+            index = bisect_right(ends, highest_position) - 1
+            if index < 0 or ends[index] < lowest_position:
+                continue
+            end_token = bisect_left(token_starts, ends[index])
+            if min_end_token <= end_token <= max_end_token:
+                return end_token
+        return max_end_token
+
+    def _find_overlap_start(self, first_token: int, end_token: int, text: str, offsets: list[tuple[int, int]]) -> int:
+        """
+        Returns the first token of the next chunk, about `chunk_overlap` tokens
+        before the end of the current one, moved forward to a word start if possible.
+        """
+        overlap_start = max(end_token - self._chunk_overlap, first_token + 1)
+        for token in range(overlap_start, end_token):
+            start = offsets[token][0]
+            if start == 0 or text[start - 1].isspace():
+                return token
+        return overlap_start
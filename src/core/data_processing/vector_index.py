@@ -0,0 +1,250 @@
+from typing import Optional
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.core.exceptions import VectorStoreError
+from src.core.models.query_embedding_cache import QueryEmbeddingCache
+from src.core.models.query_embeddings import embed_queries
+
+FULL_PRECISION_OPTION = "float32"
+
+INDEX_OPTIONS = {
+    FULL_PRECISION_OPTION: {"factory": "Flat", "dimension": None, "min_training_vectors": None},
+    "float16": {"factory": "SQfp16", "dimension": None, "min_training_vectors": None},
+    "sq8": {"factory": "SQ8", "dimension": None, "min_training_vectors": None},
+    "pca256": {"factory": "PCA256,Flat", "dimension": None, "min_training_vectors": 256},
+    "matryoshka256": {"factory": "Flat", "dimension": 256, "min_training_vectors": None},
+    "matryoshka256-sq8": {"factory": "SQ8", "dimension": 256, "min_training_vectors": None},
+}
+"""
+FAISS index options, from full precision to the most compact. "factory" is a
+`faiss.index_factory` description: SQfp16 stores float16 vectors and SQ8 one
+byte per dimension. "dimension" keeps only the leading dimensions of each
+embedding, which suits Matryoshka-trained models; PCA instead learns the
+projection from the indexed vectors, so it needs at least as many training
+vectors as output dimensions ("min_training_vectors").
+"""
+
+
+def get_index_option(option: str) -> dict:
+    """
+    Returns the settings of a vector index option.
+    Args:
+        option (str): Name of the index option.
+    Returns:
+        dict: Settings of the index option.
+    Raises:
+        VectorStoreError: If the option does not exist.
+    """
+    if option not in INDEX_OPTIONS:
+        raise VectorStoreError(
+            f"Unsupported vector index option: {option}. Supported options are: {', '.join(INDEX_OPTIONS)}."
+        )
+    return INDEX_OPTIONS[option]
+
+
+class TruncatedEmbeddings(Embeddings):
+    """
+    Embeddings that keep only the leading dimensions of another model's
+    embeddings and re-normalize them to unit length (Matryoshka truncation).
+    """
+
+    def __init__(self, embeddings: Embeddings, dimension: int):
+        """
+        Initializes the truncated embeddings.
+        Args:
+            embeddings (Embeddings): Model producing the full embeddings.
+            dimension (int): Number of leading dimensions kept.
+        """
+        self.embeddings = embeddings
+        self.dimension = dimension
+        self.model_name = f"{getattr(embeddings, 'model_name', type(embeddings).__name__)}@dim{dimension}"
+
+    def _truncate(self, vectors: list[list[float]]) -> list[list[float]]:
+        truncated = np.asarray(vectors, dtype=np.float32)[:, : self.dimension]
+        norms = np.linalg.norm(truncated, axis=1, keepdims=True)
+        return (truncated / np.maximum(norms, 1e-12)).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds chunks and truncates their embeddings.
+        Args:
+            texts (list[str]): Chunk texts.
+        Returns:
+            list[list[float]]: Truncated embedding of each chunk.
+        """
+        if not texts:
+            return []
+        return self._truncate(self.embeddings.embed_documents(texts))
+
+    def embed_query(self, text: str) -> list[float]:
+        """
+        Embeds a query and truncates its embedding.
+        Args:
+            text (str): Query text.
+        Returns:
+            list[float]: Truncated embedding of the query.
+        """
+        return self._truncate([self.embeddings.embed_query(text)])[0]
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds queries in one batch and truncates their embeddings.
+        Args:
+            texts (list[str]): Query texts.
+        Returns:
+            list[list[float]]: Truncated embedding of each query.
+        """
+        if not texts:
+            return []
+        return self._truncate(embed_queries(self.embeddings, texts))
+
+
+def get_index_embeddings(embeddings: Embeddings, option: str) -> Embeddings:
+    """
+    Returns the embeddings to index and search with under an index option.
+    Args:
+        embeddings (Embeddings): Embedding model.
+        option (str): Name of the index option.
+    Returns:
+        Embeddings: The model itself, or its truncated embeddings if the option truncates dimensions.
+    Raises:
+        VectorStoreError: If the option does not exist.
+    """
+    dimension = get_index_option(option)["dimension"]
+    return TruncatedEmbeddings(embeddings, dimension) if dimension is not None else embeddings
+
+
+def build_vector_store(
+    embeddings: Embeddings,
+    documents: list[Document],
+    vectors: list[list[float]],
+    option: str,
+    training_vectors: Optional[np.ndarray] = None,
+    fallback_option: Optional[str] = FULL_PRECISION_OPTION,
+) -> FAISS:
+    """
+    Builds a FAISS vector store over precomputed embeddings with the index of an index option.
+    Args:
+        embeddings (Embeddings): Embeddings used for queries, as returned by `get_index_embeddings`.
+        documents (list[Document]): Chunks with metadata.
+        vectors (list[list[float]]): Embedding of each chunk, computed with `embeddings`.
+        option (str): Name of the index option.
+        training_vectors (Optional[np.ndarray]): Vectors that trainable indexes (e.g. PCA) are fitted on,
+            such as the chunks of a whole corpus when a single document has too few. Defaults to `vectors`.
+        fallback_option (Optional[str]): Option built instead when there are fewer training vectors than
+            the option needs, e.g. for short papers under PCA. If None, such an option is rejected.
+    Returns:
+        FAISS: FAISS vector store.
+    Raises:
+        VectorStoreError: If the option does not exist, has too few training vectors and no fallback,
+            or the index cannot be built.
+    """
+    settings = get_index_option(option)
+    if not documents:
+        raise VectorStoreError("Cannot create vector store from empty chunks.")
+    min_training_vectors = settings["min_training_vectors"]
+    training_count = len(vectors) if training_vectors is None else len(training_vectors)
+    if min_training_vectors is not None and training_count < min_training_vectors:
+        if fallback_option is None:
+            raise VectorStoreError(
+                f"Index option {option} needs at least {min_training_vectors} training vectors, got {training_count}."
+            )
+        return build_vector_store(embeddings, documents, vectors, fallback_option)
+    try:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        index = faiss.index_factory(matrix.shape[1], settings["factory"], faiss.METRIC_L2)
+        if not index.is_trained:
+            index.train(matrix if training_vectors is None else np.asarray(training_vectors, dtype=np.float32))
+        vector_store = FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={},
+        )
+        vector_store.add_embeddings(
+            zip([document.page_content for document in documents], vectors),
+            metadatas=[document.metadata for document in documents],
+        )
+        return vector_store
+    except Exception as e:
+        raise VectorStoreError(f"Error during FAISS index creation for option {option}: {e}") from e
+
+
+def batch_similarity_search(
+    vector_store: FAISS,
+    queries: list[str],
+    k: int,
+    query_cache: Optional[QueryEmbeddingCache] = None,
+) -> list[list[tuple[Document, float]]]:
+    """
+    Searches a FAISS vector store for many queries at once. All queries are
+    embedded in one batch and looked up with a single matrix search, instead
+    of one forward pass and one search per query.
+    Args:
+        vector_store (FAISS): FAISS vector store.
+        queries (list[str]): Query texts.
+        k (int): Number of chunks returned per query.
+        query_cache (Optional[QueryEmbeddingCache]): Cache of query embeddings. All queries are embedded if None.
+    Returns:
+        list[list[tuple[Document, float]]]: Nearest chunks and their distances for each query, nearest first.
+    Raises:
+        VectorStoreError: If embedding or searching fails.
+    """
+    if not queries:
+        return []
+    try:
+        if query_cache is not None:
+            embeddings = query_cache.get_query_embeddings(vector_store.embeddings, queries)
+        else:
+            embeddings = embed_queries(vector_store.embeddings, queries)
+        distances, ids = search_by_vectors(vector_store, np.asarray(embeddings, dtype=np.float32), k)
+    except Exception as e:
+        raise VectorStoreError(f"Error during batch similarity search: {e}") from e
+
+    return [
+        [
+            (vector_store.docstore.search(vector_store.index_to_docstore_id[i]), float(distance))
+            for distance, i in zip(query_distances, query_ids)
+            if i >= 0
+        ]
+        for query_distances, query_ids in zip(distances, ids)
+    ]
+
+
+def search_by_vectors(
+    vector_store: FAISS, query_embeddings: np.ndarray, k: int, normalize_L2: bool = False
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Runs a single FAISS search for a matrix of query embeddings.
+    Args:
+        vector_store (FAISS): FAISS vector store.
+        query_embeddings (np.ndarray): Query embeddings, one per row.
+        k (int): Number of chunks returned per query.
+        normalize_L2 (bool): Whether to L2-normalize the queries, for stores created with `normalize_L2=True`.
+            The stores built in this package are not normalized.
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Distances and FAISS ids of the nearest chunks of each query, nearest first.
+            Missing results have id -1.
+    """
+    query_embeddings = np.array(query_embeddings, dtype=np.float32, order="C")
+    if normalize_L2:
+        faiss.normalize_L2(query_embeddings)
+    return vector_store.index.search(query_embeddings, k)
+
+
+def get_index_memory_bytes(vector_store: FAISS) -> int:
+    """
+    Returns the size of a vector store's FAISS index.
+    Args:
+        vector_store (FAISS): FAISS vector store.
+    Returns:
+        int: Size of the serialized index in bytes, which is close to its size in memory.
+    """
+    return int(faiss.serialize_index(vector_store.index).nbytes)
+
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from threading import Lock
+from typing import NamedTuple, Optional, Union
+
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+INDEX_FILE_NAME = "index.faiss"
+DOCSTORE_FILE_NAME = "docstore.json"
+
+
+class CachedVectorStore(NamedTuple):
+    """Vector store of a paper loaded from the cache, with the markdown it was built from."""
+
+    vector_store: FAISS
+    documents: list[Document]
+    text: str
+
+
+class VectorStoreCache:
+    """
+    Content-addressed on-disk cache of per-paper FAISS vector stores.
+    Each entry is a directory holding the FAISS index and a JSON docstore
+    with the chunks and the markdown they were split from. Indexes are loaded
+    read-only through a memory map, so sessions and processes opening the same
+    paper share its vectors through the page cache instead of each holding a
+    copy. Once the total size of the stored entries exceeds the limit, the
+    least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir: str, max_size_bytes: int):
+        """
+        Initializes the vector store cache.
+        Args:
+            cache_dir (str): Directory where the cached vector stores are stored.
+            max_size_bytes (int): Maximum total size of the cached entries in bytes.
+        """
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self._lock = Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(pdf_bytes: Union[bytes, bytearray, memoryview], config: dict) -> str:
+        """
+        Builds the cache key for the given PDF contents and processing config.
+        Args:
+            pdf_bytes (Union[bytes, bytearray, memoryview]): Raw contents of the PDF file.
+            config (dict): Extraction, chunking, embedding and index settings the vector store depends on.
+        Returns:
+            str: Hex digest identifying the cache entry.
+        """
+        digest = hashlib.sha256(pdf_bytes)
+        digest.update(json.dumps(config, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key: str, embeddings: Embeddings) -> Optional[CachedVectorStore]:
+        """
+        Loads the cached vector store for the key and marks the entry as recently used.
+        Args:
+            key (str): Cache key returned by `make_key`.
+            embeddings (Embeddings): Embeddings used to embed queries against the loaded index.
+        Returns:
+            Optional[CachedVectorStore]: Memory-mapped vector store with its chunks in index order
+                and markdown, or None if the entry does not exist or cannot be read.
+        """
+        entry_path = self._entry_path(key)
+        index_path = os.path.join(entry_path, INDEX_FILE_NAME)
+        try:
+            with open(os.path.join(entry_path, DOCSTORE_FILE_NAME), "r", encoding="utf-8") as f:
+                docstore = json.load(f)
+            # IO_FLAG_MMAP only maps inverted lists; IO_FLAG_MMAP_IFC also maps flat and scalar-quantized codes.
+            index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+            os.utime(index_path)
+        except (OSError, RuntimeError, ValueError):
+            return None
+
+        documents = [Document(**document) for document in docstore["documents"]]
+        if index.ntotal != len(documents):
+            return None
+        vector_store = FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=InMemoryDocstore(dict(zip(docstore["ids"], documents))),
+            index_to_docstore_id=dict(enumerate(docstore["ids"])),
+        )
+        return CachedVectorStore(vector_store, documents, docstore["text"])
+
+    def put(self, key: str, vector_store: FAISS, text: str) -> None:
+        """
+        Stores the vector store under the key and evicts old entries if needed.
+        An existing entry for the key is left as it is.
+        Args:
+            key (str): Cache key returned by `make_key`.
+            vector_store (FAISS): Vector store of the paper.
+            text (str): Markdown the chunks of the vector store were split from.
+        """
+        entry_path = self._entry_path(key)
+        if os.path.isdir(entry_path):
+            return
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        ids = [vector_store.index_to_docstore_id[i] for i in range(vector_store.index.ntotal)]
+        documents = [vector_store.docstore.search(doc_id) for doc_id in ids]
+        docstore = {
+            "ids": ids,
+            "documents": [
+                {"page_content": document.page_content, "metadata": document.metadata} for document in documents
+            ],
+            "text": text,
+        }
+
+        tmp_path = tempfile.mkdtemp(dir=os.path.dirname(entry_path), suffix=".tmp")
+        try:
+            faiss.write_index(vector_store.index, os.path.join(tmp_path, INDEX_FILE_NAME))
+            with open(os.path.join(tmp_path, DOCSTORE_FILE_NAME), "w", encoding="utf-8") as f:
+                json.dump(docstore, f)
+            try:
+                os.rename(tmp_path, entry_path)
+            except OSError:
+                # Another process stored the same paper in the meantime.
+                if not os.path.isdir(entry_path):
+                    raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            for prefix in os.listdir(self.cache_dir):
+                prefix_path = os.path.join(self.cache_dir, prefix)
+                if not os.path.isdir(prefix_path):
+                    continue
+                for key in os.listdir(prefix_path):
+                    entry_path = os.path.join(prefix_path, key)
+                    if key.endswith(".tmp"):
+                        continue
+                    try:
+                        last_used = os.stat(os.path.join(entry_path, INDEX_FILE_NAME)).st_mtime
+                        size = sum(os.path.getsize(os.path.join(entry_path, name)) for name in os.listdir(entry_path))
+                    except OSError:
+                        continue
+                    entries.append((last_used, size, entry_path))
+
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, entry_path in sorted(entries):
+                if total_size <= self.max_size_bytes:
+                    break
+                # Open memory maps of an evicted index stay valid until their stores are dropped.
+                shutil.rmtree(entry_path, ignore_errors=True)
+                total_size -= size
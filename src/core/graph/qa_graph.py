@@ -9,7 +9,10 @@ from langgraph.graph import END, START, StateGraph
 from langgraph.graph.state import CompiledStateGraph
 from typing_extensions import List, TypedDict
 
-from src.config import K_RETRIEVED_DOCS
+from src.config import HYBRID_FETCH_K, K_RETRIEVED_DOCS, RRF_K, SECTION_FILTER_FETCH_K
+from src.core.data_processing.bm25_index import BM25Index
+from src.core.data_processing.markdown_chunker import make_section_filter
+from src.core.models.query_embedding_cache import QueryEmbeddingCache
 
 
 class GraphState(TypedDict):
@@ -19,20 +22,72 @@ class GraphState(TypedDict):
     context: List[Document]
     answer: str
     chat_history: Optional[List[BaseMessage]]
+    section: Optional[str]
 
 
-def retrieve(state: GraphState, vector_store: VectorStore, k_retrieved_docs: int = 3) -> GraphState:
+def reciprocal_rank_fusion(rankings: List[List[Document]], k: int = RRF_K) -> List[Document]:
+    """
+    Merges rankings of the same chunks with reciprocal-rank fusion: each chunk
+    scores the sum of 1 / (k + rank) over the rankings it appears in.
+    Args:
+        rankings (List[List[Document]]): Rankings to merge, best first.
+        k (int): Constant damping the weight of the top ranks.
+    Returns:
+        List[Document]: Chunks of all rankings, best fused score first.
+    """
+    scores: dict[tuple, float] = {}
+    documents: dict[tuple, Document] = {}
+    for ranking in rankings:
+        for rank, document in enumerate(ranking, start=1):
+            key = (document.page_content, repr(sorted(document.metadata.items())))
+            scores[key] = scores.get(key, 0.0) + 1 / (k + rank)
+            documents.setdefault(key, document)
+    return [documents[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+def retrieve(
+    state: GraphState,
+    vector_store: VectorStore,
+    k_retrieved_docs: int = 3,
+    query_cache: Optional[QueryEmbeddingCache] = None,
+    keyword_index: Optional[BM25Index] = None,
+) -> GraphState:
     """
     Retrieve relevant documents from the vector store based on the question.
+    If the state names a section, only chunks from that section and its
+    subsections are retrieved. With a keyword index, the nearest chunks and the
+    best BM25 matches are fused with reciprocal-rank fusion, so chunks naming
+    the exact terms of the question rank high without retrieving more of them.
     Args:
         state (GraphState): The current state of the graph.
         vector_store (VectorStore): The vector store to search for documents.
         k_retrieved_docs (int): The number of documents to retrieve.
+        query_cache (Optional[QueryEmbeddingCache]): Cache of question embeddings. The vector store
+            embeds the question itself if None.
+        keyword_index (Optional[BM25Index]): BM25 index over the chunks of the vector store.
+            Only dense similarity is used if None.
     Returns:
         GraphState: The updated state with the retrieved documents.
     """
     question = state["question"]
-    retrieved_docs = vector_store.similarity_search(question, k=k_retrieved_docs)
+    section = state.get("section")
+    section_filter = make_section_filter(section) if section else None
+    fetch_k = max(k_retrieved_docs, HYBRID_FETCH_K) if keyword_index is not None else k_retrieved_docs
+    search_kwargs = {"k": fetch_k}
+    if section_filter is not None:
+        search_kwargs["filter"] = section_filter
+        search_kwargs["fetch_k"] = SECTION_FILTER_FETCH_K
+
+    embeddings = vector_store.embeddings if query_cache is not None else None
+    if embeddings is not None:
+        question_embedding = query_cache.get_query_embedding(embeddings, question)
+        retrieved_docs = vector_store.similarity_search_by_vector(question_embedding, **search_kwargs)
+    else:
+        retrieved_docs = vector_store.similarity_search(question, **search_kwargs)
+
+    if keyword_index is not None:
+        keyword_docs = keyword_index.search(question, fetch_k, section_filter)
+        retrieved_docs = reciprocal_rank_fusion([retrieved_docs, keyword_docs])[:k_retrieved_docs]
     return GraphState(question=question, context=retrieved_docs)
 
 
@@ -83,18 +138,27 @@ Base your answer primarily on the provided context for the current question.""",
     )
 
 
-def build_qa_graph(vector_store: VectorStore, llm: BaseChatModel) -> CompiledStateGraph:
+def build_qa_graph(
+    vector_store: VectorStore,
+    llm: BaseChatModel,
+    query_cache: Optional[QueryEmbeddingCache] = None,
+    keyword_index: Optional[BM25Index] = None,
+) -> CompiledStateGraph:
     """
     Build the Q&A graph using the provided vector store and language model.
     Args:
         vector_store (VectorStore): The vector store for document retrieval.
         llm (BaseChatModel): The language model for answer generation.
+        query_cache (Optional[QueryEmbeddingCache]): Cache of question embeddings used during retrieval.
+        keyword_index (Optional[BM25Index]): BM25 index fused with dense retrieval.
     Returns:
         CompiledStateGraph: The compiled state graph for the Q&A process.
     """
     graph_builder = StateGraph(GraphState)
 
-    graph_builder.add_node("retrieve", lambda state: retrieve(state, vector_store, K_RETRIEVED_DOCS))
+    graph_builder.add_node(
+        "retrieve", lambda state: retrieve(state, vector_store, K_RETRIEVED_DOCS, query_cache, keyword_index)
+    )
     graph_builder.add_node("generate", lambda state: generate(state, llm))
 
     graph_builder.add_edge(START, "retrieve")
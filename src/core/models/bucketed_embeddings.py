@@ -0,0 +1,137 @@
+import time
+from threading import Lock
+
+from langchain_core.embeddings import Embeddings
+from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+
+from src.core.models.query_embeddings import embed_queries, encode_texts
+
+
+def make_length_buckets(token_lengths: list[int], token_budget: int) -> list[list[int]]:
+    """
+    Groups texts of similar length into batches that fit a token budget.
+    Texts are sorted from the longest to the shortest, and a batch is closed
+    once padding all of its texts to the longest one would exceed the budget.
+    Args:
+        token_lengths (list[int]): Number of tokens of each text.
+        token_budget (int): Maximum number of (padded) tokens in a batch.
+    Returns:
+        list[list[int]]: Indices of the texts in each batch.
+    """
+    batches: list[list[int]] = []
+    batch: list[int] = []
+    batch_length = 0
+    for index in sorted(range(len(token_lengths)), key=lambda i: token_lengths[i], reverse=True):
+        if not batch:
+            batch_length = max(token_lengths[index], 1)
+        elif (len(batch) + 1) * batch_length > token_budget:
+            batches.append(batch)
+            batch = []
+            batch_length = max(token_lengths[index], 1)
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class LengthBucketedEmbeddings(Embeddings):
+    """
+    Embeddings that encode chunks in length-sorted batches under a token budget.
+    Similar lengths keep padding low, and the token budget lets short chunks
+    form large batches while long ones form small ones. Embeddings are
+    returned in the original order of the chunks.
+    """
+
+    def __init__(self, embeddings: HuggingFaceEmbeddings, token_budget: int):
+        """
+        Initializes the length-bucketed embeddings.
+        Args:
+            embeddings (HuggingFaceEmbeddings): Sentence Transformers model used for encoding.
+            token_budget (int): Maximum number of padded tokens encoded in one batch.
+        """
+        self.embeddings = embeddings
+        self.token_budget = token_budget
+        self.model_name = embeddings.model_name
+        self._lock = Lock()
+        self.tokens = 0
+        self.padded_tokens = 0
+        self.seconds = 0.0
+
+    def _count_tokens(self, texts: list[str]) -> list[int]:
+        client = self.embeddings._client
+        encoded = client.tokenizer(
+            texts,
+            truncation=True,
+            max_length=client.max_seq_length,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+        )
+        return [len(input_ids) for input_ids in encoded["input_ids"]]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds chunks in length-bucketed batches.
+        Args:
+            texts (list[str]): Chunk texts.
+        Returns:
+            list[list[float]]: Embedding of each chunk, in the order of `texts`.
+        """
+        if not texts:
+            return []
+
+        start_time = time.perf_counter()
+        texts = [text.replace("\n", " ") for text in texts]
+        token_lengths = self._count_tokens(texts)
+        embeddings: list = [None] * len(texts)
+        padded_tokens = 0
+        for batch in make_length_buckets(token_lengths, self.token_budget):
+            # The bucket decides the batch size, so it overrides the configured encode settings.
+            batch_embeddings = encode_texts(
+                self.embeddings,
+                [texts[index] for index in batch],
+                {**self.embeddings.encode_kwargs, "batch_size": len(batch)},
+            )
+            for index, embedding in zip(batch, batch_embeddings):
+                embeddings[index] = embedding.tolist()
+            padded_tokens += len(batch) * max(token_lengths[index] for index in batch)
+
+        with self._lock:
+            self.tokens += sum(token_lengths)
+            self.padded_tokens += padded_tokens
+            self.seconds += time.perf_counter() - start_time
+        return embeddings
+
+    def embed_query(self, text: str) -> list[float]:
+        """
+        Embeds a query with the wrapped model.
+        Args:
+            text (str): Query text.
+        Returns:
+            list[float]: Embedding of the query.
+        """
+        return self.embeddings.embed_query(text)
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds queries with the wrapped model in one batch.
+        Args:
+            texts (list[str]): Query texts.
+        Returns:
+            list[list[float]]: Embedding of each query.
+        """
+        return embed_queries(self.embeddings, texts)
+
+    def stats(self) -> dict[str, float]:
+        """
+        Summarizes the throughput of the chunks embedded so far.
+        Returns:
+            dict[str, float]: Tokens, padded tokens, seconds, tokens per second and padding ratio.
+        """
+        with self._lock:
+            return {
+                "tokens": self.tokens,
+                "padded_tokens": self.padded_tokens,
+                "seconds": self.seconds,
+                "tokens_per_second": self.tokens / self.seconds if self.seconds > 0 else 0.0,
+                "padding_ratio": self.padded_tokens / self.tokens if self.tokens > 0 else 0.0,
+            }
@@ -1,34 +1,115 @@
+from typing import Optional
+
+from langchain_core.embeddings import Embeddings
 from langchain_huggingface.embeddings import HuggingFaceEmbeddings
 
 from src.core.exceptions import EmbeddingError
-from src.core.utils.singleton_meta import SingletonMeta
+from src.core.models.bucketed_embeddings import LengthBucketedEmbeddings
+from src.core.models.embedding_cache import CachedEmbeddings, EmbeddingCache
+from src.core.models.embedding_scheduler import EmbeddingScheduler
+from src.core.models.onnx_export import EMBEDDING_BACKENDS, export_onnx_model, get_onnx_file_name
+from src.core.models.process_pool_embeddings import ProcessPoolEmbeddings
+from src.core.utils.model_registry import ModelRegistryMeta, estimate_module_bytes
 
 
-class EmbeddingModel(metaclass=SingletonMeta):
+class EmbeddingModel(metaclass=ModelRegistryMeta):
     """
-    Singleton class to manage the embedding model.
-    This class ensures that the model is only initialized once,
-    even if called from multiple threads.
+    Registry-managed class to manage the embedding models.
+    This class ensures that each model is only initialized once per
+    configuration (every constructor argument is part of the registry key, so
+    e.g. a pooled or cached variant never gets a plain instance built earlier),
+    even if called from multiple threads, and that unused models can be
+    evicted by the registry. An evicted model keeps working
+    for callers still holding it; its scheduler thread and worker processes
+    stop once the last reference to it is dropped.
     """
 
     def __init__(
-        self, model_name: str = "Alibaba-NLP/gte-multilingual-base", device: str = "cpu"
+        self,
+        model_name: str = "Alibaba-NLP/gte-multilingual-base",
+        device: str = "cpu",
+        cache_dir: Optional[str] = None,
+        token_budget: Optional[int] = None,
+        backend: str = "torch",
+        onnx_dir: str = "data/cache/onnx",
+        batch_window_ms: Optional[float] = None,
+        max_batch_size: int = 256,
+        max_document_batch_size: int = 64,
+        num_workers: Optional[int] = None,
+        threads_per_worker: int = 1,
+        min_shard_size: int = 16,
     ):
         """
         Initializes the embedding model.
         Args:
             model_name (str): Name of the embedding model.
             device (str): Device to run the model on (e.g., "cpu", "cuda").
+            cache_dir (Optional[str]): Directory of the persistent chunk embedding cache. No cache is used if None.
+            token_budget (Optional[int]): Maximum number of padded tokens per batch when chunks are
+                encoded in length-bucketed batches. The model's default batching is used if None.
+            backend (str): Inference backend: "torch", "onnx" (ONNX Runtime) or "onnx-int8"
+                (ONNX Runtime with a dynamically int8-quantized graph).
+            onnx_dir (str): Directory where ONNX exports of the model are stored.
+            batch_window_ms (Optional[float]): Time in milliseconds concurrent requests are collected
+                for to be embedded in one micro-batch. Each request is embedded on its own if None.
+            max_batch_size (int): Maximum number of texts in a micro-batch.
+            max_document_batch_size (int): Maximum number of chunks in a micro-batch, so queries
+                are not held up by large document requests.
+            num_workers (Optional[int]): Number of CPU worker processes, each holding a copy of the model,
+                that large batches of chunks are sharded across. The model runs in this process if None or 0.
+            threads_per_worker (int): Number of torch intra-op threads of each worker process.
+            min_shard_size (int): Minimum number of chunks embedded by a worker process in one task.
+        Raises:
+            ValueError: If the backend is not supported.
         """
+        if backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown embedding backend {backend}. Expected one of: {', '.join(EMBEDDING_BACKENDS)}.")
         self.model_name = model_name
         self.device = device
+        self.cache_dir = cache_dir
+        self.token_budget = token_budget
+        self.backend = backend
+        self.onnx_dir = onnx_dir
+        self.batch_window_ms = batch_window_ms
+        self.max_batch_size = max_batch_size
+        self.max_document_batch_size = max_document_batch_size
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        self.min_shard_size = min_shard_size
+        self.process_pool_model: Optional[ProcessPoolEmbeddings] = None
+        self.huggingface_model: Optional[HuggingFaceEmbeddings] = None
+        self.bucketed_model: Optional[LengthBucketedEmbeddings] = None
+        self.scheduler: Optional[EmbeddingScheduler] = None
         self.model = self._initialize_model()
 
-    def _initialize_model(self) -> HuggingFaceEmbeddings:
+    def memory_footprint(self) -> int:
         """
-        Initializes the embedding model.
+        Estimates the memory held by the model weights, including the copies of the worker processes.
+        Returns:
+            int: Estimated size in bytes.
+        """
+        if self.process_pool_model is not None:
+            return self.process_pool_model.memory_footprint()
+        if self.huggingface_model is None:
+            return 0
+        return estimate_module_bytes(self.huggingface_model._client)
+
+    def get_throughput_stats(self) -> Optional[dict[str, float]]:
+        """
+        Returns the throughput of the chunks encoded in length-bucketed batches so far.
+        Returns:
+            Optional[dict[str, float]]: Tokens, seconds and tokens per second, or None if
+                length-bucketed batching is disabled.
+        """
+        return self.bucketed_model.stats() if self.bucketed_model is not None else None
+
+    def _initialize_model(self) -> Embeddings:
+        """
+        Initializes the embedding model, in this process or in a pool of worker
+        processes, wrapped in length-bucketed batching, cross-session
+        micro-batching and the chunk embedding cache if enabled.
         Returns:
-            HuggingFaceEmbeddings: Initialized embedding model.
+            Embeddings: Initialized embedding model.
         Raises:
             EmbeddingError: If there is an error during model initialization.
         """
@@ -37,9 +118,45 @@ class EmbeddingModel(metaclass=SingletonMeta):
             "trust_remote_code": True,
         }
         try:
-            model = HuggingFaceEmbeddings(
-                model_name=self.model_name, model_kwargs=model_kwargs
-            )
+            model_path = self.model_name
+            if self.backend != "torch":
+                quantized = self.backend == "onnx-int8"
+                model_path = export_onnx_model(self.model_name, self.onnx_dir, quantize=quantized)
+                model_kwargs["backend"] = "onnx"
+                model_kwargs["model_kwargs"] = {"file_name": get_onnx_file_name(quantized)}
+
+            if self.num_workers:
+                self.process_pool_model = ProcessPoolEmbeddings(
+                    model_path,
+                    model_kwargs,
+                    num_workers=self.num_workers,
+                    threads_per_worker=self.threads_per_worker,
+                    min_shard_size=self.min_shard_size,
+                    token_budget=self.token_budget,
+                )
+                model = self.process_pool_model
+            else:
+                self.huggingface_model = HuggingFaceEmbeddings(
+                    model_name=model_path, model_kwargs=model_kwargs
+                )
+                model = self.huggingface_model
+                if self.token_budget is not None:
+                    self.bucketed_model = LengthBucketedEmbeddings(model, self.token_budget)
+                    model = self.bucketed_model
+            if self.batch_window_ms is not None:
+                self.scheduler = EmbeddingScheduler(
+                    model,
+                    batch_window_seconds=self.batch_window_ms / 1000,
+                    max_batch_size=self.max_batch_size,
+                    queries_as_documents=(
+                        self.huggingface_model is not None and not self.huggingface_model.query_encode_kwargs
+                    ),
+                    max_document_batch_size=self.max_document_batch_size,
+                )
+                model = self.scheduler
+            if self.cache_dir is not None:
+                cache_model_name = self.model_name if self.backend == "torch" else f"{self.model_name}@{self.backend}"
+                return CachedEmbeddings(model, EmbeddingCache(self.cache_dir, cache_model_name))
             return model
         except Exception as e:
             raise EmbeddingError(
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import unicodedata
+from threading import Lock
+from typing import Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.core.exceptions import EmbeddingError
+from src.core.models.query_embeddings import embed_queries
+from src.core.utils.file_lock import lock_file
+
+KEY_SIZE = 32
+"""Size in bytes of a chunk key (SHA-256 digest) in the index file."""
+
+
+def normalize_chunk_text(text: str) -> str:
+    """
+    Normalizes chunk text so that chunks differing only in Unicode form or whitespace share a cache entry.
+    Args:
+        text (str): Chunk text.
+    Returns:
+        str: Normalized chunk text.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def make_chunk_key(text: str) -> bytes:
+    """
+    Builds the cache key of a chunk.
+    Args:
+        text (str): Chunk text.
+    Returns:
+        bytes: SHA-256 digest of the normalized chunk text.
+    """
+    return hashlib.sha256(normalize_chunk_text(text).encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """
+    Persistent on-disk cache of chunk embeddings of a single embedding model.
+    Vectors are appended as float32 rows to a flat file that is read through
+    a memory map. The index file holds the key of each row in the same order,
+    and a row only counts as stored once its key is in the index, so an
+    interrupted write never exposes a partial vector. Writers hold an exclusive
+    lock (on POSIX systems) on the cache directory and append after the rows on disk, so several
+    processes (e.g. the web app and the ingest script) can share a cache.
+    """
+
+    def __init__(self, cache_dir: str, model_name: str):
+        """
+        Opens the cache of a model, creating it if it does not exist.
+        Args:
+            cache_dir (str): Root directory of the embedding caches of all models.
+            model_name (str): Name of the embedding model.
+        Raises:
+            EmbeddingError: If the cache on disk is corrupted.
+        """
+        self.model_name = model_name
+        model_key = hashlib.sha256(model_name.encode("utf-8")).hexdigest()[:16]
+        self.cache_dir = os.path.join(cache_dir, model_key)
+        self._meta_path = os.path.join(self.cache_dir, "meta.json")
+        self._index_path = os.path.join(self.cache_dir, "index.bin")
+        self._vectors_path = os.path.join(self.cache_dir, "vectors.f32")
+        self._lock_path = os.path.join(self.cache_dir, "lock")
+        self._lock = Lock()
+        self._rows: dict[bytes, int] = {}
+        self._row_count = 0
+        self._vectors: Optional[np.memmap] = None
+        self.dimension: Optional[int] = None
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _load(self) -> None:
+        # Reads the rows appended since the last load, including those written by other processes.
+        try:
+            if self.dimension is None:
+                if not os.path.exists(self._meta_path):
+                    return
+                with open(self._meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                if meta["model_name"] != self.model_name:
+                    raise ValueError(f"cache belongs to model {meta['model_name']}")
+                self.dimension = meta["dimension"]
+
+            if os.path.exists(self._index_path):
+                with open(self._index_path, "rb") as f:
+                    f.seek(self._row_count * KEY_SIZE)
+                    index = f.read()
+            else:
+                index = b""
+        except (OSError, ValueError, KeyError) as e:
+            raise EmbeddingError(f"Failed to open embedding cache at {self.cache_dir}: {e}") from e
+
+        row_count = self._row_count + len(index) // KEY_SIZE
+        vector_bytes = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        row_count = min(row_count, vector_bytes // (4 * self.dimension))
+        for row in range(self._row_count, row_count):
+            offset = (row - self._row_count) * KEY_SIZE
+            self._rows.setdefault(index[offset : offset + KEY_SIZE], row)
+        self._row_count = max(self._row_count, row_count)
+
+    def _open_vectors(self) -> Optional[np.memmap]:
+        row_count = self._row_count
+        if row_count == 0:
+            return None
+        if self._vectors is None or self._vectors.shape[0] < row_count:
+            self._vectors = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(row_count, self.dimension)
+            )
+        return self._vectors
+
+    def get_many(self, texts: list[str]) -> list[Optional[np.ndarray]]:
+        """
+        Looks up the embeddings of chunks.
+        Args:
+            texts (list[str]): Chunk texts.
+        Returns:
+            list[Optional[np.ndarray]]: Embedding of each chunk, or None if it is not cached.
+        """
+        with self._lock:
+            self._load()
+            rows = [self._rows.get(make_chunk_key(text)) for text in texts]
+            vectors = self._open_vectors()
+            return [None if row is None else np.array(vectors[row]) for row in rows]
+
+    def put_many(self, texts: list[str], embeddings: list[list[float]]) -> None:
+        """
+        Stores the embeddings of chunks, skipping chunks that are already cached.
+        Rows written by other processes are read under the lock first, so new rows
+        are appended after them instead of overwriting them.
+        Args:
+            texts (list[str]): Chunk texts.
+            embeddings (list[list[float]]): Embedding of each chunk.
+        Raises:
+            EmbeddingError: If the embedding dimension does not match the cache.
+        """
+        with self._lock, lock_file(self._lock_path):
+            self._load()
+            keys = {}
+            for text, embedding in zip(texts, embeddings):
+                key = make_chunk_key(text)
+                if key not in self._rows and key not in keys:
+                    keys[key] = embedding
+            if not keys:
+                return
+
+            vectors = np.asarray(list(keys.values()), dtype=np.float32)
+            if self.dimension is None:
+                self.dimension = vectors.shape[1]
+                with open(self._meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"model_name": self.model_name, "dimension": self.dimension}, f)
+            elif vectors.shape[1] != self.dimension:
+                raise EmbeddingError(
+                    f"Embedding dimension {vectors.shape[1]} does not match the cache dimension {self.dimension}."
+                )
+
+            first_row = self._row_count
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(first_row * self.dimension * 4)
+                f.write(vectors.tobytes())
+            with open(self._index_path, "ab") as f:
+                f.truncate(first_row * KEY_SIZE)
+                f.write(b"".join(keys))
+
+            for row, key in enumerate(keys, start=first_row):
+                self._rows[key] = row
+            self._row_count = first_row + len(keys)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings that look chunks up in an EmbeddingCache and only send the
+    missing ones to the wrapped model. Queries are never cached.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache):
+        """
+        Initializes the cached embeddings.
+        Args:
+            embeddings (Embeddings): Model used for chunks missing from the cache.
+            cache (EmbeddingCache): Cache of the model's chunk embeddings.
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_name = cache.model_name
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds chunks, computing only those that are not cached yet.
+        Args:
+            texts (list[str]): Chunk texts.
+        Returns:
+            list[list[float]]: Embedding of each chunk.
+        """
+        cached = self.cache.get_many(texts)
+        missing_texts = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        self.hits += len(texts) - sum(vector is None for vector in cached)
+        self.misses += len(missing_texts)
+
+        computed = {}
+        if missing_texts:
+            missing_embeddings = self.embeddings.embed_documents(missing_texts)
+            self.cache.put_many(missing_texts, missing_embeddings)
+            computed = dict(zip(missing_texts, missing_embeddings))
+
+        return [
+            vector.tolist() if vector is not None else list(computed[text]) for text, vector in zip(texts, cached)
+        ]
+
+    def embed_query(self, text: str) -> list[float]:
+        """
+        Embeds a query with the wrapped model.
+        Args:
+            text (str): Query text.
+        Returns:
+            list[float]: Embedding of the query.
+        """
+        return self.embeddings.embed_query(text)
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds queries with the wrapped model in one batch.
+        Args:
+            texts (list[str]): Query texts.
+        Returns:
+            list[list[float]]: Embedding of each query.
+        """
+        return embed_queries(self.embeddings, texts)
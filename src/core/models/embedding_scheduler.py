@@ -0,0 +1,298 @@
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Future
+from threading import Condition, Lock, Thread
+from typing import NamedTuple, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from src.core.models.query_embeddings import embed_queries
+
+
+class EmbeddingRequest(NamedTuple):
+    """Texts waiting to be embedded by the scheduler worker."""
+
+    texts: list[str]
+    is_query: bool
+    future: Future
+    enqueued_at: float
+    embeddings: list[list[float]]
+
+
+class RequestSlice(NamedTuple):
+    """Consecutive texts of a request embedded in one micro-batch."""
+
+    request: EmbeddingRequest
+    start: int
+    end: int
+
+    @property
+    def texts(self) -> list[str]:
+        return self.request.texts[self.start : self.end]
+
+
+class RequestQueues:
+    """
+    Requests waiting for the scheduler worker. Queries are kept in their own
+    lane that is drained before documents, and document requests are handed
+    out in slices so a large one cannot hold a micro-batch on its own.
+    """
+
+    def __init__(self):
+        self.condition = Condition()
+        self.queries: deque[EmbeddingRequest] = deque()
+        self.documents: deque[RequestSlice] = deque()
+        self.stopping = False
+
+    def put(self, request: EmbeddingRequest) -> None:
+        with self.condition:
+            if request.is_query:
+                self.queries.append(request)
+            else:
+                self.documents.append(RequestSlice(request, 0, len(request.texts)))
+            self.condition.notify()
+
+    def stop(self) -> None:
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+
+    def wait(self) -> bool:
+        """
+        Blocks until a request is queued.
+        Returns:
+            bool: False if the queues are stopping and empty.
+        """
+        with self.condition:
+            while not self.queries and not self.documents:
+                if self.stopping:
+                    return False
+                self.condition.wait()
+            return True
+
+    def take_batch(
+        self, window_seconds: float, max_batch_size: int, max_document_batch_size: int
+    ) -> list[RequestSlice]:
+        """
+        Collects requests for at most `window_seconds` and takes a micro-batch of them.
+        Queries come first; whole query requests are taken while they fit, and one larger
+        than `max_batch_size` runs alone. The rest of the batch is filled with at most
+        `max_document_batch_size` document texts, the remainder of a request staying queued.
+        Args:
+            window_seconds (float): Maximum time to wait for the batch to fill up.
+            max_batch_size (int): Maximum number of texts in the batch.
+            max_document_batch_size (int): Maximum number of document texts in the batch.
+        Returns:
+            list[RequestSlice]: Slices of the requests in the batch.
+        """
+        deadline = time.perf_counter() + window_seconds
+        with self.condition:
+            while not self.stopping:
+                queued = sum(len(request.texts) for request in self.queries)
+                queued += min(sum(piece.end - piece.start for piece in self.documents), max_document_batch_size)
+                remaining = deadline - time.perf_counter()
+                if queued >= max_batch_size or remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+
+            batch = []
+            batch_size = 0
+            while self.queries and (not batch or batch_size + len(self.queries[0].texts) <= max_batch_size):
+                request = self.queries.popleft()
+                batch.append(RequestSlice(request, 0, len(request.texts)))
+                batch_size += len(request.texts)
+
+            document_budget = min(max_batch_size - batch_size, max_document_batch_size)
+            while self.documents and document_budget > 0:
+                piece = self.documents.popleft()
+                if piece.request.future.done():
+                    # An earlier slice of the request failed.
+                    continue
+                end = min(piece.end, piece.start + document_budget)
+                batch.append(RequestSlice(piece.request, piece.start, end))
+                document_budget -= end - piece.start
+                if end < piece.end:
+                    self.documents.appendleft(RequestSlice(piece.request, end, piece.end))
+            return batch
+
+
+class EmbeddingScheduler(Embeddings):
+    """
+    Embeddings that merge concurrent requests into micro-batches.
+    Requests from all threads are queued and collected by a single worker
+    for at most `batch_window_seconds` after the first one arrives, so
+    sessions share a few large forward passes instead of competing with
+    many small ones. Each caller blocks on a future holding its own results.
+    Queries skip ahead of queued documents, and each micro-batch takes at
+    most `max_document_batch_size` document texts, so a query waits for at
+    most one such batch even while a large document request is embedded.
+    Once closed, requests are embedded directly on the calling thread. The
+    worker only holds a weak reference to the scheduler, so it stops when the
+    scheduler is garbage collected.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        batch_window_seconds: float,
+        max_batch_size: int,
+        queries_as_documents: bool = True,
+        max_document_batch_size: Optional[int] = None,
+    ):
+        """
+        Initializes the embedding scheduler and starts its worker thread.
+        Args:
+            embeddings (Embeddings): Model that embeds the merged batches.
+            batch_window_seconds (float): Maximum time a request waits for others to join its batch.
+            max_batch_size (int): Maximum number of texts in a merged batch. Larger query requests run alone.
+            queries_as_documents (bool): Whether queries can be embedded with `embed_documents`,
+                i.e. the model encodes queries and documents the same way. Otherwise the
+                queries of a batch are embedded together with `embed_queries`.
+            max_document_batch_size (Optional[int]): Maximum number of document texts in a merged batch.
+                Larger document requests are split across batches. Defaults to `max_batch_size`.
+        """
+        self.embeddings = embeddings
+        self.batch_window_seconds = batch_window_seconds
+        self.max_batch_size = max_batch_size
+        self.max_document_batch_size = max_document_batch_size or max_batch_size
+        self.queries_as_documents = queries_as_documents
+        self.model_name = getattr(embeddings, "model_name", None)
+        self._queues = RequestQueues()
+        self._lock = Lock()
+        self._closed = False
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._worker = Thread(
+            target=EmbeddingScheduler._run,
+            args=(weakref.ref(self), self._queues),
+            name="embedding-scheduler",
+            daemon=True,
+        )
+        self._worker.start()
+        weakref.finalize(self, self._queues.stop)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds chunks in a micro-batch shared with concurrent requests.
+        Args:
+            texts (list[str]): Chunk texts.
+        Returns:
+            list[list[float]]: Embedding of each chunk.
+        """
+        if not texts:
+            return []
+        return self._submit(texts, is_query=False).result()
+
+    def embed_query(self, text: str) -> list[float]:
+        """
+        Embeds a query in a micro-batch shared with concurrent requests.
+        Args:
+            text (str): Query text.
+        Returns:
+            list[float]: Embedding of the query.
+        """
+        return self._submit([text], is_query=True).result()[0]
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds queries in a micro-batch shared with concurrent requests.
+        Args:
+            texts (list[str]): Query texts.
+        Returns:
+            list[list[float]]: Embedding of each query.
+        """
+        if not texts:
+            return []
+        return self._submit(texts, is_query=True).result()
+
+    def close(self) -> None:
+        """
+        Stops the worker once the requests queued so far are processed.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queues.stop()
+        self._worker.join()
+
+    def stats(self) -> dict[str, float]:
+        """
+        Summarizes how requests were merged so far.
+        Returns:
+            dict[str, float]: Requests, batches, texts, mean texts per batch, and mean and maximum
+                time requests waited in the queue in seconds.
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "texts": self.texts,
+                "mean_batch_size": self.texts / self.batches if self.batches else 0.0,
+                "mean_wait_seconds": self.wait_seconds / self.requests if self.requests else 0.0,
+                "max_wait_seconds": self.max_wait_seconds,
+            }
+
+    def _submit(self, texts: list[str], is_query: bool) -> Future:
+        request = EmbeddingRequest(texts, is_query, Future(), time.perf_counter(), [])
+        with self._lock:
+            if not self._closed:
+                self._queues.put(request)
+                return request.future
+        self._run_batch([RequestSlice(request, 0, len(texts))])
+        return request.future
+
+    @staticmethod
+    def _run(scheduler_ref: "weakref.ref[EmbeddingScheduler]", queues: RequestQueues) -> None:
+        while queues.wait():
+            scheduler = scheduler_ref()
+            if scheduler is None:
+                return
+            batch = queues.take_batch(
+                scheduler.batch_window_seconds, scheduler.max_batch_size, scheduler.max_document_batch_size
+            )
+            if batch:
+                scheduler._run_batch(batch)
+            # Dropped before blocking on the queues again, so an unused scheduler can be collected.
+            del scheduler
+
+    def _run_batch(self, batch: list[RequestSlice]) -> None:
+        started_at = time.perf_counter()
+        documents = [piece for piece in batch if not piece.request.is_query or self.queries_as_documents]
+        queries = [piece for piece in batch if piece.request.is_query and not self.queries_as_documents]
+
+        if documents:
+            self._resolve(documents, lambda texts: self.embeddings.embed_documents(texts))
+        if queries:
+            self._resolve(queries, lambda texts: embed_queries(self.embeddings, texts))
+
+        with self._lock:
+            self.batches += 1
+            self.texts += sum(piece.end - piece.start for piece in batch)
+            for piece in batch:
+                if piece.start > 0:
+                    continue
+                wait_seconds = started_at - piece.request.enqueued_at
+                self.requests += 1
+                self.wait_seconds += wait_seconds
+                self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    @staticmethod
+    def _resolve(batch: list[RequestSlice], embed) -> None:
+        try:
+            embeddings = embed([text for piece in batch for text in piece.texts])
+        except Exception as e:
+            for piece in batch:
+                piece.request.future.set_exception(e)
+            return
+
+        start = 0
+        for piece in batch:
+            piece.request.embeddings.extend(embeddings[start : start + piece.end - piece.start])
+            start += piece.end - piece.start
+            if piece.end == len(piece.request.texts):
+                piece.request.future.set_result(piece.request.embeddings)
@@ -0,0 +1,57 @@
+import os
+from typing import Optional
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+QUANTIZATION_CONFIG = "avx2"
+"""Dynamic int8 quantization preset; AVX2 kernels run on practically every x86-64 CPU."""
+
+
+def get_onnx_model_dir(onnx_dir: str, model_name: str) -> str:
+    """
+    Returns the directory holding the ONNX export of a model.
+    Args:
+        onnx_dir (str): Root directory of the ONNX exports of all models.
+        model_name (str): Name of the Hugging Face model.
+    Returns:
+        str: Directory of the model's ONNX export.
+    """
+    return os.path.join(onnx_dir, model_name.replace("/", "__"))
+
+
+def get_onnx_file_name(quantized: bool) -> str:
+    """
+    Returns the path of the ONNX graph inside an exported model directory.
+    Args:
+        quantized (bool): Whether to return the dynamically int8-quantized graph.
+    Returns:
+        str: Path of the graph relative to the model directory.
+    """
+    return f"onnx/model_qint8_{QUANTIZATION_CONFIG}.onnx" if quantized else "onnx/model.onnx"
+
+
+def export_onnx_model(model_name: str, onnx_dir: str, quantize: bool = False) -> str:
+    """
+    Exports a Sentence Transformers model to ONNX, optionally with a dynamically
+    int8-quantized copy of the graph. Exports that already exist are reused.
+    Args:
+        model_name (str): Name of the Hugging Face model.
+        onnx_dir (str): Root directory of the ONNX exports of all models.
+        quantize (bool): Whether to also export the int8-quantized graph.
+    Returns:
+        str: Directory of the model's ONNX export, loadable with `backend="onnx"`.
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    model_dir = get_onnx_model_dir(onnx_dir, model_name)
+    model: Optional[SentenceTransformer] = None
+    if not os.path.exists(os.path.join(model_dir, get_onnx_file_name(quantized=False))):
+        model = SentenceTransformer(model_name, backend="onnx", trust_remote_code=True)
+        model.save(model_dir)
+
+    if quantize and not os.path.exists(os.path.join(model_dir, get_onnx_file_name(quantized=True))):
+        if model is None:
+            model = SentenceTransformer(model_dir, backend="onnx", trust_remote_code=True)
+        export_dynamic_quantized_onnx_model(model, QUANTIZATION_CONFIG, model_dir)
+
+    return model_dir
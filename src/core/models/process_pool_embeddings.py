@@ -0,0 +1,230 @@
+import glob
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import torch
+from huggingface_hub import snapshot_download
+from langchain_core.embeddings import Embeddings
+from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+
+from src.core.exceptions import EmbeddingError
+from src.core.models.bucketed_embeddings import LengthBucketedEmbeddings
+from src.core.models.query_embeddings import embed_queries
+
+WEIGHT_FILE_PATTERNS = ("*.safetensors", "*.bin")
+"""Weight files measured, in order of preference, when a model directory holds several formats."""
+
+_worker_model: Optional[Embeddings] = None
+
+
+def _initialize_worker(model_name: str, model_kwargs: dict, threads: int, token_budget: Optional[int]) -> None:
+    """Loads the embedding model once per worker process with a fixed number of torch threads."""
+    global _worker_model
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    model = HuggingFaceEmbeddings(model_name=model_name, model_kwargs=model_kwargs)
+    _worker_model = LengthBucketedEmbeddings(model, token_budget) if token_budget is not None else model
+
+
+def _embed_shard(texts: list[str]) -> list[list[float]]:
+    """
+    Embeds a shard of chunks in a worker process.
+    Args:
+        texts (list[str]): Chunk texts.
+    Returns:
+        list[list[float]]: Embedding of each chunk.
+    """
+    return _worker_model.embed_documents(texts)
+
+
+def _embed_query(text: str) -> list[float]:
+    """
+    Embeds a query in a worker process.
+    Args:
+        text (str): Query text.
+    Returns:
+        list[float]: Embedding of the query.
+    """
+    return _worker_model.embed_query(text)
+
+
+def _embed_queries(texts: list[str]) -> list[list[float]]:
+    """
+    Embeds queries in one batch in a worker process.
+    Args:
+        texts (list[str]): Query texts.
+    Returns:
+        list[list[float]]: Embedding of each query.
+    """
+    return embed_queries(_worker_model, texts)
+
+
+def estimate_weight_file_bytes(model_path: str, file_name: Optional[str] = None) -> int:
+    """
+    Estimates the memory one copy of a model's weights takes from the size of its weight files,
+    without loading the model.
+    Args:
+        model_path (str): Local directory or Hugging Face Hub name of the model. Hub models are
+            only looked up in the local cache.
+        file_name (Optional[str]): Weight file to measure (e.g. an ONNX graph), relative to the model directory.
+            The safetensors weights, or else the PyTorch ones, are measured if None.
+    Returns:
+        int: Estimated size in bytes, or 0 if the weights are not available locally.
+    """
+    directory = model_path
+    if not os.path.isdir(directory):
+        try:
+            directory = snapshot_download(model_path, local_files_only=True)
+        except Exception:
+            return 0
+
+    if file_name is not None:
+        path = os.path.join(directory, file_name)
+        return os.path.getsize(path) if os.path.exists(path) else 0
+    for pattern in WEIGHT_FILE_PATTERNS:
+        paths = glob.glob(os.path.join(directory, pattern))
+        if paths:
+            return sum(os.path.getsize(path) for path in paths)
+    return 0
+
+
+def split_shards(count: int, shard_count: int, min_shard_size: int) -> list[tuple[int, int]]:
+    """
+    Splits a range of items into contiguous shards of similar size.
+    Args:
+        count (int): Number of items.
+        shard_count (int): Preferred number of shards.
+        min_shard_size (int): Minimum number of items in a shard, so small inputs are not spread too thin.
+    Returns:
+        list[tuple[int, int]]: Start (inclusive) and end (exclusive) index of each shard.
+    """
+    shard_size = max(math.ceil(count / max(shard_count, 1)), min_shard_size, 1)
+    return [(start, min(start + shard_size, count)) for start in range(0, count, shard_size)]
+
+
+class ProcessPoolEmbeddings(Embeddings):
+    """
+    Embeddings computed by a pool of CPU worker processes.
+    Each worker loads its own copy of the model and runs it with a fixed
+    number of torch intra-op threads. Large `embed_documents` calls are split
+    into contiguous shards that are embedded concurrently, and the results
+    are stitched back together in the original order.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        model_kwargs: dict,
+        num_workers: int,
+        threads_per_worker: int,
+        min_shard_size: int,
+        token_budget: Optional[int] = None,
+    ):
+        """
+        Initializes the worker pool. Models are loaded by each worker when it starts.
+        Args:
+            model_name (str): Name or path of the embedding model.
+            model_kwargs (dict): Keyword arguments of the Sentence Transformers model.
+            num_workers (int): Number of worker processes.
+            threads_per_worker (int): Number of torch intra-op threads of each worker.
+            min_shard_size (int): Minimum number of chunks embedded by a worker in one task.
+            token_budget (Optional[int]): Token budget of length-bucketed batching in the workers.
+                The model's default batching is used if None.
+        """
+        self.model_name = model_name
+        self.model_kwargs = model_kwargs
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        self.min_shard_size = min_shard_size
+        self.token_budget = token_budget
+        self._weight_bytes: Optional[int] = None
+        self.executor = self._initialize_executor()
+
+    def _initialize_executor(self) -> ProcessPoolExecutor:
+        """
+        Initializes the process pool. Workers are started with the "spawn"
+        method so that they do not inherit the parent's torch state.
+        Returns:
+            ProcessPoolExecutor: Pool of embedding worker processes.
+        """
+        return ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_worker,
+            initargs=(self.model_name, self.model_kwargs, self.threads_per_worker, self.token_budget),
+        )
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds chunks by sharding them across the worker pool.
+        Args:
+            texts (list[str]): Chunk texts.
+        Returns:
+            list[list[float]]: Embedding of each chunk, in the order of `texts`.
+        Raises:
+            EmbeddingError: If a worker fails or the pool crashes.
+        """
+        if not texts:
+            return []
+        shards = split_shards(len(texts), self.num_workers, self.min_shard_size)
+        futures = self._run(lambda: [self.executor.submit(_embed_shard, texts[start:end]) for start, end in shards])
+        return [embedding for future in futures for embedding in self._run(future.result)]
+
+    def embed_query(self, text: str) -> list[float]:
+        """
+        Embeds a query in one of the workers.
+        Args:
+            text (str): Query text.
+        Returns:
+            list[float]: Embedding of the query.
+        Raises:
+            EmbeddingError: If the worker fails or the pool crashes.
+        """
+        return self._run(lambda: self.executor.submit(_embed_query, text).result())
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds queries in one batch in one of the workers.
+        Args:
+            texts (list[str]): Query texts.
+        Returns:
+            list[list[float]]: Embedding of each query.
+        Raises:
+            EmbeddingError: If the worker fails or the pool crashes.
+        """
+        if not texts:
+            return []
+        return self._run(lambda: self.executor.submit(_embed_queries, texts).result())
+
+    def memory_footprint(self) -> int:
+        """
+        Estimates the memory held by the model weights of all workers.
+        The size of one copy is estimated from the model's weight files, so the
+        pool is not started just to measure it.
+        Returns:
+            int: Estimated size in bytes.
+        """
+        if self._weight_bytes is None:
+            file_name = self.model_kwargs.get("model_kwargs", {}).get("file_name")
+            self._weight_bytes = estimate_weight_file_bytes(self.model_name, file_name)
+        return self.num_workers * self._weight_bytes
+
+    def close(self) -> None:
+        """
+        Shuts down the worker pool.
+        """
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def _run(self, function):
+        try:
+            return function()
+        except BrokenProcessPool as e:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self._initialize_executor()
+            raise EmbeddingError(f"Embedding worker pool crashed: {e}") from e
+        except Exception as e:
+            raise EmbeddingError(f"Error during embedding in worker pool: {e}") from e
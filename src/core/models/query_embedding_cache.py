@@ -0,0 +1,125 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from langchain_core.embeddings import Embeddings
+
+from src.config import QUERY_EMBEDDING_CACHE_SIZE
+from src.core.models.embedding_cache import normalize_chunk_text
+from src.core.models.query_embeddings import embed_queries
+from src.core.utils.singleton_meta import SingletonMeta
+
+
+class QueryEmbeddingCache(metaclass=SingletonMeta):
+    """
+    Process-wide LRU cache of query embeddings shared by all sessions.
+    Entries are keyed by the embedding model and the normalized query, so
+    repeated questions skip the forward pass. The least recently used entries
+    are dropped once the cache holds `max_size` queries.
+    """
+
+    def __init__(self, max_size: int = QUERY_EMBEDDING_CACHE_SIZE):
+        """
+        Initializes the query embedding cache.
+        Args:
+            max_size (int): Maximum number of cached query embeddings.
+        """
+        self.max_size = max_size
+        self._entries: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_query_embedding(self, embeddings: Embeddings, query: str) -> list[float]:
+        """
+        Returns the embedding of a query, computing it with the model on a cache miss.
+        Args:
+            embeddings (Embeddings): Model that embeds the query.
+            query (str): Query text.
+        Returns:
+            list[float]: Embedding of the query.
+        """
+        key = (self._get_model_key(embeddings), normalize_chunk_text(query))
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(embedding)
+            self.misses += 1
+
+        embedding = embeddings.embed_query(query)
+        with self._lock:
+            self._entries[key] = list(embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return embedding
+
+    def get_query_embeddings(self, embeddings: Embeddings, queries: list[str]) -> list[list[float]]:
+        """
+        Returns the embeddings of many queries, computing all cache misses in one batch.
+        Args:
+            embeddings (Embeddings): Model that embeds the queries.
+            queries (list[str]): Query texts.
+        Returns:
+            list[list[float]]: Embedding of each query.
+        """
+        model_key = self._get_model_key(embeddings)
+        keys = [(model_key, normalize_chunk_text(query)) for query in queries]
+        results: list[Optional[list[float]]] = [None] * len(queries)
+        missing: dict[tuple[str, str], list[int]] = {}
+        with self._lock:
+            for position, key in enumerate(keys):
+                embedding = self._entries.get(key)
+                if embedding is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    results[position] = list(embedding)
+                else:
+                    self.misses += 1
+                    missing.setdefault(key, []).append(position)
+
+        if missing:
+            computed = embed_queries(embeddings, [queries[positions[0]] for positions in missing.values()])
+            with self._lock:
+                for (key, positions), embedding in zip(missing.items(), computed):
+                    self._entries[key] = list(embedding)
+                    self._entries.move_to_end(key)
+                    for position in positions:
+                        results[position] = list(embedding)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return results
+
+    def stats(self) -> dict[str, float]:
+        """
+        Summarizes how often cached query embeddings were reused.
+        Returns:
+            dict[str, float]: Hits, misses, hit rate and number of cached queries.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+            }
+
+    def clear(self) -> None:
+        """
+        Drops all cached query embeddings and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @staticmethod
+    def _get_model_key(embeddings: Embeddings) -> str:
+        model_name = getattr(embeddings, "model_name", None)
+        return model_name if isinstance(model_name, str) else f"{type(embeddings).__name__}@{id(embeddings)}"
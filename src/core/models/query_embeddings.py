@@ -0,0 +1,45 @@
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+
+
+def encode_texts(embeddings: HuggingFaceEmbeddings, texts: list[str], encode_kwargs: dict) -> np.ndarray:
+    """
+    Encodes texts in one call to the SentenceTransformer model of a Hugging Face embedding model.
+    LangChain only exposes encoding with the model's own document or query settings, so callers that
+    need other settings (a batch size, or query settings for many queries at once) encode through here.
+    Args:
+        embeddings (HuggingFaceEmbeddings): Hugging Face embedding model.
+        texts (list[str]): Texts to encode. Newlines are replaced by spaces, as LangChain does.
+        encode_kwargs (dict): Keyword arguments of `SentenceTransformer.encode`.
+    Returns:
+        np.ndarray: Embedding of each text, one per row.
+    """
+    texts = [text.replace("\n", " ") for text in texts]
+    return np.asarray(
+        embeddings._client.encode(texts, **{**encode_kwargs, "show_progress_bar": False, "convert_to_numpy": True})
+    )
+
+
+def embed_queries(embeddings: Embeddings, queries: list[str]) -> list[list[float]]:
+    """
+    Embeds many queries in as few forward passes as possible.
+    LangChain only embeds queries one at a time, so models providing an
+    `embed_queries` method (the wrappers in this package) are asked for all
+    of them at once, and Hugging Face models encode them in a single batch
+    with their query settings. Other models embed the queries one by one.
+    Args:
+        embeddings (Embeddings): Embedding model.
+        queries (list[str]): Query texts.
+    Returns:
+        list[list[float]]: Embedding of each query, as `embed_query` would return it.
+    """
+    if not queries:
+        return []
+    if callable(getattr(type(embeddings), "embed_queries", None)):
+        return embeddings.embed_queries(queries)
+    if isinstance(embeddings, HuggingFaceEmbeddings):
+        if not embeddings.query_encode_kwargs:
+            return embeddings.embed_documents(queries)
+        return encode_texts(embeddings, queries, embeddings.query_encode_kwargs).tolist()
+    return [embeddings.embed_query(query) for query in queries]
@@ -4,8 +4,10 @@ from langchain.vectorstores import VectorStore
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import BaseMessage
 
+from src.core.data_processing.bm25_index import BM25Index
 from src.core.exceptions import QAServiceError
 from src.core.graph.qa_graph import build_qa_graph
+from src.core.models.query_embedding_cache import QueryEmbeddingCache
 
 
 def generate_qa_answer(
@@ -13,6 +15,8 @@ def generate_qa_answer(
     llm: BaseChatModel,
     question: str,
     history: Optional[List[BaseMessage]],
+    section: Optional[str] = None,
+    keyword_index: Optional[BM25Index] = None,
 ) -> str:
     """
     Generates an answer to a question using the provided vector store and language model.
@@ -20,16 +24,21 @@ def generate_qa_answer(
         vec (VectorStore): The vector store to search for relevant documents.
         llm (BaseChatModel): The language model to generate the answer.
         question (str): The question to be answered.
+        section (Optional[str]): Section path the retrieved context is limited to. Searches the whole paper if None.
+        keyword_index (Optional[BM25Index]): BM25 index over the chunks, fused with dense retrieval if given.
     Returns:
         str: The generated answer.
     Raises:
         QAServiceError: If there is an error during the Q&A generation process.
     """
     try:
-        qa_graph = build_qa_graph(vector_store=vec, llm=llm)
-        response = qa_graph.invoke(
-            {"question": question, "chat_history": history}
+        qa_graph = build_qa_graph(
+            vector_store=vec, llm=llm, query_cache=QueryEmbeddingCache(), keyword_index=keyword_index
         )
+        graph_input = {"question": question, "chat_history": history}
+        if section:
+            graph_input["section"] = section
+        response = qa_graph.invoke(graph_input)
         answer = response["answer"]
         return answer
     except Exception as e:
@@ -0,0 +1,31 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows.
+    fcntl = None
+
+
+@contextmanager
+def lock_file(path: str) -> Iterator[None]:
+    """
+    Holds an exclusive lock on a file, creating it if needed, so that several processes
+    can take turns writing shared data. The lock is an advisory `flock`, so it is only
+    taken on POSIX systems; elsewhere the context does not lock anything and callers
+    only get the thread-level locking they do themselves.
+    Args:
+        path (str): Path of the lock file.
+    Yields:
+        None: While the lock is held.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,276 @@
+import inspect
+import time
+import weakref
+from threading import Event, Lock, Thread
+from typing import Any, Optional
+
+from src.config import MODEL_REGISTRY_IDLE_TIMEOUT_SECONDS, MODEL_REGISTRY_MEMORY_BUDGET_BYTES
+
+MAX_CALL_KEYS = 1024
+
+
+def estimate_module_bytes(*modules: Any) -> int:
+    """
+    Estimates the memory held by the parameters and buffers of PyTorch modules.
+    Objects that are not modules but wrap one in a `model` attribute (e.g. Marker predictors) are unwrapped.
+    Args:
+        *modules (Any): PyTorch modules or objects wrapping them. Other objects count as 0 bytes.
+    Returns:
+        int: Estimated size in bytes.
+    """
+    total_bytes = 0
+    for module in modules:
+        if not hasattr(module, "parameters"):
+            module = getattr(module, "model", None)
+        if not hasattr(module, "parameters"):
+            continue
+        tensors = [*module.parameters(), *module.buffers()]
+        total_bytes += sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+    return total_bytes
+
+
+class RegistryEntry:
+    """Instance hosted by the model registry with its bookkeeping."""
+
+    def __init__(self, instance: Any, memory_bytes: int):
+        self.instance = instance
+        self.memory_bytes = memory_bytes
+        self.last_used = time.monotonic()
+
+
+class ModelRegistryMeta(type):
+    """
+    Thread-safe metaclass that shares instances per class and constructor arguments.
+    Unlike SingletonMeta, classes can host several instances at once, e.g. one
+    per model name and device. The arguments that identify an instance are
+    listed in the class attribute `registry_key_args` (all arguments if it is
+    not set); calls differing only in other arguments get the existing instance.
+    Instances are loaded lazily under a per-key lock, so loading one model does
+    not block access to the others. The least recently used instances are
+    evicted once the total `memory_footprint()` of all instances exceeds the
+    memory budget, and instances idle for longer than the idle timeout are
+    evicted in the background. Eviction only drops the registry's reference:
+    callers still holding an instance keep using it, and its memory is
+    reclaimed once they drop it too. Until then, requests for its key get the
+    evicted instance back instead of loading a second copy.
+    """
+
+    _entries: dict[tuple, RegistryEntry] = {}
+
+    _lock: Lock = Lock()
+    """
+    Guards changes to `_entries` and `_key_locks`. Lookups of loaded instances
+    never take it, and it is never held while a model loads.
+    """
+
+    _key_locks: dict[tuple, Lock] = {}
+
+    _evicted: dict[tuple, tuple[weakref.ref, int]] = {}
+    """Weak references to evicted instances and their memory footprint, by registry key."""
+
+    memory_budget_bytes: Optional[int] = MODEL_REGISTRY_MEMORY_BUDGET_BYTES
+
+    idle_timeout_seconds: Optional[float] = MODEL_REGISTRY_IDLE_TIMEOUT_SECONDS
+
+    _sweeper: Optional[Thread] = None
+
+    _sweeper_stop = Event()
+
+    _signatures: dict[type, inspect.Signature] = {}
+
+    _call_keys: dict[tuple, tuple] = {}
+    """Registry keys of recent argument combinations, so repeated calls skip binding the signature."""
+
+    def __call__(cls, *args, **kwargs):
+        try:
+            call_key = (cls, args, tuple(kwargs.items()))
+            key = ModelRegistryMeta._call_keys.get(call_key)
+        except TypeError:
+            call_key, key = None, None
+        if key is None:
+            key = cls._make_registry_key(*args, **kwargs)
+            if call_key is not None:
+                if len(ModelRegistryMeta._call_keys) >= MAX_CALL_KEYS:
+                    ModelRegistryMeta._call_keys.clear()
+                ModelRegistryMeta._call_keys[call_key] = key
+        instance = ModelRegistryMeta._get(key)
+        if instance is not None:
+            return instance
+
+        with ModelRegistryMeta._lock:
+            key_lock = ModelRegistryMeta._key_locks.setdefault(key, Lock())
+
+        with key_lock:
+            instance = ModelRegistryMeta._get(key)
+            if instance is not None:
+                return instance
+
+            instance, memory_bytes = ModelRegistryMeta._take_evicted(key)
+            if instance is None:
+                instance = super().__call__(*args, **kwargs)
+                memory_bytes = ModelRegistryMeta._measure(instance)
+            with ModelRegistryMeta._lock:
+                ModelRegistryMeta._entries[key] = RegistryEntry(instance, memory_bytes)
+                ModelRegistryMeta._evict_over_budget(keep=key)
+            ModelRegistryMeta._start_sweeper()
+
+        return instance
+
+    def _make_registry_key(cls, *args, **kwargs) -> tuple:
+        signature = ModelRegistryMeta._signatures.get(cls)
+        if signature is None:
+            signature = ModelRegistryMeta._signatures.setdefault(cls, inspect.signature(cls.__init__))
+        bound_args = signature.bind(None, *args, **kwargs)
+        bound_args.apply_defaults()
+        arguments = dict(list(bound_args.arguments.items())[1:])
+        for name, value in arguments.items():
+            if signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD:
+                arguments[name] = tuple(sorted(value.items()))
+        key_args = getattr(cls, "registry_key_args", None)
+        if key_args is not None:
+            arguments = {name: arguments[name] for name in key_args}
+        return (cls, *arguments.items())
+
+    @staticmethod
+    def _get(key: tuple) -> Optional[Any]:
+        # Lock-free: reading the dict and setting `last_used` are atomic, and
+        # eviction orders entries by `last_used` instead of by dict order.
+        entry = ModelRegistryMeta._entries.get(key)
+        if entry is None:
+            return None
+        entry.last_used = time.monotonic()
+        return entry.instance
+
+    @staticmethod
+    def _measure(instance: Any) -> int:
+        memory_footprint = getattr(instance, "memory_footprint", None)
+        if memory_footprint is None:
+            return 0
+        try:
+            return int(memory_footprint())
+        except Exception:
+            return 0
+
+    @staticmethod
+    def _take_evicted(key: tuple) -> tuple[Optional[Any], int]:
+        # Instances evicted while callers still held them are registered again instead of reloaded.
+        with ModelRegistryMeta._lock:
+            reference, memory_bytes = ModelRegistryMeta._evicted.pop(key, (None, 0))
+        instance = reference() if reference is not None else None
+        return instance, memory_bytes
+
+    @staticmethod
+    def _evict(key: tuple) -> None:
+        # Must be called with the lock held.
+        entry = ModelRegistryMeta._entries.pop(key)
+        try:
+            ModelRegistryMeta._evicted[key] = (weakref.ref(entry.instance), entry.memory_bytes)
+        except TypeError:
+            pass
+
+    @staticmethod
+    def _evict_over_budget(keep: tuple) -> int:
+        # Must be called with the lock held.
+        budget = ModelRegistryMeta.memory_budget_bytes
+        if budget is None:
+            return 0
+        entries = ModelRegistryMeta._entries
+        total_bytes = sum(entry.memory_bytes for entry in entries.values())
+        evicted_count = 0
+        for key in sorted(entries, key=lambda key: entries[key].last_used):
+            if total_bytes <= budget:
+                break
+            if key == keep:
+                continue
+            total_bytes -= entries[key].memory_bytes
+            ModelRegistryMeta._evict(key)
+            evicted_count += 1
+        return evicted_count
+
+    @staticmethod
+    def _start_sweeper() -> None:
+        if ModelRegistryMeta.idle_timeout_seconds is None:
+            return
+        with ModelRegistryMeta._lock:
+            sweeper = ModelRegistryMeta._sweeper
+            if sweeper is not None and sweeper.is_alive():
+                return
+            ModelRegistryMeta._sweeper_stop.clear()
+            ModelRegistryMeta._sweeper = Thread(
+                target=ModelRegistryMeta._sweep_forever, name="model-registry-sweeper", daemon=True
+            )
+            ModelRegistryMeta._sweeper.start()
+
+    @staticmethod
+    def _stop_sweeper() -> None:
+        with ModelRegistryMeta._lock:
+            sweeper = ModelRegistryMeta._sweeper
+            ModelRegistryMeta._sweeper = None
+        if sweeper is not None:
+            ModelRegistryMeta._sweeper_stop.set()
+            sweeper.join()
+
+    @staticmethod
+    def _sweep_forever() -> None:
+        while True:
+            timeout = ModelRegistryMeta.idle_timeout_seconds
+            if timeout is None or ModelRegistryMeta._sweeper_stop.wait(max(timeout / 2, 0.01)):
+                return
+            ModelRegistryMeta.evict_idle()
+
+    @staticmethod
+    def evict_idle() -> int:
+        """
+        Evicts the instances that were not used for longer than the idle timeout.
+        Returns:
+            int: Number of evicted instances.
+        """
+        timeout = ModelRegistryMeta.idle_timeout_seconds
+        if timeout is None:
+            return 0
+        now = time.monotonic()
+        with ModelRegistryMeta._lock:
+            idle_keys = [key for key, entry in ModelRegistryMeta._entries.items() if now - entry.last_used > timeout]
+            for key in idle_keys:
+                ModelRegistryMeta._evict(key)
+        return len(idle_keys)
+
+    @staticmethod
+    def configure(memory_budget_bytes: Optional[int], idle_timeout_seconds: Optional[float]) -> None:
+        """
+        Sets the eviction limits of the registry. Instances over the new memory budget are evicted at once.
+        Args:
+            memory_budget_bytes (Optional[int]): Total memory the hosted instances may use. Unlimited if None.
+            idle_timeout_seconds (Optional[float]): Time after which unused instances are evicted. Never if None.
+        """
+        with ModelRegistryMeta._lock:
+            ModelRegistryMeta.memory_budget_bytes = memory_budget_bytes
+            ModelRegistryMeta.idle_timeout_seconds = idle_timeout_seconds
+            ModelRegistryMeta._evict_over_budget(keep=())
+        ModelRegistryMeta._stop_sweeper()
+        if ModelRegistryMeta._entries:
+            ModelRegistryMeta._start_sweeper()
+
+    @staticmethod
+    def clear() -> None:
+        """
+        Drops all hosted instances, including evicted ones still held by callers.
+        """
+        with ModelRegistryMeta._lock:
+            ModelRegistryMeta._entries.clear()
+            ModelRegistryMeta._evicted.clear()
+            ModelRegistryMeta._key_locks.clear()
+        ModelRegistryMeta._stop_sweeper()
+
+    @staticmethod
+    def stats() -> dict[str, int]:
+        """
+        Summarizes the hosted instances.
+        Returns:
+            dict[str, int]: Number of hosted instances and their total memory footprint in bytes.
+        """
+        with ModelRegistryMeta._lock:
+            return {
+                "instances": len(ModelRegistryMeta._entries),
+                "memory_bytes": sum(entry.memory_bytes for entry in ModelRegistryMeta._entries.values()),
+            }
@@ -0,0 +1,69 @@
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_END = object()
+
+
+def prefetch(iterable: Iterable[T], max_prefetch: int) -> Iterator[T]:
+    """
+    Consumes the iterable in a background thread so that producing the next
+    items overlaps with processing the current one.
+    At most `max_prefetch` items are buffered, which keeps memory bounded when
+    the consumer is slower than the producer. Exceptions raised by the
+    iterable are re-raised in the consuming thread. When the consumer stops
+    early, the background thread is stopped and joined, and the iterable is
+    closed if it is a generator, so its cleanup runs before this returns.
+    Args:
+        iterable (Iterable[T]): The iterable to consume in the background.
+        max_prefetch (int): Maximum number of items produced ahead of the consumer.
+    Yields:
+        T: Items of the iterable, in order.
+    """
+    queue: Queue = Queue(maxsize=max_prefetch)
+    stopped = Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            put((_END, e))
+            return
+        finally:
+            # Generators must be closed by the thread iterating them.
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                close()
+        put((_END, None))
+
+    producer = Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            try:
+                item, error = queue.get(timeout=0.1)
+            except Empty:
+                if not producer.is_alive() and queue.empty():
+                    return
+                continue
+            if item is _END:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stopped.set()
+        producer.join()
@@ -0,0 +1,56 @@
+from contextlib import contextmanager
+from threading import Condition, Lock
+from typing import Iterator
+
+
+class ReadWriteLock:
+    """
+    Lock that any number of readers can hold at once, or a single writer.
+    Waiting writers take precedence over new readers, so a steady stream of
+    readers cannot starve them.
+    """
+
+    def __init__(self):
+        self._condition = Condition(Lock())
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """
+        Holds the lock shared with other readers.
+        Yields:
+            None: While the lock is held.
+        """
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """
+        Holds the lock exclusively.
+        Yields:
+            None: While the lock is held.
+        """
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
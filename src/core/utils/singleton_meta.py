@@ -10,8 +10,15 @@ class SingletonMeta(type):
 
     _lock: Lock = Lock()
     """
-    We now have a lock object that will be used to synchronize threads during
-    first access to the Singleton.
+    We now have a lock object that will be used to synchronize threads while
+    they publish an instance or look up the lock of a class. It is held only
+    for a moment, never while an instance is being initialized.
+    """
+
+    _class_locks: dict[type, Lock] = {}
+    """
+    Each class gets its own lock for the first access, so a slow initialization
+    of one Singleton does not block threads creating or reading another one.
     """
 
     def __call__(cls, *args, **kwargs):
@@ -19,18 +26,30 @@ class SingletonMeta(type):
         Possible changes to the value of the `__init__` argument do not affect
         the returned instance.
         """
+        # Once the instance is published, every call returns it straight away
+        # without touching any lock. Reading a dict is atomic, so a thread
+        # either sees the fully initialized instance or nothing at all.
+        instance = cls._instances.get(cls)
+        if instance is not None:
+            return instance
+
+        with cls._lock:
+            class_lock = cls._class_locks.setdefault(cls, Lock())
+
         # Now, imagine that the program has just been launched. Since there's no
         # Singleton instance yet, multiple threads can simultaneously pass the
         # previous conditional and reach this point almost at the same time. The
-        # first of them will acquire lock and will proceed further, while the
-        # rest will wait here.
-        with cls._lock:
+        # first of them will acquire the lock of the class and will proceed
+        # further, while the rest will wait here.
+        with class_lock:
             # The first thread to acquire the lock, reaches this conditional,
             # goes inside and creates the Singleton instance. Once it leaves the
             # lock block, a thread that might have been waiting for the lock
             # release may then enter this section. But since the Singleton field
             # is already initialized, the thread won't create a new object.
-            if cls not in cls._instances:
+            instance = cls._instances.get(cls)
+            if instance is None:
                 instance = super().__call__(*args, **kwargs)
-                cls._instances[cls] = instance
-        return cls._instances[cls]
+                with cls._lock:
+                    cls._instances[cls] = instance
+        return instance
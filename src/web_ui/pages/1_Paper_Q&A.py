@@ -33,6 +33,12 @@ if st.session_state.processed_article:
     for message in chat_history.messages:
         st.chat_message(message.type).write(message.content)
 
+    all_sections = "Whole paper"
+    section = st.selectbox(
+        "Limit answers to section",
+        [all_sections, *processed_article.get("sections", [])],
+    )
+
     if not api_key:
         st.error("API Key is missing. Please provide it in the sidebar to ask about the paper.")
 
@@ -55,6 +61,8 @@ if st.session_state.processed_article:
                         llm=llm,
                         question=prompt,
                         history=messages,
+                        section=None if section == all_sections else section,
+                        keyword_index=processed_article.get("keyword_index"),
                     )
 
                     chat_history.add_user_message(prompt)
@@ -1,70 +1,152 @@
-import os
-import tempfile
+import time
+from contextlib import closing
 from io import BytesIO
+from typing import Iterable, Iterator, TypeVar
 
 import streamlit as st
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from transformers import AutoTokenizer
 
-from src.config import CHUNK_OVERLAP, CHUNK_SIZE, DEVICE, EMBEDDING_MODEL_NAME, SEPARATORS
+from src.config import (
+    CHUNK_OVERLAP,
+    CHUNK_SIZE,
+    DEFAULT_EXTRACTION_PROFILE,
+    DEVICE,
+    EMBEDDING_BACKEND,
+    EMBEDDING_BATCH_WINDOW_MS,
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_MAX_BATCH_SIZE,
+    EMBEDDING_MAX_DOCUMENT_BATCH_SIZE,
+    EMBEDDING_MIN_SHARD_SIZE,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_ONNX_DIR,
+    EMBEDDING_THREADS_PER_WORKER,
+    EMBEDDING_TOKEN_BUDGETS,
+    EMBEDDING_WORKERS,
+    HYBRID_RETRIEVAL,
+    SEPARATORS,
+    STREAMING_PREFETCH_STEPS,
+    TOKEN_OFFSET_SPLITTER,
+    VECTOR_INDEX_OPTION,
+    VECTOR_STORE_CACHE_DIR,
+    VECTOR_STORE_CACHE_MAX_BYTES,
+)
 from src.core.data_processing.document_processor import DocumentProcessor
-from src.core.data_processing.text_extractor import MarkerTextExtractor
+from src.core.data_processing.extraction_cache import build_text_extractor
+from src.core.data_processing.markdown_chunker import join_pages
+from src.core.data_processing.text_extractor import as_pdf_buffer
+from src.core.data_processing.text_splitter_registry import TextSplitterRegistry
+from src.core.data_processing.vector_store_cache import VectorStoreCache
 from src.core.models.embedding import EmbeddingModel
+from src.core.utils.prefetch import prefetch
 
+T = TypeVar("T")
 
-def process_uploaded_file(uploaded_file: BytesIO):
+
+def _collect(items: Iterable[T], sink: list[T]) -> Iterator[T]:
+    """Passes the items through while appending each of them to the sink."""
+    for item in items:
+        sink.append(item)
+        yield item
+
+
+def process_uploaded_file(uploaded_file: BytesIO, extraction_profile: str = DEFAULT_EXTRACTION_PROFILE):
     """
-    Processes the uploaded PDF file, extracts text, splits it into chunks,
-    and creates a vector store for further processing.
+    Processes the uploaded PDF file, extracts text, splits it into chunks
+    along its sections, and creates a vector store for further processing.
+    Extraction runs ahead in a background thread while the already extracted
+    pages are chunked and embedded batch by batch. Papers processed before with
+    the same settings are loaded from the on-disk vector store cache instead.
     Args:
         uploaded_file (BytesIO): The uploaded PDF file.
+        extraction_profile (str): Name of the Marker extraction profile.
     """
     if uploaded_file is None:
         st.session_state.processing_error = "No file uploaded."
         st.session_state.processed_article = None
         return
 
-    tmp_file_path = None
     try:
         st.session_state.summary_text = None
         st.session_state.summary_error = None
 
-        file_contents = uploaded_file.getvalue()
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            tmp_file.write(file_contents)
-            tmp_file_path = tmp_file.name
-
-        text_extractor = MarkerTextExtractor()
-        article_text = text_extractor.extract_text_from_pdf_file(tmp_file_path)
+        text_extractor = build_text_extractor()
 
-        embedding_model = EmbeddingModel(device=DEVICE, model_name=EMBEDDING_MODEL_NAME)
+        embedding_model = EmbeddingModel(
+            device=DEVICE,
+            model_name=EMBEDDING_MODEL_NAME,
+            cache_dir=EMBEDDING_CACHE_DIR,
+            token_budget=EMBEDDING_TOKEN_BUDGETS[DEVICE],
+            backend=EMBEDDING_BACKEND,
+            onnx_dir=EMBEDDING_ONNX_DIR,
+            batch_window_ms=EMBEDDING_BATCH_WINDOW_MS,
+            max_batch_size=EMBEDDING_MAX_BATCH_SIZE,
+            max_document_batch_size=EMBEDDING_MAX_DOCUMENT_BATCH_SIZE,
+            num_workers=EMBEDDING_WORKERS,
+            threads_per_worker=EMBEDDING_THREADS_PER_WORKER,
+            min_shard_size=EMBEDDING_MIN_SHARD_SIZE,
+        )
 
-        text_splitter = RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
-            tokenizer=AutoTokenizer.from_pretrained(EMBEDDING_MODEL_NAME),
-            chunk_size=CHUNK_SIZE,
-            chunk_overlap=CHUNK_OVERLAP,
-            separators=SEPARATORS,
+        splitter_registry = TextSplitterRegistry()
+        start_time = time.perf_counter()
+        text_splitter = splitter_registry.get_text_splitter(
+            EMBEDDING_MODEL_NAME, CHUNK_SIZE, CHUNK_OVERLAP, SEPARATORS, TOKEN_OFFSET_SPLITTER
+        )
+        splitter_setup_seconds = time.perf_counter() - start_time
+        splitter_build_seconds = splitter_registry.get_build_seconds(
+            EMBEDDING_MODEL_NAME, CHUNK_SIZE, CHUNK_OVERLAP, SEPARATORS, TOKEN_OFFSET_SPLITTER
         )
 
+        vector_store_cache = VectorStoreCache(VECTOR_STORE_CACHE_DIR, VECTOR_STORE_CACHE_MAX_BYTES)
         doc_processor = DocumentProcessor(
-            embedding_model=embedding_model, text_splitter=text_splitter
+            embedding_model=embedding_model,
+            text_splitter=text_splitter,
+            index_option=VECTOR_INDEX_OPTION,
+            vector_store_cache=vector_store_cache,
+        )
+        vector_store_key = vector_store_cache.make_key(
+            as_pdf_buffer(uploaded_file),
+            {
+                "extraction": {**text_extractor.config, "profile": extraction_profile},
+                "embedding_model": EMBEDDING_MODEL_NAME,
+                "embedding_backend": EMBEDDING_BACKEND,
+                "chunk_size": CHUNK_SIZE,
+                "chunk_overlap": CHUNK_OVERLAP,
+                "separators": SEPARATORS,
+                "token_offset_splitter": TOKEN_OFFSET_SPLITTER,
+                "index_option": VECTOR_INDEX_OPTION,
+            },
         )
 
-        chunks = doc_processor.split_text(article_text)
-        vector_store = doc_processor.create_vector_store(chunks)
+        cached_vector_store = doc_processor.load_vector_store(vector_store_key)
+        if cached_vector_store is not None:
+            vector_store, chunks, article_text = cached_vector_store
+        else:
+            pages = []
+            chunks = []
+            # Closing the prefetched pages stops the extraction thread and releases
+            # the extracted file even if chunking or embedding fails.
+            with closing(
+                prefetch(
+                    text_extractor.iter_text_from_bytes(uploaded_file, extraction_profile), STREAMING_PREFETCH_STEPS
+                )
+            ) as prefetched_pages:
+                page_stream = _collect(prefetched_pages, pages)
+                chunk_stream = _collect(doc_processor.split_document_stream(page_stream), chunks)
+                vector_store = doc_processor.create_vector_store_from_document_stream(chunk_stream)
+            article_text = join_pages(pages)
+            doc_processor.save_vector_store(vector_store_key, vector_store, article_text)
+        keyword_index = doc_processor.create_keyword_index(chunks) if HYBRID_RETRIEVAL else None
 
         st.session_state.processed_article = {
             "name": uploaded_file.name,
             "text": article_text,
             "vector_store": vector_store,
+            "keyword_index": keyword_index,
             "chunks": chunks,
+            "sections": list(dict.fromkeys(chunk.metadata["section"] for chunk in chunks if chunk.metadata["section"])),
+            "splitter_setup_saved_seconds": max(0.0, splitter_build_seconds - splitter_setup_seconds),
         }
         st.session_state.processing_error = None
 
     except Exception as e:
         st.session_state.processing_error = str(e)
         st.session_state.processed_article = None
-
-    finally:
-        if tmp_file_path and os.path.exists(tmp_file_path):
-            os.remove(tmp_file_path)
@@ -1,5 +1,7 @@
 import streamlit as st
 
+from src.config import DEFAULT_EXTRACTION_PROFILE
+from src.core.data_processing.text_extractor import EXTRACTION_PROFILES
 from src.web_ui.processing import process_uploaded_file
 from src.web_ui.state import update_session_state_on_input_change
 
@@ -14,18 +16,28 @@ def render_sidebar():
         type="password",
     )
     st.sidebar.markdown("---")
+    profiles = list(EXTRACTION_PROFILES)
+    extraction_profile = st.sidebar.selectbox(
+        "Extraction profile",
+        profiles,
+        index=profiles.index(DEFAULT_EXTRACTION_PROFILE),
+        help="'fast' skips OCR, tables and equations, 'full' runs the complete Marker pipeline.",
+    )
     uploaded_file = st.sidebar.file_uploader("Upload a PDF file", type=["pdf"], label_visibility="collapsed")
 
     update_session_state_on_input_change(uploaded_file, llm_model_name, api_key)
 
     if st.session_state.processed_article:
         st.sidebar.success(f"File '{st.session_state.processed_article['name']}' processed successfully")
+        saved_seconds = st.session_state.processed_article.get("splitter_setup_saved_seconds", 0.0)
+        if saved_seconds > 0:
+            st.sidebar.caption(f"Cached tokenizer saved {saved_seconds:.2f}s of setup time.")
 
     can_process = uploaded_file is not None and st.session_state.processed_article is None
     if can_process:
         if st.sidebar.button("Process Paper", use_container_width=True, type="primary"):
             with st.spinner(f"Processing '{uploaded_file.name}'... It may take a while."):
-                process_uploaded_file(uploaded_file)
+                process_uploaded_file(uploaded_file, extraction_profile)
             st.rerun()
 
 
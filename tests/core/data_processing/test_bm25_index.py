@@ -0,0 +1,65 @@
+import pytest
+from langchain_core.documents import Document
+
+from src.core.data_processing.bm25_index import BM25Index, tokenize
+
+
+@pytest.fixture
+def documents():
+    return [
+        Document(page_content="We fine-tune BERT on the SQuAD dataset.", metadata={"section": "Methods"}),
+        Document(page_content="BERT BERT BERT is a transformer encoder.", metadata={"section": "Intro"}),
+        Document(page_content="Results on ImageNet-1k improve top-1 accuracy.", metadata={"section": "Results"}),
+        Document(page_content="The loss is the cross-entropy of the answer span.", metadata={"section": "Methods"}),
+    ]
+
+
+def test_tokenize_folds_case_and_splits_names():
+    assert tokenize("ImageNet-1k, BERT's F1") == ["imagenet", "1k", "bert", "s", "f1"]
+
+
+def test_bm25_index_ranks_rare_terms_higher(documents):
+    index = BM25Index(documents)
+
+    results = index.search("BERT on SQuAD", k=2)
+
+    assert results == [documents[0], documents[1]]
+
+
+def test_bm25_index_saturates_term_frequency(documents):
+    index = BM25Index(documents)
+
+    (_, repeated_score), (_, single_score) = index.search_with_scores("bert", k=2)
+
+    assert repeated_score > single_score
+    assert repeated_score < 3 * single_score
+
+
+def test_bm25_index_returns_only_matching_chunks(documents):
+    index = BM25Index(documents)
+
+    assert index.search("ImageNet", k=5) == [documents[2]]
+    assert index.search("unknown words", k=5) == []
+    assert index.search("", k=5) == []
+
+
+def test_bm25_index_applies_metadata_filter(documents):
+    index = BM25Index(documents)
+
+    results = index.search("bert answer", k=5, filter=lambda metadata: metadata["section"] == "Methods")
+
+    assert sorted(document.page_content for document in results) == sorted(
+        [documents[0].page_content, documents[3].page_content]
+    )
+
+
+def test_bm25_index_limits_results_to_k(documents):
+    index = BM25Index(documents)
+
+    assert len(index.search("the bert", k=1)) == 1
+    assert len(index) == 4
+    assert index.vocabulary_size > 20
+
+
+def test_bm25_index_handles_empty_corpus():
+    assert BM25Index([]).search("bert", k=3) == []
@@ -0,0 +1,435 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from src.core.data_processing.corpus_index import (
+    FLAT_INDEX,
+    HNSW_INDEX,
+    IVF_PQ_INDEX,
+    CorpusIndex,
+    choose_index_type,
+    get_index_factory,
+)
+from src.core.exceptions import VectorStoreError
+
+
+@pytest.fixture(autouse=True)
+def small_ivf_pq(mocker):
+    # 8-bit PQ codebooks take seconds to train, 4-bit ones are enough for these corpora.
+    mocker.patch(
+        "src.core.data_processing.corpus_index.get_index_factory",
+        side_effect=lambda index_type, dimension, vector_count: (
+            "IVF16,PQ8x4" if index_type == IVF_PQ_INDEX else get_index_factory(index_type, dimension, vector_count)
+        ),
+    )
+
+
+@pytest.fixture
+def papers():
+    vectors = np.random.default_rng(0).normal(size=(600, 32)).astype(np.float32)
+    return [
+        (
+            f"paper-{i}",
+            [Document(page_content=f"chunk {j}", metadata={"section": "Intro"}) for j in range(i * 100, (i + 1) * 100)],
+            vectors[i * 100 : (i + 1) * 100].tolist(),
+        )
+        for i in range(6)
+    ]
+
+
+def query_for(papers, paper_index: int, chunk_index: int) -> list[float]:
+    return (np.asarray(papers[paper_index][2][chunk_index]) + 0.01).tolist()
+
+
+def test_choose_index_type_grows_with_corpus_size(mocker):
+    mocker.patch("src.core.data_processing.corpus_index.CORPUS_FLAT_MAX_VECTORS", 10)
+    mocker.patch("src.core.data_processing.corpus_index.CORPUS_HNSW_MAX_VECTORS", 100)
+
+    assert choose_index_type(10) == FLAT_INDEX
+    assert choose_index_type(11) == HNSW_INDEX
+    assert choose_index_type(101) == IVF_PQ_INDEX
+
+
+def test_get_index_factory_sizes_ivf_pq_from_corpus():
+    assert get_index_factory(IVF_PQ_INDEX, 1024, 1_000_000) == "IVF4096,PQ64"
+    assert get_index_factory(IVF_PQ_INDEX, 768, 10_000) == "IVF512,PQ48"
+
+
+def test_get_index_factory_raises_error_on_unknown_type():
+    with pytest.raises(VectorStoreError, match="Unsupported corpus index type"):
+        get_index_factory("lsh", 32, 100)
+
+
+@pytest.mark.parametrize("index_type", [FLAT_INDEX, HNSW_INDEX])
+def test_corpus_index_searches_across_papers(papers, index_type):
+    corpus_index = CorpusIndex.build(None, papers, index_type)
+
+    results = corpus_index.similarity_search_by_vector(query_for(papers, 3, 42), k=2)
+
+    assert results[0].page_content == "chunk 342"
+    assert results[0].metadata == {"section": "Intro", "paper_id": "paper-3"}
+    assert len(corpus_index) == 600
+    assert corpus_index.paper_ids == [f"paper-{i}" for i in range(6)]
+
+
+@pytest.mark.parametrize("index_type", [FLAT_INDEX, HNSW_INDEX, IVF_PQ_INDEX])
+def test_corpus_index_restricts_search_to_papers(papers, index_type, mocker):
+    mocker.patch("src.core.data_processing.corpus_index.CORPUS_EXACT_FILTER_MAX_VECTORS", 150)
+    corpus_index = CorpusIndex.build(None, papers, index_type)
+
+    for paper_ids in (["paper-1"], ["paper-1", "paper-4"]):
+        results = corpus_index.similarity_search_by_vector(query_for(papers, 3, 42), k=5, paper_ids=paper_ids)
+
+        assert len(results) == 5
+        assert {document.metadata["paper_id"] for document in results} <= set(paper_ids)
+
+
+@pytest.mark.parametrize("index_type", [FLAT_INDEX, HNSW_INDEX, IVF_PQ_INDEX])
+@pytest.mark.parametrize("paper_ids", [None, ["paper-3"], ["paper-1", "paper-3"]])
+def test_corpus_index_batch_search_matches_single_queries(papers, index_type, paper_ids, mocker):
+    mocker.patch("src.core.data_processing.corpus_index.CORPUS_EXACT_FILTER_MAX_VECTORS", 150)
+    corpus_index = CorpusIndex.build(None, papers, index_type)
+    queries = [query_for(papers, 3, 42), query_for(papers, 3, 7), query_for(papers, 1, 0)]
+
+    batch_results = corpus_index.similarity_search_with_score_by_vectors(queries, k=4, paper_ids=paper_ids)
+
+    assert len(batch_results) == 3
+    for query, results in zip(queries, batch_results):
+        expected = corpus_index.similarity_search_with_score_by_vector(query, k=4, paper_ids=paper_ids)
+        assert [document for document, _ in results] == [document for document, _ in expected]
+        assert [score for _, score in results] == pytest.approx([score for _, score in expected], abs=1e-4)
+
+
+def test_corpus_index_ivf_pq_selection_probes_more_lists_only_when_needed(papers, mocker):
+    mocker.patch("src.core.data_processing.corpus_index.CORPUS_IVF_FILTER_NPROBE", 2)
+    search_parameters = mocker.spy(CorpusIndex, "_get_search_parameters")
+    corpus_index = CorpusIndex.build(None, papers, IVF_PQ_INDEX)
+
+    results = corpus_index.similarity_search_by_vector(query_for(papers, 3, 42), k=5, paper_ids=["paper-1"])
+
+    assert len(results) == 5
+    assert {document.metadata["paper_id"] for document in results} == {"paper-1"}
+    nprobes = [call.args[2] for call in search_parameters.call_args_list]
+    assert nprobes[0] == 2
+    assert nprobes == sorted(nprobes) and nprobes[-1] <= 16
+
+
+class BlockingIndex:
+    """Wraps a FAISS index so that searches wait until two of them run at the same time."""
+
+    def __init__(self, index):
+        self.index = index
+        self.barrier = threading.Barrier(2, timeout=5)
+
+    def __getattr__(self, name):
+        return getattr(self.index, name)
+
+    def search(self, *args, **kwargs):
+        self.barrier.wait()
+        return self.index.search(*args, **kwargs)
+
+
+def test_corpus_index_runs_concurrent_searches_in_parallel(papers):
+    corpus_index = CorpusIndex.build(None, papers, FLAT_INDEX)
+    corpus_index.index = BlockingIndex(corpus_index.index)
+    results = [None, None]
+
+    def search(position):
+        results[position] = corpus_index.similarity_search_by_vector(query_for(papers, position, 7), k=1)
+
+    threads = [threading.Thread(target=search, args=(position,)) for position in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [result[0].page_content for result in results] == ["chunk 7", "chunk 107"]
+
+
+def test_corpus_index_batch_similarity_search_embeds_queries_in_one_batch(papers, mocker):
+    embed_queries = mocker.patch(
+        "src.core.data_processing.corpus_index.embed_queries",
+        return_value=[query_for(papers, 3, 42), query_for(papers, 5, 9)],
+    )
+    corpus_index = CorpusIndex.build(mocker.sentinel.embeddings, papers, FLAT_INDEX)
+
+    results = corpus_index.batch_similarity_search(["first", "second"], k=1)
+
+    embed_queries.assert_called_once_with(mocker.sentinel.embeddings, ["first", "second"])
+    assert [[document.page_content for document, _ in query_results] for query_results in results] == [
+        ["chunk 342"],
+        ["chunk 509"],
+    ]
+
+
+def test_corpus_index_applies_metadata_filter(papers):
+    corpus_index = CorpusIndex.build(None, papers, FLAT_INDEX)
+
+    results = corpus_index.similarity_search_by_vector(
+        query_for(papers, 0, 0), k=3, filter=lambda metadata: metadata["section"] == "Methods"
+    )
+
+    assert results == []
+
+
+def test_corpus_index_raises_error_on_unknown_paper(papers):
+    corpus_index = CorpusIndex.build(None, papers, FLAT_INDEX)
+
+    with pytest.raises(VectorStoreError, match="not in the corpus index"):
+        corpus_index.similarity_search_by_vector(query_for(papers, 0, 0), paper_ids=["paper-9"])
+
+
+def test_corpus_index_build_raises_error_on_duplicate_paper(papers):
+    with pytest.raises(VectorStoreError, match="more than once"):
+        CorpusIndex.build(None, papers + papers[:1])
+
+
+def test_corpus_index_build_raises_error_on_empty_corpus():
+    with pytest.raises(VectorStoreError, match="empty chunks"):
+        CorpusIndex.build(None, [("paper-0", [], [])])
+
+
+def test_corpus_index_round_trips_through_disk(papers, tmp_path):
+    corpus_index = CorpusIndex.build(None, papers, HNSW_INDEX)
+    directory = str(tmp_path / "corpus_index")
+
+    corpus_index.save(directory)
+    corpus_index.save(directory)
+    loaded = CorpusIndex.load(directory, None)
+
+    assert loaded.index_type == HNSW_INDEX
+    assert loaded.paper_ranges == corpus_index.paper_ranges
+    results = loaded.similarity_search_by_vector(query_for(papers, 5, 7), k=1, paper_ids=["paper-5"])
+    assert results[0].page_content == "chunk 507"
+
+
+def test_corpus_index_load_raises_error_on_missing_directory(tmp_path):
+    with pytest.raises(VectorStoreError, match="Error loading corpus index"):
+        CorpusIndex.load(str(tmp_path / "missing"), None)
+
+
+def new_paper(paper_id: str, seed: int, count: int = 10) -> tuple[str, list[Document], list[list[float]]]:
+    vectors = np.random.default_rng(seed).normal(size=(count, 32)).astype(np.float32)
+    return paper_id, [Document(page_content=f"{paper_id} chunk {j}") for j in range(count)], vectors.tolist()
+
+
+@pytest.mark.parametrize("index_type", [FLAT_INDEX, HNSW_INDEX, IVF_PQ_INDEX])
+def test_corpus_index_delete_paper_hides_its_chunks(papers, index_type):
+    corpus_index = CorpusIndex.build(None, papers, index_type)
+
+    assert corpus_index.delete_paper("paper-3")
+    results = corpus_index.similarity_search_by_vector(query_for(papers, 3, 42), k=10)
+
+    assert all(document.metadata["paper_id"] != "paper-3" for document in results)
+    assert len(results) == 10
+    assert len(corpus_index) == 500
+    assert corpus_index.deleted_count == 100
+    assert not corpus_index.delete_paper("paper-3")
+
+
+def test_corpus_index_upsert_paper_replaces_previous_chunks(papers):
+    corpus_index = CorpusIndex.build(None, papers, FLAT_INDEX)
+    paper_id, documents, vectors = new_paper("paper-2", seed=1)
+
+    corpus_index.upsert_paper(paper_id, documents, vectors)
+    results = corpus_index.similarity_search_by_vector(vectors[4], k=1)
+    paper_results = corpus_index.similarity_search_by_vector(vectors[4], k=20, paper_ids=["paper-2"])
+
+    assert results[0].page_content == "paper-2 chunk 4"
+    assert len(paper_results) == 10
+    assert corpus_index.paper_ranges["paper-2"] == (600, 610)
+    assert len(corpus_index) == 510
+
+
+def test_corpus_index_needs_compaction_after_many_deletes(papers):
+    corpus_index = CorpusIndex.build(None, papers, FLAT_INDEX)
+
+    corpus_index.delete_paper("paper-0")
+    assert not corpus_index.needs_compaction()
+    corpus_index.delete_paper("paper-1")
+    assert corpus_index.needs_compaction()
+
+
+def test_corpus_index_needs_compaction_after_many_ivf_pq_additions(papers):
+    corpus_index = CorpusIndex.build(None, papers[:3], IVF_PQ_INDEX)
+
+    corpus_index.upsert_paper(*papers[3])
+    assert not corpus_index.needs_compaction()
+    corpus_index.upsert_paper(*papers[4])
+    assert corpus_index.needs_compaction()
+
+
+def test_corpus_index_needs_compaction_when_outgrowing_index_type(papers, mocker):
+    mocker.patch("src.core.data_processing.corpus_index.CORPUS_FLAT_MAX_VECTORS", 550)
+    corpus_index = CorpusIndex.build(None, papers[:5], FLAT_INDEX)
+
+    corpus_index.upsert_paper(*papers[5])
+
+    assert corpus_index.needs_compaction()
+    assert corpus_index.get_compacted_index_type() == HNSW_INDEX
+
+
+def test_corpus_index_finish_compaction_replays_concurrent_changes(papers):
+    corpus_index = CorpusIndex.build(None, papers, FLAT_INDEX)
+    corpus_index.delete_paper("paper-0")
+
+    snapshot = corpus_index.begin_compaction()
+    corpus_index.delete_paper("paper-1")
+    corpus_index.upsert_paper(*new_paper("paper-9", seed=2))
+    corpus_index.finish_compaction(CorpusIndex.build(None, snapshot, FLAT_INDEX))
+
+    assert [paper_id for paper_id, _, _ in snapshot] == [f"paper-{i}" for i in range(1, 6)]
+    assert corpus_index.paper_ids == ["paper-2", "paper-3", "paper-4", "paper-5", "paper-9"]
+    assert corpus_index.deleted_count == 100
+    assert len(corpus_index) == 410
+    results = corpus_index.similarity_search_by_vector(query_for(papers, 5, 7), k=1)
+    assert results[0].metadata == {"section": "Intro", "paper_id": "paper-5"}
+
+
+def test_corpus_index_begin_compaction_raises_error_when_already_running(papers):
+    corpus_index = CorpusIndex.build(None, papers, FLAT_INDEX)
+    corpus_index.begin_compaction()
+
+    with pytest.raises(VectorStoreError, match="already running"):
+        corpus_index.begin_compaction()
+
+
+def test_corpus_index_loaded_with_mmap_is_read_only(papers, tmp_path):
+    directory = str(tmp_path / "corpus_index")
+    CorpusIndex.build(None, papers, FLAT_INDEX).save(directory)
+
+    with pytest.raises(VectorStoreError, match="read-only"):
+        CorpusIndex.load(directory, None).delete_paper("paper-0")
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/maps"), reason="Requires /proc/self/maps")
+@pytest.mark.parametrize("index_type", [FLAT_INDEX, HNSW_INDEX, IVF_PQ_INDEX])
+def test_corpus_index_load_memory_maps_index(papers, tmp_path, index_type):
+    directory = str(tmp_path / "corpus_index")
+    CorpusIndex.build(None, papers, index_type).save(directory)
+
+    corpus_index = CorpusIndex.load(directory, None)
+
+    with open("/proc/self/maps", "r", encoding="utf-8") as f:
+        assert any(directory in line and line.rstrip().endswith("index.faiss") for line in f)
+    assert corpus_index.similarity_search_by_vector(query_for(papers, 3, 42), k=1, paper_ids=["paper-3"])
+
+
+def test_corpus_index_keeps_tombstones_through_disk(papers, tmp_path):
+    directory = str(tmp_path / "corpus_index")
+    corpus_index = CorpusIndex.build(None, papers, FLAT_INDEX)
+    corpus_index.delete_paper("paper-3")
+    corpus_index.save(directory)
+
+    loaded = CorpusIndex.load(directory, None, mmap=False)
+    loaded.upsert_paper(*new_paper("paper-7", seed=3))
+
+    assert loaded.deleted_count == 100
+    assert loaded.trained_count == 600
+    results = loaded.similarity_search_by_vector(query_for(papers, 3, 42), k=5)
+    assert all(document.metadata["paper_id"] != "paper-3" for document in results)
+
+
+def snapshot_files(directory: str) -> dict[str, float]:
+    return {
+        os.path.join(root, name): os.path.getmtime(os.path.join(root, name))
+        for root, _, names in os.walk(directory)
+        for name in names
+        if name in ("index.faiss", "docstore.json")
+    }
+
+
+def test_corpus_index_save_changes_appends_to_change_log(papers, tmp_path):
+    directory = str(tmp_path / "corpus_index")
+    corpus_index = CorpusIndex.build(None, papers, FLAT_INDEX)
+    corpus_index.save(directory)
+    snapshot = snapshot_files(directory)
+
+    corpus_index.upsert_paper(*new_paper("paper-7", seed=7))
+    corpus_index.delete_paper("paper-2")
+    corpus_index.save_changes(directory)
+
+    assert snapshot_files(directory) == snapshot
+    loaded = CorpusIndex.load(directory, None, mmap=False)
+    assert loaded.paper_ids == corpus_index.paper_ids
+    assert loaded.documents == corpus_index.documents
+    np.testing.assert_array_equal(loaded.index.reconstruct_n(0, 610), corpus_index.index.reconstruct_n(0, 610))
+
+
+def test_corpus_index_save_changes_writes_snapshot_once_change_log_is_large(papers, tmp_path, mocker):
+    mocker.patch("src.core.data_processing.corpus_index.CORPUS_CHANGE_LOG_MAX_RATIO", 0.0)
+    directory = str(tmp_path / "corpus_index")
+    corpus_index = CorpusIndex.build(None, papers, FLAT_INDEX)
+    corpus_index.save(directory)
+    corpus_index.upsert_paper(*new_paper("paper-7", seed=7))
+    corpus_index.save_changes(directory)
+    snapshot = snapshot_files(directory)
+
+    corpus_index.delete_paper("paper-7")
+    corpus_index.save_changes(directory)
+
+    assert snapshot_files(directory).keys() != snapshot.keys()
+    assert CorpusIndex.load(directory, None).paper_ids == corpus_index.paper_ids
+
+
+def test_corpus_index_load_ignores_change_cut_short_by_crash(papers, tmp_path):
+    directory = str(tmp_path / "corpus_index")
+    corpus_index = CorpusIndex.build(None, papers, FLAT_INDEX)
+    corpus_index.save(directory)
+    corpus_index.delete_paper("paper-1")
+    corpus_index.save_changes(directory)
+    change_log = next(
+        os.path.join(root, "changes.jsonl") for root, _, names in os.walk(directory) if "changes.jsonl" in names
+    )
+    with open(change_log, "a", encoding="utf-8") as f:
+        f.write('{"operation": "upsert", "paper_id": "paper-9", "docu')
+
+    loaded = CorpusIndex.load(directory, None)
+
+    assert loaded.paper_ids == ["paper-0", "paper-2", "paper-3", "paper-4", "paper-5"]
+
+
+def test_corpus_index_load_reads_index_into_memory_when_change_log_adds_chunks(papers, tmp_path):
+    directory = str(tmp_path / "corpus_index")
+    corpus_index = CorpusIndex.build(None, papers, FLAT_INDEX)
+    corpus_index.save(directory)
+    corpus_index.upsert_paper(*new_paper("paper-7", seed=7))
+    corpus_index.save_changes(directory)
+
+    loaded = CorpusIndex.load(directory, None)
+
+    assert loaded.read_only
+    assert len(loaded) == 610
+    results = loaded.similarity_search_by_vector(new_paper("paper-7", seed=7)[2][3], k=1)
+    assert results[0].metadata["paper_id"] == "paper-7"
+
+
+def test_corpus_index_concurrent_saves_keep_a_loadable_index(papers, tmp_path):
+    directory = str(tmp_path / "corpus_index")
+    corpus_index = CorpusIndex.build(None, papers, FLAT_INDEX)
+    corpus_index.save(directory)
+    errors = []
+
+    def save_repeatedly(save):
+        try:
+            for i in range(20):
+                corpus_index.upsert_paper(*new_paper(f"paper-{threading.get_ident()}-{i}", seed=i, count=2))
+                save(directory)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=save_repeatedly, args=(corpus_index.save,)),
+        threading.Thread(target=save_repeatedly, args=(corpus_index.save_changes,)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert CorpusIndex.load(directory, None).paper_ids == corpus_index.paper_ids
+    assert len([name for name in os.listdir(directory) if name.startswith("snapshot-")]) == 1
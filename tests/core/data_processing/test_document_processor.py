@@ -1,10 +1,14 @@
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, call
 
+import numpy as np
 import pytest
 from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
 from langchain_text_splitters import TextSplitter
 
+from src.core.data_processing.corpus_index import CorpusIndex
 from src.core.data_processing.document_processor import DocumentProcessor
+from src.core.data_processing.vector_store_cache import VectorStoreCache
 from src.core.exceptions import VectorStoreError
 from src.core.models.embedding import EmbeddingModel
 
@@ -112,3 +116,207 @@ def test_document_processor_create_vector_store_raises_error_on_faiss_failure(
     mock_faiss_from_texts.assert_called_once_with(
         texts=input_chunks, embedding=mock_embedding_model.model
     )
+
+
+def test_document_processor_create_vector_store_from_document_stream_raises_error_on_empty_stream(
+    document_processor_with_mocks, mocker
+):
+    processor, _, _ = document_processor_with_mocks
+
+    mock_faiss_from_documents = mocker.patch("src.core.data_processing.document_processor.FAISS.from_documents")
+
+    with pytest.raises(VectorStoreError, match="Cannot create vector store from empty chunks."):
+        processor.create_vector_store_from_document_stream(iter([]))
+
+    mock_faiss_from_documents.assert_not_called()
+
+
+def test_document_processor_create_vector_store_from_document_stream_wraps_faiss_errors(
+    document_processor_with_mocks, mocker
+):
+    processor, _, _ = document_processor_with_mocks
+
+    faiss_error = RuntimeError("Simulated FAISS creation error")
+    mocker.patch(
+        "src.core.data_processing.document_processor.FAISS.from_documents",
+        side_effect=faiss_error,
+    )
+
+    with pytest.raises(VectorStoreError) as excinfo:
+        processor.create_vector_store_from_document_stream(iter([Document(page_content="chunk A")]))
+
+    assert excinfo.value.__cause__ is faiss_error
+
+
+def test_document_processor_create_vector_store_from_document_stream_keeps_metadata(
+    document_processor_with_mocks, mocker
+):
+    processor, mock_embedding_model, _ = document_processor_with_mocks
+
+    mock_faiss_from_documents = mocker.patch("src.core.data_processing.document_processor.FAISS.from_documents")
+    mock_vector_store_instance = MagicMock(spec=FAISS)
+    mock_faiss_from_documents.return_value = mock_vector_store_instance
+    documents = [Document(page_content=f"chunk {i}", metadata={"section": "Intro", "page": 0}) for i in range(3)]
+
+    actual_vector_store = processor.create_vector_store_from_document_stream(iter(documents), batch_size=2)
+
+    mock_faiss_from_documents.assert_called_once_with(documents=documents[:2], embedding=mock_embedding_model.model)
+    mock_vector_store_instance.add_documents.assert_called_once_with(documents[2:])
+    assert actual_vector_store is mock_vector_store_instance
+
+
+def test_document_processor_split_document_stream_follows_sections(document_processor_with_mocks):
+    processor, _, mock_text_splitter = document_processor_with_mocks
+    mock_text_splitter.split_text.side_effect = lambda text: [text.strip()]
+
+    documents = list(processor.split_document_stream(["# Intro\n\nIntro text.", "# Methods\n\nMethods text."]))
+
+    assert [document.metadata["section"] for document in documents] == ["Intro", "Methods"]
+    assert documents[1].page_content == "# Methods\n\nMethods text."
+
+
+def test_document_processor_rejects_unknown_index_option():
+    with pytest.raises(VectorStoreError, match="Unsupported vector index option"):
+        DocumentProcessor(MagicMock(spec=EmbeddingModel), MagicMock(spec=TextSplitter), index_option="float8")
+
+
+def test_document_processor_create_vector_store_from_document_stream_builds_index_option(mocker):
+    mock_embedding_model = MagicMock(spec=EmbeddingModel)
+    mock_embedding_model.model = MagicMock()
+    mock_embedding_model.model.embed_documents.side_effect = lambda texts: [[1.0] * 8 for _ in texts]
+    processor = DocumentProcessor(mock_embedding_model, MagicMock(spec=TextSplitter), index_option="sq8")
+    mock_build_vector_store = mocker.patch("src.core.data_processing.document_processor.build_vector_store")
+    documents = [Document(page_content=f"chunk {i}", metadata={"page": i}) for i in range(3)]
+
+    actual_vector_store = processor.create_vector_store_from_document_stream(iter(documents), batch_size=2)
+
+    assert mock_embedding_model.model.embed_documents.call_args_list == [
+        call(["chunk 0", "chunk 1"]),
+        call(["chunk 2"]),
+    ]
+    mock_build_vector_store.assert_called_once_with(mock_embedding_model.model, documents, [[1.0] * 8] * 3, "sq8")
+    assert actual_vector_store is mock_build_vector_store.return_value
+
+
+def test_document_processor_load_vector_store_returns_none_without_cache(document_processor_with_mocks):
+    processor, _, _ = document_processor_with_mocks
+
+    assert processor.load_vector_store("key") is None
+
+
+def test_document_processor_loads_and_saves_vector_stores_through_cache():
+    mock_embedding_model = MagicMock(spec=EmbeddingModel)
+    mock_embedding_model.model = MagicMock()
+    mock_cache = MagicMock(spec=VectorStoreCache)
+    processor = DocumentProcessor(mock_embedding_model, MagicMock(spec=TextSplitter), vector_store_cache=mock_cache)
+    mock_vector_store = MagicMock(spec=FAISS)
+
+    loaded = processor.load_vector_store("key")
+    processor.save_vector_store("key", mock_vector_store, "text")
+
+    mock_cache.get.assert_called_once_with("key", mock_embedding_model.model)
+    assert loaded is mock_cache.get.return_value
+    mock_cache.put.assert_called_once_with("key", mock_vector_store, "text")
+
+
+def test_document_processor_save_vector_store_ignores_write_errors():
+    mock_cache = MagicMock(spec=VectorStoreCache)
+    mock_cache.put.side_effect = OSError("disk full")
+    processor = DocumentProcessor(MagicMock(spec=EmbeddingModel), MagicMock(spec=TextSplitter), vector_store_cache=mock_cache)
+
+    processor.save_vector_store("key", MagicMock(spec=FAISS), "text")
+
+
+def test_document_processor_create_corpus_index_embeds_papers_in_batches(mocker):
+    mock_embedding_model = MagicMock(spec=EmbeddingModel)
+    mock_embedding_model.model = MagicMock()
+    mock_embedding_model.model.embed_documents.side_effect = lambda texts: [[float(len(text))] for text in texts]
+    processor = DocumentProcessor(mock_embedding_model, MagicMock(spec=TextSplitter))
+    mock_build = mocker.patch("src.core.data_processing.document_processor.CorpusIndex.build")
+    papers = [
+        ("a", iter([Document(page_content="x"), Document(page_content="xy"), Document(page_content="xyz")])),
+        ("b", iter([Document(page_content="xyzw")])),
+    ]
+
+    corpus_index = processor.create_corpus_index(papers, batch_size=2)
+
+    embeddings, embedded_papers, index_type = mock_build.call_args.args
+    assert embeddings is mock_embedding_model.model
+    assert [(paper_id, vectors) for paper_id, _, vectors in embedded_papers] == [
+        ("a", [[1.0], [2.0], [3.0]]),
+        ("b", [[4.0]]),
+    ]
+    assert index_type is None
+    assert mock_embedding_model.model.embed_documents.call_count == 3
+    assert corpus_index is mock_build.return_value
+
+
+def make_corpus_papers(count: int, chunks_per_paper: int = 100) -> list[tuple[str, list[Document]]]:
+    return [
+        (f"paper-{i}", [Document(page_content=f"paper {i} chunk {j}") for j in range(chunks_per_paper)])
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def corpus_processor():
+    mock_embedding_model = MagicMock(spec=EmbeddingModel)
+    mock_embedding_model.model = MagicMock()
+    mock_embedding_model.model.embed_documents.side_effect = lambda texts: [
+        np.random.default_rng(sum(map(ord, text))).normal(size=16).tolist() for text in texts
+    ]
+    return DocumentProcessor(mock_embedding_model, MagicMock(spec=TextSplitter)), mock_embedding_model
+
+
+def test_document_processor_upsert_corpus_papers_embeds_only_new_chunks(corpus_processor, tmp_path):
+    processor, mock_embedding_model = corpus_processor
+    corpus_index = processor.create_corpus_index(make_corpus_papers(5), index_type="flat")
+    mock_embedding_model.model.embed_documents.reset_mock()
+    directory = str(tmp_path / "corpus_index")
+
+    processor.upsert_corpus_papers(corpus_index, make_corpus_papers(6)[5:], directory)
+
+    embedded_texts = [text for c in mock_embedding_model.model.embed_documents.call_args_list for text in c.args[0]]
+    assert len(embedded_texts) == 100
+    assert processor.compaction_thread is None
+    assert CorpusIndex.load(directory, None).paper_ids == [f"paper-{i}" for i in range(6)]
+
+
+def test_document_processor_delete_corpus_papers_compacts_in_background(corpus_processor, tmp_path):
+    processor, _ = corpus_processor
+    corpus_index = processor.create_corpus_index(make_corpus_papers(5), index_type="flat")
+    directory = str(tmp_path / "corpus_index")
+
+    processor.delete_corpus_papers(corpus_index, ["paper-0", "paper-1"], directory)
+    processor.compaction_thread.join()
+
+    assert corpus_index.deleted_count == 0
+    assert corpus_index.paper_ids == ["paper-2", "paper-3", "paper-4"]
+    assert CorpusIndex.load(directory, None).deleted_count == 0
+
+
+def test_document_processor_surfaces_background_compaction_failure(corpus_processor, tmp_path, mocker):
+    processor, _ = corpus_processor
+    corpus_index = processor.create_corpus_index(make_corpus_papers(5), index_type="flat")
+    mocker.patch.object(corpus_index, "save", side_effect=VectorStoreError("disk full"))
+
+    processor.delete_corpus_papers(corpus_index, ["paper-0", "paper-1"], str(tmp_path / "corpus_index"))
+
+    with pytest.raises(VectorStoreError, match="Background compaction of the corpus index failed: disk full"):
+        processor.wait_for_compaction()
+    processor.wait_for_compaction()
+
+
+def test_document_processor_compact_corpus_index_re_embeds_ivf_pq_chunks(corpus_processor, mocker):
+    processor, mock_embedding_model = corpus_processor
+    mocker.patch("src.core.data_processing.corpus_index.get_index_factory", return_value="IVF16,PQ4x4")
+    corpus_index = processor.create_corpus_index(make_corpus_papers(4), index_type="ivfpq")
+    corpus_index.delete_paper("paper-0")
+    mock_embedding_model.model.embed_documents.reset_mock()
+
+    processor.compact_corpus_index(corpus_index)
+
+    embedded_texts = [text for c in mock_embedding_model.model.embed_documents.call_args_list for text in c.args[0]]
+    assert len(embedded_texts) == 300
+    assert corpus_index.index_type == "ivfpq"
+    assert corpus_index.trained_count == 300
@@ -0,0 +1,186 @@
+import os
+from io import BytesIO
+
+import pytest
+
+from src.core.data_processing.extraction_cache import CachedTextExtractor, ExtractionCache, build_text_extractor
+from src.core.data_processing.text_extractor import EXTRACTION_PROFILES, MARKER_CONFIG
+from src.core.exceptions import TextExtractionError
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExtractionCache(str(tmp_path / "cache"), max_size_bytes=1024)
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    file_path = tmp_path / "paper.pdf"
+    file_path.write_bytes(b"%PDF-1.4 sample contents")
+    return str(file_path)
+
+
+def test_extraction_cache_key_depends_on_bytes_and_config():
+    key = ExtractionCache.make_key(b"pdf", {"a": 1, "b": 2})
+
+    assert key == ExtractionCache.make_key(b"pdf", {"b": 2, "a": 1})
+    assert key != ExtractionCache.make_key(b"other pdf", {"a": 1, "b": 2})
+    assert key != ExtractionCache.make_key(b"pdf", {"a": 1, "b": 3})
+
+
+def test_extraction_cache_returns_none_on_miss(cache):
+    assert cache.get(ExtractionCache.make_key(b"pdf", {})) is None
+
+
+def test_extraction_cache_returns_stored_text(cache):
+    key = ExtractionCache.make_key(b"pdf", {})
+
+    cache.put(key, "# Title\n\nBody")
+
+    assert cache.get(key) == "# Title\n\nBody"
+
+
+def test_extraction_cache_evicts_least_recently_used_entries(cache):
+    keys = [ExtractionCache.make_key(str(i).encode(), {}) for i in range(3)]
+
+    cache.put(keys[0], "a" * 400)
+    cache.put(keys[1], "b" * 400)
+    os.utime(cache._entry_path(keys[0]), (0, 0))
+    os.utime(cache._entry_path(keys[1]), (1, 1))
+    cache.get(keys[0])
+
+    cache.put(keys[2], "c" * 400)
+
+    assert cache.get(keys[0]) == "a" * 400
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) == "c" * 400
+
+
+def test_cached_text_extractor_skips_extractor_on_hit(cache, pdf_file, mocker):
+    with open(pdf_file, "rb") as f:
+        profile_config = {**MARKER_CONFIG, "profile": "balanced", **EXTRACTION_PROFILES["balanced"]}
+        cache.put(ExtractionCache.make_key(f.read(), profile_config), "cached text")
+    extractor_factory = mocker.Mock()
+
+    result = CachedTextExtractor(cache, extractor_factory).extract_text_from_pdf_file(pdf_file)
+
+    assert result == "cached text"
+    extractor_factory.assert_not_called()
+
+
+def test_cached_text_extractor_extracts_and_stores_on_miss(cache, pdf_file, mocker):
+    extractor_factory = mocker.Mock()
+    extractor_factory.return_value.extract_text_from_pdf_file.return_value = "extracted text"
+    cached_extractor = CachedTextExtractor(cache, extractor_factory)
+
+    first = cached_extractor.extract_text_from_pdf_file(pdf_file)
+    second = cached_extractor.extract_text_from_pdf_file(pdf_file)
+
+    assert first == second == "extracted text"
+    extractor_factory.return_value.extract_text_from_pdf_file.assert_called_once_with(pdf_file, "balanced")
+
+
+def test_cached_text_extractor_raises_error_if_file_does_not_exist(cache, mocker):
+    extractor_factory = mocker.Mock()
+
+    with pytest.raises(TextExtractionError, match="PDF file not found at: missing.pdf"):
+        CachedTextExtractor(cache, extractor_factory).extract_text_from_pdf_file("missing.pdf")
+
+    extractor_factory.assert_not_called()
+
+
+def test_cached_text_extractor_iter_streams_and_stores_on_miss(cache, pdf_file, mocker):
+    extractor_factory = mocker.Mock()
+    extractor_factory.return_value.iter_text_from_pdf_file.return_value = iter(["page 1", "page 2"])
+    cached_extractor = CachedTextExtractor(cache, extractor_factory)
+
+    streamed = list(cached_extractor.iter_text_from_pdf_file(pdf_file))
+    cached = list(cached_extractor.iter_text_from_pdf_file(pdf_file))
+
+    assert streamed == ["page 1", "page 2"]
+    assert cached == ["page 1\n\npage 2"]
+    extractor_factory.return_value.iter_text_from_pdf_file.assert_called_once_with(pdf_file, "balanced")
+
+
+def test_cached_text_extractor_key_includes_extraction_config(cache, pdf_file, mocker):
+    extractor_factory = mocker.Mock()
+    extractor_factory.return_value.extract_text_from_pdf_file.side_effect = ["marker text", "hybrid text"]
+
+    marker_text = CachedTextExtractor(cache, extractor_factory).extract_text_from_pdf_file(pdf_file)
+    hybrid_text = CachedTextExtractor(
+        cache, extractor_factory, config={**MARKER_CONFIG, "hybrid": True}
+    ).extract_text_from_pdf_file(pdf_file)
+
+    assert marker_text == "marker text"
+    assert hybrid_text == "hybrid text"
+
+
+def test_cached_text_extractor_key_includes_extraction_profile(cache, pdf_file, mocker):
+    extractor_factory = mocker.Mock()
+    extractor_factory.return_value.extract_text_from_pdf_file.side_effect = lambda file_path, profile: f"{profile} text"
+    cached_extractor = CachedTextExtractor(cache, extractor_factory)
+
+    fast_text = cached_extractor.extract_text_from_pdf_file(pdf_file, "fast")
+    full_text = cached_extractor.extract_text_from_pdf_file(pdf_file, "full")
+
+    assert fast_text == "fast text"
+    assert full_text == "full text"
+    assert cached_extractor.extract_text_from_pdf_file(pdf_file, "fast") == "fast text"
+    assert extractor_factory.return_value.extract_text_from_pdf_file.call_count == 2
+
+
+def test_cached_text_extractor_raises_error_for_unknown_profile(cache, pdf_file, mocker):
+    extractor_factory = mocker.Mock()
+
+    with pytest.raises(TextExtractionError, match="Unsupported extraction profile: turbo"):
+        CachedTextExtractor(cache, extractor_factory).extract_text_from_pdf_file(pdf_file, "turbo")
+
+    extractor_factory.assert_not_called()
+
+
+def test_cached_text_extractor_iter_from_bytes_shares_cache_with_files(cache, pdf_file, mocker):
+    extractor_factory = mocker.Mock()
+    extractor_factory.return_value.extract_text_from_pdf_file.return_value = "extracted text"
+    cached_extractor = CachedTextExtractor(cache, extractor_factory)
+    cached_extractor.extract_text_from_pdf_file(pdf_file)
+
+    with open(pdf_file, "rb") as f:
+        result = cached_extractor.extract_text_from_bytes(BytesIO(f.read()))
+
+    assert result == "extracted text"
+    extractor_factory.return_value.iter_text_from_pdf_file.assert_not_called()
+
+
+def test_cached_text_extractor_iter_from_bytes_extracts_in_memory_pdf_on_miss(cache, mocker):
+    extracted_contents = []
+
+    def iter_text(file_path, profile):
+        with open(file_path, "rb") as f:
+            extracted_contents.append(f.read())
+        yield "page 1"
+        yield "page 2"
+
+    extractor_factory = mocker.Mock()
+    extractor_factory.return_value.iter_text_from_pdf_file.side_effect = iter_text
+    cached_extractor = CachedTextExtractor(cache, extractor_factory)
+
+    streamed = list(cached_extractor.iter_text_from_bytes(b"%PDF-1.4 uploaded"))
+    cached = list(cached_extractor.iter_text_from_bytes(b"%PDF-1.4 uploaded"))
+
+    assert streamed == ["page 1", "page 2"]
+    assert cached == ["page 1\n\npage 2"]
+    assert extracted_contents == [b"%PDF-1.4 uploaded"]
+
+
+@pytest.mark.parametrize("hybrid", [False, True])
+def test_build_text_extractor_runs_marker_in_worker_pool_when_parallel(mocker, tmp_path, hybrid):
+    mocker.patch("src.core.data_processing.extraction_cache.EXTRACTION_CACHE_DIR", str(tmp_path))
+    mocker.patch("src.core.data_processing.extraction_cache.HYBRID_EXTRACTION", hybrid)
+    mock_parallel_extractor_class = mocker.patch(
+        "src.core.data_processing.extraction_cache.ParallelMarkerTextExtractor"
+    )
+
+    extractor = build_text_extractor(parallel=True).extractor_factory()
+
+    marker_extractor = extractor.marker_factory() if hybrid else extractor
+    assert marker_extractor is mock_parallel_extractor_class.return_value
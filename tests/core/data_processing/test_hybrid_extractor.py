@@ -0,0 +1,172 @@
+import time
+
+import pytest
+
+from src.core.data_processing.hybrid_extractor import (
+    MARKER_SOURCE,
+    TEXT_LAYER_SOURCE,
+    HybridTextExtractor,
+    PageExtraction,
+    TextExtractionError,
+    format_page_separator,
+    is_text_layer_usable,
+    split_marker_pages,
+    summarize_page_sources,
+    text_layer_quality,
+)
+
+CLEAN_PAGE = "Attention is all you need. The dominant sequence transduction models are based on recurrent networks. " * 5
+
+
+def test_text_layer_quality_is_high_for_clean_text():
+    assert text_layer_quality(CLEAN_PAGE) > 0.95
+
+
+@pytest.mark.parametrize(
+    "garbled_text",
+    [
+        "(cid:12)(cid:45)(cid:7) (cid:88)(cid:3)" * 20,
+        "\ufffd\ufffd\ufffd abc \ufffd\ufffd" * 20,
+        "T h i s   i s   l e t t e r   s p a c e d " * 20,
+    ],
+)
+def test_text_layer_quality_is_low_for_garbled_text(garbled_text):
+    assert text_layer_quality(garbled_text) < 0.9
+
+
+def test_is_text_layer_usable_rejects_sparse_pages():
+    assert is_text_layer_usable(CLEAN_PAGE, min_chars=100)
+    assert not is_text_layer_usable("Figure 1", min_chars=100)
+    assert not is_text_layer_usable("", min_chars=100)
+
+
+def test_hybrid_extractor_sends_only_unusable_pages_to_marker(mocker):
+    mocker.patch("src.core.data_processing.hybrid_extractor.os.path.exists", return_value=True)
+    mocker.patch(
+        "src.core.data_processing.hybrid_extractor.iter_text_layer",
+        return_value=(text for text in [CLEAN_PAGE, "", CLEAN_PAGE]),
+    )
+    marker_factory = mocker.Mock()
+    marker_factory.return_value.extract_text_from_pdf_pages.return_value = "# Scanned page"
+
+    pages = HybridTextExtractor(marker_factory, min_chars=100).extract_pages("paper.pdf")
+
+    assert [page.source for page in pages] == [TEXT_LAYER_SOURCE, MARKER_SOURCE, TEXT_LAYER_SOURCE]
+    assert pages[1].text == "# Scanned page"
+    assert pages[0].text == CLEAN_PAGE.strip()
+    marker_factory.return_value.extract_text_from_pdf_pages.assert_called_once_with("paper.pdf", 1, 1, "balanced")
+
+
+def test_hybrid_extractor_converts_consecutive_fallback_pages_together(mocker):
+    mocker.patch("src.core.data_processing.hybrid_extractor.os.path.exists", return_value=True)
+    mocker.patch(
+        "src.core.data_processing.hybrid_extractor.iter_text_layer",
+        return_value=(text for text in [CLEAN_PAGE, "", "", "", CLEAN_PAGE, "", ""]),
+    )
+    marker_factory = mocker.Mock()
+    marker_factory.return_value.extract_text_from_pdf_pages.side_effect = (
+        lambda file_path, first_page, last_page, profile: "".join(
+            f"{format_page_separator(page)}# Scanned page {page}" for page in range(first_page, last_page + 1)
+        )
+    )
+
+    pages = HybridTextExtractor(marker_factory, min_chars=100, max_marker_pages=2).extract_pages("paper.pdf")
+
+    assert [page.page for page in pages] == list(range(7))
+    assert [page.source for page in pages] == [
+        TEXT_LAYER_SOURCE,
+        MARKER_SOURCE,
+        MARKER_SOURCE,
+        MARKER_SOURCE,
+        TEXT_LAYER_SOURCE,
+        MARKER_SOURCE,
+        MARKER_SOURCE,
+    ]
+    assert pages[2].text == f"{format_page_separator(2)}# Scanned page 2"
+    assert marker_factory.return_value.extract_text_from_pdf_pages.call_args_list == [
+        mocker.call("paper.pdf", 1, 2, "balanced"),
+        mocker.call("paper.pdf", 3, 3, "balanced"),
+        mocker.call("paper.pdf", 5, 6, "balanced"),
+    ]
+
+
+def test_split_marker_pages_keeps_separators_and_fills_missing_pages():
+    text = f"{format_page_separator(4)}Page four{format_page_separator(6)}Page six"
+
+    assert split_marker_pages(text, 4, 6) == [
+        f"{format_page_separator(4)}Page four",
+        "",
+        f"{format_page_separator(6)}Page six",
+    ]
+    assert split_marker_pages("No separators", 4, 5) == ["No separators", ""]
+
+
+def test_hybrid_extractor_does_not_load_marker_for_clean_pdf(mocker):
+    mocker.patch("src.core.data_processing.hybrid_extractor.os.path.exists", return_value=True)
+    mocker.patch(
+        "src.core.data_processing.hybrid_extractor.iter_text_layer",
+        return_value=(text for text in [CLEAN_PAGE, CLEAN_PAGE]),
+    )
+    marker_factory = mocker.Mock()
+
+    text = HybridTextExtractor(marker_factory, min_chars=100).extract_text_from_pdf_file("paper.pdf")
+
+    assert text == "\n\n".join(
+        [
+            f"{format_page_separator(0)}{CLEAN_PAGE.strip()}",
+            f"{format_page_separator(1)}{CLEAN_PAGE.strip()}",
+        ]
+    )
+    marker_factory.assert_not_called()
+
+
+def test_hybrid_extractor_times_text_layer_read_of_each_page(mocker):
+    mocker.patch("src.core.data_processing.hybrid_extractor.os.path.exists", return_value=True)
+
+    def slow_text_layer():
+        for _ in range(3):
+            time.sleep(0.05)
+            yield CLEAN_PAGE
+
+    mocker.patch("src.core.data_processing.hybrid_extractor.iter_text_layer", return_value=slow_text_layer())
+
+    pages = HybridTextExtractor(mocker.Mock(), min_chars=100).extract_pages("paper.pdf")
+
+    assert [page.source for page in pages] == [TEXT_LAYER_SOURCE] * 3
+    assert all(page.seconds >= 0.05 for page in pages)
+
+
+def test_hybrid_extractor_raises_error_if_file_does_not_exist(mocker):
+    mocker.patch("src.core.data_processing.hybrid_extractor.os.path.exists", return_value=False)
+
+    with pytest.raises(TextExtractionError, match="PDF file not found at: missing.pdf"):
+        HybridTextExtractor(mocker.Mock()).extract_pages("missing.pdf")
+
+
+def test_hybrid_extractor_wraps_text_layer_errors(mocker):
+    mocker.patch("src.core.data_processing.hybrid_extractor.os.path.exists", return_value=True)
+    read_error = RuntimeError("Simulated pdfium error")
+
+    def failing_text_layer():
+        yield CLEAN_PAGE
+        raise read_error
+
+    mocker.patch("src.core.data_processing.hybrid_extractor.iter_text_layer", return_value=failing_text_layer())
+
+    with pytest.raises(TextExtractionError) as excinfo:
+        HybridTextExtractor(mocker.Mock()).extract_pages("paper.pdf")
+
+    assert excinfo.value.__cause__ is read_error
+
+
+def test_summarize_page_sources_counts_pages_and_throughput():
+    pages = [
+        PageExtraction(0, "a", TEXT_LAYER_SOURCE, 0.5),
+        PageExtraction(1, "b", TEXT_LAYER_SOURCE, 0.5),
+        PageExtraction(2, "c", MARKER_SOURCE, 4.0),
+    ]
+
+    summary = summarize_page_sources(pages)
+
+    assert summary[TEXT_LAYER_SOURCE] == {"pages": 2, "seconds": 1.0, "pages_per_second": 2.0}
+    assert summary[MARKER_SOURCE] == {"pages": 1, "seconds": 4.0, "pages_per_second": 0.25}
@@ -0,0 +1,71 @@
+import pytest
+
+from src.core.data_processing.ingestion_manifest import (
+    CHUNKED_STAGE,
+    EMBEDDED_STAGE,
+    EXTRACTED_STAGE,
+    IngestionManifest,
+    compute_content_hash,
+)
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    manifest = IngestionManifest(str(tmp_path / "manifest.sqlite"))
+    yield manifest
+    manifest.close()
+
+
+def test_compute_content_hash_depends_only_on_contents(tmp_path):
+    first = tmp_path / "a.pdf"
+    second = tmp_path / "b.pdf"
+    third = tmp_path / "c.pdf"
+    first.write_bytes(b"%PDF-1.4 same")
+    second.write_bytes(b"%PDF-1.4 same")
+    third.write_bytes(b"%PDF-1.4 other")
+
+    assert compute_content_hash(str(first), block_size=4) == compute_content_hash(str(second))
+    assert compute_content_hash(str(first)) != compute_content_hash(str(third))
+
+
+def test_ingestion_manifest_resumes_from_next_stage(manifest):
+    assert manifest.next_stage("hash") == EXTRACTED_STAGE
+
+    manifest.mark_stage("hash", "paper.pdf", EXTRACTED_STAGE)
+    assert manifest.next_stage("hash") == CHUNKED_STAGE
+
+    manifest.mark_stage("hash", "paper.pdf", CHUNKED_STAGE)
+    manifest.mark_stage("hash", "paper.pdf", EMBEDDED_STAGE)
+    assert manifest.next_stage("hash") is None
+    assert manifest.is_complete("hash")
+
+
+def test_ingestion_manifest_keeps_stage_on_failure(manifest):
+    manifest.mark_stage("hash", "paper.pdf", EXTRACTED_STAGE)
+
+    manifest.mark_failed("hash", "paper.pdf", "chunk: Simulated error")
+
+    assert manifest.get_stage("hash") == EXTRACTED_STAGE
+    assert manifest.get_error("hash") == "chunk: Simulated error"
+
+    manifest.mark_stage("hash", "paper.pdf", CHUNKED_STAGE)
+    assert manifest.get_error("hash") is None
+
+
+def test_ingestion_manifest_persists_across_reopening(tmp_path):
+    db_path = str(tmp_path / "manifest.sqlite")
+    manifest = IngestionManifest(db_path)
+    manifest.mark_stage("a", "a.pdf", EMBEDDED_STAGE)
+    manifest.mark_stage("b", "b.pdf", EXTRACTED_STAGE)
+    manifest.mark_failed("c", "c.pdf", "extract: Simulated error")
+    manifest.close()
+
+    reopened = IngestionManifest(db_path)
+
+    assert reopened.count_by_stage() == {EMBEDDED_STAGE: 1, EXTRACTED_STAGE: 1, None: 1}
+    reopened.close()
+
+
+def test_ingestion_manifest_rejects_unknown_stage(manifest):
+    with pytest.raises(ValueError, match="Unknown ingestion stage: indexed"):
+        manifest.mark_stage("hash", "paper.pdf", "indexed")
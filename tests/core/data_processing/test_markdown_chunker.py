@@ -0,0 +1,111 @@
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.core.data_processing import markdown_chunker
+from src.core.data_processing.markdown_chunker import (
+    MarkdownSectionChunker,
+    find_headings,
+    join_pages,
+    make_section_filter,
+    strip_page_separators,
+)
+
+SEPARATOR = "-" * 48
+PAGES = [
+    f"\n\n{{0}}{SEPARATOR}\n\n# Title\n\nAbstract text.\n\n## Introduction\n\nIntroduction text.",
+    f"\n\n{{1}}{SEPARATOR}\n\nMore introduction.\n\n## Methods\n\n### Data\n\nData text.\n\n## Results\n\nResults text.",
+]
+
+
+def make_chunker(chunk_size=200, **kwargs):
+    return MarkdownSectionChunker(RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=0), **kwargs)
+
+
+def test_strip_page_separators_records_page_starts():
+    text, page_starts = strip_page_separators("".join(PAGES))
+
+    assert SEPARATOR not in text
+    assert page_starts == [(0, 0), (text.index("More introduction."), 1)]
+
+
+def test_find_headings_skips_fenced_code():
+    text = "# Title\n\n```python\n# comment\n```\n\n## Section ##\n"
+
+    assert [(heading.level, heading.title) for heading in find_headings(text)] == [(1, "Title"), (2, "Section")]
+
+
+def test_markdown_section_chunker_attaches_section_metadata():
+    documents = make_chunker().split_documents("".join(PAGES))
+
+    assert [(document.metadata["section"], document.metadata["page"]) for document in documents] == [
+        ("Title", 0),
+        ("Title > Introduction", 0),
+        ("Title > Methods > Data", 1),
+        ("Title > Results", 1),
+    ]
+    assert documents[1].page_content == "## Introduction\n\nIntroduction text.\n\nMore introduction."
+
+
+def test_markdown_section_chunker_offsets_point_into_joined_pages():
+    text = join_pages(PAGES)
+
+    documents = list(make_chunker(chunk_size=20).split_document_stream(PAGES))
+
+    assert len(documents) > 4
+    for document in documents:
+        assert text[document.metadata["start_index"] : document.metadata["end_index"]] == document.page_content
+
+
+def test_markdown_section_chunker_stream_matches_whole_text():
+    chunker = make_chunker()
+
+    assert list(chunker.split_document_stream(PAGES)) == chunker.split_documents("".join(PAGES))
+
+
+def test_markdown_section_chunker_stream_only_scans_new_text_for_headings(mocker):
+    scan_headings = mocker.spy(markdown_chunker, "_scan_headings")
+    pages = ["# Title", "```", "# Not a heading", "```"] + [f"Paragraph {index}." for index in range(50)]
+
+    documents = list(make_chunker().split_document_stream(pages))
+
+    assert sum(len(call.args[0]) for call in scan_headings.call_args_list) == len(join_pages(pages))
+    assert {document.metadata["section"] for document in documents} == {"Title"}
+
+
+def test_markdown_section_chunker_stream_flushes_long_open_sections():
+    pages = ["# Title\n\n## Long section"] + [f"Paragraph {index} of the long section." for index in range(200)]
+    consumed_pages = []
+
+    def stream():
+        for page in pages:
+            consumed_pages.append(page)
+            yield page
+
+    text = join_pages(pages)
+    chunker = make_chunker(chunk_size=100, max_buffer_size=300)
+    documents = []
+    for document in chunker.split_document_stream(stream()):
+        if not documents:
+            first_chunk_pages = len(consumed_pages)
+        documents.append(document)
+
+    assert first_chunk_pages < 20
+    assert {document.metadata["section"] for document in documents} == {"Title > Long section"}
+    assert "".join(document.page_content for document in documents).count("Paragraph") == 200
+    for document in documents:
+        assert text[document.metadata["start_index"] : document.metadata["end_index"]] == document.page_content
+
+
+def test_markdown_section_chunker_handles_text_without_headings_or_pages():
+    documents = make_chunker().split_documents("Plain text only.")
+
+    assert len(documents) == 1
+    assert documents[0].metadata == {"section": "", "page": None, "start_index": 0, "end_index": 16}
+
+
+def test_make_section_filter_matches_section_and_subsections():
+    section_filter = make_section_filter("Title > Methods")
+
+    assert section_filter({"section": "Title > Methods"})
+    assert section_filter({"section": "Title > Methods > Data"})
+    assert not section_filter({"section": "Title > Methods and Materials"})
+    assert not section_filter({})
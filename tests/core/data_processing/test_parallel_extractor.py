@@ -0,0 +1,127 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from src.core.data_processing import parallel_extractor
+from src.core.data_processing.parallel_extractor import (
+    ParallelMarkerTextExtractor,
+    TextExtractionError,
+    split_page_ranges,
+)
+from src.core.utils.singleton_meta import SingletonMeta
+
+
+class InlineExecutor:
+    def __init__(self, *args, **kwargs):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, *args, **kwargs):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def reset_singleton_meta_instances():
+    with SingletonMeta._lock:
+        SingletonMeta._instances = {}
+
+    yield
+
+
+@pytest.fixture
+def mock_pdf(mocker):
+    mocker.patch("src.core.data_processing.parallel_extractor.os.path.exists", return_value=True)
+    return mocker.patch("src.core.data_processing.parallel_extractor.count_pdf_pages", return_value=5)
+
+
+def test_extract_page_range_keeps_bounded_worker_converters(mocker):
+    mock_build_converter = mocker.patch(
+        "src.core.data_processing.parallel_extractor.build_converter", side_effect=lambda *args, **kwargs: mocker.Mock()
+    )
+    mocker.patch("src.core.data_processing.parallel_extractor.text_from_rendered", return_value=("text", None, None))
+    mocker.patch("src.core.data_processing.text_extractor.EXTRACTION_CONVERTER_CACHE_SIZE", 2)
+    mocker.patch.object(parallel_extractor, "_worker_converters", OrderedDict())
+
+    for first_page in (0, 8, 0, 16, 0):
+        assert parallel_extractor._extract_page_range("file.pdf", first_page, first_page + 7, "fast") == "text"
+
+    assert list(parallel_extractor._worker_converters) == [("fast", "16-23"), ("fast", "0-7")]
+    assert mock_build_converter.call_count == 3
+
+
+def test_split_page_ranges_covers_all_pages_in_order():
+    assert split_page_ranges(5, 2) == [(0, 1), (2, 3), (4, 4)]
+    assert split_page_ranges(4, 8) == [(0, 3)]
+    assert split_page_ranges(0, 8) == []
+
+
+def test_parallel_extractor_stitches_shards_in_page_order(mocker, mock_pdf):
+    mocker.patch("src.core.data_processing.parallel_extractor.ProcessPoolExecutor", InlineExecutor)
+    mocker.patch(
+        "src.core.data_processing.parallel_extractor._extract_page_range",
+        side_effect=lambda file_path, first_page, last_page, profile: f"pages {first_page}-{last_page}",
+    )
+
+    extractor = ParallelMarkerTextExtractor(max_workers=2, pages_per_shard=2)
+    result = extractor.extract_text_from_pdf_file("paper.pdf")
+
+    assert result == "pages 0-1\n\npages 2-3\n\npages 4-4"
+    assert extractor.executor.submitted == [
+        ("paper.pdf", 0, 1, "balanced"),
+        ("paper.pdf", 2, 3, "balanced"),
+        ("paper.pdf", 4, 4, "balanced"),
+    ]
+
+
+def test_parallel_extractor_extracts_page_range_in_one_task(mocker, mock_pdf):
+    mocker.patch("src.core.data_processing.parallel_extractor.ProcessPoolExecutor", InlineExecutor)
+    mocker.patch(
+        "src.core.data_processing.parallel_extractor._extract_page_range",
+        side_effect=lambda file_path, first_page, last_page, profile: f"pages {first_page}-{last_page}",
+    )
+
+    extractor = ParallelMarkerTextExtractor()
+
+    assert extractor.extract_text_from_pdf_pages("paper.pdf", 3, 5, "fast") == "pages 3-5"
+    assert extractor.executor.submitted == [("paper.pdf", 3, 5, "fast")]
+
+
+def test_parallel_extractor_raises_error_if_file_does_not_exist(mocker):
+    mocker.patch("src.core.data_processing.parallel_extractor.ProcessPoolExecutor", InlineExecutor)
+    mocker.patch("src.core.data_processing.parallel_extractor.os.path.exists", return_value=False)
+
+    with pytest.raises(TextExtractionError, match="PDF file not found at: missing.pdf"):
+        ParallelMarkerTextExtractor().extract_text_from_pdf_file("missing.pdf")
+
+
+def test_parallel_extractor_wraps_worker_errors(mocker, mock_pdf):
+    mocker.patch("src.core.data_processing.parallel_extractor.ProcessPoolExecutor", InlineExecutor)
+    worker_error = RuntimeError("Simulated error in worker")
+    mocker.patch("src.core.data_processing.parallel_extractor._extract_page_range", side_effect=worker_error)
+
+    with pytest.raises(TextExtractionError) as excinfo:
+        ParallelMarkerTextExtractor().extract_text_from_pdf_file("paper.pdf")
+
+    assert "Error during Marker PDF extraction for paper.pdf" in str(excinfo.value)
+    assert excinfo.value.__cause__ is worker_error
+
+
+def test_parallel_extractor_recreates_broken_pool(mocker, mock_pdf):
+    mock_executor_class = mocker.patch("src.core.data_processing.parallel_extractor.ProcessPoolExecutor")
+    broken_executor = mocker.Mock()
+    broken_executor.submit.side_effect = BrokenProcessPool("worker died")
+    mock_executor_class.side_effect = [broken_executor, mocker.Mock()]
+
+    extractor = ParallelMarkerTextExtractor()
+    with pytest.raises(TextExtractionError, match="Marker worker pool crashed"):
+        extractor.extract_text_from_pdf_file("paper.pdf")
+
+    broken_executor.shutdown.assert_called_once()
+    assert extractor.executor is not broken_executor
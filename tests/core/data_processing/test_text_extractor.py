@@ -1,16 +1,25 @@
+from io import BytesIO
+
 import pytest
+from marker.converters.pdf import PdfConverter
 
-from src.core.data_processing.text_extractor import MarkerTextExtractor, TextExtractionError
-from src.core.utils.singleton_meta import SingletonMeta
+from src.core.data_processing.text_extractor import (
+    MarkerTextExtractor,
+    TextExtractionError,
+    as_pdf_buffer,
+    in_memory_pdf_path,
+)
+from src.core.utils.model_registry import ModelRegistryMeta
 
 
 @pytest.fixture(autouse=True)
-def reset_singleton_meta_instances():
-    with SingletonMeta._lock:
-        SingletonMeta._instances = {}
+def reset_model_registry():
+    ModelRegistryMeta.clear()
 
     yield
 
+    ModelRegistryMeta.clear()
+
 
 def test_marker_text_extractor_initializes_on_first_call(mocker):
     mock_create_model_dict = mocker.patch("src.core.data_processing.text_extractor.create_model_dict")
@@ -19,7 +28,7 @@ def test_marker_text_extractor_initializes_on_first_call(mocker):
     MarkerTextExtractor()
 
     mock_pdf_converter_class.assert_called_once_with(
-        artifact_dict=mock_create_model_dict.return_value, config=mocker.ANY
+        artifact_dict=mock_create_model_dict.return_value, config=mocker.ANY, processor_list=mocker.ANY
     )
 
 
@@ -32,7 +41,7 @@ def test_marker_text_extractor_returns_same_instance_on_subsequent_calls(mocker)
     converter_3 = MarkerTextExtractor()
 
     mock_pdf_converter_class.assert_called_once_with(
-        artifact_dict=mock_create_model_dict.return_value, config=mocker.ANY
+        artifact_dict=mock_create_model_dict.return_value, config=mocker.ANY, processor_list=mocker.ANY
     )
 
     assert converter_1 is converter_2 is converter_3
@@ -50,9 +59,9 @@ def test_marker_text_extractor_initialization_error(mocker):
     assert "Failed to initialize Marker PDF converter" in str(excinfo.value)
     assert excinfo.value.__cause__ is marker_initialization_error
     mock_pdf_converter_class.assert_called_once_with(
-        artifact_dict=mock_create_model_dict.return_value, config=mocker.ANY
+        artifact_dict=mock_create_model_dict.return_value, config=mocker.ANY, processor_list=mocker.ANY
     )
-    assert not SingletonMeta._instances
+    assert ModelRegistryMeta.stats()["instances"] == 0
 
 
 def test_extract_from_pdf_file_raises_error_if_file_does_not_exist(mocker):
@@ -126,3 +135,200 @@ def test_marker_text_extractor_extract_raises_error_on_conversion_failure(mocker
         excinfo.value
     )
     assert excinfo.value.__cause__ is conversion_error
+
+
+def test_marker_text_extractor_extract_pages_uses_page_range_and_shared_models(mocker):
+    mock_create_model_dict = mocker.patch("src.core.data_processing.text_extractor.create_model_dict")
+    mock_pdf_converter_class = mocker.patch("src.core.data_processing.text_extractor.PdfConverter")
+    mocker.patch(
+        "src.core.data_processing.text_extractor.text_from_rendered",
+        return_value=("Pages 2-3 text", None, None),
+    )
+
+    extractor_instance = MarkerTextExtractor()
+    result = extractor_instance.extract_text_from_pdf_pages("valid_file.pdf", 2, 3)
+
+    assert result == "Pages 2-3 text"
+    page_converter_call = mock_pdf_converter_class.call_args_list[-1]
+    assert page_converter_call.kwargs["artifact_dict"] is mock_create_model_dict.return_value
+    assert page_converter_call.kwargs["config"]["page_range"] == [2, 3]
+    mock_pdf_converter_class.return_value.assert_called_once_with("valid_file.pdf")
+
+
+def test_marker_text_extractor_reuses_converter_of_page_range(mocker):
+    mocker.patch("src.core.data_processing.text_extractor.create_model_dict")
+    mock_pdf_converter_class = mocker.patch("src.core.data_processing.text_extractor.PdfConverter")
+    mocker.patch("src.core.data_processing.text_extractor.text_from_rendered", return_value=("text", None, None))
+
+    extractor_instance = MarkerTextExtractor()
+    for file_path in ("first.pdf", "second.pdf"):
+        extractor_instance.extract_text_from_pdf_pages(file_path, 0, 3)
+        extractor_instance.extract_text_from_pdf_pages(file_path, 4, 7)
+
+    page_ranges = [call.kwargs["config"].get("page_range") for call in mock_pdf_converter_class.call_args_list]
+    assert page_ranges == [None, [0, 1, 2, 3], [4, 5, 6, 7]]
+    assert mock_pdf_converter_class.return_value.call_count == 4
+
+
+def test_marker_text_extractor_iter_yields_page_ranges_in_order(mocker):
+    mocker.patch("src.core.data_processing.text_extractor.create_model_dict")
+    mocker.patch("src.core.data_processing.text_extractor.PdfConverter")
+    mocker.patch("src.core.data_processing.text_extractor.os.path.exists", return_value=True)
+    mocker.patch("src.core.data_processing.text_extractor.count_pdf_pages", return_value=5)
+
+    extractor_instance = MarkerTextExtractor()
+    mock_extract_pages = mocker.patch.object(
+        extractor_instance,
+        "extract_text_from_pdf_pages",
+        side_effect=lambda file_path, first_page, last_page, profile: f"pages {first_page}-{last_page}",
+    )
+
+    result = list(extractor_instance.iter_text_from_pdf_file("valid_file.pdf", pages_per_step=2))
+
+    assert result == ["pages 0-1", "pages 2-3", "pages 4-4"]
+    assert mock_extract_pages.call_count == 3
+
+
+def test_marker_text_extractor_iter_raises_error_if_file_does_not_exist(mocker):
+    mocker.patch("src.core.data_processing.text_extractor.create_model_dict")
+    mocker.patch("src.core.data_processing.text_extractor.PdfConverter")
+    mocker.patch("src.core.data_processing.text_extractor.os.path.exists", return_value=False)
+
+    extractor_instance = MarkerTextExtractor()
+
+    with pytest.raises(TextExtractionError, match="PDF file not found at: non_existent_file.pdf"):
+        next(extractor_instance.iter_text_from_pdf_file("non_existent_file.pdf"))
+
+
+def test_marker_text_extractor_caches_converter_per_profile(mocker):
+    mocker.patch("src.core.data_processing.text_extractor.create_model_dict")
+    mock_pdf_converter_class = mocker.patch("src.core.data_processing.text_extractor.PdfConverter")
+    mock_pdf_converter_class.side_effect = lambda **kwargs: mocker.Mock()
+
+    extractor_instance = MarkerTextExtractor()
+    fast_converter = extractor_instance.get_converter("fast")
+
+    assert extractor_instance.get_converter("fast") is fast_converter
+    assert extractor_instance.get_converter("balanced") is extractor_instance.converter
+    assert mock_pdf_converter_class.call_count == 2
+
+
+def test_marker_text_extractor_evicts_least_recently_used_converters(mocker):
+    mocker.patch("src.core.data_processing.text_extractor.create_model_dict")
+    mock_pdf_converter_class = mocker.patch("src.core.data_processing.text_extractor.PdfConverter")
+    mock_pdf_converter_class.side_effect = lambda **kwargs: mocker.Mock()
+    mocker.patch("src.core.data_processing.text_extractor.EXTRACTION_CONVERTER_CACHE_SIZE", 2)
+
+    extractor_instance = MarkerTextExtractor()
+    first_range_converter = extractor_instance.get_converter("fast", "0-3")
+    extractor_instance.get_converter("fast", "4-7")
+    assert extractor_instance.get_converter("fast", "0-3") is first_range_converter
+    extractor_instance.get_converter("fast", "8-11")
+
+    assert list(extractor_instance._converters) == [("fast", "0-3"), ("fast", "8-11")]
+    assert extractor_instance.get_converter("fast", "4-7") is not None
+    assert mock_pdf_converter_class.call_count == 5
+
+
+def test_marker_text_extractor_profiles_select_config_and_processors(mocker):
+    mocker.patch("src.core.data_processing.text_extractor.create_model_dict")
+    mock_pdf_converter_class = mocker.patch("src.core.data_processing.text_extractor.PdfConverter")
+    mock_pdf_converter_class.default_processors = PdfConverter.default_processors
+
+    extractor_instance = MarkerTextExtractor()
+    extractor_instance.get_converter("fast")
+    extractor_instance.get_converter("full")
+
+    fast_call, full_call = mock_pdf_converter_class.call_args_list[1:]
+    assert fast_call.kwargs["config"]["disable_ocr"] is True
+    assert not any(
+        processor.endswith(("TableProcessor", "EquationProcessor"))
+        for processor in fast_call.kwargs["processor_list"]
+    )
+    assert "processor_list" not in full_call.kwargs
+
+
+def test_marker_text_extractor_raises_error_for_unknown_profile(mocker):
+    mocker.patch("src.core.data_processing.text_extractor.create_model_dict")
+    mocker.patch("src.core.data_processing.text_extractor.PdfConverter")
+
+    extractor_instance = MarkerTextExtractor()
+
+    with pytest.raises(TextExtractionError, match="Unsupported extraction profile: turbo"):
+        extractor_instance.get_converter("turbo")
+
+
+@pytest.mark.parametrize("data", [b"%PDF-1.4 bytes", bytearray(b"%PDF-1.4 bytes"), BytesIO(b"%PDF-1.4 bytes")])
+def test_in_memory_pdf_path_exposes_pdf_bytes(data):
+    with in_memory_pdf_path(data) as file_path:
+        with open(file_path, "rb") as f:
+            assert f.read() == b"%PDF-1.4 bytes"
+
+
+def test_as_pdf_buffer_does_not_copy_bytes_io():
+    buffer = as_pdf_buffer(BytesIO(b"%PDF-1.4 bytes"))
+
+    assert isinstance(buffer, memoryview)
+    assert bytes(buffer) == b"%PDF-1.4 bytes"
+
+
+def test_marker_text_extractor_extract_from_bytes_converts_in_memory_pdf(mocker):
+    mocker.patch("src.core.data_processing.text_extractor.create_model_dict")
+    mock_pdf_converter_class = mocker.patch("src.core.data_processing.text_extractor.PdfConverter")
+
+    converted_contents = []
+
+    def convert(file_path):
+        with open(file_path, "rb") as f:
+            converted_contents.append(f.read())
+        return mocker.Mock()
+
+    mock_pdf_converter_class.return_value.side_effect = convert
+    mocker.patch(
+        "src.core.data_processing.text_extractor.text_from_rendered",
+        return_value=("Extracted text content from PDF.", None, None),
+    )
+
+    extractor_instance = MarkerTextExtractor()
+    result = extractor_instance.extract_text_from_bytes(BytesIO(b"%PDF-1.4 uploaded"))
+
+    assert result == "Extracted text content from PDF."
+    assert converted_contents == [b"%PDF-1.4 uploaded"]
+
+
+def test_marker_text_extractor_extract_from_bytes_raises_error_on_conversion_failure(mocker):
+    mocker.patch("src.core.data_processing.text_extractor.create_model_dict")
+    mock_pdf_converter_class = mocker.patch("src.core.data_processing.text_extractor.PdfConverter")
+    conversion_error = RuntimeError("Simulated error during PDF conversion")
+    mock_pdf_converter_class.return_value.side_effect = conversion_error
+
+    extractor_instance = MarkerTextExtractor()
+
+    with pytest.raises(TextExtractionError) as excinfo:
+        extractor_instance.extract_text_from_bytes(b"%PDF-1.4 uploaded")
+
+    assert "Error during Marker PDF extraction from bytes" in str(excinfo.value)
+    assert excinfo.value.__cause__ is conversion_error
+
+
+def test_marker_text_extractor_hosts_one_instance_per_device(mocker):
+    mock_create_model_dict = mocker.patch("src.core.data_processing.text_extractor.create_model_dict")
+    mocker.patch("src.core.data_processing.text_extractor.PdfConverter")
+
+    extractor_default = MarkerTextExtractor()
+    extractor_cpu = MarkerTextExtractor(device="cpu")
+
+    assert extractor_default is not extractor_cpu
+    assert mock_create_model_dict.call_args_list == [mocker.call(), mocker.call(device="cpu")]
+
+
+def test_marker_text_extractor_keeps_models_after_eviction(mocker):
+    mock_create_model_dict = mocker.patch("src.core.data_processing.text_extractor.create_model_dict")
+    mocker.patch("src.core.data_processing.text_extractor.PdfConverter")
+    extractor = MarkerTextExtractor()
+
+    ModelRegistryMeta.clear()
+
+    assert extractor.artifact_dict is mock_create_model_dict.return_value
+    extractor.get_converter("fast")
+    assert mock_create_model_dict.call_count == 1
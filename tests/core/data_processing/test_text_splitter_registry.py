@@ -0,0 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.core.data_processing.text_splitter_registry import TextSplitterRegistry
+from src.core.utils.singleton_meta import SingletonMeta
+
+SEPARATORS = ["\n\n", "\n", " ", ""]
+
+
+@pytest.fixture(autouse=True)
+def reset_singleton_meta_instances():
+    with SingletonMeta._lock:
+        SingletonMeta._instances = {}
+
+    yield
+
+
+@pytest.fixture
+def mock_from_pretrained(mocker):
+    return mocker.patch("src.core.data_processing.text_splitter_registry.AutoTokenizer.from_pretrained")
+
+
+@pytest.fixture
+def mock_from_huggingface_tokenizer(mocker):
+    return mocker.patch(
+        "src.core.data_processing.text_splitter_registry.RecursiveCharacterTextSplitter.from_huggingface_tokenizer",
+        side_effect=lambda **kwargs: mocker.Mock(),
+    )
+
+
+def test_text_splitter_registry_builds_splitter_once(mock_from_pretrained, mock_from_huggingface_tokenizer):
+    registry = TextSplitterRegistry()
+
+    first = registry.get_text_splitter("model", 512, 64, SEPARATORS)
+    second = TextSplitterRegistry().get_text_splitter("model", 512, 64, list(SEPARATORS))
+
+    assert first is second
+    mock_from_pretrained.assert_called_once_with("model")
+    mock_from_huggingface_tokenizer.assert_called_once_with(
+        tokenizer=mock_from_pretrained.return_value, chunk_size=512, chunk_overlap=64, separators=SEPARATORS
+    )
+    assert registry.stats()["hits"] == 1
+    assert registry.stats()["misses"] == 1
+
+
+def test_text_splitter_registry_shares_tokenizer_between_splitters(
+    mock_from_pretrained, mock_from_huggingface_tokenizer
+):
+    registry = TextSplitterRegistry()
+
+    small = registry.get_text_splitter("model", 256, 32, SEPARATORS)
+    large = registry.get_text_splitter("model", 512, 64, SEPARATORS)
+
+    assert small is not large
+    assert registry.get_tokenizer("model") is mock_from_pretrained.return_value
+    mock_from_pretrained.assert_called_once_with("model")
+
+
+def test_text_splitter_registry_reports_saved_setup_time(mocker, mock_from_pretrained, mock_from_huggingface_tokenizer):
+    mocker.patch("src.core.data_processing.text_splitter_registry.time.perf_counter", side_effect=[10.0, 12.5])
+    registry = TextSplitterRegistry()
+
+    registry.get_text_splitter("model", 512, 64, SEPARATORS)
+    registry.get_text_splitter("model", 512, 64, SEPARATORS)
+    registry.get_text_splitter("model", 512, 64, SEPARATORS)
+
+    assert registry.get_build_seconds("model", 512, 64, SEPARATORS) == 2.5
+    assert registry.stats() == {"hits": 2, "misses": 1, "build_seconds": 2.5, "saved_seconds": 5.0}
+
+
+def test_text_splitter_registry_builds_once_under_concurrent_access(
+    mock_from_pretrained, mock_from_huggingface_tokenizer
+):
+    registry = TextSplitterRegistry()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        splitters = list(
+            executor.map(lambda _: registry.get_text_splitter("model", 512, 64, SEPARATORS), range(32))
+        )
+
+    assert all(splitter is splitters[0] for splitter in splitters)
+    mock_from_huggingface_tokenizer.assert_called_once()
+    assert registry.stats()["hits"] == 31
+
+
+def test_text_splitter_registry_builds_token_offset_splitter(mocker, mock_from_pretrained):
+    mock_token_offset_splitter_class = mocker.patch(
+        "src.core.data_processing.text_splitter_registry.TokenOffsetTextSplitter"
+    )
+    registry = TextSplitterRegistry()
+
+    text_splitter = registry.get_text_splitter("model", 512, 64, SEPARATORS, offset_based=True)
+
+    assert text_splitter is mock_token_offset_splitter_class.return_value
+    mock_token_offset_splitter_class.assert_called_once_with(
+        tokenizer=mock_from_pretrained.return_value, chunk_size=512, chunk_overlap=64, separators=SEPARATORS
+    )
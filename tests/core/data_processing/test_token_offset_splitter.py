@@ -0,0 +1,69 @@
+import pytest
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import PreTrainedTokenizerFast
+
+from src.core.data_processing.token_offset_splitter import TokenOffsetTextSplitter
+
+WORDS = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta", "iota", "kappa"]
+SEPARATORS = ["\n\n", "\n", " ", ""]
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    vocab = {word: i for i, word in enumerate(["[UNK]", *WORDS])}
+    word_level_tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+    word_level_tokenizer.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    return PreTrainedTokenizerFast(tokenizer_object=word_level_tokenizer, unk_token="[UNK]")
+
+
+def test_token_offset_splitter_returns_single_chunk_for_short_text(tokenizer):
+    splitter = TokenOffsetTextSplitter(tokenizer, SEPARATORS, chunk_size=8, chunk_overlap=2)
+
+    assert splitter.split_text("  alpha beta\n\ngamma  ") == ["alpha beta\n\ngamma"]
+    assert splitter.split_text("") == []
+
+
+def test_token_offset_splitter_prefers_paragraph_boundaries(tokenizer):
+    splitter = TokenOffsetTextSplitter(tokenizer, SEPARATORS, chunk_size=6, chunk_overlap=0)
+    text = "alpha beta gamma delta\n\nepsilon zeta eta theta\n\niota kappa alpha"
+
+    chunks = splitter.split_text(text)
+
+    assert chunks == ["alpha beta gamma delta", "epsilon zeta eta theta", "iota kappa alpha"]
+
+
+def test_token_offset_splitter_falls_back_to_lower_priority_separators(tokenizer):
+    splitter = TokenOffsetTextSplitter(tokenizer, SEPARATORS, chunk_size=4, chunk_overlap=0)
+    text = "alpha beta\ngamma delta epsilon zeta eta"
+
+    chunks = splitter.split_text(text)
+
+    assert chunks == ["alpha beta", "gamma delta epsilon zeta", "eta"]
+
+
+def test_token_offset_splitter_respects_chunk_size_and_overlap(tokenizer):
+    splitter = TokenOffsetTextSplitter(tokenizer, SEPARATORS, chunk_size=5, chunk_overlap=2)
+    text = " ".join(WORDS * 5)
+
+    chunks = splitter.split_text(text)
+    tokenized_chunks = [tokenizer.tokenize(chunk) for chunk in chunks]
+
+    assert all(len(tokens) <= 5 for tokens in tokenized_chunks)
+    assert all(previous[-2:] == current[:2] for previous, current in zip(tokenized_chunks, tokenized_chunks[1:]))
+    assert chunks[0].startswith("alpha") and chunks[-1].endswith("kappa")
+
+
+def test_token_offset_splitter_tokenizes_text_once(tokenizer, mocker):
+    splitter = TokenOffsetTextSplitter(tokenizer, SEPARATORS, chunk_size=3, chunk_overlap=1)
+    tokenizer_call = mocker.spy(type(tokenizer), "__call__")
+
+    splitter.split_text(" ".join(WORDS * 20))
+
+    assert tokenizer_call.call_count == 1
+
+
+def test_token_offset_splitter_requires_fast_tokenizer(mocker):
+    slow_tokenizer = mocker.Mock(is_fast=False)
+
+    with pytest.raises(ValueError, match="requires a fast tokenizer"):
+        TokenOffsetTextSplitter(slow_tokenizer, SEPARATORS, chunk_size=8, chunk_overlap=2)
@@ -0,0 +1,197 @@
+import faiss
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.core.data_processing.vector_index import (
+    INDEX_OPTIONS,
+    TruncatedEmbeddings,
+    batch_similarity_search,
+    build_vector_store,
+    get_index_embeddings,
+    get_index_memory_bytes,
+    get_index_option,
+    search_by_vectors,
+)
+from src.core.exceptions import VectorStoreError
+
+
+class RandomEmbeddings(Embeddings):
+    model_name = "random"
+
+    def __init__(self, texts: list[str], dimension: int = 64):
+        generator = np.random.default_rng(0)
+        vectors = generator.normal(size=(len(texts), dimension)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.vectors = dict(zip(texts, vectors.tolist()))
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.vectors[text] for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.vectors[text]
+
+
+@pytest.fixture
+def corpus():
+    texts = [f"chunk {i}" for i in range(100)]
+    documents = [Document(page_content=text, metadata={"id": i}) for i, text in enumerate(texts)]
+    return RandomEmbeddings(texts), documents
+
+
+def test_get_index_option_returns_settings():
+    assert get_index_option("sq8") is INDEX_OPTIONS["sq8"]
+
+
+def test_get_index_option_raises_error_on_unknown_option():
+    with pytest.raises(VectorStoreError, match="Unsupported vector index option"):
+        get_index_option("float8")
+
+
+def test_truncated_embeddings_keep_leading_dimensions_with_unit_norm():
+    base = RandomEmbeddings(["a", "b"])
+    truncated = TruncatedEmbeddings(base, 16)
+
+    vectors = np.asarray(truncated.embed_documents(["a", "b"]))
+    query = np.asarray(truncated.embed_query("a"))
+
+    assert vectors.shape == (2, 16)
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_allclose(query, vectors[0], rtol=1e-5)
+    assert truncated.model_name == "random@dim16"
+
+
+def test_get_index_embeddings_truncates_only_matryoshka_options():
+    base = RandomEmbeddings(["a"])
+
+    assert get_index_embeddings(base, "sq8") is base
+    assert isinstance(get_index_embeddings(base, "matryoshka256"), TruncatedEmbeddings)
+
+
+@pytest.mark.parametrize("option", ["float32", "float16", "sq8"])
+def test_build_vector_store_retrieves_chunks_with_compressed_index(corpus, option):
+    embeddings, documents = corpus
+    vectors = embeddings.embed_documents([document.page_content for document in documents])
+
+    vector_store = build_vector_store(embeddings, documents, vectors, option)
+
+    results = vector_store.similarity_search("chunk 42", k=1)
+    assert results[0].metadata == {"id": 42}
+
+
+def test_build_vector_store_compressed_index_is_smaller(corpus):
+    embeddings, documents = corpus
+    vectors = embeddings.embed_documents([document.page_content for document in documents])
+
+    full_bytes = get_index_memory_bytes(build_vector_store(embeddings, documents, vectors, "float32"))
+    sq8_bytes = get_index_memory_bytes(build_vector_store(embeddings, documents, vectors, "sq8"))
+
+    assert sq8_bytes < full_bytes / 2
+
+
+def test_build_vector_store_raises_error_on_empty_documents():
+    with pytest.raises(VectorStoreError, match="empty chunks"):
+        build_vector_store(RandomEmbeddings([]), [], [], "sq8")
+
+
+def test_build_vector_store_raises_error_when_pca_has_too_few_vectors_and_no_fallback(corpus):
+    embeddings, documents = corpus
+    vectors = embeddings.embed_documents([document.page_content for document in documents])
+
+    with pytest.raises(VectorStoreError, match="pca256 needs at least 256 training vectors, got 100"):
+        build_vector_store(embeddings, documents, vectors, "pca256", fallback_option=None)
+
+
+def test_build_vector_store_falls_back_when_pca_has_too_few_vectors(corpus):
+    embeddings, documents = corpus
+    vectors = embeddings.embed_documents([document.page_content for document in documents])
+
+    vector_store = build_vector_store(embeddings, documents, vectors, "pca256")
+
+    assert isinstance(vector_store.index, faiss.IndexFlat)
+    assert vector_store.similarity_search("chunk 42", k=1)[0].metadata == {"id": 42}
+
+
+def test_build_vector_store_fits_pca_on_training_vectors():
+    texts = [f"chunk {i}" for i in range(100)]
+    embeddings = RandomEmbeddings(texts, dimension=300)
+    documents = [Document(page_content=text, metadata={"id": i}) for i, text in enumerate(texts)]
+    vectors = embeddings.embed_documents(texts)
+    training_vectors = np.random.default_rng(1).normal(size=(400, 300)).astype(np.float32)
+
+    vector_store = build_vector_store(embeddings, documents, vectors, "pca256", training_vectors=training_vectors)
+
+    assert vector_store.index.ntotal == 100
+    assert vector_store.similarity_search("chunk 42", k=1)[0].metadata == {"id": 42}
+
+
+@pytest.mark.parametrize("option", ["float32", "sq8"])
+def test_batch_similarity_search_matches_single_queries(corpus, option):
+    embeddings, documents = corpus
+    vectors = embeddings.embed_documents([document.page_content for document in documents])
+    vector_store = build_vector_store(embeddings, documents, vectors, option)
+    queries = ["chunk 3", "chunk 42", "chunk 99"]
+
+    batch_results = batch_similarity_search(vector_store, queries, k=3)
+
+    for query, results in zip(queries, batch_results):
+        expected = vector_store.similarity_search_with_score(query, k=3)
+        assert [document.metadata["id"] for document, _ in results] == [
+            document.metadata["id"] for document, _ in expected
+        ]
+        assert [score for _, score in results] == pytest.approx([score for _, score in expected], abs=1e-5)
+
+
+def test_batch_similarity_search_embeds_queries_in_one_batch(corpus, mocker):
+    embeddings, documents = corpus
+    vectors = embeddings.embed_documents([document.page_content for document in documents])
+    vector_store = build_vector_store(embeddings, documents, vectors, "float32")
+    embed_query = mocker.spy(embeddings, "embed_query")
+    embed_queries = mocker.patch(
+        "src.core.data_processing.vector_index.embed_queries",
+        side_effect=lambda model, texts: model.embed_documents(texts),
+    )
+
+    results = batch_similarity_search(vector_store, ["chunk 1", "chunk 2"], k=1)
+
+    embed_queries.assert_called_once_with(embeddings, ["chunk 1", "chunk 2"])
+    embed_query.assert_not_called()
+    assert [[document.metadata["id"] for document, _ in query_results] for query_results in results] == [[1], [2]]
+
+
+def test_batch_similarity_search_uses_query_cache(corpus, mocker):
+    embeddings, documents = corpus
+    vectors = embeddings.embed_documents([document.page_content for document in documents])
+    vector_store = build_vector_store(embeddings, documents, vectors, "float32")
+    query_cache = mocker.Mock()
+    query_cache.get_query_embeddings.return_value = embeddings.embed_documents(["chunk 5"])
+
+    results = batch_similarity_search(vector_store, ["chunk 5"], k=1, query_cache=query_cache)
+
+    query_cache.get_query_embeddings.assert_called_once_with(embeddings, ["chunk 5"])
+    assert results[0][0][0].metadata["id"] == 5
+
+
+def test_batch_similarity_search_raises_vector_store_error(corpus, mocker):
+    embeddings, documents = corpus
+    vectors = embeddings.embed_documents([document.page_content for document in documents])
+    vector_store = build_vector_store(embeddings, documents, vectors, "float32")
+    mocker.patch("src.core.data_processing.vector_index.embed_queries", side_effect=RuntimeError("boom"))
+
+    with pytest.raises(VectorStoreError, match="Error during batch similarity search: boom"):
+        batch_similarity_search(vector_store, ["chunk 1"], k=1)
+
+
+def test_search_by_vectors_normalizes_copies_of_queries(corpus):
+    embeddings, documents = corpus
+    vectors = embeddings.embed_documents([document.page_content for document in documents])
+    vector_store = build_vector_store(embeddings, documents, vectors, "float32")
+    queries = np.asarray(embeddings.embed_documents(["chunk 7"]), dtype=np.float32) * 3
+
+    _, ids = search_by_vectors(vector_store, queries, k=1, normalize_L2=True)
+    distances, _ = search_by_vectors(vector_store, queries, k=1)
+
+    assert ids[0][0] == 7
+    assert np.linalg.norm(queries[0]) == pytest.approx(3.0)
+    assert distances[0][0] == pytest.approx(4.0, abs=1e-4)
@@ -0,0 +1,119 @@
+import os
+
+import numpy as np
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.core.data_processing.vector_index import build_vector_store
+from src.core.data_processing.vector_store_cache import INDEX_FILE_NAME, VectorStoreCache
+
+
+class HashEmbeddings(Embeddings):
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        generator = np.random.default_rng(sum(map(ord, text)))
+        return generator.normal(size=16).tolist()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return VectorStoreCache(str(tmp_path / "cache"), max_size_bytes=1024 * 1024)
+
+
+@pytest.fixture
+def vector_store():
+    documents = [
+        Document(page_content=f"chunk number {i}", metadata={"section": "Intro", "page": i}) for i in range(5)
+    ]
+    return FAISS.from_documents(documents, HashEmbeddings())
+
+
+def test_vector_store_cache_key_depends_on_bytes_and_config():
+    key = VectorStoreCache.make_key(b"pdf", {"a": 1, "b": 2})
+
+    assert key == VectorStoreCache.make_key(b"pdf", {"b": 2, "a": 1})
+    assert key != VectorStoreCache.make_key(b"other pdf", {"a": 1, "b": 2})
+    assert key != VectorStoreCache.make_key(b"pdf", {"a": 1, "b": 3})
+
+
+def test_vector_store_cache_returns_none_on_miss(cache):
+    assert cache.get(VectorStoreCache.make_key(b"pdf", {}), HashEmbeddings()) is None
+
+
+def test_vector_store_cache_returns_stored_vector_store(cache, vector_store):
+    key = VectorStoreCache.make_key(b"pdf", {})
+
+    cache.put(key, vector_store, "# Intro\n\nBody")
+    cached = cache.get(key, HashEmbeddings())
+
+    assert cached.text == "# Intro\n\nBody"
+    assert [document.metadata["page"] for document in cached.documents] == [0, 1, 2, 3, 4]
+    results = cached.vector_store.similarity_search("chunk number 3", k=1)
+    assert results[0].page_content == "chunk number 3"
+    assert results[0].metadata == {"section": "Intro", "page": 3}
+
+
+def mapped_files() -> set[str]:
+    with open("/proc/self/maps", "r", encoding="utf-8") as f:
+        return {line.split(maxsplit=5)[5].strip() for line in f if len(line.split(maxsplit=5)) == 6}
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/maps"), reason="Requires /proc/self/maps")
+@pytest.mark.parametrize("option", ["float32", "sq8"])
+def test_vector_store_cache_memory_maps_loaded_index(cache, option):
+    embeddings = HashEmbeddings()
+    documents = [Document(page_content=f"chunk number {i}") for i in range(5)]
+    vectors = embeddings.embed_documents([document.page_content for document in documents])
+    key = VectorStoreCache.make_key(b"pdf", {"option": option})
+    cache.put(key, build_vector_store(embeddings, documents, vectors, option), "text")
+
+    cached = cache.get(key, embeddings)
+
+    assert os.path.join(cache._entry_path(key), INDEX_FILE_NAME) in mapped_files()
+    assert cached.vector_store.similarity_search("chunk number 2", k=1)[0].page_content == "chunk number 2"
+
+
+def test_vector_store_cache_keeps_compressed_index(cache):
+    embeddings = HashEmbeddings()
+    documents = [Document(page_content=f"chunk number {i}") for i in range(20)]
+    vectors = embeddings.embed_documents([document.page_content for document in documents])
+    key = VectorStoreCache.make_key(b"pdf", {"index_option": "sq8"})
+
+    cache.put(key, build_vector_store(embeddings, documents, vectors, "sq8"), "text")
+    cached = cache.get(key, embeddings)
+
+    assert cached.vector_store.index.code_size == 16
+    assert cached.vector_store.similarity_search("chunk number 7", k=1)[0].page_content == "chunk number 7"
+
+
+def test_vector_store_cache_returns_none_on_corrupted_entry(cache, vector_store):
+    key = VectorStoreCache.make_key(b"pdf", {})
+    cache.put(key, vector_store, "text")
+
+    with open(os.path.join(cache._entry_path(key), INDEX_FILE_NAME), "wb") as f:
+        f.write(b"not an index")
+
+    assert cache.get(key, HashEmbeddings()) is None
+
+
+def test_vector_store_cache_evicts_least_recently_used_entries(tmp_path, vector_store):
+    keys = [VectorStoreCache.make_key(str(i).encode(), {}) for i in range(3)]
+    cache = VectorStoreCache(str(tmp_path / "cache"), max_size_bytes=1024 * 1024)
+    cache.put(keys[0], vector_store, "a")
+    entry_size = sum(entry.stat().st_size for entry in os.scandir(cache._entry_path(keys[0])))
+    cache.max_size_bytes = 2 * entry_size
+
+    cache.put(keys[1], vector_store, "b")
+    os.utime(os.path.join(cache._entry_path(keys[0]), INDEX_FILE_NAME), (0, 0))
+    os.utime(os.path.join(cache._entry_path(keys[1]), INDEX_FILE_NAME), (1, 1))
+    cache.get(keys[0], HashEmbeddings())
+
+    cache.put(keys[2], vector_store, "c")
+
+    assert cache.get(keys[0], HashEmbeddings()) is not None
+    assert cache.get(keys[1], HashEmbeddings()) is None
+    assert cache.get(keys[2], HashEmbeddings()) is not None
@@ -1,5 +1,7 @@
+import pytest
 from langchain_core.messages import HumanMessage
 
+from src.core.data_processing.bm25_index import BM25Index
 from src.core.graph.qa_graph import (
     BaseChatModel,
     CompiledStateGraph,
@@ -8,8 +10,19 @@ from src.core.graph.qa_graph import (
     VectorStore,
     build_qa_graph,
     generate,
+    reciprocal_rank_fusion,
     retrieve,
 )
+from src.core.models.query_embedding_cache import QueryEmbeddingCache
+from src.core.utils.singleton_meta import SingletonMeta
+
+
+@pytest.fixture(autouse=True)
+def reset_singleton_meta_instances():
+    with SingletonMeta._lock:
+        SingletonMeta._instances = {}
+
+    yield
 
 
 def test_retrieve(mocker):
@@ -36,6 +49,85 @@ def test_retrieve(mocker):
     ]
 
 
+def test_retrieve_filters_by_section(mocker):
+    mock_vector_store = mocker.Mock()
+    mock_vector_store.similarity_search.return_value = [Document(page_content="doc1")]
+
+    state = {
+        "question": "Test question",
+        "context": [],
+        "answer": None,
+        "section": "Title > Methods",
+    }
+
+    updated_state = retrieve(state, mock_vector_store, k_retrieved_docs=3)
+
+    assert updated_state["context"] == [Document(page_content="doc1")]
+    _, kwargs = mock_vector_store.similarity_search.call_args
+    assert kwargs["k"] == 3
+    assert kwargs["filter"]({"section": "Title > Methods > Data"})
+    assert not kwargs["filter"]({"section": "Title > Results"})
+
+
+def test_retrieve_reuses_cached_question_embedding(mocker):
+    mock_vector_store = mocker.Mock()
+    mock_vector_store.embeddings.model_name = "model"
+    mock_vector_store.embeddings.embed_query.return_value = [0.1, 0.2]
+    mock_vector_store.similarity_search_by_vector.return_value = [Document(page_content="doc1")]
+    query_cache = QueryEmbeddingCache(max_size=8)
+    state = {"question": "Test question", "context": [], "answer": None}
+
+    retrieve(state, mock_vector_store, k_retrieved_docs=3, query_cache=query_cache)
+    updated_state = retrieve(
+        {**state, "question": " Test  question"}, mock_vector_store, k_retrieved_docs=3, query_cache=query_cache
+    )
+
+    assert updated_state["context"] == [Document(page_content="doc1")]
+    mock_vector_store.embeddings.embed_query.assert_called_once_with("Test question")
+    mock_vector_store.similarity_search_by_vector.assert_called_with([0.1, 0.2], k=3)
+    mock_vector_store.similarity_search.assert_not_called()
+    assert query_cache.stats()["hits"] == 1
+
+
+def test_retrieve_fuses_dense_and_keyword_results(mocker):
+    chunks = [
+        Document(page_content="The model is trained end to end.", metadata={"section": "Methods"}),
+        Document(page_content="We evaluate on the SQuAD dataset.", metadata={"section": "Results"}),
+        Document(page_content="Related work on question answering.", metadata={"section": "Intro"}),
+    ]
+    mock_vector_store = mocker.Mock()
+    mock_vector_store.similarity_search.return_value = [chunks[0], chunks[2]]
+    state = {"question": "SQuAD", "context": [], "answer": None}
+
+    updated_state = retrieve(state, mock_vector_store, k_retrieved_docs=2, keyword_index=BM25Index(chunks))
+
+    assert updated_state["context"] == [chunks[0], chunks[1]]
+    _, kwargs = mock_vector_store.similarity_search.call_args
+    assert kwargs["k"] == 20
+
+
+def test_retrieve_applies_section_filter_to_keyword_results(mocker):
+    chunks = [
+        Document(page_content="SQuAD results.", metadata={"section": "Results"}),
+        Document(page_content="SQuAD preprocessing.", metadata={"section": "Methods"}),
+    ]
+    mock_vector_store = mocker.Mock()
+    mock_vector_store.similarity_search.return_value = []
+    state = {"question": "SQuAD", "context": [], "answer": None, "section": "Methods"}
+
+    updated_state = retrieve(state, mock_vector_store, k_retrieved_docs=2, keyword_index=BM25Index(chunks))
+
+    assert updated_state["context"] == [chunks[1]]
+
+
+def test_reciprocal_rank_fusion_rewards_chunks_ranked_by_both():
+    a, b, c, d = (Document(page_content=text) for text in "abcd")
+
+    fused = reciprocal_rank_fusion([[a, b, c], [b, d, Document(page_content="a")]])
+
+    assert fused == [b, a, d, c]
+
+
 def test_generate_with_history(mocker):
     test_question = "Test question"
     test_docs = [
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from src.core.models.bucketed_embeddings import LengthBucketedEmbeddings, make_length_buckets
+
+
+@pytest.fixture
+def mock_huggingface_embeddings(mocker):
+    embeddings = mocker.Mock()
+    embeddings.model_name = "model"
+    embeddings.encode_kwargs = {}
+    embeddings._client.max_seq_length = 8
+    embeddings._client.tokenizer.side_effect = lambda texts, **kwargs: {
+        "input_ids": [text.split()[: kwargs["max_length"]] for text in texts]
+    }
+    embeddings._client.encode.side_effect = lambda texts, **kwargs: np.array(
+        [[float(len(text.split())), 0.0] for text in texts]
+    )
+    return embeddings
+
+
+def test_make_length_buckets_groups_texts_under_token_budget():
+    batches = make_length_buckets([2, 8, 3, 8, 1], token_budget=16)
+
+    assert batches == [[1, 3], [2, 0, 4]]
+    assert sorted(index for batch in batches for index in batch) == [0, 1, 2, 3, 4]
+
+
+def test_make_length_buckets_keeps_texts_longer_than_budget_alone():
+    assert make_length_buckets([10, 10, 1], token_budget=4) == [[0], [1], [2]]
+
+
+def test_make_length_buckets_handles_no_texts():
+    assert make_length_buckets([], token_budget=16) == []
+
+
+def test_length_bucketed_embeddings_restore_original_order(mock_huggingface_embeddings):
+    embeddings = LengthBucketedEmbeddings(mock_huggingface_embeddings, token_budget=6)
+    texts = ["a", "a b c", "a b", "a b c d"]
+
+    vectors = embeddings.embed_documents(texts)
+
+    assert vectors == [[1.0, 0.0], [3.0, 0.0], [2.0, 0.0], [4.0, 0.0]]
+    encoded_batches = [call.args[0] for call in mock_huggingface_embeddings._client.encode.call_args_list]
+    assert encoded_batches == [["a b c d"], ["a b c", "a b"], ["a"]]
+
+
+def test_length_bucketed_embeddings_replace_newlines(mock_huggingface_embeddings):
+    embeddings = LengthBucketedEmbeddings(mock_huggingface_embeddings, token_budget=64)
+
+    embeddings.embed_documents(["a\nb"])
+
+    mock_huggingface_embeddings._client.encode.assert_called_once_with(
+        ["a b"], batch_size=1, show_progress_bar=False, convert_to_numpy=True
+    )
+
+
+def test_length_bucketed_embeddings_override_configured_batch_size(mock_huggingface_embeddings):
+    mock_huggingface_embeddings.encode_kwargs = {"batch_size": 32, "normalize_embeddings": True}
+    embeddings = LengthBucketedEmbeddings(mock_huggingface_embeddings, token_budget=64)
+
+    embeddings.embed_documents(["a b", "c"])
+
+    mock_huggingface_embeddings._client.encode.assert_called_once_with(
+        ["a b", "c"], batch_size=2, normalize_embeddings=True, show_progress_bar=False, convert_to_numpy=True
+    )
+
+
+def test_length_bucketed_embeddings_report_throughput(mock_huggingface_embeddings):
+    embeddings = LengthBucketedEmbeddings(mock_huggingface_embeddings, token_budget=6)
+
+    embeddings.embed_documents(["a", "a b c", "a b", "a b c d"])
+    stats = embeddings.stats()
+
+    assert stats["tokens"] == 10
+    assert stats["padded_tokens"] == 4 + 2 * 3 + 1
+    assert stats["padding_ratio"] == pytest.approx(1.1)
+    assert stats["seconds"] > 0
+    assert stats["tokens_per_second"] == pytest.approx(10 / stats["seconds"])
+
+
+def test_length_bucketed_embeddings_skip_empty_input(mock_huggingface_embeddings):
+    embeddings = LengthBucketedEmbeddings(mock_huggingface_embeddings, token_budget=6)
+
+    assert embeddings.embed_documents([]) == []
+    mock_huggingface_embeddings._client.encode.assert_not_called()
+    assert embeddings.stats()["tokens_per_second"] == 0.0
+
+
+def test_length_bucketed_embeddings_pass_queries_through(mock_huggingface_embeddings):
+    mock_huggingface_embeddings.embed_query.return_value = [0.5, 0.5]
+    embeddings = LengthBucketedEmbeddings(mock_huggingface_embeddings, token_budget=6)
+
+    assert embeddings.embed_query("query") == [0.5, 0.5]
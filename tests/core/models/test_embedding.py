@@ -1,16 +1,25 @@
+import gc
+
 import pytest
 
-from src.core.models.embedding import EmbeddingError, EmbeddingModel
-from src.core.utils.singleton_meta import SingletonMeta
+from src.core.models.embedding import (
+    CachedEmbeddings,
+    EmbeddingError,
+    EmbeddingModel,
+    EmbeddingScheduler,
+    LengthBucketedEmbeddings,
+)
+from src.core.utils.model_registry import ModelRegistryMeta
 
 
 @pytest.fixture(autouse=True)
-def reset_singleton_meta_instances():
-    with SingletonMeta._lock:
-        SingletonMeta._instances = {}
+def reset_model_registry():
+    ModelRegistryMeta.clear()
 
     yield
 
+    ModelRegistryMeta.clear()
+
 
 def test_embedding_model_initializes_on_first_call(mocker):
     mock_huggingface_embeddings_class = mocker.patch(
@@ -56,4 +65,195 @@ def test_embedding_model_initialization_error(mocker):
     mock_huggingface_embeddings_class.assert_called_once_with(
         model_name=mocker.ANY, model_kwargs={"device": "cpu", "trust_remote_code": True}
     )
-    assert not SingletonMeta._instances
+    assert ModelRegistryMeta.stats()["instances"] == 0
+
+
+def test_embedding_model_wraps_model_in_cache_when_cache_dir_is_set(mocker, tmp_path):
+    mock_huggingface_embeddings_class = mocker.patch(
+        "src.core.models.embedding.HuggingFaceEmbeddings"
+    )
+
+    embedding_model = EmbeddingModel(model_name="model", cache_dir=str(tmp_path))
+
+    assert isinstance(embedding_model.model, CachedEmbeddings)
+    assert embedding_model.model.embeddings is mock_huggingface_embeddings_class.return_value
+    assert embedding_model.model.cache.model_name == "model"
+
+
+def test_embedding_model_batches_cache_misses_by_length_when_token_budget_is_set(mocker, tmp_path):
+    mock_huggingface_embeddings_class = mocker.patch(
+        "src.core.models.embedding.HuggingFaceEmbeddings"
+    )
+
+    embedding_model = EmbeddingModel(model_name="model", cache_dir=str(tmp_path), token_budget=1024)
+
+    assert isinstance(embedding_model.model, CachedEmbeddings)
+    assert isinstance(embedding_model.model.embeddings, LengthBucketedEmbeddings)
+    assert embedding_model.model.embeddings.embeddings is mock_huggingface_embeddings_class.return_value
+    assert embedding_model.model.embeddings.token_budget == 1024
+    assert embedding_model.get_throughput_stats()["tokens"] == 0
+
+
+def test_embedding_model_has_no_throughput_stats_without_token_budget(mocker):
+    mocker.patch("src.core.models.embedding.HuggingFaceEmbeddings")
+
+    assert EmbeddingModel().get_throughput_stats() is None
+
+
+@pytest.mark.parametrize(
+    "backend, quantized, file_name",
+    [("onnx", False, "onnx/model.onnx"), ("onnx-int8", True, "onnx/model_qint8_avx2.onnx")],
+)
+def test_embedding_model_loads_onnx_export_for_onnx_backends(mocker, backend, quantized, file_name):
+    mock_huggingface_embeddings_class = mocker.patch(
+        "src.core.models.embedding.HuggingFaceEmbeddings"
+    )
+    mock_export_onnx_model = mocker.patch(
+        "src.core.models.embedding.export_onnx_model", return_value="onnx_dir/model"
+    )
+
+    embedding_model = EmbeddingModel(model_name="model", backend=backend, onnx_dir="onnx_dir")
+
+    mock_export_onnx_model.assert_called_once_with("model", "onnx_dir", quantize=quantized)
+    mock_huggingface_embeddings_class.assert_called_once_with(
+        model_name="onnx_dir/model",
+        model_kwargs={
+            "device": "cpu",
+            "trust_remote_code": True,
+            "backend": "onnx",
+            "model_kwargs": {"file_name": file_name},
+        },
+    )
+    assert embedding_model.model is mock_huggingface_embeddings_class.return_value
+
+
+def test_embedding_model_keeps_separate_cache_per_backend(mocker, tmp_path):
+    mocker.patch("src.core.models.embedding.HuggingFaceEmbeddings")
+    mocker.patch("src.core.models.embedding.export_onnx_model", return_value="onnx_dir/model")
+
+    embedding_model = EmbeddingModel(model_name="model", cache_dir=str(tmp_path), backend="onnx-int8")
+
+    assert embedding_model.model.cache.model_name == "model@onnx-int8"
+
+
+def test_embedding_model_rejects_unknown_backend(mocker):
+    mock_huggingface_embeddings_class = mocker.patch(
+        "src.core.models.embedding.HuggingFaceEmbeddings"
+    )
+
+    with pytest.raises(ValueError, match="Unknown embedding backend"):
+        EmbeddingModel(backend="tensorrt")
+
+    mock_huggingface_embeddings_class.assert_not_called()
+    assert ModelRegistryMeta.stats()["instances"] == 0
+
+
+def test_embedding_model_export_error(mocker):
+    mocker.patch("src.core.models.embedding.HuggingFaceEmbeddings")
+    export_error = RuntimeError("Simulated export error")
+    mocker.patch("src.core.models.embedding.export_onnx_model", side_effect=export_error)
+
+    with pytest.raises(EmbeddingError) as excinfo:
+        EmbeddingModel(backend="onnx")
+
+    assert excinfo.value.__cause__ is export_error
+
+
+def test_embedding_model_schedules_micro_batches_when_batch_window_is_set(mocker):
+    mock_huggingface_embeddings_class = mocker.patch(
+        "src.core.models.embedding.HuggingFaceEmbeddings"
+    )
+    mock_huggingface_embeddings_class.return_value.query_encode_kwargs = {}
+
+    embedding_model = EmbeddingModel(batch_window_ms=5, max_batch_size=32, max_document_batch_size=8)
+
+    assert isinstance(embedding_model.model, EmbeddingScheduler)
+    assert embedding_model.model is embedding_model.scheduler
+    assert embedding_model.model.embeddings is mock_huggingface_embeddings_class.return_value
+    assert embedding_model.model.batch_window_seconds == 0.005
+    assert embedding_model.model.max_batch_size == 32
+    assert embedding_model.model.max_document_batch_size == 8
+    assert embedding_model.model.queries_as_documents
+    embedding_model.scheduler.close()
+
+
+def test_embedding_model_hosts_one_instance_per_configuration(mocker):
+    mock_huggingface_embeddings_class = mocker.patch(
+        "src.core.models.embedding.HuggingFaceEmbeddings"
+    )
+    mock_process_pool_embeddings_class = mocker.patch("src.core.models.embedding.ProcessPoolEmbeddings")
+
+    model_a = EmbeddingModel(model_name="a")
+    model_b = EmbeddingModel(model_name="b")
+    pooled_model_a = EmbeddingModel(model_name="a", num_workers=8, token_budget=1024)
+
+    assert model_a is not model_b
+    assert pooled_model_a is not model_a
+    assert pooled_model_a.model is mock_process_pool_embeddings_class.return_value
+    assert model_a is EmbeddingModel(model_name="a")
+    assert pooled_model_a is EmbeddingModel(model_name="a", num_workers=8, token_budget=1024)
+    assert mock_huggingface_embeddings_class.call_count == 2
+
+
+def test_embedding_model_evicted_while_in_use_keeps_embedding(mocker):
+    mock_huggingface_embeddings_class = mocker.patch("src.core.models.embedding.HuggingFaceEmbeddings")
+    mock_huggingface_embeddings_class.return_value.query_encode_kwargs = {}
+    mock_huggingface_embeddings_class.return_value.embed_documents.side_effect = lambda texts: [[1.0] for _ in texts]
+    ModelRegistryMeta.configure(memory_budget_bytes=100, idle_timeout_seconds=None)
+    mocker.patch.object(EmbeddingModel, "memory_footprint", return_value=80)
+    try:
+        embedding_model = EmbeddingModel(model_name="a", batch_window_ms=5)
+        model = embedding_model.model
+
+        EmbeddingModel(model_name="b", batch_window_ms=5)
+
+        assert ModelRegistryMeta.stats()["instances"] == 1
+        assert embedding_model.model is model
+        assert embedding_model.model.embed_documents(["chunk"]) == [[1.0]]
+        assert EmbeddingModel(model_name="a", batch_window_ms=5) is embedding_model
+    finally:
+        ModelRegistryMeta.configure(memory_budget_bytes=None, idle_timeout_seconds=None)
+
+
+def test_embedding_model_stops_scheduler_once_released(mocker):
+    mocker.patch("src.core.models.embedding.HuggingFaceEmbeddings")
+    embedding_model = EmbeddingModel(batch_window_ms=5)
+    worker = embedding_model.scheduler._worker
+
+    ModelRegistryMeta.clear()
+    del embedding_model
+    gc.collect()
+    worker.join(timeout=2)
+
+    assert not worker.is_alive()
+
+
+def test_embedding_model_shards_chunks_across_worker_processes_when_num_workers_is_set(mocker):
+    mock_huggingface_embeddings_class = mocker.patch(
+        "src.core.models.embedding.HuggingFaceEmbeddings"
+    )
+    mock_process_pool_embeddings_class = mocker.patch("src.core.models.embedding.ProcessPoolEmbeddings")
+
+    embedding_model = EmbeddingModel(model_name="model", num_workers=4, threads_per_worker=2, token_budget=1024)
+
+    mock_huggingface_embeddings_class.assert_not_called()
+    mock_process_pool_embeddings_class.assert_called_once_with(
+        "model",
+        {"device": "cpu", "trust_remote_code": True},
+        num_workers=4,
+        threads_per_worker=2,
+        min_shard_size=16,
+        token_budget=1024,
+    )
+    assert embedding_model.model is mock_process_pool_embeddings_class.return_value
+    assert embedding_model.memory_footprint() is mock_process_pool_embeddings_class.return_value.memory_footprint()
+
+
+def test_embedding_model_runs_in_process_when_num_workers_is_zero(mocker):
+    mock_huggingface_embeddings_class = mocker.patch("src.core.models.embedding.HuggingFaceEmbeddings")
+    mock_process_pool_embeddings_class = mocker.patch("src.core.models.embedding.ProcessPoolEmbeddings")
+
+    embedding_model = EmbeddingModel(num_workers=0)
+
+    mock_process_pool_embeddings_class.assert_not_called()
+    assert embedding_model.model is mock_huggingface_embeddings_class.return_value
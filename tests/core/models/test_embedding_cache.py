@@ -0,0 +1,132 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from src.core.exceptions import EmbeddingError
+from src.core.models.embedding_cache import CachedEmbeddings, EmbeddingCache, make_chunk_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(str(tmp_path), "model")
+
+
+@pytest.fixture
+def mock_embeddings(mocker):
+    embeddings = mocker.Mock()
+    embeddings.embed_documents.side_effect = lambda texts: [[float(len(text)), 1.0] for text in texts]
+    return embeddings
+
+
+def test_make_chunk_key_ignores_whitespace_and_unicode_form():
+    assert make_chunk_key("Café  au\nlait ") == make_chunk_key("Café au lait")
+    assert make_chunk_key("chunk one") != make_chunk_key("chunk two")
+
+
+def test_embedding_cache_returns_stored_vectors(cache):
+    cache.put_many(["a", "bb"], [[1.0, 2.0], [3.0, 4.0]])
+
+    vectors = cache.get_many(["bb", "missing", "a"])
+
+    np.testing.assert_array_equal(vectors[0], [3.0, 4.0])
+    assert vectors[1] is None
+    np.testing.assert_array_equal(vectors[2], [1.0, 2.0])
+
+
+def test_embedding_cache_persists_across_reopening(tmp_path):
+    EmbeddingCache(str(tmp_path), "model").put_many(["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+
+    reopened = EmbeddingCache(str(tmp_path), "model")
+
+    assert len(reopened) == 2
+    np.testing.assert_array_equal(reopened.get_many(["b"])[0], [3.0, 4.0])
+    assert len(EmbeddingCache(str(tmp_path), "other model")) == 0
+
+
+def test_embedding_cache_ignores_vectors_without_index_entry(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "model")
+    cache.put_many(["a"], [[1.0, 2.0]])
+    with open(cache._vectors_path, "ab") as f:
+        f.write(np.asarray([9.0], dtype=np.float32).tobytes())
+
+    reopened = EmbeddingCache(str(tmp_path), "model")
+    reopened.put_many(["b"], [[3.0, 4.0]])
+
+    np.testing.assert_array_equal(reopened.get_many(["a"])[0], [1.0, 2.0])
+    np.testing.assert_array_equal(reopened.get_many(["b"])[0], [3.0, 4.0])
+
+
+def test_embedding_cache_appends_after_rows_written_by_another_instance(tmp_path):
+    first = EmbeddingCache(str(tmp_path), "model")
+    second = EmbeddingCache(str(tmp_path), "model")
+
+    first.put_many(["a"], [[1.0, 2.0]])
+    second.put_many(["b"], [[3.0, 4.0]])
+
+    np.testing.assert_array_equal(first.get_many(["b"])[0], [3.0, 4.0])
+    np.testing.assert_array_equal(second.get_many(["a"])[0], [1.0, 2.0])
+    reopened = EmbeddingCache(str(tmp_path), "model")
+    assert len(reopened) == 2
+    np.testing.assert_array_equal(reopened.get_many(["a"])[0], [1.0, 2.0])
+
+
+def _put_chunks(cache_dir, prefix, batches):
+    cache = EmbeddingCache(cache_dir, "model")
+    for batch in range(batches):
+        texts = [f"{prefix} {batch} {row}" for row in range(5)]
+        cache.put_many(texts, [[float(batch), float(row), float(len(prefix))] for row in range(5)])
+
+
+def test_embedding_cache_is_shared_by_concurrent_processes(tmp_path):
+    context = multiprocessing.get_context("fork")
+    writers = [
+        context.Process(target=_put_chunks, args=(str(tmp_path), prefix, 40)) for prefix in ("web", "ingest")
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join(timeout=60)
+        assert writer.exitcode == 0
+
+    cache = EmbeddingCache(str(tmp_path), "model")
+    assert len(cache) == 400
+    for prefix in ("web", "ingest"):
+        texts = [f"{prefix} {batch} {row}" for batch in range(40) for row in range(5)]
+        expected = [[float(batch), float(row), float(len(prefix))] for batch in range(40) for row in range(5)]
+        np.testing.assert_array_equal(cache.get_many(texts), expected)
+
+
+def test_embedding_cache_rejects_dimension_mismatch(cache):
+    cache.put_many(["a"], [[1.0, 2.0]])
+
+    with pytest.raises(EmbeddingError, match="does not match the cache dimension 2"):
+        cache.put_many(["b"], [[1.0, 2.0, 3.0]])
+
+
+def test_cached_embeddings_only_embeds_missing_chunks(cache, mock_embeddings):
+    cached_embeddings = CachedEmbeddings(mock_embeddings, cache)
+    cached_embeddings.embed_documents(["known"])
+
+    vectors = cached_embeddings.embed_documents(["new", "known", "new"])
+
+    assert vectors == [[3.0, 1.0], [5.0, 1.0], [3.0, 1.0]]
+    assert mock_embeddings.embed_documents.call_args_list[-1].args == (["new"],)
+    assert (cached_embeddings.hits, cached_embeddings.misses) == (1, 2)
+
+
+def test_cached_embeddings_skips_model_when_all_chunks_are_cached(cache, mock_embeddings):
+    CachedEmbeddings(mock_embeddings, cache).embed_documents(["a", "b"])
+    mock_embeddings.reset_mock()
+
+    vectors = CachedEmbeddings(mock_embeddings, cache).embed_documents(["a", "b"])
+
+    assert vectors == [[1.0, 1.0], [1.0, 1.0]]
+    mock_embeddings.embed_documents.assert_not_called()
+
+
+def test_cached_embeddings_does_not_cache_queries(cache, mock_embeddings):
+    mock_embeddings.embed_query.return_value = [0.5, 0.5]
+
+    assert CachedEmbeddings(mock_embeddings, cache).embed_query("query") == [0.5, 0.5]
+    assert len(cache) == 0
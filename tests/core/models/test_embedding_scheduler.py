@@ -0,0 +1,140 @@
+import threading
+import time
+
+import pytest
+
+from src.core.models.embedding_scheduler import EmbeddingScheduler
+
+
+@pytest.fixture
+def mock_embeddings(mocker):
+    embeddings = mocker.Mock()
+    embeddings.embed_documents.side_effect = lambda texts: [[float(len(text))] for text in texts]
+    embeddings.embed_query.side_effect = lambda text: [-float(len(text))]
+    return embeddings
+
+
+@pytest.fixture
+def make_scheduler(mock_embeddings):
+    schedulers = []
+
+    def make(**kwargs):
+        kwargs = {"batch_window_seconds": 0.2, "max_batch_size": 64, **kwargs}
+        scheduler = EmbeddingScheduler(mock_embeddings, **kwargs)
+        schedulers.append(scheduler)
+        return scheduler
+
+    yield make
+
+    for scheduler in schedulers:
+        scheduler.close()
+
+
+def run_concurrently(functions):
+    results = [None] * len(functions)
+    barrier = threading.Barrier(len(functions))
+
+    def run(index):
+        barrier.wait()
+        results[index] = functions[index]()
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(len(functions))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_embedding_scheduler_merges_concurrent_requests(make_scheduler, mock_embeddings):
+    scheduler = make_scheduler()
+
+    results = run_concurrently(
+        [
+            lambda: scheduler.embed_documents(["a", "bb"]),
+            lambda: scheduler.embed_documents(["ccc"]),
+            lambda: scheduler.embed_query("dddd"),
+        ]
+    )
+
+    assert results == [[[1.0], [2.0]], [[3.0]], [4.0]]
+    mock_embeddings.embed_documents.assert_called_once()
+    assert sorted(mock_embeddings.embed_documents.call_args.args[0]) == ["a", "bb", "ccc", "dddd"]
+    assert scheduler.stats()["batches"] == 1
+    assert scheduler.stats()["requests"] == 3
+
+
+def test_embedding_scheduler_embeds_queries_separately_if_encoded_differently(make_scheduler, mock_embeddings):
+    scheduler = make_scheduler(queries_as_documents=False)
+
+    results = run_concurrently([lambda: scheduler.embed_documents(["a", "bb"]), lambda: scheduler.embed_query("ccc")])
+
+    assert results == [[[1.0], [2.0]], [-3.0]]
+    mock_embeddings.embed_documents.assert_called_once_with(["a", "bb"])
+    mock_embeddings.embed_query.assert_called_once_with("ccc")
+
+
+def test_embedding_scheduler_respects_max_batch_size(make_scheduler, mock_embeddings):
+    scheduler = make_scheduler(max_batch_size=3)
+
+    results = run_concurrently([lambda: scheduler.embed_documents(["a", "bb"]) for _ in range(3)])
+
+    assert results == [[[1.0], [2.0]]] * 3
+    assert mock_embeddings.embed_documents.call_count == 2
+    assert all(len(call.args[0]) == 3 for call in mock_embeddings.embed_documents.call_args_list)
+    assert scheduler.stats()["requests"] == 3
+
+
+def test_embedding_scheduler_splits_large_document_requests(make_scheduler, mock_embeddings):
+    scheduler = make_scheduler(batch_window_seconds=0.0, max_document_batch_size=4)
+    texts = ["x" * length for length in range(1, 11)]
+
+    assert scheduler.embed_documents(texts) == [[float(length)] for length in range(1, 11)]
+    assert [len(call.args[0]) for call in mock_embeddings.embed_documents.call_args_list] == [4, 4, 2]
+    assert scheduler.stats()["requests"] == 1
+
+
+def test_embedding_scheduler_embeds_queries_ahead_of_large_document_requests(make_scheduler, mock_embeddings):
+    def slow_embed_documents(texts):
+        time.sleep(0.002 * len(texts))
+        return [[float(len(text))] for text in texts]
+
+    mock_embeddings.embed_documents.side_effect = slow_embed_documents
+    scheduler = make_scheduler(batch_window_seconds=0.0, max_document_batch_size=16)
+    document_texts = [f"chunk {index}" for index in range(500)]
+    document_results = []
+    documents = threading.Thread(target=lambda: document_results.append(scheduler.embed_documents(document_texts)))
+    documents.start()
+    time.sleep(0.05)
+
+    started_at = time.perf_counter()
+    query_result = scheduler.embed_query("query")
+    query_seconds = time.perf_counter() - started_at
+    documents.join()
+
+    assert query_result == [5.0]
+    # Embedding all documents takes about a second, a document micro-batch about 32ms.
+    assert query_seconds < 0.25
+    assert document_results == [[[float(len(text))] for text in document_texts]]
+    assert max(len(call.args[0]) for call in mock_embeddings.embed_documents.call_args_list) <= 17
+
+
+def test_embedding_scheduler_propagates_errors_to_the_batch(make_scheduler, mock_embeddings):
+    scheduler = make_scheduler(batch_window_seconds=0.0)
+    embedding_error = RuntimeError("Simulated embedding error")
+    mock_embeddings.embed_documents.side_effect = embedding_error
+
+    with pytest.raises(RuntimeError) as excinfo:
+        scheduler.embed_documents(["a"])
+
+    assert excinfo.value is embedding_error
+    mock_embeddings.embed_documents.side_effect = None
+    mock_embeddings.embed_documents.return_value = [[1.0]]
+    assert scheduler.embed_documents(["a"]) == [[1.0]]
+
+
+def test_embedding_scheduler_skips_empty_requests(make_scheduler, mock_embeddings):
+    scheduler = make_scheduler()
+
+    assert scheduler.embed_documents([]) == []
+    mock_embeddings.embed_documents.assert_not_called()
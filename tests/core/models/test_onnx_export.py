@@ -0,0 +1,60 @@
+import sys
+
+import pytest
+
+from src.core.models.onnx_export import export_onnx_model, get_onnx_file_name, get_onnx_model_dir
+
+
+@pytest.fixture
+def mock_sentence_transformers(mocker):
+    module = mocker.MagicMock()
+    mocker.patch.dict(sys.modules, {"sentence_transformers": module})
+    return module
+
+
+def test_get_onnx_model_dir_flattens_model_name():
+    assert get_onnx_model_dir("onnx", "org/model") == "onnx/org__model"
+
+
+def test_get_onnx_file_name():
+    assert get_onnx_file_name(quantized=False) == "onnx/model.onnx"
+    assert get_onnx_file_name(quantized=True) == "onnx/model_qint8_avx2.onnx"
+
+
+def test_export_onnx_model_exports_and_quantizes(mock_sentence_transformers, tmp_path):
+    model = mock_sentence_transformers.SentenceTransformer.return_value
+
+    model_dir = export_onnx_model("org/model", str(tmp_path), quantize=True)
+
+    assert model_dir == str(tmp_path / "org__model")
+    mock_sentence_transformers.SentenceTransformer.assert_called_once_with(
+        "org/model", backend="onnx", trust_remote_code=True
+    )
+    model.save.assert_called_once_with(model_dir)
+    mock_sentence_transformers.export_dynamic_quantized_onnx_model.assert_called_once_with(model, "avx2", model_dir)
+
+
+def test_export_onnx_model_reuses_existing_export(mock_sentence_transformers, tmp_path):
+    onnx_model_dir = tmp_path / "org__model" / "onnx"
+    onnx_model_dir.mkdir(parents=True)
+    (onnx_model_dir / "model.onnx").touch()
+    (onnx_model_dir / "model_qint8_avx2.onnx").touch()
+
+    export_onnx_model("org/model", str(tmp_path), quantize=True)
+
+    mock_sentence_transformers.SentenceTransformer.assert_not_called()
+    mock_sentence_transformers.export_dynamic_quantized_onnx_model.assert_not_called()
+
+
+def test_export_onnx_model_quantizes_existing_export(mock_sentence_transformers, tmp_path):
+    onnx_model_dir = tmp_path / "org__model" / "onnx"
+    onnx_model_dir.mkdir(parents=True)
+    (onnx_model_dir / "model.onnx").touch()
+
+    model_dir = export_onnx_model("org/model", str(tmp_path), quantize=True)
+
+    mock_sentence_transformers.SentenceTransformer.assert_called_once_with(
+        model_dir, backend="onnx", trust_remote_code=True
+    )
+    mock_sentence_transformers.SentenceTransformer.return_value.save.assert_not_called()
+    mock_sentence_transformers.export_dynamic_quantized_onnx_model.assert_called_once()
@@ -0,0 +1,137 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from src.core.exceptions import EmbeddingError
+from src.core.models import process_pool_embeddings
+from src.core.models.process_pool_embeddings import ProcessPoolEmbeddings, split_shards
+
+
+class InlineExecutor:
+    def __init__(self, *args, initializer=None, initargs=(), **kwargs):
+        self.submitted = []
+        initializer(*initargs)
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, *args, **kwargs):
+        pass
+
+
+@pytest.fixture
+def mock_huggingface_embeddings(mocker):
+    mocker.patch("src.core.models.process_pool_embeddings.torch")
+    mock_huggingface_embeddings_class = mocker.patch(
+        "src.core.models.process_pool_embeddings.HuggingFaceEmbeddings"
+    )
+    model = mock_huggingface_embeddings_class.return_value
+    model.embed_documents.side_effect = lambda texts: [[float(len(text))] for text in texts]
+    model.embed_query.side_effect = lambda text: [-float(len(text))]
+    return mock_huggingface_embeddings_class
+
+
+def make_embeddings(mocker, **kwargs):
+    mocker.patch("src.core.models.process_pool_embeddings.ProcessPoolExecutor", InlineExecutor)
+    kwargs = {"num_workers": 2, "threads_per_worker": 3, "min_shard_size": 2, **kwargs}
+    return ProcessPoolEmbeddings("model", {"device": "cpu"}, **kwargs)
+
+
+def test_split_shards_covers_all_items_in_order():
+    assert split_shards(10, 4, 2) == [(0, 3), (3, 6), (6, 9), (9, 10)]
+    assert split_shards(5, 4, 4) == [(0, 4), (4, 5)]
+    assert split_shards(0, 4, 2) == []
+
+
+def test_process_pool_embeddings_shard_chunks_and_keep_order(mocker, mock_huggingface_embeddings):
+    embeddings = make_embeddings(mocker)
+
+    vectors = embeddings.embed_documents(["a", "bb", "ccc", "dddd", "eeeee"])
+
+    assert vectors == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert embeddings.executor.submitted == [(["a", "bb", "ccc"],), (["dddd", "eeeee"],)]
+
+
+def test_process_pool_embeddings_initialize_workers(mocker, mock_huggingface_embeddings):
+    make_embeddings(mocker)
+
+    mock_huggingface_embeddings.assert_called_once_with(model_name="model", model_kwargs={"device": "cpu"})
+    process_pool_embeddings.torch.set_num_threads.assert_called_once_with(3)
+
+
+def test_process_pool_embeddings_bucket_chunks_in_workers_when_token_budget_is_set(
+    mocker, mock_huggingface_embeddings
+):
+    make_embeddings(mocker, token_budget=512)
+
+    assert isinstance(process_pool_embeddings._worker_model, process_pool_embeddings.LengthBucketedEmbeddings)
+    assert process_pool_embeddings._worker_model.token_budget == 512
+
+
+def test_process_pool_embeddings_memory_footprint_counts_every_worker_without_starting_them(mocker, tmp_path):
+    mock_executor_class = mocker.patch("src.core.models.process_pool_embeddings.ProcessPoolExecutor")
+    (tmp_path / "model.safetensors").write_bytes(b"0" * 1000)
+    (tmp_path / "pytorch_model.bin").write_bytes(b"0" * 5000)
+    embeddings = ProcessPoolEmbeddings(str(tmp_path), {}, num_workers=3, threads_per_worker=1, min_shard_size=1)
+
+    assert embeddings.memory_footprint() == 3000
+    mock_executor_class.return_value.submit.assert_not_called()
+
+
+def test_estimate_weight_file_bytes_measures_requested_file(tmp_path):
+    (tmp_path / "onnx").mkdir()
+    (tmp_path / "onnx" / "model.onnx").write_bytes(b"0" * 700)
+    (tmp_path / "model.safetensors").write_bytes(b"0" * 1000)
+
+    assert process_pool_embeddings.estimate_weight_file_bytes(str(tmp_path), "onnx/model.onnx") == 700
+    assert process_pool_embeddings.estimate_weight_file_bytes(str(tmp_path)) == 1000
+
+
+def test_estimate_weight_file_bytes_returns_zero_for_uncached_hub_model(mocker):
+    mocker.patch(
+        "src.core.models.process_pool_embeddings.snapshot_download", side_effect=FileNotFoundError("not cached")
+    )
+
+    assert process_pool_embeddings.estimate_weight_file_bytes("org/model") == 0
+
+
+def test_process_pool_embeddings_embed_query_in_worker(mocker, mock_huggingface_embeddings):
+    embeddings = make_embeddings(mocker)
+
+    assert embeddings.embed_query("query") == [-5.0]
+
+
+def test_process_pool_embeddings_skip_empty_input(mocker, mock_huggingface_embeddings):
+    embeddings = make_embeddings(mocker)
+
+    assert embeddings.embed_documents([]) == []
+    assert embeddings.executor.submitted == []
+
+
+def test_process_pool_embeddings_recreate_broken_pool(mocker):
+    mock_executor_class = mocker.patch("src.core.models.process_pool_embeddings.ProcessPoolExecutor")
+    broken_executor = mocker.Mock()
+    broken_executor.submit.side_effect = BrokenProcessPool("worker died")
+    mock_executor_class.side_effect = [broken_executor, mocker.Mock()]
+
+    embeddings = ProcessPoolEmbeddings("model", {}, num_workers=2, threads_per_worker=1, min_shard_size=1)
+    with pytest.raises(EmbeddingError, match="Embedding worker pool crashed"):
+        embeddings.embed_documents(["a", "b"])
+
+    broken_executor.shutdown.assert_called_once()
+    assert embeddings.executor is not broken_executor
+
+
+def test_process_pool_embeddings_wrap_worker_errors(mocker):
+    mock_executor_class = mocker.patch("src.core.models.process_pool_embeddings.ProcessPoolExecutor")
+    future = Future()
+    future.set_exception(RuntimeError("Simulated worker error"))
+    mock_executor_class.return_value.submit.return_value = future
+
+    embeddings = ProcessPoolEmbeddings("model", {}, num_workers=1, threads_per_worker=1, min_shard_size=1)
+    with pytest.raises(EmbeddingError, match="Simulated worker error"):
+        embeddings.embed_documents(["a"])
@@ -0,0 +1,98 @@
+import pytest
+
+from src.core.models.query_embedding_cache import QueryEmbeddingCache
+from src.core.utils.singleton_meta import SingletonMeta
+
+
+@pytest.fixture(autouse=True)
+def reset_singleton_meta_instances():
+    with SingletonMeta._lock:
+        SingletonMeta._instances = {}
+
+    yield
+
+
+@pytest.fixture
+def mock_embeddings(mocker):
+    embeddings = mocker.Mock()
+    embeddings.model_name = "model"
+    embeddings.embed_query.side_effect = lambda text: [float(len(text))]
+    return embeddings
+
+
+def test_query_embedding_cache_reuses_embeddings_of_normalized_queries(mock_embeddings):
+    cache = QueryEmbeddingCache(max_size=8)
+
+    first = cache.get_query_embedding(mock_embeddings, "What is attention?")
+    second = cache.get_query_embedding(mock_embeddings, "  What is\nattention? ")
+
+    assert first == second == [18.0]
+    mock_embeddings.embed_query.assert_called_once_with("What is attention?")
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "size": 1}
+
+
+def test_query_embedding_cache_keys_by_model(mocker, mock_embeddings):
+    other_embeddings = mocker.Mock()
+    other_embeddings.model_name = "other-model"
+    other_embeddings.embed_query.return_value = [1.0]
+    cache = QueryEmbeddingCache(max_size=8)
+
+    cache.get_query_embedding(mock_embeddings, "query")
+
+    assert cache.get_query_embedding(other_embeddings, "query") == [1.0]
+    assert cache.misses == 2
+
+
+def test_query_embedding_cache_evicts_least_recently_used(mock_embeddings):
+    cache = QueryEmbeddingCache(max_size=2)
+    cache.get_query_embedding(mock_embeddings, "a")
+    cache.get_query_embedding(mock_embeddings, "b")
+    cache.get_query_embedding(mock_embeddings, "a")
+
+    cache.get_query_embedding(mock_embeddings, "c")
+    cache.get_query_embedding(mock_embeddings, "a")
+    cache.get_query_embedding(mock_embeddings, "b")
+
+    assert len(cache) == 2
+    assert [call.args[0] for call in mock_embeddings.embed_query.call_args_list] == ["a", "b", "c", "b"]
+
+
+def test_query_embedding_cache_returns_copies(mock_embeddings):
+    cache = QueryEmbeddingCache(max_size=8)
+
+    cache.get_query_embedding(mock_embeddings, "query").append(0.0)
+
+    assert cache.get_query_embedding(mock_embeddings, "query") == [5.0]
+
+
+def test_query_embedding_cache_is_shared(mock_embeddings):
+    QueryEmbeddingCache().get_query_embedding(mock_embeddings, "query")
+
+    assert QueryEmbeddingCache().hits == 0
+    assert len(QueryEmbeddingCache()) == 1
+
+
+def test_query_embedding_cache_clear(mock_embeddings):
+    cache = QueryEmbeddingCache(max_size=8)
+    cache.get_query_embedding(mock_embeddings, "query")
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.stats()["misses"] == 0
+
+
+def test_query_embedding_cache_embeds_missing_queries_in_one_batch(mocker, mock_embeddings):
+    embed_queries = mocker.patch(
+        "src.core.models.query_embedding_cache.embed_queries",
+        side_effect=lambda embeddings, queries: [[float(len(query))] for query in queries],
+    )
+    cache = QueryEmbeddingCache(max_size=8)
+    cache.get_query_embedding(mock_embeddings, "cached")
+
+    results = cache.get_query_embeddings(mock_embeddings, ["cached", "new", " new ", "other"])
+
+    assert results == [[6.0], [3.0], [3.0], [5.0]]
+    embed_queries.assert_called_once_with(mock_embeddings, ["new", "other"])
+    assert len(cache) == 3
+    assert cache.hits == 1
@@ -0,0 +1,56 @@
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+
+from src.core.models.query_embeddings import embed_queries
+
+
+class BatchedQueryEmbeddings(Embeddings):
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        raise AssertionError("Documents should not be embedded")
+
+    def embed_query(self, text: str) -> list[float]:
+        raise AssertionError("Queries should be embedded in one batch")
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        return [[float(len(text))] for text in texts]
+
+
+def test_embed_queries_uses_embed_queries_method():
+    assert embed_queries(BatchedQueryEmbeddings(), ["a", "bb"]) == [[1.0], [2.0]]
+
+
+def test_embed_queries_encodes_hugging_face_queries_in_one_batch(mocker):
+    embeddings = HuggingFaceEmbeddings.model_construct(
+        model_name="model", query_encode_kwargs={"prompt": "query: "}, encode_kwargs={}
+    )
+    embeddings._client = mocker.Mock()
+    embeddings._client.encode.return_value = np.array([[1.0], [2.0]])
+
+    assert embed_queries(embeddings, ["a", "b\nc"]) == [[1.0], [2.0]]
+    embeddings._client.encode.assert_called_once_with(
+        ["a", "b c"], prompt="query: ", show_progress_bar=False, convert_to_numpy=True
+    )
+
+
+def test_embed_queries_embeds_hugging_face_queries_as_documents_without_query_settings(mocker):
+    embeddings = HuggingFaceEmbeddings.model_construct(model_name="model", query_encode_kwargs={}, encode_kwargs={})
+    embed_documents = mocker.patch.object(HuggingFaceEmbeddings, "embed_documents", return_value=[[1.0], [2.0]])
+
+    assert embed_queries(embeddings, ["a", "b"]) == [[1.0], [2.0]]
+    embed_documents.assert_called_once_with(["a", "b"])
+
+
+def test_embed_queries_falls_back_to_embed_query(mocker):
+    embeddings = mocker.Mock(spec=Embeddings)
+    embeddings.embed_query.side_effect = lambda text: [float(len(text))]
+
+    assert embed_queries(embeddings, ["a", "bb"]) == [[1.0], [2.0]]
+    assert embeddings.embed_query.call_count == 2
+
+
+def test_embed_queries_returns_empty_list_for_no_queries(mocker):
+    embeddings = mocker.Mock(spec=Embeddings)
+
+    assert embed_queries(embeddings, []) == []
+    embeddings.embed_query.assert_not_called()
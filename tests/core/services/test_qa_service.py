@@ -60,3 +60,13 @@ def test_generate_qa_answer_failure(mocker, mock_dependencies):
 
     assert str(excinfo.value) == f"Error during Q&A generation: {error_message}"
     mock_qa_graph.invoke.assert_called_once_with({"question": mock_question, "chat_history": None})
+
+
+def test_generate_qa_answer_passes_section(mock_dependencies):
+    mock_vec, mock_llm, mock_question, mock_qa_graph, _ = mock_dependencies
+
+    generate_qa_answer(mock_vec, mock_llm, mock_question, history=None, section="Title > Methods")
+
+    mock_qa_graph.invoke.assert_called_once_with(
+        {"question": mock_question, "chat_history": None, "section": "Title > Methods"}
+    )
@@ -0,0 +1,39 @@
+import multiprocessing
+import time
+
+from src.core.utils import file_lock
+from src.core.utils.file_lock import lock_file
+
+
+def _append_while_locked(lock_path, log_path, name):
+    with lock_file(lock_path):
+        with open(log_path, "a") as f:
+            f.write(f"{name} start\n")
+        time.sleep(0.2)
+        with open(log_path, "a") as f:
+            f.write(f"{name} end\n")
+
+
+def test_lock_file_serializes_processes(tmp_path):
+    lock_path, log_path = str(tmp_path / "lock"), str(tmp_path / "log")
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_append_while_locked, args=(lock_path, log_path, name)) for name in "ab"]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=10)
+        assert process.exitcode == 0
+
+    with open(log_path) as f:
+        lines = f.read().splitlines()
+    assert lines in (["a start", "a end", "b start", "b end"], ["b start", "b end", "a start", "a end"])
+
+
+def test_lock_file_does_nothing_without_fcntl(tmp_path, mocker):
+    mocker.patch.object(file_lock, "fcntl", None)
+
+    with lock_file(str(tmp_path / "lock")):
+        with lock_file(str(tmp_path / "lock")):
+            pass
+
+    assert not (tmp_path / "lock").exists()
@@ -0,0 +1,199 @@
+import gc
+import threading
+import time
+import weakref
+
+import pytest
+import torch
+
+from src.core.utils.model_registry import ModelRegistryMeta, estimate_module_bytes
+
+
+class FakeModel(metaclass=ModelRegistryMeta):
+    registry_key_args = ("model_name", "device")
+
+    loads = 0
+
+    def __init__(self, model_name: str, device: str = "cpu", batch_size: int = 8, memory_bytes: int = 100):
+        FakeModel.loads += 1
+        self.model_name = model_name
+        self.device = device
+        self.memory_bytes = memory_bytes
+        self.model = object()
+
+    def memory_footprint(self) -> int:
+        return self.memory_bytes
+
+
+class FailingModel(metaclass=ModelRegistryMeta):
+    def __init__(self, model_name: str):
+        raise RuntimeError("Simulated error during model loading")
+
+
+@pytest.fixture(autouse=True)
+def reset_model_registry():
+    ModelRegistryMeta.clear()
+    ModelRegistryMeta.configure(memory_budget_bytes=None, idle_timeout_seconds=None)
+    FakeModel.loads = 0
+
+    yield
+
+    ModelRegistryMeta.clear()
+    ModelRegistryMeta.configure(memory_budget_bytes=None, idle_timeout_seconds=None)
+
+
+def test_model_registry_shares_instances_per_key_arguments():
+    model_1 = FakeModel("a")
+    model_2 = FakeModel(model_name="a", device="cpu")
+    model_3 = FakeModel("a", batch_size=32)
+
+    assert model_1 is model_2 is model_3
+    assert FakeModel.loads == 1
+
+
+def test_model_registry_hosts_one_instance_per_key():
+    model_a = FakeModel("a")
+    model_b = FakeModel("b")
+    model_a_cuda = FakeModel("a", device="cuda")
+
+    assert len({id(model_a), id(model_b), id(model_a_cuda)}) == 3
+    assert ModelRegistryMeta.stats() == {"instances": 3, "memory_bytes": 300}
+
+
+def test_model_registry_loads_each_key_once_under_concurrency():
+    barrier = threading.Barrier(8)
+    instances = []
+
+    def load():
+        barrier.wait()
+        instances.append(FakeModel("a"))
+
+    threads = [threading.Thread(target=load) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert FakeModel.loads == 1
+    assert all(instance is instances[0] for instance in instances)
+
+
+def registered_instances() -> list:
+    return [entry.instance for entry in ModelRegistryMeta._entries.values()]
+
+
+def test_model_registry_evicts_least_recently_used_over_memory_budget():
+    ModelRegistryMeta.configure(memory_budget_bytes=250, idle_timeout_seconds=None)
+    model_a = FakeModel("a")
+    FakeModel("b")
+    FakeModel("a")
+
+    model_c = FakeModel("c")
+
+    assert registered_instances() == [model_a, model_c]
+    assert ModelRegistryMeta.stats() == {"instances": 2, "memory_bytes": 200}
+    FakeModel("b")
+    assert FakeModel.loads == 4
+
+
+def test_model_registry_keeps_new_instance_larger_than_budget():
+    ModelRegistryMeta.configure(memory_budget_bytes=50, idle_timeout_seconds=None)
+    FakeModel("a")
+
+    model_b = FakeModel("b", memory_bytes=500)
+
+    assert registered_instances() == [model_b]
+    assert FakeModel("b") is model_b
+
+
+def test_model_registry_eviction_leaves_instances_in_use_intact():
+    ModelRegistryMeta.configure(memory_budget_bytes=100, idle_timeout_seconds=None)
+    model_a = FakeModel("a", memory_bytes=80)
+    weights = model_a.model
+
+    FakeModel("b", memory_bytes=80)
+
+    assert model_a not in registered_instances()
+    assert model_a.model is weights
+
+
+def test_model_registry_returns_evicted_instance_still_in_use_instead_of_reloading():
+    ModelRegistryMeta.configure(memory_budget_bytes=100, idle_timeout_seconds=None)
+    model_a = FakeModel("a", memory_bytes=80)
+    FakeModel("b", memory_bytes=80)
+
+    assert FakeModel("a", memory_bytes=80) is model_a
+    assert FakeModel.loads == 2
+    assert ModelRegistryMeta.stats() == {"instances": 1, "memory_bytes": 80}
+
+
+def test_model_registry_reloads_evicted_instance_once_released():
+    ModelRegistryMeta.configure(memory_budget_bytes=100, idle_timeout_seconds=None)
+    model_a = FakeModel("a", memory_bytes=80)
+    reference = weakref.ref(model_a)
+    FakeModel("b", memory_bytes=80)
+
+    del model_a
+    gc.collect()
+
+    assert reference() is None
+    FakeModel("a", memory_bytes=80)
+    assert FakeModel.loads == 3
+
+
+def test_model_registry_evicts_idle_instances():
+    ModelRegistryMeta.configure(memory_budget_bytes=None, idle_timeout_seconds=60)
+    model_a = FakeModel("a")
+    model_b = FakeModel("b")
+    for entry in ModelRegistryMeta._entries.values():
+        if entry.instance is model_a:
+            entry.last_used -= 120
+
+    assert ModelRegistryMeta.evict_idle() == 1
+    assert registered_instances() == [model_b]
+    assert model_a.model is not None
+
+
+def test_model_registry_sweeps_idle_instances_in_background():
+    ModelRegistryMeta.configure(memory_budget_bytes=None, idle_timeout_seconds=0.05)
+    FakeModel("a")
+
+    deadline = time.monotonic() + 2
+    while ModelRegistryMeta.stats()["instances"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert ModelRegistryMeta.stats()["instances"] == 0
+
+
+def test_model_registry_does_not_register_failed_instances():
+    with pytest.raises(RuntimeError):
+        FailingModel("a")
+
+    assert ModelRegistryMeta.stats()["instances"] == 0
+
+
+def test_model_registry_clear_drops_all_instances():
+    model_a = FakeModel("a")
+    FakeModel("b")
+
+    ModelRegistryMeta.clear()
+
+    assert ModelRegistryMeta.stats()["instances"] == 0
+    assert FakeModel("a") is not model_a
+
+
+def test_estimate_module_bytes_counts_parameters_and_buffers():
+    module = torch.nn.BatchNorm1d(4)
+    wrapper = type("Predictor", (), {"model": torch.nn.Linear(2, 3)})()
+
+    assert estimate_module_bytes(module) == (4 + 4 + 4 + 4) * 4 + 8
+    assert estimate_module_bytes(wrapper, "not a module") == (2 * 3 + 3) * 4
+
+
+def test_model_registry_returns_loaded_instance_without_locking(mocker):
+    instance = FakeModel("a")
+    mock_lock = mocker.MagicMock()
+    mocker.patch.object(ModelRegistryMeta, "_lock", mock_lock)
+
+    assert FakeModel("a") is instance
+    mock_lock.__enter__.assert_not_called()
@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+from src.core.utils.prefetch import prefetch
+
+
+def test_prefetch_yields_all_items_in_order():
+    assert list(prefetch(iter(range(10)), max_prefetch=2)) == list(range(10))
+
+
+def test_prefetch_produces_items_in_background_thread():
+    producer_threads = []
+
+    def produce():
+        for i in range(3):
+            producer_threads.append(threading.current_thread())
+            yield i
+
+    assert list(prefetch(produce(), max_prefetch=1)) == [0, 1, 2]
+    assert all(thread is not threading.current_thread() for thread in producer_threads)
+
+
+def test_prefetch_reraises_producer_errors():
+    producer_error = RuntimeError("Simulated producer error")
+
+    def produce():
+        yield 1
+        raise producer_error
+
+    results = []
+    with pytest.raises(RuntimeError) as excinfo:
+        for item in prefetch(produce(), max_prefetch=1):
+            results.append(item)
+
+    assert results == [1]
+    assert excinfo.value is producer_error
+
+
+def test_prefetch_stops_producer_when_consumer_stops_early():
+    produced = []
+    finished = threading.Event()
+
+    def produce():
+        try:
+            for i in range(1000):
+                produced.append(i)
+                yield i
+        finally:
+            finished.set()
+
+    stream = prefetch(produce(), max_prefetch=1)
+    assert next(stream) == 0
+    stream.close()
+
+    assert finished.wait(timeout=5)
+    assert len(produced) < 1000
+
+
+def test_prefetch_closes_producer_when_consumer_raises():
+    finished = threading.Event()
+    producer_threads = []
+
+    def produce():
+        producer_threads.append(threading.current_thread())
+        try:
+            for i in range(1000):
+                yield i
+        finally:
+            finished.set()
+
+    with pytest.raises(ValueError):
+        for item in prefetch(produce(), max_prefetch=1):
+            raise ValueError("Simulated consumer error")
+
+    assert finished.is_set()
+    assert not producer_threads[0].is_alive()
@@ -0,0 +1,50 @@
+import threading
+
+from src.core.utils.read_write_lock import ReadWriteLock
+
+
+def test_read_write_lock_shares_reads():
+    lock = ReadWriteLock()
+    barrier = threading.Barrier(2, timeout=5)
+
+    def read():
+        with lock.read():
+            barrier.wait()
+
+    threads = [threading.Thread(target=read) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not barrier.broken
+
+
+def test_read_write_lock_write_waits_for_readers():
+    lock = ReadWriteLock()
+    events = []
+    reading = threading.Event()
+    release = threading.Event()
+
+    def read():
+        with lock.read():
+            reading.set()
+            release.wait(5)
+            events.append("read done")
+
+    def write():
+        with lock.write():
+            events.append("write")
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    reading.wait(5)
+    writer = threading.Thread(target=write)
+    writer.start()
+    writer.join(0.1)
+    assert events == []
+
+    release.set()
+    reader.join()
+    writer.join()
+    assert events == ["read done", "write"]
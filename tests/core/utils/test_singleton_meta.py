@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+from src.core.utils.singleton_meta import SingletonMeta
+
+
+@pytest.fixture(autouse=True)
+def reset_singleton_meta_instances():
+    with SingletonMeta._lock:
+        SingletonMeta._instances = {}
+
+    yield
+
+    with SingletonMeta._lock:
+        SingletonMeta._instances = {}
+
+
+class Counter(metaclass=SingletonMeta):
+    created = 0
+
+    def __init__(self):
+        Counter.created += 1
+
+
+class SlowSingleton(metaclass=SingletonMeta):
+    started = threading.Event()
+    release = threading.Event()
+
+    def __init__(self):
+        SlowSingleton.started.set()
+        SlowSingleton.release.wait(timeout=5)
+
+
+def test_singleton_meta_creates_instance_once_under_concurrency():
+    Counter.created = 0
+    barrier = threading.Barrier(8)
+    instances = []
+
+    def create():
+        barrier.wait()
+        instances.append(Counter())
+
+    threads = [threading.Thread(target=create) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert Counter.created == 1
+    assert all(instance is instances[0] for instance in instances)
+
+
+def test_singleton_meta_returns_published_instance_without_locking(mocker):
+    instance = Counter()
+    mock_lock = mocker.MagicMock()
+    mocker.patch.object(SingletonMeta, "_lock", mock_lock)
+
+    assert Counter() is instance
+    mock_lock.__enter__.assert_not_called()
+
+
+def test_singleton_meta_slow_initialization_does_not_block_other_classes():
+    SlowSingleton.started.clear()
+    SlowSingleton.release.clear()
+    slow_thread = threading.Thread(target=SlowSingleton)
+    slow_thread.start()
+    assert SlowSingleton.started.wait(timeout=5)
+
+    counter_created = threading.Event()
+    threading.Thread(target=lambda: (Counter(), counter_created.set())).start()
+
+    try:
+        assert counter_created.wait(timeout=1)
+    finally:
+        SlowSingleton.release.set()
+        slow_thread.join()